@@ -0,0 +1,89 @@
+"""Benchmark: blocking PyMongo calls vs. the async data-access layer.
+
+Simulates N concurrent interactions that each perform a few database round-trips
+against a collection with fixed latency, and reports wall time, throughput and
+event-loop lag (how late a 10 ms heartbeat fires) for both paths.
+
+Usage:
+    python -m benchmarks.bench_async_db [--interactions 200] [--calls 4] [--latency-ms 5]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from services.database.async_operations import run_blocking
+
+
+class SlowCollection:
+    """Stand-in for a pymongo Collection with fixed round-trip latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def find_one(self, query):
+        time.sleep(self.latency)
+        return {"_id": 1, **query}
+
+
+async def _heartbeat(stop: asyncio.Event, lags: list, interval: float = 0.01):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def _interaction_blocking(collection: SlowCollection, calls: int):
+    for i in range(calls):
+        collection.find_one({"user_id": str(i)})
+        await asyncio.sleep(0)
+
+
+async def _interaction_async(collection: SlowCollection, calls: int):
+    for i in range(calls):
+        await run_blocking(collection.find_one, {"user_id": str(i)})
+
+
+async def _run(mode: str, interactions: int, calls: int, latency: float):
+    collection = SlowCollection(latency)
+    handler = _interaction_blocking if mode == "blocking" else _interaction_async
+    lags: list = []
+    stop = asyncio.Event()
+    heartbeat = asyncio.create_task(_heartbeat(stop, lags))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(collection, calls) for _ in range(interactions)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await heartbeat
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    return {
+        "mode": mode,
+        "elapsed_s": elapsed,
+        "ops_per_s": interactions * calls / elapsed,
+        "lag_p50_ms": statistics.median(lags_ms),
+        "lag_max_ms": lags_ms[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--interactions", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    print(f"{args.interactions} interactions x {args.calls} calls, {args.latency_ms} ms per call")
+    for mode in ("blocking", "async"):
+        r = asyncio.run(_run(mode, args.interactions, args.calls, latency))
+        print(
+            f"{r['mode']:>9}: {r['elapsed_s']:.2f}s  {r['ops_per_s']:.0f} ops/s  "
+            f"loop lag p50 {r['lag_p50_ms']:.1f} ms, max {r['lag_max_ms']:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Micro-benchmark: list-scan bingo checks vs. the bitboard engine.
+
+Plays complete games (all 75 numbers) and times the per-call work the game loop does:
+  * legacy:   for every participant, scan the card for the number, then scan rows,
+              columns and diagonals (check_bingo) - plus one count_remaining_numbers
+              pass for the halfway leaderboard
+  * bitboard: BingoBoard.call() touches only cards holding the number, then a mask
+              test per touched card - plus board.standings() for the leaderboard
+
+Usage:
+    python -m benchmarks.bench_bingo [--players 10 50 200] [--games 20]
+"""
+import argparse
+import random
+import time
+
+from cogs.systems.bingo_game import generate_bingo_card
+from cogs.systems.bingo_game.bingoboard import BingoBoard
+
+HALFWAY = int(75 * 0.4)
+
+
+def legacy_check_bingo(card, marked):
+    for row in card:
+        if all(num == 0 or num in marked for num in row):
+            return True
+    for col in range(5):
+        if all(card[row][col] == 0 or card[row][col] in marked for row in range(5)):
+            return True
+    if all(card[i][i] == 0 or card[i][i] in marked for i in range(5)):
+        return True
+    if all(card[i][4 - i] == 0 or card[i][4 - i] in marked for i in range(5)):
+        return True
+    return False
+
+
+def legacy_count_remaining(card, marked):
+    count = 0
+    for row in card:
+        for num in row:
+            if num != 0 and num not in marked:
+                count += 1
+    return count
+
+
+def play_legacy(cards, calls):
+    marked = [set() for _ in cards]
+    called = []
+    for number in calls:
+        called.append(number)
+        if len(called) == HALFWAY:
+            sorted(legacy_count_remaining(card, set(called)) for card in cards)
+        for index, card in enumerate(cards):
+            for row in card:
+                if number in row:
+                    marked[index].add(number)
+                    break
+            legacy_check_bingo(card, marked[index])
+
+
+def play_bitboard(cards, calls):
+    board = BingoBoard(cards)
+    for count, number in enumerate(calls, 1):
+        if count == HALFWAY:
+            board.standings()
+        for index in board.call(number):
+            board.has_bingo(index)
+
+
+def bench(players: int, games: int, rng: random.Random):
+    setups = [
+        ([generate_bingo_card() for _ in range(players)], rng.sample(range(1, 76), 75))
+        for _ in range(games)
+    ]
+    results = {}
+    for name, play in (("legacy", play_legacy), ("bitboard", play_bitboard)):
+        start = time.perf_counter()
+        for cards, calls in setups:
+            play(cards, calls)
+        results[name] = (time.perf_counter() - start) / (games * 75) * 1e6
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--games", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    print("per number call (us)")
+    for players in args.players:
+        r = bench(players, args.games, rng)
+        print(
+            f"{players:>4} players: legacy {r['legacy']:8.1f} us | bitboard {r['bitboard']:6.1f} us | "
+            f"x{r['legacy'] / r['bitboard']:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Benchmark: /petbattles globalrank, full collection scan vs. indexed ranking.
+
+Seeds a scratch database with N synthetic pets and times
+  * legacy:  find({}).sort(level, xp) into a list, then a linear search
+  * indexed: petranking.get_global_ranking (top 3 + count_documents + estimated count)
+for a pet near the top, the median and the bottom of the ranking.
+
+Needs a real MongoDB to be meaningful (mongomock has no indexes):
+    python -m benchmarks.bench_globalrank --uri mongodb://localhost:27017 --sizes 100000 1000000
+A quick correctness smoke run without a server:
+    python -m benchmarks.bench_globalrank --mock --sizes 2000
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+from pymongo import MongoClient
+
+from cogs.systems.pet_battles import petranking
+
+BENCH_DB = "astrostats_bench"
+BATCH = 10_000
+
+
+def _seed(collection, size: int, rng: random.Random) -> None:
+    collection.drop()
+    petranking._rank_index_ready = False
+    for start in range(0, size, BATCH):
+        collection.insert_many([
+            {
+                "user_id": str(i),
+                "guild_id": str(i % 500),
+                "name": f"Pet{i}",
+                "level": rng.randint(1, 60),
+                "xp": rng.randint(0, 360_000),
+            }
+            for i in range(start, min(size, start + BATCH))
+        ], ordered=False)
+    petranking.ensure_rank_index(collection)
+
+
+def _legacy_rank(collection, pet):
+    all_pets = list(collection.find({}).sort([("level", -1), ("xp", -1)]))
+    for index, ranked in enumerate(all_pets):
+        if ranked["_id"] == pet["_id"]:
+            return index + 1, len(all_pets)
+    return None, len(all_pets)
+
+
+def _time(func, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run(collection, size: int, repeat: int, skip_legacy: bool) -> None:
+    rng = random.Random(size)
+    t0 = time.perf_counter()
+    _seed(collection, size, rng)
+    print(f"\n{size:,} pets (seeded in {time.perf_counter() - t0:.1f}s)")
+
+    ordered_ids = [p["_id"] for p in collection.find({}, {"_id": 1}).sort(petranking.RANK_SORT)]
+    probes = {"top": ordered_ids[1], "median": ordered_ids[size // 2], "bottom": ordered_ids[-1]}
+
+    for label, pet_id in probes.items():
+        pet = collection.find_one({"_id": pet_id})
+        indexed_ms = _time(lambda: petranking.get_global_ranking(collection, pet, 3), repeat)
+        rank = petranking.get_global_ranking(collection, pet, 3)["rank"]
+        line = f"  {label:>6} (rank {rank:,}): indexed {indexed_ms:8.2f} ms"
+        if not skip_legacy:
+            legacy_ms = _time(lambda: _legacy_rank(collection, pet), max(1, repeat // 5))
+            line += f" | legacy {legacy_ms:9.2f} ms | speedup x{legacy_ms / max(indexed_ms, 1e-6):,.0f}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uri", default=os.getenv("MONGODB_URI"))
+    parser.add_argument("--mock", action="store_true", help="use mongomock instead of a server")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--skip-legacy", action="store_true")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch database")
+    args = parser.parse_args()
+
+    if args.mock:
+        import mongomock
+        client = mongomock.MongoClient()
+    elif args.uri:
+        client = MongoClient(args.uri)
+    else:
+        parser.error("pass --uri (or set MONGODB_URI) or --mock")
+
+    collection = client[BENCH_DB]["pets"]
+    try:
+        for size in args.sizes:
+            run(collection, size, args.repeat, args.skip_legacy)
+    finally:
+        if not args.keep:
+            client.drop_database(BENCH_DB)
+
+
+if __name__ == "__main__":
+    main()
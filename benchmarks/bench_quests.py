@@ -0,0 +1,185 @@
+"""Micro-benchmark: substring-matched quest progress vs. the metric dispatch table.
+
+Runs the same random battles through both versions of update_quests_and_achievements,
+checks they complete the same entries and award the same XP/cash, and times the per-battle work:
+  * legacy:   full quest copies on the pet; per entry, a chain of substring checks on the
+              description
+  * dispatch: compact {id: progress} maps on the pet, hydrated from the definitions; per
+              entry, an id -> metric lookup and one updater call, skipping entries whose
+              metric the battle didn't change
+
+Usage:
+    python -m benchmarks.bench_quests [--battles 20000] [--quests 3 8 20] [--repeat 5]
+"""
+import argparse
+import copy
+
+import bson
+import random
+import time
+
+import services.premium as premium
+from cogs.systems.pet_battles import petquests
+from cogs.systems.pet_battles.petconstants import ACHIEVEMENTS, DAILY_COMPLETION_BONUS, DAILY_QUESTS
+
+TIER_MULTIPLIERS = {"supporter": 1.2, "sponsor": 1.5, "vip": 1.75}
+
+
+def legacy_update(pet, battle_stats):
+    """The description-matching implementation this replaces, entitlements lookups included."""
+    def award(xp, cash):
+        tier = premium.get_user_entitlements(str(pet.get('user_id', ''))).get('tier', 'free')
+        pet['xp'] += int(round(xp * TIER_MULTIPLIERS.get(tier, 1.0)))
+        tier = premium.get_user_entitlements(str(pet.get('user_id', ''))).get('tier', 'free')
+        pet['balance'] += int(round(cash * TIER_MULTIPLIERS.get(tier, 1.0)))
+
+    completed_quests, completed_achievements, daily_bonus = [], [], False
+    for quest in pet.get('daily_quests', []):
+        if quest.get('completed', False):
+            continue
+        initial = quest.get('progress', 0)
+        d = quest['description']
+        if "Win " in d:
+            quest['progress'] = min(quest['progress_required'], initial + battle_stats.get('battles_won', 0))
+        elif "battle win streak" in d or "battle killstreak" in d:
+            if pet.get('killstreak', 0) >= quest['progress_required']:
+                quest['progress'] = quest['progress_required']
+        elif "Inflict" in d and "critical hits" in d:
+            quest['progress'] = min(quest['progress_required'], initial + battle_stats.get('critical_hits', 0))
+        elif "Land" in d and "lucky hits" in d:
+            quest['progress'] = min(quest['progress_required'], initial + battle_stats.get('lucky_hits', 0))
+        elif "Lose" in d:
+            quest['progress'] = min(quest['progress_required'], initial + battle_stats.get('battles_lost', 0))
+        elif "Earn" in d and "XP from battles" in d:
+            quest['progress'] = min(quest['progress_required'], initial + battle_stats.get('xp_earned', 0))
+        elif "Participate in" in d and "battles" in d:
+            quest['progress'] = min(quest['progress_required'], initial + 1)
+        elif "Deal" in d and "damage in total" in d:
+            quest['progress'] = min(quest['progress_required'], initial + battle_stats.get('damage_dealt', 0))
+        if quest['progress'] >= quest['progress_required']:
+            quest['completed'] = True
+            award(quest['xp_reward'], quest['cash_reward'])
+            completed_quests.append(quest)
+
+    if all(q.get('completed', False) for q in pet.get('daily_quests', [])) and not pet.get('claimed_daily_completion_bonus'):
+        award(DAILY_COMPLETION_BONUS['xp'], DAILY_COMPLETION_BONUS['cash'])
+        pet['claimed_daily_completion_bonus'] = True
+        daily_bonus = True
+
+    for achievement in pet.get('achievements', []):
+        if achievement.get('completed', False):
+            continue
+        initial = achievement.get('progress', 0)
+        d = achievement['description']
+        if "Win " in d:
+            achievement['progress'] = min(achievement['progress_required'], initial + battle_stats.get('battles_won', 0))
+        elif "battle killstreak" in d:
+            if pet.get('killstreak', 0) >= achievement['progress_required']:
+                achievement['progress'] = achievement['progress_required']
+        elif "Deal" in d and "total damage" in d:
+            achievement['progress'] = min(achievement['progress_required'], initial + battle_stats.get('damage_dealt', 0))
+        elif "Land" in d and "critical hits" in d:
+            achievement['progress'] = min(achievement['progress_required'], initial + battle_stats.get('critical_hits', 0))
+        elif "Land" in d and "lucky hits" in d:
+            achievement['progress'] = min(achievement['progress_required'], initial + battle_stats.get('lucky_hits', 0))
+        if achievement['progress'] >= achievement['progress_required']:
+            achievement['completed'] = True
+            award(achievement['xp_reward'], achievement['cash_reward'])
+            completed_achievements.append(achievement)
+    return completed_quests, completed_achievements, daily_bonus
+
+
+def make_pet(quests: int, rng: random.Random):
+    """A pet in the old stored form: full copies of each quest and achievement definition."""
+    def entry(definition):
+        return dict(definition, progress=0, completed=False)
+
+    return {
+        "user_id": "1", "xp": 0, "balance": 0, "killstreak": 0,
+        "claimed_daily_completion_bonus": False,
+        "daily_quests": [entry(q) for q in rng.sample(DAILY_QUESTS, quests)],
+        "achievements": [entry(a) for a in ACHIEVEMENTS],
+    }
+
+
+def compact_pet(pet):
+    """The same pet in the compact {id: progress} form."""
+    pet = copy.deepcopy(pet)
+    petquests.compact_quest_progress(pet)
+    return pet
+
+
+def make_battles(count: int, rng: random.Random):
+    battles = []
+    for _ in range(count):
+        won = rng.random() < 0.5
+        battles.append((won, {
+            "damage_dealt": rng.randint(20, 120),
+            "critical_hits": rng.randint(0, 3),
+            "lucky_hits": rng.randint(0, 2),
+            "battles_won": int(won),
+            "battles_lost": int(not won),
+            "xp_earned": rng.randint(10, 40),
+        }))
+    return battles
+
+
+def play(update, template, battles, reset_every: int = 25):
+    """Feeds the battles to one pet, handing out fresh quests every `reset_every` battles."""
+    pet = copy.deepcopy(template)
+    completions = []
+    for number, (won, stats) in enumerate(battles):
+        if number % reset_every == 0:
+            if isinstance(pet["daily_quests"], dict):
+                pet["daily_quests"] = dict.fromkeys(pet["daily_quests"], 0)
+            else:
+                for quest in pet["daily_quests"]:
+                    quest["progress"], quest["completed"] = 0, False
+            pet["claimed_daily_completion_bonus"] = False
+        pet["killstreak"] = pet["killstreak"] + 1 if won else 0
+        quests, achievements, bonus = update(pet, stats)
+        completions.append(([q["id"] for q in quests], [a["id"] for a in achievements], bonus))
+    return pet, completions
+
+
+def bench(quests: int, battles: int, repeat: int, rng: random.Random):
+    template = make_pet(quests, rng)
+    fights = make_battles(battles, rng)
+    results = {}
+    outcomes = {}
+    for name, update, start_pet in (("legacy", legacy_update, template),
+                                    ("dispatch", petquests.update_quests_and_achievements, compact_pet(template))):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            pet, completions = play(update, start_pet, fights)
+            best = min(best, time.perf_counter() - start)
+        results[name] = best / battles * 1e6
+        outcomes[name] = (pet["xp"], pet["balance"], completions)
+        results[f"{name}_bytes"] = len(bson.encode({k: start_pet[k] for k in ("daily_quests", "achievements")}))
+    if outcomes["legacy"] != outcomes["dispatch"]:
+        raise SystemExit(f"dispatch table diverged from the legacy matcher with {quests} quests")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--battles", type=int, default=20_000)
+    parser.add_argument("--quests", type=int, nargs="+", default=[3, 8, 20])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    print("per battle update, best of --repeat runs (us); identical completions verified")
+    # A supporter whose entitlements are already cached, as during a normal battle
+    premium._ENTITLEMENTS_CACHE["1"] = (time.time() + 3600, premium._tier_entitlements("supporter"))
+    for quests in args.quests:
+        r = bench(quests, args.battles, args.repeat, rng)
+        print(
+            f"{quests:>3} quests: legacy {r['legacy']:6.2f} us | dispatch {r['dispatch']:6.2f} us | "
+            f"x{r['legacy'] / r['dispatch']:.1f} | quest fields {r['legacy_bytes']} -> {r['dispatch_bytes']} bytes"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -9,8 +9,9 @@ from discord.ext import commands
 from discord import app_commands
 from typing import Optional, Literal, List
 
-from services.premium import get_user_entitlements
+from services.premium import get_user_entitlements_async
 from services.database.welcome import get_welcome_settings, update_welcome_settings
+from services.database.async_operations import run_blocking
 from ui.embeds import get_premium_promotion_view
 
 logger = logging.getLogger(__name__)
@@ -24,11 +25,8 @@ def has_required_tier(required_tiers: List[str]):
         
         try:
             # Use asyncio.wait_for to prevent blocking Discord interactions
-            loop = asyncio.get_running_loop()
             ent = await asyncio.wait_for(
-                loop.run_in_executor(
-                    None, get_user_entitlements, user_id
-                ),
+                get_user_entitlements_async(user_id),
                 timeout=2.0  # 2 second timeout
             )
             user_tier = ent.get("tier", "free")
@@ -66,7 +64,7 @@ def has_required_tier(required_tiers: List[str]):
             inline=False
         )
         
-        view = get_premium_promotion_view(user_id) if user_tier == "free" else None
+        view = await get_premium_promotion_view(user_id) if user_tier == "free" else None
         await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
         return False
     
@@ -172,7 +170,7 @@ class WelcomeCog(commands.GroupCog, group_name="welcome"):
         is_enabled = enabled == "true"
         
         # Update the database
-        success = update_welcome_settings(guild_id, enabled=is_enabled)
+        success = await run_blocking(update_welcome_settings, guild_id, enabled=is_enabled)
         
         if not success:
             embed = discord.Embed(
@@ -206,7 +204,7 @@ class WelcomeCog(commands.GroupCog, group_name="welcome"):
     async def status(self, interaction: discord.Interaction):
         """Show current welcome settings."""
         guild_id = str(interaction.guild.id)
-        welcome_settings = get_welcome_settings(guild_id)
+        welcome_settings = await run_blocking(get_welcome_settings, guild_id)
 
         is_enabled = welcome_settings.enabled if welcome_settings else False
         embed = discord.Embed(
@@ -280,7 +278,7 @@ class WelcomeCog(commands.GroupCog, group_name="welcome"):
             return
         
         guild_id = str(interaction.guild.id)
-        success = update_welcome_settings(guild_id, custom_message=message)
+        success = await run_blocking(update_welcome_settings, guild_id, custom_message=message)
         
         if not success:
             embed = discord.Embed(
@@ -337,7 +335,7 @@ class WelcomeCog(commands.GroupCog, group_name="welcome"):
     async def remove_message(self, interaction: discord.Interaction):
         """Remove the custom welcome message."""
         guild_id = str(interaction.guild.id)
-        success = update_welcome_settings(guild_id, custom_message=None)
+        success = await run_blocking(update_welcome_settings, guild_id, custom_message=None)
         
         if not success:
             embed = discord.Embed(
@@ -401,8 +399,9 @@ class WelcomeCog(commands.GroupCog, group_name="welcome"):
             
             # Save the image data to database
             guild_id = str(interaction.guild.id)
-            success = update_welcome_settings(
-                guild_id, 
+            success = await run_blocking(
+                update_welcome_settings,
+                guild_id,
                 custom_image_data=image_base64,
                 custom_image_filename=image.filename
             )
@@ -453,7 +452,7 @@ class WelcomeCog(commands.GroupCog, group_name="welcome"):
     async def remove_image(self, interaction: discord.Interaction):
         """Remove the custom welcome image."""
         guild_id = str(interaction.guild.id)
-        success = update_welcome_settings(guild_id, custom_image_data=None, custom_image_filename=None)
+        success = await run_blocking(update_welcome_settings, guild_id, custom_image_data=None, custom_image_filename=None)
         
         if not success:
             embed = discord.Embed(
@@ -477,7 +476,7 @@ class WelcomeCog(commands.GroupCog, group_name="welcome"):
     async def test_welcome(self, interaction: discord.Interaction):
         """Test/preview the welcome message."""
         guild_id = str(interaction.guild.id)
-        welcome_settings = get_welcome_settings(guild_id)
+        welcome_settings = await run_blocking(get_welcome_settings, guild_id)
         
         # Check if welcome is enabled
         if not welcome_settings or not welcome_settings.enabled:
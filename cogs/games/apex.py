@@ -12,6 +12,7 @@ from config.constants import APEX_PLATFORM_MAPPING
 from core.errors import APIError, ResourceNotFoundError, send_error_embed
 from core.utils import get_conditional_embed
 from services.api.apex import fetch_apex_stats, format_stat_value
+from services.api.statscache import get_stats_cache
 from ui.embeds import get_premium_promotion_view
 
 logger = logging.getLogger(__name__)
@@ -28,7 +29,7 @@ class ApexCog(commands.GroupCog, group_name="apex"):
 
     async def _fetch_player_data(self, platform: str, name: str) -> Optional[Dict[str, Any]]:
         """Fetch and parse Apex stats for a player."""
-        data = await asyncio.to_thread(fetch_apex_stats, platform, name)
+        data = await get_stats_cache().get("apex", platform, name, lambda: fetch_apex_stats(platform, name))
         if not data or "data" not in data or "segments" not in data["data"]:
             return None
 
@@ -123,7 +124,7 @@ class ApexCog(commands.GroupCog, group_name="apex"):
             if conditional_embed:
                 embeds.append(conditional_embed)
 
-            premium_view = get_premium_promotion_view(str(interaction.user.id))
+            premium_view = await get_premium_promotion_view(str(interaction.user.id))
 
             await interaction.followup.send(
                 embeds=embeds,
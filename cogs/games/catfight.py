@@ -17,6 +17,8 @@ from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure
 
 from config.settings import MONGODB_URI
+from services.database.async_operations import run_blocking
+from services.database.connection import get_client, get_database
 from services.image_generator import battle_image_generator
 from ui.embeds import get_premium_promotion_view
 from core.utils import get_conditional_embed
@@ -35,9 +37,9 @@ catfight_stats = None
 
 try:
     if MONGODB_URI:
-        mongo_client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=30000, connectTimeoutMS=20000, socketTimeoutMS=20000)
+        mongo_client = get_client()
         mongo_client.admin.command('ping')
-        db = mongo_client['astrostats_database']
+        db = get_database()
         catfight_stats = db['catfight_stats']
         logger.debug("Catfight: MongoDB connection established")
     else:
@@ -106,7 +108,7 @@ class CatfightCog(commands.Cog):
             return {"wins": 0, "losses": 0, "win_streak": 0, "loss_streak": 0}
         
         try:
-            stats = catfight_stats.find_one({
+            stats = await run_blocking(catfight_stats.find_one, {
                 "user_id": user_id,
                 "guild_id": guild_id
             })
@@ -150,7 +152,8 @@ class CatfightCog(commands.Cog):
                 }
             
             # Update in database
-            catfight_stats.update_one(
+            await run_blocking(
+                catfight_stats.update_one,
                 {"user_id": user_id, "guild_id": guild_id},
                 {
                     "$set": {
@@ -172,12 +175,13 @@ class CatfightCog(commands.Cog):
         
         try:
             # Sort by wins descending, then by win_streak descending
-            leaderboard = list(catfight_stats.find(
+            leaderboard_cursor = catfight_stats.find(
                 {"guild_id": guild_id}
             ).sort([
                 ("wins", -1),
                 ("win_streak", -1)
-            ]).limit(limit))
+            ]).limit(limit)
+            leaderboard = await run_blocking(list, leaderboard_cursor)
             
             return leaderboard
             
@@ -452,7 +456,7 @@ class CatfightCog(commands.Cog):
             final_embed.timestamp = datetime.now(timezone.utc)
             
             # Get premium view
-            premium_view = get_premium_promotion_view(str(winner.id))
+            premium_view = await get_premium_promotion_view(str(winner.id))
             
             # Edit original message with final result
             await asyncio.sleep(2)  # Final dramatic pause
@@ -540,7 +544,7 @@ class CatfightCog(commands.Cog):
             embed.timestamp = datetime.now(timezone.utc)
             
             # Get premium view
-            premium_view = get_premium_promotion_view(str(interaction.user.id))
+            premium_view = await get_premium_promotion_view(str(interaction.user.id))
             
             await interaction.followup.send(embed=embed, view=premium_view)
             
@@ -630,7 +634,7 @@ class CatfightCog(commands.Cog):
             embed.timestamp = datetime.now(timezone.utc)
             
             # Get premium view
-            premium_view = get_premium_promotion_view(str(interaction.user.id))
+            premium_view = await get_premium_promotion_view(str(interaction.user.id))
             
             await interaction.followup.send(embed=embed, view=premium_view)
             
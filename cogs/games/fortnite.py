@@ -12,8 +12,10 @@ from discord.ext import commands
 
 from config.constants import FORTNITE_TIME_MAPPING
 from config.settings import FORTNITE_API_KEY
-from core.errors import send_error_embed
+from core.errors import ResourceNotFoundError, send_error_embed
 from core.utils import get_conditional_embed
+from services.api.http import http_session
+from services.api.statscache import get_stats_cache
 from ui.embeds import get_premium_promotion_view
 
 logger = logging.getLogger(__name__)
@@ -30,6 +32,15 @@ class FortniteCog(commands.GroupCog, group_name="fortnite"):
         self.fortnite_thumbnail = os.path.join(self.base_path, "images", "fortnite_thumbnail.png")
 
     async def fetch_fortnite_stats(self, name: str, time_window: str) -> Optional[Dict[str, Any]]:
+        """Fetch a player's raw stats through the shared stats cache; None if not found or on error."""
+        try:
+            return await get_stats_cache().get(
+                "fortnite", time_window, name, lambda: self._request_fortnite_stats(name, time_window)
+            )
+        except ResourceNotFoundError:
+            return None
+
+    async def _request_fortnite_stats(self, name: str, time_window: str) -> Optional[Dict[str, Any]]:
         if not FORTNITE_API_KEY:
             logger.error("Fortnite API key not found. Please check your .env file.")
             return None
@@ -37,14 +48,14 @@ class FortniteCog(commands.GroupCog, group_name="fortnite"):
         url = f"https://fortnite-api.com/v2/stats/br/v2?timeWindow={time_window}&name={name}"
         headers = {"Authorization": FORTNITE_API_KEY}
 
-        async with aiohttp.ClientSession() as session:
+        async with http_session(url) as session:
             try:
                 async with session.get(url, headers=headers) as response:
                     status = response.status
                     if status == 200:
                         return await response.json()
                     if status == 404:
-                        return None
+                        raise ResourceNotFoundError(f"No Fortnite stats found for {name}")
 
                     logger.error("Failed to fetch stats for %s. HTTP %s received.", name, status)
                     return None
@@ -115,7 +126,7 @@ class FortniteCog(commands.GroupCog, group_name="fortnite"):
             if conditional_embed:
                 embeds.append(conditional_embed)
 
-            premium_view = get_premium_promotion_view(str(interaction.user.id))
+            premium_view = await get_premium_promotion_view(str(interaction.user.id))
 
             await interaction.followup.send(
                 embeds=embeds,
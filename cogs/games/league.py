@@ -1,5 +1,4 @@
 ﻿import os
-import time
 import asyncio
 import logging
 import datetime
@@ -16,6 +15,13 @@ from discord import app_commands
 from config.settings import LOL_API, DISCORD_APP_ID, TOKEN
 from config.constants import LEAGUE_REGIONS, LEAGUE_QUEUE_TYPE_NAMES, SPECIAL_EMOJI_NAMES, REGION_TO_ROUTING
 from core.errors import send_error_embed
+from core.singleflight import get_singleflight
+from services.api.http import RIOT_UPSTREAM, http_session
+from services.api.riot import get_riot_client
+from services.api.riotidentity import get_riot_identity_cache, riot_id_key
+from services.api.datadragon import DEFAULT_DDRAGON_VERSION, get_data_dragon
+from services.api.matchcache import get_match_cache
+from services.premium import get_user_entitlements_async
 from core.utils import get_conditional_embed
 from ui.embeds import get_premium_promotion_view
 from services.compare_image import compare_image_generator, compare_values
@@ -23,9 +29,6 @@ from discord.ui import View, Button
 
 logger = logging.getLogger(__name__)
 
-account_data_cache = {}
-CACHE_EXPIRY_SECONDS = 300
-
 
 class LeagueCog(commands.GroupCog, group_name="league"):
     """A cog grouping League of Legends commands under `/league`."""
@@ -82,13 +85,13 @@ class LeagueCog(commands.GroupCog, group_name="league"):
                 return
             headers = {'X-Riot-Token': riot_api_key}
 
-            regional_url = (
-                "https://europe.api.riotgames.com/"
-                f"riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
-            )
-            async with aiohttp.ClientSession() as session:
-                account_data = await self.fetch_data(session, regional_url, headers)
-                puuid = account_data.get('puuid') if account_data else None
+            async with http_session(RIOT_UPSTREAM) as session:
+                # Identical lookups running at the same time (a shared link) share one set of requests
+                profile_data = await get_singleflight("league_profile").do(
+                    (region.upper(), riot_id_key(game_name, tag_line)),
+                    lambda: self._load_profile(session, game_name, tag_line, region, headers)
+                )
+                puuid = profile_data["puuid"]
 
                 if not puuid:
                     await send_error_embed(
@@ -101,7 +104,7 @@ class LeagueCog(commands.GroupCog, group_name="league"):
                     )
                     return
 
-                summoner_data = await self.fetch_summoner_data(session, puuid, region, headers)
+                summoner_data = profile_data["summoner_data"]
                 if not summoner_data:
                     await send_error_embed(
                         interaction,
@@ -114,7 +117,7 @@ class LeagueCog(commands.GroupCog, group_name="league"):
                     )
                     return
 
-                league_data = await self.fetch_league_data(session, puuid, region, headers)
+                league_data = profile_data["league_data"]
                 query_params = urlencode({
                     "gameName": game_name,
                     "tagLine": tag_line,
@@ -170,9 +173,10 @@ class LeagueCog(commands.GroupCog, group_name="league"):
                 embed.add_field(name="Ranked Flex 5v5", value=ranked_info["Ranked Flex 5v5"], inline=True)
 
                 # Check for live game data and add it if available.
-                live_game_data = await self.fetch_live_game(session, puuid, region, headers)
+                live_game_data = profile_data["live_game_data"]
                 if live_game_data and 'status' not in live_game_data:
-                    await self.add_live_game_data_to_embed(embed, live_game_data, region, headers, session)
+                    await self.add_live_game_data_to_embed(embed, live_game_data, region, headers, session,
+                                                           profile_data["participants_data"])
 
                 embed.timestamp = datetime.datetime.now(datetime.timezone.utc)
                 embed.set_footer(text="AstroStats | astrostats.info", icon_url="attachment://astrostats.png")
@@ -182,7 +186,8 @@ class LeagueCog(commands.GroupCog, group_name="league"):
                 if conditional_embed:
                     embeds.append(conditional_embed)
                 
-                view = LeagueProfileView(self, puuid, region, riotid, str(interaction.user.id))
+                entitlements = await get_user_entitlements_async(str(interaction.user.id))
+                view = LeagueProfileView(self, puuid, region, riotid, str(interaction.user.id), entitlements.get("tier", "free"))
                 message = await interaction.followup.send(embeds=embeds, view=view)
                 view.message = message
 
@@ -215,23 +220,39 @@ class LeagueCog(commands.GroupCog, group_name="league"):
             )
 
     # Helper methods
+    async def _load_profile(self, session: aiohttp.ClientSession, game_name: str, tag_line: str, region: str,
+                            headers: dict) -> dict:
+        """
+        Fetches everything the profile embed shows. Stages after a missing account or
+        summoner are skipped and left as None.
+        """
+        profile_data = {"puuid": None, "summoner_data": None, "league_data": None,
+                        "live_game_data": None, "participants_data": None}
+        account_data = await self.resolve_account(session, game_name, tag_line, headers)
+        puuid = profile_data["puuid"] = account_data.get('puuid') if account_data else None
+        if not puuid:
+            return profile_data
+
+        profile_data["summoner_data"] = await self.fetch_summoner_data(session, puuid, region, headers)
+        if not profile_data["summoner_data"]:
+            return profile_data
+
+        profile_data["league_data"] = await self.fetch_league_data(session, puuid, region, headers)
+        live_game_data = profile_data["live_game_data"] = await self.fetch_live_game(session, puuid, region, headers)
+        if live_game_data and 'status' not in live_game_data:
+            profile_data["participants_data"] = await self.fetch_participants(live_game_data, region, headers, session)
+        return profile_data
+
     async def fetch_data(self, session: aiohttp.ClientSession, url: str, headers=None) -> dict:
-        try:
-            async with session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    return await response.json()
-                elif response.status == 404:
-                    return None
-                elif response.status == 429:
-                    retry_after = int(response.headers.get('Retry-After', '1'))
-                    await asyncio.sleep(retry_after)
-                    return await self.fetch_data(session, url, headers)
-                else:
-                    logger.error(f"Error fetching data from {url}: {response.status} - {response.reason}")
-                    return None
-        except Exception as e:
-            logger.error(f"Exception during fetch_data: {e}")
-            return None
+        # Rate limiting, 429 handling and retries are shared with the other Riot cog
+        return await get_riot_client().get_json(session, url, headers)
+
+    async def resolve_account(self, session: aiohttp.ClientSession, game_name: str, tag_line: str,
+                              headers: dict) -> Optional[dict]:
+        """Resolve a Riot ID to its account (puuid, gameName, tagLine) through the shared identity cache."""
+        return await get_riot_identity_cache().by_riot_id(
+            "lol", game_name, tag_line, lambda url: self.fetch_data(session, url, headers)
+        )
 
     async def fetch_summoner_data(self, session: aiohttp.ClientSession, puuid: str, region: str, headers: dict) -> dict:
         try:
@@ -268,17 +289,24 @@ class LeagueCog(commands.GroupCog, group_name="league"):
             logger.error(f"Failed to fetch live game data: {e}")
             return None
 
+    async def fetch_participants(self, live_game_data: dict, region: str, headers: dict,
+                                 session: aiohttp.ClientSession) -> list:
+        """Fetches (player data, team id) for every participant of a live game."""
+        tasks = []
+        for player in live_game_data.get('participants', []):
+            tasks.append(self.fetch_participant_data(player, region, headers, session))
+        return await asyncio.gather(*tasks)
+
     async def add_live_game_data_to_embed(self, embed: discord.Embed, live_game_data: dict, region: str, headers: dict,
-                                          session: aiohttp.ClientSession):
+                                          session: aiohttp.ClientSession, participants_data: Optional[list] = None):
         """
         Processes live game data and appends live game information to the provided embed.
         Special handling is added for Arena mode (queueId 1700) where the game is split into 8 teams of 2.
+        Participants are fetched unless participants_data is passed in.
         """
         try:
-            tasks = []
-            for player in live_game_data.get('participants', []):
-                tasks.append(self.fetch_participant_data(player, region, headers, session))
-            participants_data = await asyncio.gather(*tasks)
+            if participants_data is None:
+                participants_data = await self.fetch_participants(live_game_data, region, headers, session)
 
             # Determine game mode based on queue id.
             queue_config_id = live_game_data.get("gameQueueConfigId")
@@ -347,22 +375,9 @@ class LeagueCog(commands.GroupCog, group_name="league"):
         try:
             puuid = player['puuid']
             team_id = player['teamId']
-            current_time = time.time()
-            cached_account_data = account_data_cache.get(puuid)
-
-            if cached_account_data and current_time - cached_account_data['timestamp'] < CACHE_EXPIRY_SECONDS:
-                account_data = cached_account_data['data']
-            else:
-                account_url = f"https://{region.lower()}.api.riotgames.com/lol/summoner/v4/summoners/by-puuid/{puuid}"
-                summoner_data = await self.fetch_data(session, account_url, headers)
-
-                if summoner_data and 'puuid' in summoner_data:
-                    riot_id_url = f"https://europe.api.riotgames.com/riot/account/v1/accounts/by-puuid/{summoner_data['puuid']}"
-                    account_data = await self.fetch_data(session, riot_id_url, headers)
-                    if account_data:
-                        account_data_cache[puuid] = {'data': account_data, 'timestamp': current_time}
-                else:
-                    account_data = None
+            account_data = await get_riot_identity_cache().by_puuid(
+                "lol", puuid, lambda url: self.fetch_data(session, url, headers)
+            )
 
             if account_data:
                 game_name = account_data.get('gameName', 'Unknown')
@@ -406,23 +421,15 @@ class LeagueCog(commands.GroupCog, group_name="league"):
     async def get_latest_ddragon_version(self, session: aiohttp.ClientSession) -> str:
         """Get the latest Data Dragon version."""
         try:
-            versions_url = "https://ddragon.leagueoflegends.com/api/versions.json"
-            versions_data = await self.fetch_data(session, versions_url)
-            return versions_data[0] if versions_data else '13.1.1'
+            return await get_data_dragon().get_version(session)
         except Exception as e:
             logger.error(f"Error fetching Data Dragon version: {e}")
-            return '13.1.1'
+            return DEFAULT_DDRAGON_VERSION
 
     async def fetch_champion_name(self, session: aiohttp.ClientSession, champion_id: int) -> str:
         try:
-            latest_version = await self.get_latest_ddragon_version(session)
-
-            champions_url = f"https://ddragon.leagueoflegends.com/cdn/{latest_version}/data/en_US/champion.json"
-            champions_data = await self.fetch_data(session, champions_url)
-            if champions_data and 'data' in champions_data:
-                for champ_key, champ_info in champions_data['data'].items():
-                    if int(champ_info['key']) == champion_id:
-                        return champ_info['name']
+            # Champion data is loaded once per patch and indexed by key
+            return await get_data_dragon().get_champion_name(champion_id, session)
         except Exception as e:
             logger.error(f"Error fetching champion name for ID {champion_id}: {e}")
         return "Unknown"
@@ -430,8 +437,12 @@ class LeagueCog(commands.GroupCog, group_name="league"):
     async def get_emoji_for_champion(self, champion_name: str) -> str:
         """Get the emoji for a champion name."""
         try:
-            # First, handle special cases like "Wukong" -> "MonkeyKing"
-            if champion_name in SPECIAL_EMOJI_NAMES:
+            # Data Dragon ids match the emoji names ("Wukong" -> "MonkeyKing")
+            ddragon_id = get_data_dragon().champion_id_for_name(champion_name)
+            if ddragon_id:
+                base_name = ddragon_id
+            # Otherwise handle special cases like "Wukong" -> "MonkeyKing"
+            elif champion_name in SPECIAL_EMOJI_NAMES:
                 base_name = SPECIAL_EMOJI_NAMES[champion_name]
             else:
                 # For all others, remove apostrophes, spaces, and other non-alphanumeric characters
@@ -466,7 +477,7 @@ class LeagueCog(commands.GroupCog, group_name="league"):
             url = f"https://discord.com/api/v10/applications/{application_id}/emojis"
             headers = {'Authorization': f'Bot {bot_token}'}
 
-            async with aiohttp.ClientSession() as session:
+            async with http_session(url) as session:
                 try:
                     async with session.get(url, headers=headers) as response:
                         if response.status != 200:
@@ -494,8 +505,14 @@ class LeagueCog(commands.GroupCog, group_name="league"):
         """Fetch recent match IDs for a player."""
         try:
             routing = REGION_TO_ROUTING.get(region.upper(), "europe")
+            cache_key = f"{routing}:{puuid}:{count}"
+            cached_ids = get_match_cache("lol").get_ids(cache_key)
+            if cached_ids is not None:
+                return cached_ids
             url = f"https://{routing}.api.riotgames.com/lol/match/v5/matches/by-puuid/{puuid}/ids?count={count}"
             data = await self.fetch_data(session, url, headers)
+            if data:
+                get_match_cache("lol").put_ids(cache_key, data)
             return data if data else []
         except Exception as e:
             logger.error(f"Failed to fetch match IDs: {e}")
@@ -505,14 +522,23 @@ class LeagueCog(commands.GroupCog, group_name="league"):
         """Fetch details for a specific match."""
         try:
             routing = REGION_TO_ROUTING.get(region.upper(), "europe")
+            # Finished matches never change, so cached details are always valid
+            match_cache = get_match_cache("lol")
+            cached = await match_cache.get(match_id)
+            if cached is not None:
+                return cached
             url = f"https://{routing}.api.riotgames.com/lol/match/v5/matches/{match_id}"
-            return await self.fetch_data(session, url, headers)
+            data = await self.fetch_data(session, url, headers)
+            return await match_cache.put(match_id, data) if data else data
         except Exception as e:
             logger.error(f"Failed to fetch match details for {match_id}: {e}")
             return None
 
     def get_champion_display_name(self, api_name: str) -> str:
-        """Convert API champion name to proper display name using SPECIAL_EMOJI_NAMES."""
+        """Convert API champion name to proper display name using Data Dragon or SPECIAL_EMOJI_NAMES."""
+        display_name = get_data_dragon().display_name_for_id(api_name)
+        if display_name:
+            return display_name
         # Reverse lookup: find display name from internal name
         for display_name, internal_name in SPECIAL_EMOJI_NAMES.items():
             if internal_name.lower() == api_name.lower() or internal_name.lower() == api_name.replace("'", "").replace(" ", "").lower():
@@ -534,6 +560,7 @@ class LeagueCog(commands.GroupCog, group_name="league"):
             embed.set_footer(text="AstroStats | astrostats.info")
             return embed
         matches_data = await asyncio.gather(*[self.fetch_match_details(session, mid, region, headers) for mid in match_ids])
+        logger.debug(f"LOL match cache: {get_match_cache('lol').get_stats()}")
         for match_data in matches_data:
             if not match_data:
                 continue
@@ -599,11 +626,7 @@ class LeagueCog(commands.GroupCog, group_name="league"):
 
     async def _fetch_player_profile(self, session, game_name, tag_line, region, headers):
         """Fetch all profile data for a League player. Returns dict with profile info or None."""
-        regional_url = (
-            "https://europe.api.riotgames.com/"
-            f"riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
-        )
-        account_data = await self.fetch_data(session, regional_url, headers)
+        account_data = await self.resolve_account(session, game_name, tag_line, headers)
         puuid = account_data.get('puuid') if account_data else None
         if not puuid:
             return None
@@ -677,7 +700,7 @@ class LeagueCog(commands.GroupCog, group_name="league"):
                 return
             headers = {'X-Riot-Token': riot_api_key}
 
-            async with aiohttp.ClientSession() as session:
+            async with http_session(RIOT_UPSTREAM) as session:
                 p1, p2 = await asyncio.gather(
                     self._fetch_player_profile(session, game_name1, tag_line1, region, headers),
                     self._fetch_player_profile(session, game_name2, tag_line2, region, headers)
@@ -758,7 +781,7 @@ class LeagueCog(commands.GroupCog, group_name="league"):
 
 class LeagueProfileView(View):
     """View with Match History and Champion Mastery buttons for League profile."""
-    def __init__(self, cog: 'LeagueCog', puuid: str, region: str, riotid: str, user_id: str):
+    def __init__(self, cog: 'LeagueCog', puuid: str, region: str, riotid: str, user_id: str, tier: str = "free"):
         super().__init__(timeout=840)
         self.cog = cog
         self.puuid = puuid
@@ -766,7 +789,7 @@ class LeagueProfileView(View):
         self.riotid = riotid
         self.user_id = user_id
         self.message: Optional[discord.Message] = None
-        self._add_premium_buttons()
+        self._add_premium_buttons(tier)
 
     async def on_timeout(self) -> None:
         """Disable all buttons when the view times out."""
@@ -787,12 +810,9 @@ class LeagueProfileView(View):
         except Exception as e:
             logger.error(f"Unexpected error handling timeout for LeagueProfileView: {e}")
 
-    def _add_premium_buttons(self):
-        """Add premium promotion buttons."""
+    def _add_premium_buttons(self, tier: str):
+        """Add premium promotion buttons for a tier the caller looked up with the async entitlements API."""
         try:
-            from services.premium import get_user_entitlements
-            entitlements = get_user_entitlements(self.user_id)
-            tier = (entitlements or {}).get("tier", "free")
             if tier == "free":
                 btn = Button(label="Get Premium", style=discord.ButtonStyle.link, url="https://astrostats.info/pricing", emoji="💎")
             else:
@@ -810,7 +830,7 @@ class LeagueProfileView(View):
                 await interaction.followup.send("API key not configured.", ephemeral=True)
                 return
             headers = {'X-Riot-Token': riot_api_key}
-            async with aiohttp.ClientSession() as session:
+            async with http_session(RIOT_UPSTREAM) as session:
                 embed = await self.cog.create_match_history_embed(session, self.puuid, self.region, headers, self.riotid)
                 await interaction.followup.send(embed=embed)
         except Exception as e:
@@ -826,7 +846,7 @@ class LeagueProfileView(View):
                 await interaction.followup.send("API key not configured.", ephemeral=True)
                 return
             headers = {'X-Riot-Token': riot_api_key}
-            async with aiohttp.ClientSession() as session:
+            async with http_session(RIOT_UPSTREAM) as session:
                 embed = await self.cog.create_champion_mastery_embed(session, self.puuid, self.region, headers, self.riotid)
                 await interaction.followup.send(embed=embed)
         except Exception as e:
@@ -11,6 +11,7 @@ from discord.ext import commands
 from config.constants import MARVEL_RIVALS_CURRENT_SEASON, MARVEL_RIVALS_SEASONS
 from core.errors import APIError, ResourceNotFoundError, send_error_embed
 from services.api.marvel_rivals import fetch_marvel_rivals_player
+from services.api.statscache import get_stats_cache
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +31,12 @@ class MarvelRivalsCog(commands.GroupCog, group_name="marvelrivals"):
         self.astrostats_img = os.path.join(self.base_path, 'images', 'astrostats.png')
         self.rank_icons_path = os.path.join(self.base_path, 'images', 'marvel_rivals', 'ranks')
 
+    async def _fetch_player(self, name: str, season: int) -> Dict[str, Any]:
+        """Fetch a player's stats for a season through the shared stats cache."""
+        return await get_stats_cache().get(
+            "marvel_rivals", season, name, lambda: fetch_marvel_rivals_player(name, season=season)
+        )
+
     @app_commands.command(name="stats", description="Search Marvel Rivals ranked stats")
     @app_commands.describe(season="Season to query")
     @app_commands.choices(season=MARVEL_RIVALS_SEASON_CHOICES)
@@ -42,7 +49,7 @@ class MarvelRivalsCog(commands.GroupCog, group_name="marvelrivals"):
         await interaction.response.defer()
 
         try:
-            response = await fetch_marvel_rivals_player(name, season=season)
+            response = await self._fetch_player(name, season)
             embed, rank_icon_path = self.build_embed(name, response)
             season_name = MARVEL_RIVALS_SEASONS.get(season, f"Season {season}")
             embed.description = f"Season: **{season_name}**"
@@ -85,8 +92,8 @@ class MarvelRivalsCog(commands.GroupCog, group_name="marvelrivals"):
         await interaction.response.defer()
 
         results = await asyncio.gather(
-            fetch_marvel_rivals_player(name1, season=season),
-            fetch_marvel_rivals_player(name2, season=season),
+            self._fetch_player(name1, season),
+            self._fetch_player(name2, season),
             return_exceptions=True,
         )
 
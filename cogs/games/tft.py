@@ -15,6 +15,13 @@ from config.settings import TFT_API
 from config.constants import LEAGUE_REGIONS, TFT_QUEUE_TYPE_NAMES, REGION_TO_ROUTING
 from core.utils import get_conditional_embed
 from core.errors import send_error_embed
+from core.singleflight import get_singleflight
+from services.api.http import RIOT_UPSTREAM, http_session
+from services.api.riot import get_riot_client
+from services.api.riotidentity import get_riot_identity_cache, riot_id_key
+from services.api.datadragon import DEFAULT_DDRAGON_VERSION, get_data_dragon
+from services.api.matchcache import get_match_cache
+from services.premium import get_user_entitlements_async
 from ui.embeds import get_premium_promotion_view
 from services.compare_image import compare_image_generator, compare_values
 
@@ -32,39 +39,37 @@ class TFTCog(commands.GroupCog, group_name="tft"):
 
     async def fetch_data(self, session: aiohttp.ClientSession, url: str, headers: dict = None) -> Optional[dict]:
         """Fetch data from an API endpoint."""
-        try:
-            async with session.get(url, headers=headers) as response:
-                if response.status == 200:
-                    return await response.json()
-                elif response.status == 404:
-                    return None
-                elif response.status == 429:
-                    retry_after = int(response.headers.get('Retry-After', '1'))
-                    await asyncio.sleep(retry_after)
-                    return await self.fetch_data(session, url, headers)
-                else:
-                    logger.error(f"Error fetching data from {url}: {response.status}")
-                    return None
-        except Exception as e:
-            logger.error(f"Exception during fetch_data: {e}")
-            return None
+        # Rate limiting, 429 handling and retries are shared with the other Riot cog
+        return await get_riot_client().get_json(session, url, headers)
+
+    async def resolve_account(self, session: aiohttp.ClientSession, game_name: str, tag_line: str,
+                              headers: dict) -> Optional[dict]:
+        """Resolve a Riot ID to its account (puuid, gameName, tagLine) through the shared identity cache."""
+        # TFT_API encrypts PUUIDs differently from LOL_API, so TFT keeps its own namespace
+        return await get_riot_identity_cache().by_riot_id(
+            "tft", game_name, tag_line, lambda url: self.fetch_data(session, url, headers)
+        )
 
     async def get_latest_ddragon_version(self, session: aiohttp.ClientSession) -> str:
         """Get the latest Data Dragon version."""
         try:
-            versions_url = "https://ddragon.leagueoflegends.com/api/versions.json"
-            versions_data = await self.fetch_data(session, versions_url)
-            return versions_data[0] if versions_data else '13.1.1'
+            return await get_data_dragon().get_version(session)
         except Exception as e:
             logger.error(f"Error fetching Data Dragon version: {e}")
-            return '13.1.1'
+            return DEFAULT_DDRAGON_VERSION
 
     async def fetch_match_ids(self, session: aiohttp.ClientSession, puuid: str, region: str, headers: dict, count: int = 5) -> List[str]:
         """Fetch recent TFT match IDs for a player."""
         try:
             routing = REGION_TO_ROUTING.get(region.upper(), "europe")
+            cache_key = f"{routing}:{puuid}:{count}"
+            cached_ids = get_match_cache("tft").get_ids(cache_key)
+            if cached_ids is not None:
+                return cached_ids
             url = f"https://{routing}.api.riotgames.com/tft/match/v1/matches/by-puuid/{puuid}/ids?count={count}"
             data = await self.fetch_data(session, url, headers)
+            if data:
+                get_match_cache("tft").put_ids(cache_key, data)
             return data if data else []
         except Exception as e:
             logger.error(f"Failed to fetch TFT match IDs: {e}")
@@ -74,8 +79,14 @@ class TFTCog(commands.GroupCog, group_name="tft"):
         """Fetch details for a specific TFT match."""
         try:
             routing = REGION_TO_ROUTING.get(region.upper(), "europe")
+            # Finished matches never change, so cached details are always valid
+            match_cache = get_match_cache("tft")
+            cached = await match_cache.get(match_id)
+            if cached is not None:
+                return cached
             url = f"https://{routing}.api.riotgames.com/tft/match/v1/matches/{match_id}"
-            return await self.fetch_data(session, url, headers)
+            data = await self.fetch_data(session, url, headers)
+            return await match_cache.put(match_id, data) if data else data
         except Exception as e:
             logger.error(f"Failed to fetch TFT match details for {match_id}: {e}")
             return None
@@ -93,6 +104,7 @@ class TFTCog(commands.GroupCog, group_name="tft"):
             embed.set_footer(text="AstroStats | astrostats.info")
             return embed
         matches_data = await asyncio.gather(*[self.fetch_match_details(session, mid, region, headers) for mid in match_ids])
+        logger.debug(f"TFT match cache: {get_match_cache('tft').get_stats()}")
         placement_emojis = {1: "🥇", 2: "🥈", 3: "🥉", 4: "4️⃣", 5: "5️⃣", 6: "6️⃣", 7: "7️⃣", 8: "8️⃣"}
         for match_data in matches_data:
             if not match_data:
@@ -121,8 +133,7 @@ class TFTCog(commands.GroupCog, group_name="tft"):
 
     async def _fetch_player_profile(self, session, game_name, tag_line, region, headers):
         """Fetch all TFT profile data for a player. Returns dict or None."""
-        regional_url = f"https://europe.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
-        account_data = await self.fetch_data(session, regional_url, headers)
+        account_data = await self.resolve_account(session, game_name, tag_line, headers)
         if not account_data:
             return None
 
@@ -169,6 +180,23 @@ class TFTCog(commands.GroupCog, group_name="tft"):
             "profile_icon_id": summoner_data.get('profileIconId'),
         }
 
+    async def _load_stats(self, session, game_name, tag_line, region, headers):
+        """Fetch the account, summoner and league data /tft stats shows. Stages after a miss are left as None."""
+        stats_data = {"account_data": None, "summoner_data": None, "league_data": None}
+        account_data = stats_data["account_data"] = await self.resolve_account(session, game_name, tag_line, headers)
+        puuid = account_data.get('puuid') if account_data else None
+        if not puuid:
+            return stats_data
+
+        summoner_url = f"https://{region.lower()}.api.riotgames.com/tft/summoner/v1/summoners/by-puuid/{puuid}"
+        stats_data["summoner_data"] = await self.fetch_data(session, summoner_url, headers)
+        if not stats_data["summoner_data"]:
+            return stats_data
+
+        league_url = f"https://{region.lower()}.api.riotgames.com/tft/league/v1/by-puuid/{puuid}"
+        stats_data["league_data"] = await self.fetch_data(session, league_url, headers)
+        return stats_data
+
     @app_commands.command(name="stats", description="Check your TFT Player Stats!")
     async def stats(self, interaction: discord.Interaction, region: Literal[
         "EUW1", "EUN1", "TR1", "RU", "NA1", "BR1", "LA1", "LA2", "JP1", "KR", "OC1", "SG2", "TW2", "VN2"], riotid: str):
@@ -194,9 +222,13 @@ class TFTCog(commands.GroupCog, group_name="tft"):
                 return
 
             headers = {'X-Riot-Token': riot_api_key}
-            async with aiohttp.ClientSession() as session:
-                regional_url = f"https://europe.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
-                account_data = await self.fetch_data(session, regional_url, headers)
+            async with http_session(RIOT_UPSTREAM) as session:
+                # Identical lookups running at the same time (a shared link) share one set of requests
+                stats_data = await get_singleflight("tft_stats").do(
+                    (region.upper(), riot_id_key(game_name, tag_line)),
+                    lambda: self._load_stats(session, game_name, tag_line, region, headers)
+                )
+                account_data = stats_data["account_data"]
                 if not account_data:
                     await send_error_embed(
                         interaction,
@@ -215,8 +247,7 @@ class TFTCog(commands.GroupCog, group_name="tft"):
                     )
                     return
 
-                summoner_url = f"https://{region.lower()}.api.riotgames.com/tft/summoner/v1/summoners/by-puuid/{puuid}"
-                summoner_data = await self.fetch_data(session, summoner_url, headers)
+                summoner_data = stats_data["summoner_data"]
                 if not summoner_data:
                     await send_error_embed(
                         interaction,
@@ -225,8 +256,7 @@ class TFTCog(commands.GroupCog, group_name="tft"):
                     )
                     return
 
-                league_url = f"https://{region.lower()}.api.riotgames.com/tft/league/v1/by-puuid/{puuid}"
-                league_data = await self.fetch_data(session, league_url, headers)
+                league_data = stats_data["league_data"]
 
                 query_params = urlencode({"gameName": game_name, "tagLine": tag_line, "region": region})
                 profile_url = f"https://www.clutchgg.lol/tft/profile?{query_params}"
@@ -266,7 +296,8 @@ class TFTCog(commands.GroupCog, group_name="tft"):
                 if conditional_embed:
                     embeds.append(conditional_embed)
 
-                view = TFTMatchHistoryView(self, puuid, region, riotid, str(interaction.user.id))
+                entitlements = await get_user_entitlements_async(str(interaction.user.id))
+                view = TFTMatchHistoryView(self, puuid, region, riotid, str(interaction.user.id), entitlements.get("tier", "free"))
                 await interaction.followup.send(embeds=embeds, view=view)
 
         except aiohttp.ClientError as e:
@@ -321,7 +352,7 @@ class TFTCog(commands.GroupCog, group_name="tft"):
                 return
             headers = {'X-Riot-Token': riot_api_key}
 
-            async with aiohttp.ClientSession() as session:
+            async with http_session(RIOT_UPSTREAM) as session:
                 p1, p2 = await asyncio.gather(
                     self._fetch_player_profile(session, game_name1, tag_line1, region, headers),
                     self._fetch_player_profile(session, game_name2, tag_line2, region, headers)
@@ -402,21 +433,18 @@ class TFTCog(commands.GroupCog, group_name="tft"):
 
 class TFTMatchHistoryView(View):
     """View with Match History button for TFT profile."""
-    def __init__(self, cog: 'TFTCog', puuid: str, region: str, riotid: str, user_id: str):
+    def __init__(self, cog: 'TFTCog', puuid: str, region: str, riotid: str, user_id: str, tier: str = "free"):
         super().__init__(timeout=300)
         self.cog = cog
         self.puuid = puuid
         self.region = region
         self.riotid = riotid
         self.user_id = user_id
-        self._add_premium_buttons()
+        self._add_premium_buttons(tier)
 
-    def _add_premium_buttons(self):
-        """Add premium promotion buttons."""
+    def _add_premium_buttons(self, tier: str):
+        """Add premium promotion buttons for a tier the caller looked up with the async entitlements API."""
         try:
-            from services.premium import get_user_entitlements
-            entitlements = get_user_entitlements(self.user_id)
-            tier = (entitlements or {}).get("tier", "free")
             if tier == "free":
                 btn = Button(label="Get Premium", style=discord.ButtonStyle.link, url="https://astrostats.info/pricing", emoji="💎")
             else:
@@ -434,7 +462,7 @@ class TFTMatchHistoryView(View):
                 await interaction.followup.send("API key not configured.", ephemeral=True)
                 return
             headers = {'X-Riot-Token': riot_api_key}
-            async with aiohttp.ClientSession() as session:
+            async with http_session(RIOT_UPSTREAM) as session:
                 embed = await self.cog.create_match_history_embed(session, self.puuid, self.region, headers, self.riotid)
                 await interaction.followup.send(embed=embed)
         except Exception as e:
@@ -68,7 +68,7 @@ class TruthOrDare(commands.Cog):
             embed.set_footer(text="AstroStats | astrostats.info", icon_url=f"attachment://astrostats.png")
 
             embeds = [embed]
-            premium_view = get_premium_promotion_view(str(interaction.user.id))
+            premium_view = await get_premium_promotion_view(str(interaction.user.id))
             
             # Send the message with the image files
             await interaction.response.send_message(
@@ -11,6 +11,7 @@ from zoneinfo import ZoneInfo
 from config import constants
 from ui.embeds import get_premium_promotion_view
 from services.database.wouldyourather import get_wyr_auto_settings, update_wyr_auto_settings, get_all_enabled_guilds
+from services.database.async_operations import run_blocking
 
 logger = logging.getLogger(__name__)
 
@@ -204,7 +205,7 @@ class WouldYouRather(commands.Cog):
             embed.set_footer(text="AstroStats | astrostats.info", icon_url=f"attachment://astrostats.png")
 
             embeds = [embed]
-            premium_view = get_premium_promotion_view(str(interaction.user.id))
+            premium_view = await get_premium_promotion_view(str(interaction.user.id))
             
             # Send the message with the image files
             await interaction.response.send_message(
@@ -259,7 +260,8 @@ class WouldYouRather(commands.Cog):
                     await interaction.response.send_message("Could not determine channel ID.", ephemeral=True)
                     return
 
-                success = update_wyr_auto_settings(
+                success = await run_blocking(
+                    update_wyr_auto_settings,
                     guild_id=guild_id,
                     enabled=True,
                     category=category,
@@ -278,7 +280,7 @@ class WouldYouRather(commands.Cog):
                 )
                 await interaction.response.send_message(embed=embed, ephemeral=True)
             else:
-                success = update_wyr_auto_settings(guild_id=guild_id, enabled=False)
+                success = await run_blocking(update_wyr_auto_settings, guild_id=guild_id, enabled=False)
                 if not success:
                     await interaction.response.send_message("Failed to update auto mode settings. Please try again.", ephemeral=True)
                     return
@@ -304,7 +306,7 @@ class WouldYouRather(commands.Cog):
         """Automatically send Would You Rather questions at 12:00 PM Europe/London time."""
         logger.debug("Starting auto would you rather task...")
         try:
-            enabled_guilds = get_all_enabled_guilds()
+            enabled_guilds = await run_blocking(get_all_enabled_guilds)
             if not enabled_guilds:
                 logger.debug("No guilds with auto mode enabled.")
                 return
@@ -339,7 +341,7 @@ class WouldYouRather(commands.Cog):
                         continue
 
                     # Get current settings to access history
-                    settings = get_wyr_auto_settings(str(guild_id))
+                    settings = await run_blocking(get_wyr_auto_settings, str(guild_id))
                     if not settings:
                          continue
 
@@ -365,7 +367,8 @@ class WouldYouRather(commands.Cog):
                     # Update the specific category history
                     settings.recent_questions[category] = updated_history
                     
-                    update_success = update_wyr_auto_settings(
+                    update_success = await run_blocking(
+                        update_wyr_auto_settings,
                         guild_id=str(guild_id),
                         recent_questions=settings.recent_questions
                     )
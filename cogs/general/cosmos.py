@@ -7,6 +7,8 @@ import datetime
 import time
 import random
 
+from services.api.http import http_session
+
 class Cosmos(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -96,7 +98,7 @@ class Cosmos(commands.Cog):
         api_key = os.getenv("NASA_API_KEY", "DEMO_KEY")
         url = f"https://api.nasa.gov/planetary/apod?api_key={api_key}"
 
-        async with aiohttp.ClientSession() as session:
+        async with http_session(url) as session:
             try:
                 async with session.get(url) as response:
                     if response.status == 200:
@@ -138,7 +140,7 @@ class Cosmos(commands.Cog):
         
         url = "http://api.open-notify.org/iss-now.json"
 
-        async with aiohttp.ClientSession() as session:
+        async with http_session(url) as session:
             try:
                 async with session.get(url) as response:
                     if response.status == 200:
@@ -176,7 +178,7 @@ class Cosmos(commands.Cog):
         """Shows upcoming ISS pass times for a given city."""
         await interaction.response.defer()
 
-        async with aiohttp.ClientSession() as session:
+        async with http_session("api.n2yo.com") as session:
             try:
                 location = await self._geocode_city(session, city, country)
                 if not location:
@@ -291,7 +293,7 @@ class Cosmos(commands.Cog):
         
         url = "http://api.open-notify.org/astros.json"
 
-        async with aiohttp.ClientSession() as session:
+        async with http_session(url) as session:
             try:
                 async with session.get(url) as response:
                     if response.status == 200:
@@ -336,7 +338,7 @@ class Cosmos(commands.Cog):
 
         url = "https://ll.thespacedevs.com/2.2.0/launch/upcoming/?limit=1"
 
-        async with aiohttp.ClientSession() as session:
+        async with http_session(url) as session:
             try:
                 async with session.get(url) as response:
                     if response.status == 200:
@@ -422,7 +424,7 @@ class Cosmos(commands.Cog):
 
         url = f"https://api.nasa.gov/planetary/apod?api_key={api_key}&date={random_date.isoformat()}"
 
-        async with aiohttp.ClientSession() as session:
+        async with http_session(url) as session:
             try:
                 async with session.get(url) as response:
                     if response.status == 200:
@@ -131,7 +131,7 @@ class HelpCog(commands.Cog):
         if conditional_embed:
             embeds.append(conditional_embed)
         
-        premium_view = get_premium_promotion_view(str(interaction.user.id))
+        premium_view = await get_premium_promotion_view(str(interaction.user.id))
 
         await interaction.response.send_message(embeds=embeds, view=premium_view)
 
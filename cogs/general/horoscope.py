@@ -10,6 +10,7 @@ from bs4 import BeautifulSoup
 
 from core.utils import get_conditional_embed
 from core.errors import send_error_embed
+from services.api.http import http_session
 from ui.embeds import get_premium_promotion_view
 
 logger = logging.getLogger(__name__)
@@ -40,7 +41,7 @@ class HoroscopeCog(commands.Cog):
             "https://www.horoscope.com/us/horoscopes/general/"
             f"horoscope-general-daily-today.aspx?sign={SIGNS[sign]['api']}"
         )
-        async with aiohttp.ClientSession() as session:
+        async with http_session(url) as session:
             try:
                 async with session.get(url) as response:
                     if response.status == 200:
@@ -60,7 +61,7 @@ class HoroscopeCog(commands.Cog):
 
     async def fetch_star_rating(self, sign: str, embed: discord.Embed) -> Optional[discord.Embed]:
         url = f"https://www.horoscope.com/star-ratings/today/{sign}"
-        async with aiohttp.ClientSession() as session:
+        async with http_session(url) as session:
             try:
                 async with session.get(url) as response:
                     if response.status == 200:
@@ -179,7 +180,7 @@ class HoroscopeCog(commands.Cog):
             if conditional_embed:
                 embeds.append(conditional_embed)
             
-            premium_view = get_premium_promotion_view(str(interaction.user.id))
+            premium_view = await get_premium_promotion_view(str(interaction.user.id))
 
             # Send final embed(s)
             await interaction.followup.send(embeds=embeds, view=premium_view)
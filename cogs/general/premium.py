@@ -3,6 +3,7 @@ from discord.ext import commands
 from discord import app_commands
 
 from services.premium import get_user_entitlements
+from services.database.async_operations import run_blocking
 
 
 PRICING = {
@@ -64,7 +65,7 @@ class PremiumCog(commands.Cog):
     @app_commands.command(name="premium", description="View AstroStats Premium tiers, pricing, and benefits")
     async def premium(self, interaction: discord.Interaction):
         user_id = str(interaction.user.id)
-        ent = get_user_entitlements(user_id)
+        ent = await run_blocking(get_user_entitlements, user_id)
         current_tier = ent.get("tier", "free").title()
         site_url = "https://astrostats.info"
 
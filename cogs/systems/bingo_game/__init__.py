@@ -11,8 +11,11 @@ import discord
 from discord.ext import commands
 from discord import app_commands, Interaction, Embed, Color, ButtonStyle
 from discord.ui import View, Button
-from services.premium import get_user_entitlements
+from services.premium import get_user_entitlements_async
+from services.database.async_operations import run_blocking
+from services.database.connection import get_client, get_database
 from ui.embeds import get_premium_promotion_embed, get_premium_promotion_view
+from .bingoboard import BingoBoard, cell_bit, has_line, marked_mask, remaining_cells
 
 # Third-Party Imports
 from pymongo import MongoClient
@@ -89,9 +92,9 @@ bingo_global_stats: Optional[Collection] = None
 
 try:
     if MONGODB_URI:
-        mongo_client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=30000, connectTimeoutMS=20000, socketTimeoutMS=20000)
+        mongo_client = get_client()
         mongo_client.admin.command('ping')
-        db = mongo_client['astrostats_database']
+        db = get_database()
         bingo_sessions = db['bingo_sessions']
         bingo_stats = db['bingo_stats']
         bingo_global_stats = db['bingo_global_stats']
@@ -147,13 +150,14 @@ def format_bingo_card(card: List[List[int]], marked: Set[int]) -> str:
     header = "```\n  B     I     N     G     O  \n"
     separator = "----+-----+-----+-----+-----\n"
     lines = []
+    mask = marked_mask(card, marked)
     
     for row_idx, row in enumerate(card):
         row_str = ""
         for col_idx, num in enumerate(row):
             if num == 0:  # FREE space
                 cell = " FREE"
-            elif num in marked:
+            elif mask & cell_bit(row_idx, col_idx):
                 cell = f"[{num:2d}]"
             else:
                 cell = f" {num:2d} "
@@ -171,33 +175,25 @@ def format_bingo_card(card: List[List[int]], marked: Set[int]) -> str:
 
 def check_bingo(card: List[List[int]], marked: Set[int]) -> bool:
     """Check if a card has a bingo (row, column, or diagonal)."""
-    # Check rows
-    for row in card:
-        if all(num == 0 or num in marked for num in row):
-            return True
-    
-    # Check columns
-    for col in range(BINGO_CARD_SIZE):
-        if all(card[row][col] == 0 or card[row][col] in marked for row in range(BINGO_CARD_SIZE)):
-            return True
-    
-    # Check diagonals
-    if all(card[i][i] == 0 or card[i][i] in marked for i in range(BINGO_CARD_SIZE)):
-        return True
-    if all(card[i][BINGO_CARD_SIZE - 1 - i] == 0 or card[i][BINGO_CARD_SIZE - 1 - i] in marked for i in range(BINGO_CARD_SIZE)):
-        return True
-    
-    return False
+    return has_line(marked_mask(card, marked))
 
 
 def count_remaining_numbers(card: List[List[int]], marked: Set[int]) -> int:
     """Count how many numbers remain unmarked on a card."""
-    count = 0
-    for row in card:
-        for num in row:
-            if num != 0 and num not in marked:
-                count += 1
-    return count
+    return remaining_cells(marked_mask(card, marked))
+
+
+def build_number_call_update(number: int, marked_user_ids: List[str], bingo_user_ids: List[str]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Build one update that records a called number, marks it on the given cards and flags new bingos."""
+    update: Dict[str, Any] = {"$push": {"called_numbers": number}}
+    array_filters: List[Dict[str, Any]] = []
+    if marked_user_ids:
+        update["$addToSet"] = {"participants.$[hit].marked": number}
+        array_filters.append({"hit.user_id": {"$in": marked_user_ids}})
+    if bingo_user_ids:
+        update["$set"] = {"participants.$[won].has_bingo": True}
+        array_filters.append({"won.user_id": {"$in": bingo_user_ids}})
+    return update, array_filters
 
 
 def get_max_players_for_entitlements(entitlements: Dict[str, Any]) -> int:
@@ -332,14 +328,14 @@ async def update_player_stats(winner_ids: List[str], guild_id: str, participants
             )
 
         if bulk_ops:
-            bingo_stats.bulk_write(bulk_ops, ordered=False)
-            bingo_global_stats.bulk_write(global_bulk_ops, ordered=False)
+            await run_blocking(bingo_stats.bulk_write, bulk_ops, ordered=False)
+            await run_blocking(bingo_global_stats.bulk_write, global_bulk_ops, ordered=False)
         else:
             logger.warning("No valid participants found to update stats.")
 
         # Fetch updated stats for winners
         for winner_id in winner_ids:
-            updated_stats = bingo_stats.find_one({"user_id": winner_id, "guild_id": guild_id})
+            updated_stats = await run_blocking(bingo_stats.find_one, {"user_id": winner_id, "guild_id": guild_id})
             winner_new_wins[winner_id] = updated_stats.get("wins", 0) if updated_stats else 0
 
         return winner_new_wins
@@ -362,7 +358,8 @@ async def conclude_game(bot: commands.Bot, interaction: Interaction, game_doc: d
     # Update game state in DB
     winner_ids = [w['user_id'] for w in winners]
     try:
-        bingo_sessions.update_one(
+        await run_blocking(
+            bingo_sessions.update_one,
             {"_id": game_doc["_id"]},
             {"$set": {
                 "current_game_state": "completed",
@@ -433,6 +430,8 @@ async def run_game_loop(bot: commands.Bot, interaction: Interaction, game_db_id:
     
     # Track the main announcement message to edit
     announcement_message: Optional[discord.Message] = None
+    # Bitboard state, built from the first fetched game document
+    board: Optional[BingoBoard] = None
 
     try:
         while True:
@@ -447,7 +446,7 @@ async def run_game_loop(bot: commands.Bot, interaction: Interaction, game_db_id:
                 break
 
             # Fetch latest game state
-            game = bingo_sessions.find_one({"_id": game_db_id})
+            game = await run_blocking(bingo_sessions.find_one, {"_id": game_db_id})
 
             if not game:
                 logger.warning(f"Game loop {game_db_id}: Game document not found. Stopping.")
@@ -460,6 +459,8 @@ async def run_game_loop(bot: commands.Bot, interaction: Interaction, game_db_id:
             participants = game.get('participants', [])
             called_numbers = game.get('called_numbers', [])
             halfway_break_shown = game.get('halfway_break_shown', False)
+            if board is None:
+                board = BingoBoard.from_participants(participants, called_numbers)
             
             # Check for winners
             winners = [p for p in participants if p.get('has_bingo', False)]
@@ -468,7 +469,7 @@ async def run_game_loop(bot: commands.Bot, interaction: Interaction, game_db_id:
                 
                 # Get premium view for first winner
                 winner_id = winners[0]['user_id'] if winners else None
-                premium_view = get_premium_promotion_view(winner_id) if winner_id else None
+                premium_view = await get_premium_promotion_view(winner_id) if winner_id else None
                 
                 try:
                     await safe_send_with_view(interaction, embeds=final_embeds, view=premium_view)
@@ -496,17 +497,15 @@ async def run_game_loop(bot: commands.Bot, interaction: Interaction, game_db_id:
             
             if len(called_numbers) >= halfway_point and not halfway_break_shown:
                 # Show halfway leaderboard
-                leaderboard_data = []
-                for p in participants:
-                    remaining = count_remaining_numbers(p['card'], set(called_numbers))
-                    leaderboard_data.append({
-                        'username': p['username'],
-                        'user_id': p['user_id'],
+                # Standings come sorted by remaining numbers (ascending)
+                leaderboard_data = [
+                    {
+                        'username': participants[index]['username'],
+                        'user_id': participants[index]['user_id'],
                         'remaining': remaining
-                    })
-                
-                # Sort by remaining numbers (ascending)
-                leaderboard_data.sort(key=lambda x: x['remaining'])
+                    }
+                    for index, remaining in board.standings()
+                ]
                 
                 halfway_embed = Embed(
                     title=f"{EMOJI_HALFWAY} Halfway Break! {EMOJI_LEADERBOARD}",
@@ -536,7 +535,8 @@ async def run_game_loop(bot: commands.Bot, interaction: Interaction, game_db_id:
                 
                 # Mark halfway break as shown
                 try:
-                    bingo_sessions.update_one(
+                    await run_blocking(
+                        bingo_sessions.update_one,
                         {"_id": game_db_id},
                         {"$set": {"halfway_break_shown": True}}
                     )
@@ -553,14 +553,23 @@ async def run_game_loop(bot: commands.Bot, interaction: Interaction, game_db_id:
             next_number = random.choice(available_numbers)
             called_numbers.append(next_number)
             
-            # Update DB with new called number
+            # Mark only the cards holding this number, then commit the call,
+            # the new marks and any new bingos in a single write
+            touched = board.call(next_number)
+            update_doc, array_filters = build_number_call_update(
+                next_number,
+                [participants[index]['user_id'] for index in touched],
+                [participants[index]['user_id'] for index in touched if board.has_bingo(index)]
+            )
             try:
-                bingo_sessions.update_one(
+                await run_blocking(
+                    bingo_sessions.update_one,
                     {"_id": game_db_id},
-                    {"$push": {"called_numbers": next_number}}
+                    update_doc,
+                    array_filters=array_filters or None
                 )
             except Exception as e:
-                logger.error(f"Failed to update called_numbers: {e}")
+                logger.error(f"Failed to commit called number {next_number}: {e}")
                 break
 
             # Determine letter (B-I-N-G-O)
@@ -637,38 +646,6 @@ async def run_game_loop(bot: commands.Bot, interaction: Interaction, game_db_id:
             except discord.HTTPException as e:
                 logger.error(f"Failed to send/edit number announcement: {e}")
 
-            # Update each player's card in database (no channel spam)
-            for participant in participants:
-                user_id = participant['user_id']
-                card = participant['card']
-                marked = set(participant.get('marked', []))
-                
-                # Mark number if on card
-                for row in card:
-                    if next_number in row:
-                        marked.add(next_number)
-                        break
-                
-                # Update marked in DB
-                try:
-                    bingo_sessions.update_one(
-                        {"_id": game_db_id, "participants.user_id": user_id},
-                        {"$set": {"participants.$.marked": list(marked)}}
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to update marked numbers for {user_id}: {e}")
-                
-                # Check for bingo
-                has_bingo = check_bingo(card, marked)
-                if has_bingo:
-                    try:
-                        bingo_sessions.update_one(
-                            {"_id": game_db_id, "participants.user_id": user_id},
-                            {"$set": {"participants.$.has_bingo": True}}
-                        )
-                    except Exception as e:
-                        logger.error(f"Failed to update bingo status for {user_id}: {e}")
-
             # No need to spam channel with card updates - users can click the button
             await asyncio.sleep(NUMBER_CALL_DELAY)
 
@@ -679,7 +656,8 @@ async def run_game_loop(bot: commands.Bot, interaction: Interaction, game_db_id:
         try:
             await channel.send(f"{EMOJI_ERROR} A critical error occurred in the game loop. The game has been stopped.")
             if bingo_sessions is not None:
-                bingo_sessions.update_one(
+                await run_blocking(
+                    bingo_sessions.update_one,
                     {"_id": game_db_id, "current_game_state": "in_progress"},
                     {"$set": {"current_game_state": "errored"}}
                 )
@@ -712,7 +690,7 @@ class ViewCardButton(View):
             user_id = str(interaction.user.id)
             
             # Get game from database
-            game = bingo_sessions.find_one({"_id": self.game_db_id})
+            game = await run_blocking(bingo_sessions.find_one, {"_id": self.game_db_id})
             
             if not game:
                 await interaction.followup.send("This game session no longer exists.", ephemeral=True)
@@ -892,7 +870,7 @@ class JoinButtonView(View):
             return
 
         try:
-            game = bingo_sessions.find_one({
+            game = await run_blocking(bingo_sessions.find_one, {
                 "guild_id": self.guild_id,
                 "session_id": self.game_id,
             })
@@ -931,7 +909,7 @@ class JoinButtonView(View):
             # Enforce max players based on host entitlements
             try:
                 host_id = str(game.get("host_user_id"))
-                ent = get_user_entitlements(host_id)
+                ent = await get_user_entitlements_async(host_id)
                 max_players = get_max_players_for_entitlements(ent)
                 
                 # Only enforce if not unlimited (-1)
@@ -957,7 +935,8 @@ class JoinButtonView(View):
                 "marked": [],
                 "has_bingo": False
             }
-            result = bingo_sessions.update_one(
+            result = await run_blocking(
+                bingo_sessions.update_one,
                 {"_id": game["_id"]},
                 {"$push": {"participants": new_participant}}
             )
@@ -1019,7 +998,7 @@ class JoinButtonView(View):
                 # Update player count display
                 try:
                     host_id = str(game.get("host_user_id"))
-                    ent = get_user_entitlements(host_id)
+                    ent = await get_user_entitlements_async(host_id)
                     max_players = get_max_players_for_entitlements(ent)
                 except Exception:
                     max_players = MAX_PLAYERS_FREE
@@ -1066,7 +1045,7 @@ class BingoGames(commands.GroupCog, name="bingo"):
 
         # Check for existing game
         try:
-            existing_game = bingo_sessions.find_one({
+            existing_game = await run_blocking(bingo_sessions.find_one, {
                 "guild_id": guild_id,
                 "current_game_state": {"$in": ["waiting_for_players", "in_progress"]}
             })
@@ -1087,7 +1066,7 @@ class BingoGames(commands.GroupCog, name="bingo"):
             return
 
         try:
-            session_id, new_session_doc = create_new_session(guild_id, user_id, interaction.user.display_name)
+            session_id, new_session_doc = await run_blocking(create_new_session, guild_id, user_id, interaction.user.display_name)
         except ConnectionError:
             await interaction.followup.send(f"{EMOJI_ERROR} Database connection error prevented session creation.", ephemeral=True)
             return
@@ -1115,7 +1094,7 @@ class BingoGames(commands.GroupCog, name="bingo"):
 
         # Player Count Embed
         try:
-            ent = get_user_entitlements(user_id)
+            ent = await get_user_entitlements_async(user_id)
             max_players = get_max_players_for_entitlements(ent)
             # -1 means unlimited, otherwise show the number
             cap_text = "∞" if max_players == -1 else str(max_players)
@@ -1196,7 +1175,7 @@ class BingoGames(commands.GroupCog, name="bingo"):
 
         # Find the game waiting for players
         try:
-            game = bingo_sessions.find_one({
+            game = await run_blocking(bingo_sessions.find_one, {
                 "guild_id": guild_id,
                 "current_game_state": "waiting_for_players"
             })
@@ -1248,7 +1227,8 @@ class BingoGames(commands.GroupCog, name="bingo"):
 
         # Update game state to in_progress
         try:
-            update_result = bingo_sessions.update_one(
+            update_result = await run_blocking(
+                bingo_sessions.update_one,
                 {"_id": db_id},
                 {"$set": {
                     "current_game_state": "in_progress",
@@ -1325,7 +1305,7 @@ class BingoGames(commands.GroupCog, name="bingo"):
 
         guild_id = str(interaction.guild_id)
         try:
-            game = bingo_sessions.find_one({
+            game = await run_blocking(bingo_sessions.find_one, {
                 "guild_id": guild_id,
                 "current_game_state": {"$in": ["waiting_for_players", "in_progress"]}
             })
@@ -1391,7 +1371,7 @@ class BingoGames(commands.GroupCog, name="bingo"):
         user_id = str(interaction.user.id)
 
         try:
-            game = bingo_sessions.find_one({
+            game = await run_blocking(bingo_sessions.find_one, {
                 "guild_id": guild_id,
                 "current_game_state": {"$in": ["waiting_for_players", "in_progress"]}
             })
@@ -1421,7 +1401,8 @@ class BingoGames(commands.GroupCog, name="bingo"):
 
         # Update DB to cancelled
         try:
-            bingo_sessions.update_one(
+            await run_blocking(
+                bingo_sessions.update_one,
                 {"_id": game["_id"]},
                 {"$set": {"current_game_state": "cancelled", "ended_at": datetime.datetime.now(timezone.utc)}}
             )
@@ -1459,12 +1440,12 @@ class BingoGames(commands.GroupCog, name="bingo"):
             # Get server stats
             server_stats = None
             if bingo_stats is not None:
-                server_stats = bingo_stats.find_one({"user_id": user_id, "guild_id": guild_id})
+                server_stats = await run_blocking(bingo_stats.find_one, {"user_id": user_id, "guild_id": guild_id})
             
             # Get global stats
             global_stats = None
             if bingo_global_stats is not None:
-                global_stats = bingo_global_stats.find_one({"user_id": user_id})
+                global_stats = await run_blocking(bingo_global_stats.find_one, {"user_id": user_id})
             
             embed = Embed(
                 title=f"{EMOJI_BINGO} {target_user.display_name}'s Bingo Stats",
@@ -1513,7 +1494,7 @@ class BingoGames(commands.GroupCog, name="bingo"):
             embed.timestamp = datetime.datetime.now(timezone.utc)
             
             # Get premium view
-            premium_view = get_premium_promotion_view(str(interaction.user.id))
+            premium_view = await get_premium_promotion_view(str(interaction.user.id))
             
             await interaction.followup.send(embed=embed, view=premium_view)
             
@@ -1537,9 +1518,10 @@ class BingoGames(commands.GroupCog, name="bingo"):
         try:
             leaderboard = []
             if bingo_stats is not None:
-                leaderboard = list(bingo_stats.find(
+                leaderboard_cursor = bingo_stats.find(
                     {"guild_id": guild_id}
-                ).sort([("wins", -1), ("games_played", -1)]).limit(15))
+                ).sort([("wins", -1), ("games_played", -1)]).limit(15)
+                leaderboard = await run_blocking(list, leaderboard_cursor)
             
             embed = Embed(
                 title=f"🏆 {server_name} Bingo Leaderboard",
@@ -1590,7 +1572,7 @@ class BingoGames(commands.GroupCog, name="bingo"):
             embed.set_footer(text="Start a game with /bingo start!")
             embed.timestamp = datetime.datetime.now(timezone.utc)
             
-            premium_view = get_premium_promotion_view(str(interaction.user.id))
+            premium_view = await get_premium_promotion_view(str(interaction.user.id))
             
             await interaction.followup.send(embed=embed, view=premium_view)
             
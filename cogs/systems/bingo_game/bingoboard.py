@@ -0,0 +1,113 @@
+# cogs/systems/bingo_game/bingoboard.py
+"""
+Bitboard representation of bingo cards.
+
+Each 5x5 card maps to a 25-bit mask (bit = row * 5 + col), so marking a cell is an OR,
+a win is a mask containing one of the 12 line masks, and the remaining count is a popcount.
+BingoBoard keeps an inverted index from number to (participant, cell bit) so a call only
+touches the cards that actually contain that number.
+"""
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+BOARD_SIZE = 5
+CELL_COUNT = BOARD_SIZE * BOARD_SIZE
+FREE_NUMBER = 0
+
+
+def cell_bit(row: int, col: int) -> int:
+    """Bit for the cell at (row, col)."""
+    return 1 << (row * BOARD_SIZE + col)
+
+
+FREE_BIT = cell_bit(BOARD_SIZE // 2, BOARD_SIZE // 2)
+FULL_MASK = (1 << CELL_COUNT) - 1
+
+# 5 rows, 5 columns, 2 diagonals
+LINE_MASKS: Tuple[int, ...] = tuple(
+    [sum(cell_bit(r, c) for c in range(BOARD_SIZE)) for r in range(BOARD_SIZE)]
+    + [sum(cell_bit(r, c) for r in range(BOARD_SIZE)) for c in range(BOARD_SIZE)]
+    + [sum(cell_bit(i, i) for i in range(BOARD_SIZE))]
+    + [sum(cell_bit(i, BOARD_SIZE - 1 - i) for i in range(BOARD_SIZE))]
+)
+
+
+def card_cells(card: Sequence[Sequence[int]]) -> List[Tuple[int, int]]:
+    """(number, bit) pairs for every numbered cell on a card; the FREE cell is skipped."""
+    return [
+        (num, cell_bit(row, col))
+        for row, values in enumerate(card)
+        for col, num in enumerate(values)
+        if num != FREE_NUMBER
+    ]
+
+
+def marked_mask(card: Sequence[Sequence[int]], marked: Iterable[int]) -> int:
+    """Mask of marked cells on a card; the FREE cell is always marked."""
+    marked = marked if isinstance(marked, (set, frozenset)) else set(marked)
+    mask = FREE_BIT
+    for num, bit in card_cells(card):
+        if num in marked:
+            mask |= bit
+    return mask
+
+
+def has_line(mask: int) -> bool:
+    """True if the mask completes a row, column or diagonal."""
+    for line in LINE_MASKS:
+        if mask & line == line:
+            return True
+    return False
+
+
+def remaining_cells(mask: int) -> int:
+    """Number of unmarked cells in a mask."""
+    return CELL_COUNT - (mask & FULL_MASK).bit_count()
+
+
+class BingoBoard:
+    """Bitboard state for every participant in a game."""
+
+    def __init__(self, cards: Sequence[Sequence[Sequence[int]]]):
+        self.masks: List[int] = [FREE_BIT] * len(cards)
+        self.cell_numbers: List[Dict[int, int]] = []
+        self.index: Dict[int, List[Tuple[int, int]]] = {}
+        for player, card in enumerate(cards):
+            numbers = {}
+            for num, bit in card_cells(card):
+                numbers[bit] = num
+                self.index.setdefault(num, []).append((player, bit))
+            self.cell_numbers.append(numbers)
+
+    @classmethod
+    def from_participants(cls, participants: Sequence[Dict[str, Any]], called_numbers: Iterable[int] = ()) -> "BingoBoard":
+        """Builds a board from stored participants and replays numbers already called."""
+        board = cls([p['card'] for p in participants])
+        for number in called_numbers:
+            board.call(number)
+        return board
+
+    def call(self, number: int) -> List[int]:
+        """Marks a called number and returns the participants whose card contains it."""
+        touched = []
+        for player, bit in self.index.get(number, ()):
+            self.masks[player] |= bit
+            touched.append(player)
+        return touched
+
+    def has_bingo(self, player: int) -> bool:
+        return has_line(self.masks[player])
+
+    def winners(self) -> List[int]:
+        return [player for player, mask in enumerate(self.masks) if has_line(mask)]
+
+    def remaining(self, player: int) -> int:
+        return remaining_cells(self.masks[player])
+
+    def marked_numbers(self, player: int) -> List[int]:
+        """Numbers marked on a participant's card (for persistence and display)."""
+        mask = self.masks[player]
+        return [num for bit, num in self.cell_numbers[player].items() if mask & bit]
+
+    def standings(self) -> List[Tuple[int, int]]:
+        """(participant, remaining) pairs, closest to bingo first."""
+        return sorted(((player, self.remaining(player)) for player in range(len(self.masks))), key=lambda item: item[1])
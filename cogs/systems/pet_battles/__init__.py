@@ -1,28 +1,37 @@
 ﻿# cogs/systems/pet_battles/__init__.py
 import os
+import copy
 import random
 import asyncio
 import logging
+import time
+import threading
+from itertools import islice
 from datetime import datetime, timedelta, timezone, time as dtime
 import aiohttp
 import json
 import logging
 from typing import List, Dict, Any, Optional, Tuple # Added Tuple
 from pathlib import Path
+from collections import OrderedDict
 from urllib.parse import urlparse
 
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands, Interaction # Added Interaction
-from pymongo import MongoClient
+from pymongo import UpdateOne
 from bson import ObjectId # Import ObjectId
 import topgg # Ensure topgg is imported
 import asyncio # For retry delays
 import aiohttp # For network error handling
 
 from core.utils import get_conditional_embed, create_progress_bar # Import create_progress_bar
-from services.premium import get_user_entitlements, invalidate_user_entitlements
-from config.settings import MONGODB_URI, TOPGG_TOKEN
+from services.premium import get_user_entitlements, get_many_entitlements, invalidate_user_entitlements
+from config.settings import TOPGG_TOKEN
+from services.database.connection import get_client, get_database
+from services.database.async_operations import run_blocking
+from services.database.battle_logs import compact_battle_logs, ensure_battle_log_indexes
+from services.api.http import http_session
 from ui.embeds import create_error_embed, create_success_embed, get_premium_promotion_embed, get_premium_promotion_view # Use standardized embeds
 
 
@@ -42,19 +51,36 @@ from .petstats import (
 from .petquests import (
     assign_daily_quests,
     assign_achievements,
+    daily_quest_count,
+    generate_daily_quests,
     ensure_quests_and_achievements,
+    hydrate_achievements,
+    hydrate_daily_quests,
     update_quests_and_achievements
 )
 from .petbattle import calculate_damage, get_active_buff # Import buff getter
+from .petranking import get_global_ranking
+from .petbattlelimits import release_pair_battle, reserve_pair_battle
+from .petcommit import BattleCommitError, commit_battle
+from .petrender import BATTLE_EDIT_INTERVAL, edit_schedule, record_battle_render, simulate_battle
 
 logger = logging.getLogger("PetBattlesCog")
 
-mongo_client = MongoClient(MONGODB_URI)
-db = mongo_client['astrostats_database']
+mongo_client = get_client()
+db = get_database()
 pets_collection = db['pets']
 battle_logs_collection = db['battle_logs']
+battle_pair_counts_collection = db['battle_pair_counts']
+battle_summaries_collection = db['battle_log_daily']
+
+# Pets processed per bulk write during the midnight quest reset
+QUEST_RESET_CHUNK_SIZE = 1000
 
 # --- Helper Functions ---
+def _next_chunk(cursor, size: int) -> List[Dict[str, Any]]:
+    """Pulls up to `size` documents from a cursor."""
+    return list(islice(cursor, size))
+
 def format_currency(amount: int) -> str:
     """Formats an integer as currency."""
     return f"🪙 {amount:,}"
@@ -102,6 +128,18 @@ def update_pet_document(pet: Dict[str, Any]):
     result = pets_collection.update_one({"_id": pet_id}, {"$set": update_data})
     return result.modified_count > 0
 
+def prepare_pet_for_battle(pet: Dict[str, Any]) -> Dict[str, Any]:
+    """Fills in missing quests/achievements/fields in memory; the battle commit saves them."""
+    return ensure_quests_and_achievements(pet, persist=False)
+
+async def get_pet_document_async(user_id: str, guild_id: str) -> Optional[Dict[str, Any]]:
+    """Awaitable get_pet_document; runs on the database thread pool."""
+    return await run_blocking(get_pet_document, user_id, guild_id)
+
+async def update_pet_document_async(pet: Dict[str, Any]) -> bool:
+    """Awaitable update_pet_document; runs on the database thread pool."""
+    return await run_blocking(update_pet_document, pet)
+
 # --- Multi-pet Helpers ---
 def get_user_pets(user_id: str, guild_id: str) -> List[Dict[str, Any]]:
     """Return all pets for a user within a guild, newest first."""
@@ -195,21 +233,9 @@ def set_active_pet(user_id: str, guild_id: str, pet_id: ObjectId) -> bool:
     except Exception:
         return False
 
-def enforce_user_pet_capacity(user_id: str, guild_id: str) -> None:
-    """Ensure the user does not exceed pet capacity.
-    Soft-block extras by marking them as locked, keeping earliest pets unlocked.
-    Keeps the first unlocked pet active.
-    """
-    from services.premium import get_user_entitlements
-    try:
-        ent = get_user_entitlements(user_id)
-        extra = int(ent.get("extraPets", 0) or 0)
-        capacity = max(1, 1 + extra)
-    except Exception:
-        capacity = 1
-
-    # Priority order for kept pets: active first (if present), then most recently used, then earliest created
-    pets_all = list(pets_collection.find({"user_id": user_id, "guild_id": guild_id}))
+def _capacity_state_groups(pets: List[Dict[str, Any]], capacity: int) -> Dict[Tuple[bool, bool], List[Any]]:
+    """Group the ids of pets whose (is_locked, is_active) differs from the desired state.
+    Keeps the first `capacity` pets unlocked with only the first active; the rest are locked."""
     # Add a stable key for creation time from _id
     def oid_time(p):
         try:
@@ -222,29 +248,63 @@ def enforce_user_pet_capacity(user_id: str, guild_id: str) -> None:
             return int(p.get("last_used_ts", 0))
         except Exception:
             return 0
-    pets_all_sorted = sorted(
-        pets_all,
+    # Priority order for kept pets: active first (if present), then most recently used, then earliest created
+    pets_sorted = sorted(
+        pets,
         key=lambda p: (
             0 if p.get("is_active") else 1,      # active first
             -last_used_ts(p),                      # most recently used next
             oid_time(p),                           # earliest created next
         )
     )
-    total = len(pets_all_sorted)
-    # Determine keep vs lock sets regardless of total
-    to_keep = pets_all_sorted[:capacity]
-    to_lock = pets_all_sorted[capacity:]
-    keep_ids = [p.get("_id") for p in to_keep if p.get("_id")]
-    lock_ids = [p.get("_id") for p in to_lock if p.get("_id")]
-
-    if keep_ids:
-        pets_collection.update_many({"user_id": user_id, "guild_id": guild_id}, {"$set": {"is_locked": True, "is_active": False}})
-        pets_collection.update_many({"_id": {"$in": keep_ids}}, {"$set": {"is_locked": False}})
-        # Ensure exactly one active among kept (earliest)
-        pets_collection.update_one({"_id": keep_ids[0]}, {"$set": {"is_active": True}})
-    elif lock_ids:
-        # No keep ids (capacity somehow 0, though we force >=1) -> lock all
-        pets_collection.update_many({"_id": {"$in": lock_ids}}, {"$set": {"is_locked": True, "is_active": False}})
+    changes: Dict[Tuple[bool, bool], List[Any]] = {}
+    for index, pet in enumerate(pets_sorted):
+        pet_id = pet.get("_id")
+        if not pet_id:
+            continue
+        desired = (index >= capacity, index == 0)
+        if (bool(pet.get("is_locked")), bool(pet.get("is_active"))) != desired:
+            changes.setdefault(desired, []).append(pet_id)
+    return changes
+
+# (user_id, guild_id) -> (capacity, pet count) at the last enforcement
+_CAPACITY_CHECKS: "OrderedDict[Tuple[str, str], Tuple[int, int]]" = OrderedDict()
+_CAPACITY_CHECKS_LOCK = threading.Lock()
+CAPACITY_CHECKS_MAX_ENTRIES = 10000
+
+def enforce_user_pet_capacity(user_id: str, guild_id: str) -> None:
+    """Ensure the user does not exceed pet capacity.
+    Soft-block extras by marking them as locked, keeping earliest pets unlocked.
+    Keeps the first unlocked pet active. Skipped while capacity and pet count are
+    unchanged since the last check, and only pets whose state differs are written.
+    """
+    from services.premium import get_user_entitlements
+    try:
+        ent = get_user_entitlements(user_id)
+        extra = int(ent.get("extraPets", 0) or 0)
+        capacity = max(1, 1 + extra)
+    except Exception:
+        capacity = 1
+
+    key = (user_id, guild_id)
+    count = pets_collection.count_documents({"user_id": user_id, "guild_id": guild_id})
+    with _CAPACITY_CHECKS_LOCK:
+        if _CAPACITY_CHECKS.get(key) == (capacity, count):
+            _CAPACITY_CHECKS.move_to_end(key)
+            return
+
+    pets_all = list(pets_collection.find(
+        {"user_id": user_id, "guild_id": guild_id},
+        {"is_active": 1, "is_locked": 1, "last_used_ts": 1},
+    ))
+    for (locked, active), pet_ids in _capacity_state_groups(pets_all, capacity).items():
+        pets_collection.update_many({"_id": {"$in": pet_ids}}, {"$set": {"is_locked": locked, "is_active": active}})
+
+    with _CAPACITY_CHECKS_LOCK:
+        _CAPACITY_CHECKS[key] = (capacity, len(pets_all))
+        _CAPACITY_CHECKS.move_to_end(key)
+        while len(_CAPACITY_CHECKS) > CAPACITY_CHECKS_MAX_ENTRIES:
+            _CAPACITY_CHECKS.popitem(last=False)
 
 # --- Cog Definition ---
 class PetBattles(commands.GroupCog, name="petbattles"):
@@ -379,8 +439,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
             url = f"{base_url}/bots/{self.bot.user.id}/check?userId={user_id}" # Use bot ID and user ID
 
             logger.debug(f"Making direct API call to {url} for user {user_id}")
-            # Consider using a shared session if this function is called often
-            async with aiohttp.ClientSession() as session:
+            async with http_session(url) as session:
                 async with session.get(url, headers=headers) as resp:
                     logger.debug(f"Received status {resp.status} for user {user_id}")
 
@@ -438,55 +497,68 @@ class PetBattles(commands.GroupCog, name="petbattles"):
 
     @tasks.loop(time=dtime(hour=0, minute=0, tzinfo=timezone.utc))
     async def reset_daily_quests(self):
-        """Resets daily quests for all pets at midnight UTC."""
+        """Resets daily quests for all pets at midnight UTC, in chunks."""
         logger.debug("Starting daily quest reset...")
+        started = time.perf_counter()
+        scanned = 0
+        updated_count = 0
+        chunks = 0
         try:
-            # Find all pets. Use a cursor to handle potentially large numbers.
-            all_pets_cursor = pets_collection.find({})
-            updated_count = 0
-            for pet in all_pets_cursor:
-                # Ensure _id is ObjectId
-                pet_id = pet.get('_id')
-                if pet_id is None: continue
-                if not isinstance(pet_id, ObjectId):
-                    try: pet_id = ObjectId(pet_id)
-                    except Exception: continue # Skip invalid IDs
-
-                # Assign new quests and reset bonus flag
-                new_quests = []
-                # Determine number of daily quests by entitlements
-                try:
-                    ent = get_user_entitlements(str(pet.get('user_id', '')))
-                    num_quests = 3 + int(ent.get('dailyPetQuestsBonus', 0))
-                except Exception:
-                    num_quests = 3
-                num_quests = max(1, min(len(DAILY_QUESTS), num_quests))
-                random_daily_quests = random.sample(DAILY_QUESTS, num_quests)
-                for quest in random_daily_quests:
-                       new_quests.append({
-                           "id": quest["id"],
-                           "description": quest["description"],
-                           "progress_required": quest["progress_required"],
-                           "progress": 0,
-                           "completed": False,
-                           "xp_reward": quest["xp_reward"],
-                           "cash_reward": quest["cash_reward"]
-                       })
-
-                update_result = pets_collection.update_one(
-                    {"_id": pet_id, "is_locked": {"$ne": True}},
-                    {"$set": {
-                        "daily_quests": new_quests,
-                        "claimed_daily_completion_bonus": False,
-                        "voted_battle_bonus_active": False # Reset vote bonus flag
-                    }}
-                )
-                if update_result.modified_count > 0:
-                    updated_count += 1
+            # Locked pets are skipped by the update filter anyway, so don't fetch them
+            cursor = pets_collection.find(
+                {"is_locked": {"$ne": True}},
+                {"_id": 1, "user_id": 1},
+                batch_size=QUEST_RESET_CHUNK_SIZE,
+            )
+            while True:
+                chunk = await run_blocking(_next_chunk, cursor, QUEST_RESET_CHUNK_SIZE)
+                if not chunk:
+                    break
+                chunks += 1
+                scanned += len(chunk)
 
-            logger.debug(f"Daily quest reset completed. Updated {updated_count} pets.")
+                # One $in lookup for every owner in this chunk
+                owner_ids = {str(pet.get('user_id', '')) for pet in chunk}
+                try:
+                    entitlements = await run_blocking(get_many_entitlements, owner_ids)
+                except Exception as e:
+                    logger.warning(f"Entitlement prefetch failed for quest reset chunk {chunks}: {e}")
+                    entitlements = {}
+
+                operations = []
+                for pet in chunk:
+                    # Ensure _id is ObjectId
+                    pet_id = pet.get('_id')
+                    if pet_id is None: continue
+                    if not isinstance(pet_id, ObjectId):
+                        try: pet_id = ObjectId(pet_id)
+                        except Exception: continue # Skip invalid IDs
+
+                    ent = entitlements.get(str(pet.get('user_id', '')), {})
+                    operations.append(UpdateOne(
+                        {"_id": pet_id, "is_locked": {"$ne": True}},
+                        {"$set": {
+                            "daily_quests": generate_daily_quests(daily_quest_count(ent)),
+                            "claimed_daily_completion_bonus": False,
+                            "voted_battle_bonus_active": False # Reset vote bonus flag
+                        }}
+                    ))
+
+                if operations:
+                    result = await run_blocking(pets_collection.bulk_write, operations, ordered=False)
+                    updated_count += result.modified_count
+
+                # Let interactions run between chunks
+                await asyncio.sleep(0)
+
+            elapsed = time.perf_counter() - started
+            rate = scanned / elapsed if elapsed > 0 else 0.0
+            logger.info(
+                f"Daily quest reset completed. Updated {updated_count}/{scanned} pets "
+                f"in {chunks} chunks, {elapsed:.2f}s ({rate:.0f} pets/s)."
+            )
         except Exception as e:
-            logger.error(f"Error during daily quest reset task: {e}", exc_info=True)
+            logger.error(f"Error during daily quest reset task after {scanned} pets: {e}", exc_info=True)
 
     @reset_daily_quests.before_loop
     async def before_reset_daily_quests(self):
@@ -499,7 +571,8 @@ class PetBattles(commands.GroupCog, name="petbattles"):
         logger.debug("Starting daily training reset...")
         try:
             # Use update_many to efficiently reset all pets' training count
-            result = pets_collection.update_many(
+            result = await run_blocking(
+                pets_collection.update_many,
                 {"trainingCount": {"$exists": True}},  # Only update pets with the training field
                 {"$set": {"trainingCount": 0, "lastTrainingReset": datetime.now(timezone.utc).isoformat()}}
             )
@@ -512,6 +585,25 @@ class PetBattles(commands.GroupCog, name="petbattles"):
         await self.bot.wait_until_ready()  # Ensure bot is ready before starting the loop
         logger.debug("Daily training reset task ready.")
 
+    async def cog_load(self):
+        self.battle_log_compaction.start()
+
+    def cog_unload(self):
+        self.battle_log_compaction.cancel()
+
+    @tasks.loop(time=dtime(hour=0, minute=30, tzinfo=timezone.utc))
+    async def battle_log_compaction(self):
+        """Rolls old battle logs into per-guild daily summaries."""
+        try:
+            await run_blocking(compact_battle_logs, battle_logs_collection, battle_summaries_collection)
+        except Exception as e:
+            logger.error(f"Error during battle log compaction: {e}", exc_info=True)
+
+    @battle_log_compaction.before_loop
+    async def before_battle_log_compaction(self):
+        await self.bot.wait_until_ready()
+        await run_blocking(ensure_battle_log_indexes, battle_logs_collection, battle_summaries_collection)
+
 
     @app_commands.command(name="summon", description="Summon a new pet to join your adventures!")
     @app_commands.describe(name="Give your new companion a name", pet="Choose the type of your pet")
@@ -535,10 +627,10 @@ class PetBattles(commands.GroupCog, name="petbattles"):
         try:
             # Enforce capacity by entitlements
             from services.premium import get_user_entitlements
-            ent = get_user_entitlements(user_id)
+            ent = await run_blocking(get_user_entitlements, user_id)
             extra = int(ent.get("extraPets", 0) or 0)
             capacity = 1 + extra
-            existing_count = count_unlocked_user_pets(user_id, guild_id)
+            existing_count = await run_blocking(count_unlocked_user_pets, user_id, guild_id)
             if existing_count >= capacity:
                 embed = create_error_embed(
                     title="Summon Failed",
@@ -572,8 +664,8 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 **INITIAL_STATS, # Includes balance: 0, active_items: []
                 "killstreak": 0,
                 "loss_streak": 0,
-                "daily_quests": [],
-                "achievements": [],
+                "daily_quests": {},
+                "achievements": {},
                 "last_vote_reward_time": None,
                 "claimed_daily_completion_bonus": False,
                 "is_locked": False,
@@ -581,12 +673,12 @@ class PetBattles(commands.GroupCog, name="petbattles"):
             }
 
             # Insert into DB first to get the _id
-            result = pets_collection.insert_one(new_pet_data)
+            result = await run_blocking(pets_collection.insert_one, new_pet_data)
             new_pet_data['_id'] = result.inserted_id # Store the ObjectId
             # If this is the user's first pet, mark active. If not, keep active status on existing one
             if existing_count == 0:
                 try:
-                    pets_collection.update_one({"_id": result.inserted_id}, {"$set": {"is_active": True}})
+                    await run_blocking(pets_collection.update_one, {"_id": result.inserted_id}, {"$set": {"is_active": True}})
                 except Exception:
                     pass
             # Invalidate entitlement cache for safety (no-op if unchanged)
@@ -598,10 +690,10 @@ class PetBattles(commands.GroupCog, name="petbattles"):
             # Assign initial quests and achievements using the data with _id
             # These functions now need to handle the update internally or return the modified dict
             # Assuming they modify and save internally based on the original code's comment
-            assign_daily_quests(new_pet_data) # Pass the dict, assume it modifies and saves
-            assign_achievements(new_pet_data) # Pass the dict, assume it modifies and saves
+            await run_blocking(assign_daily_quests, new_pet_data) # Pass the dict, assume it modifies and saves
+            await run_blocking(assign_achievements, new_pet_data) # Pass the dict, assume it modifies and saves
             # Fetch the latest data after assignment functions might have updated it
-            new_pet_data = get_pet_document(user_id, guild_id)
+            new_pet_data = await get_pet_document_async(user_id, guild_id)
             if not new_pet_data: # Check if fetch failed
                  logger.error(f"Failed to fetch pet data after assignment for user {user_id}")
                  # Handle error appropriately, maybe send an error message
@@ -642,7 +734,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
             embed.set_footer(text="Let the Pet Battles begin!")
 
             # Add premium promotion view
-            premium_view = get_premium_promotion_view(user_id)
+            premium_view = await get_premium_promotion_view(user_id)
             embeds = [embed]
             
             if icon_file:
@@ -670,17 +762,17 @@ class PetBattles(commands.GroupCog, name="petbattles"):
         try:
             # Enforce capacity on list to reflect any downgrades
             try:
-                enforce_user_pet_capacity(user_id, guild_id)
+                await run_blocking(enforce_user_pet_capacity, user_id, guild_id)
             except Exception:
                 pass
-            pets = get_user_pets(user_id, guild_id)
+            pets = await run_blocking(get_user_pets, user_id, guild_id)
             if not pets:
                 embed = create_error_embed("No Pets", "You have no pets. Use `/petbattles summon` to create one.")
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 return
 
             # Build a nicer embed with emoji markers and active thumbnail
-            active_pet = get_active_pet_document(user_id, guild_id)
+            active_pet = await run_blocking(get_active_pet_document, user_id, guild_id)
             lines = []
             for p in pets:
                 if p.get("is_locked"):
@@ -694,7 +786,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 lines.append(f"{status_emoji} **{pet_name}** — L{pet_level}")
 
             from services.premium import get_user_entitlements
-            ent = get_user_entitlements(user_id)
+            ent = await run_blocking(get_user_entitlements, user_id)
             capacity = 1 + int(ent.get("extraPets", 0) or 0)
 
             embed = discord.Embed(
@@ -703,7 +795,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 color=discord.Color.blue()
             )
             icon_file = apply_pet_thumbnail(embed, active_pet)
-            from_here_unlocked = count_unlocked_user_pets(user_id, guild_id)
+            from_here_unlocked = await run_blocking(count_unlocked_user_pets, user_id, guild_id)
             embed.add_field(name="Capacity (Unlocked)", value=f"{from_here_unlocked}/{capacity}", inline=True)
             embed.add_field(name="Tips", value=(
                 "Use `/petbattles setactive name:<PetName>` to switch active.\n"
@@ -711,7 +803,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
             ), inline=False)
             
             # Add premium promotion view
-            premium_view = get_premium_promotion_view(user_id)
+            premium_view = await get_premium_promotion_view(user_id)
             embeds = [embed]
             
             if icon_file:
@@ -728,7 +820,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
         user_id = str(interaction.user.id)
         guild_id = str(interaction.guild.id)
         try:
-            pet_doc = pets_collection.find_one({"user_id": user_id, "guild_id": guild_id, "name": name})
+            pet_doc = await run_blocking(pets_collection.find_one, {"user_id": user_id, "guild_id": guild_id, "name": name})
             if not pet_doc:
                 await interaction.response.send_message(embed=create_error_embed("Not Found", f"No pet named '{name}' found."), ephemeral=True)
                 return
@@ -751,14 +843,14 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 return
 
             # Otherwise, set active normally and bump last_used_ts
-            if set_active_pet(user_id, guild_id, pet_id):
+            if await run_blocking(set_active_pet, user_id, guild_id, pet_id):
                 try:
                     now_ts = int(datetime.now(timezone.utc).timestamp())
-                    pets_collection.update_one({"_id": pet_id}, {"$set": {"last_used_ts": now_ts}})
+                    await run_blocking(pets_collection.update_one, {"_id": pet_id}, {"$set": {"last_used_ts": now_ts}})
                 except Exception:
                     pass
                 # Add premium promotion view
-                premium_view = get_premium_promotion_view(user_id)
+                premium_view = await get_premium_promotion_view(user_id)
                 embeds = [create_success_embed("Active Pet Set", f"'{name}' is now your active pet.")]
                 
                 await interaction.response.send_message(embeds=embeds, ephemeral=True)
@@ -774,25 +866,25 @@ class PetBattles(commands.GroupCog, name="petbattles"):
         user_id = str(interaction.user.id)
         guild_id = str(interaction.guild.id)
         try:
-            pet_doc = pets_collection.find_one({"user_id": user_id, "guild_id": guild_id, "name": name})
+            pet_doc = await run_blocking(pets_collection.find_one, {"user_id": user_id, "guild_id": guild_id, "name": name})
             if not pet_doc:
                 await interaction.response.send_message(embed=create_error_embed("Not Found", f"No pet named '{name}' found."), ephemeral=True)
                 return
             was_active = bool(pet_doc.get("is_active"))
-            result = pets_collection.delete_one({"_id": pet_doc["_id"]})
+            result = await run_blocking(pets_collection.delete_one, {"_id": pet_doc["_id"]})
             if result.deleted_count == 1:
                 # If active pet was released, set another pet active if any remain
                 if was_active:
-                    remaining = get_user_pets(user_id, guild_id)
+                    remaining = await run_blocking(get_user_pets, user_id, guild_id)
                     if remaining:
                         try:
                             next_id = remaining[0].get("_id")
                             if next_id:
-                                pets_collection.update_one({"_id": next_id}, {"$set": {"is_active": True}})
+                                await run_blocking(pets_collection.update_one, {"_id": next_id}, {"$set": {"is_active": True}})
                         except Exception:
                             pass
                 # Add premium promotion view
-                premium_view = get_premium_promotion_view(user_id)
+                premium_view = await get_premium_promotion_view(user_id)
                 embeds = [create_success_embed("Pet Released", f"You released '{name}'.")]
                 
                 await interaction.response.send_message(embeds=embeds, ephemeral=True)
@@ -811,14 +903,14 @@ class PetBattles(commands.GroupCog, name="petbattles"):
         try:
             # If a name is provided, fetch that unlocked pet; else use active/default
             if name:
-                pet = pets_collection.find_one({
+                pet = await run_blocking(pets_collection.find_one, {
                     "user_id": user_id,
                     "guild_id": guild_id,
                     "name": name,
                     "is_locked": {"$ne": True}
                 })
             else:
-                pet = get_pet_document(user_id, guild_id)
+                pet = await get_pet_document_async(user_id, guild_id)
 
             if not pet:
                 embed = create_error_embed(
@@ -830,21 +922,21 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 return
 
             # Ensure pet has all necessary fields (for backward compatibility)
-            pet = ensure_quests_and_achievements(pet) # Assume this returns the updated pet dict
+            pet = await run_blocking(ensure_quests_and_achievements, pet) # Assume this returns the updated pet dict
 
             xp_needed = calculate_xp_needed(pet['level'])
             xp_bar = create_xp_bar(pet['xp'], xp_needed) # Use the function from petstats
 
             # Multi-pet: show active marker and total count/capacity
-            all_pets = get_user_pets(user_id, guild_id)
+            all_pets = await run_blocking(get_user_pets, user_id, guild_id)
             num_pets = len(all_pets)
             from services.premium import get_user_entitlements
-            ent = get_user_entitlements(user_id)
+            ent = await run_blocking(get_user_entitlements, user_id)
             extra = int(ent.get("extraPets", 0) or 0)
             capacity = 1 + extra
             active_marker = " (Active)" if pet.get("is_active") else ""
 
-            ent = get_user_entitlements(user_id)
+            ent = await run_blocking(get_user_entitlements, user_id)
             badge = " ⭐" if ent.get("premiumBadge") else ""
             tier = ent.get("tier", "free")
 
@@ -904,7 +996,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
             embed.timestamp = datetime.now(timezone.utc)
             # Premium tier info and capacity
             embed.add_field(name="Premium Tier", value=tier.title(), inline=True)
-            from_here_unlocked = count_unlocked_user_pets(user_id, guild_id)
+            from_here_unlocked = await run_blocking(count_unlocked_user_pets, user_id, guild_id)
             embed.add_field(name="Pet Capacity (Unlocked)", value=f"{from_here_unlocked}/{capacity}", inline=True)
 
             # Add quick list of your pets with active/locked markers for convenience
@@ -919,7 +1011,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
             embed.set_footer(text="Use /petbattles help for more commands.")
 
             # Add premium promotion view
-            premium_view = get_premium_promotion_view(user_id)
+            premium_view = await get_premium_promotion_view(user_id)
             embeds = [embed]
             
             if icon_file:
@@ -938,8 +1030,11 @@ class PetBattles(commands.GroupCog, name="petbattles"):
 
     @app_commands.command(name="battle", description="Challenge another user's pet to a battle!")
     @app_commands.guild_only()
-    @app_commands.describe(opponent="The user whose pet you want to battle")
-    async def battle(self, interaction: Interaction, opponent: discord.User):
+    @app_commands.describe(
+        opponent="The user whose pet you want to battle",
+        fast="Skip the round-by-round replay and post only the result"
+    )
+    async def battle(self, interaction: Interaction, opponent: discord.User, fast: bool = False):
         """Initiates a battle between the user's pet and the opponent's pet."""
         user_id = str(interaction.user.id)
         guild = interaction.guild
@@ -947,6 +1042,9 @@ class PetBattles(commands.GroupCog, name="petbattles"):
 
         battle_message: Optional[Any] = None # To store the message for editing (WebhookMessage or Message)
         use_channel_fallback: bool = False
+        # The daily pair slot is given back if the battle fails before its result is saved
+        battle_reserved: bool = False
+        battle_committed: bool = False
 
         async def send_reply(*, embed: Optional[discord.Embed] = None, embeds: Optional[list] = None, ephemeral: bool = False, file: Optional[discord.File] = None):
             """Send a reply using followup if interaction acknowledged, else fallback to channel.send."""
@@ -1003,8 +1101,8 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 await send_reply(embed=embed, ephemeral=True)
                 return
 
-            user_pet = get_pet_document(user_id, guild_id)
-            opponent_pet = get_pet_document(opponent_id, guild_id)
+            user_pet = await get_pet_document_async(user_id, guild_id)
+            opponent_pet = await get_pet_document_async(opponent_id, guild_id)
 
             if not user_pet:
                 embed = create_error_embed(
@@ -1031,17 +1129,11 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 await send_reply(embed=embed, ephemeral=True)
                 return
 
-            # Ensure pets have necessary fields
-            user_pet = ensure_quests_and_achievements(user_pet)
-            opponent_pet = ensure_quests_and_achievements(opponent_pet)
-
-            # Record usage timestampts for prioritizing keeps
-            try:
-                now_ts = int(datetime.now(timezone.utc).timestamp())
-                pets_collection.update_one({"_id": user_pet["_id"]}, {"$set": {"last_used_ts": now_ts}})
-                pets_collection.update_one({"_id": opponent_pet["_id"]}, {"$set": {"last_used_ts": now_ts}})
-            except Exception:
-                pass
+            # Keep the pets as read; the battle commit writes only what changed since then.
+            # Missing fields are filled in memory and saved with the battle result.
+            user_pet_stored, opponent_pet_stored = user_pet, opponent_pet
+            user_pet = await run_blocking(prepare_pet_for_battle, copy.deepcopy(user_pet_stored))
+            opponent_pet = await run_blocking(prepare_pet_for_battle, copy.deepcopy(opponent_pet_stored))
 
             # Level difference check (optional, adjust as needed)
             level_diff = abs(user_pet['level'] - opponent_pet['level'])
@@ -1055,15 +1147,6 @@ class PetBattles(commands.GroupCog, name="petbattles"):
 
             # Battle cooldown check
             now = datetime.now(timezone.utc)
-            start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            recent_battles_count = battle_logs_collection.count_documents({
-                "$or": [
-                     {"user_id": user_id, "opponent_id": opponent_id},
-                     {"user_id": opponent_id, "opponent_id": user_id} # Count battles initiated by either
-                ],
-                "guild_id": guild_id,
-                "timestamp": {"$gte": start_of_day}
-            })
 
             # Determine battle limit based on vote bonus for BOTH users
             BASE_BATTLE_LIMIT = 5
@@ -1080,7 +1163,12 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 battle_limit += VOTE_BATTLE_BONUS
                 bonus_contributors.append(opponent.display_name)
 
-            if recent_battles_count >= battle_limit:
+            # Count this battle against the pair's daily limit in one atomic step
+            battle_allowed, recent_battles_count = await run_blocking(
+                reserve_pair_battle, battle_pair_counts_collection, guild_id, user_id, opponent_id, battle_limit, now
+            )
+            battle_reserved = battle_allowed
+            if not battle_allowed:
                 limit_message = (f"You and {opponent.display_name} have already battled "
                                  f"{recent_battles_count} times today (Daily Limit: {battle_limit}).")
 
@@ -1097,171 +1185,83 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 await send_reply(embed=embed, ephemeral=True)
                 return
 
-            # Log the battle attempt (before the actual fight)
-            battle_logs_collection.insert_one({
-                "user_id": user_id,
-                "opponent_id": opponent_id,
-                "guild_id": guild_id,
-                "timestamp": now
-            })
-
             # --- Battle Setup ---
 
-            # Calculate initial health considering buffs
-            user_max_health = user_pet['health'] + get_active_buff(user_pet.get('active_items', []), 'health')
-            opponent_max_health = opponent_pet['health'] + get_active_buff(opponent_pet.get('active_items', []), 'health')
-            user_current_health = user_max_health
-            opponent_current_health = opponent_max_health
-
-            # Store initial stats for quest tracking
-            user_battle_stats = {"damage_dealt": 0, "critical_hits": 0, "lucky_hits": 0, "battles_won": 0, "battles_lost": 0, "xp_earned": 0}
-            opponent_battle_stats = {"damage_dealt": 0, "critical_hits": 0, "lucky_hits": 0, "battles_won": 0, "battles_lost": 0, "xp_earned": 0}
+            # Fight the whole battle up front; the message only replays it
+            battle = simulate_battle(user_pet, opponent_pet)
+            rounds = battle["rounds"]
+            user_max_health = battle["user_max_health"]
+            opponent_max_health = battle["opponent_max_health"]
+            user_battle_stats = battle["user_stats"]
+            opponent_battle_stats = battle["opponent_stats"]
+            message_edits = 0
 
-            # --- Initial Battle Embed ---
-            embed = discord.Embed(
-                title=f"⚔️ Battle Starting: {user_pet['name']} vs {opponent_pet['name']} ⚔️",
-                description="The pets face off! Prepare for battle...",
-                color=discord.Color.orange()
-            )
-            embed.add_field(name=f"{interaction.user.display_name}'s {user_pet['name']}", value=f"HP: {user_current_health}/{user_max_health}", inline=True)
-            embed.add_field(name=f"{opponent.display_name}'s {opponent_pet['name']}", value=f"HP: {opponent_current_health}/{opponent_max_health}", inline=True)
-            thumbnail_icon, thumbnail_file = get_pet_icon_asset(user_id, guild_id, user_pet)
-            if thumbnail_icon:
-                embed.set_thumbnail(url=thumbnail_icon)
-            # embed.set_image(url=opponent_pet['icon']) # Maybe too large, thumbnail is often enough
-            battle_message = await send_reply(embed=embed, file=thumbnail_file)
+            thumbnail_icon, thumbnail_file = await run_blocking(get_pet_icon_asset, user_id, guild_id, user_pet)
             battle_thumbnail_url = thumbnail_icon
-            await asyncio.sleep(3) # Pause for suspense
-
-            # --- Battle Loop ---
-            round_number = 1
-            battle_log_text = ""
-            winner = None
-            loser = None
-            winner_owner = None # Added initialization
-            loser_owner = None # Added initialization
-
-            while user_current_health > 0 and opponent_current_health > 0:
-                round_log_entry = f"\n\n**--- Round {round_number} ---**\n"
-
-                # User attacks opponent
-                user_damage, user_crit, user_event = calculate_damage(user_pet, opponent_pet)
-                opponent_current_health -= user_damage
-                opponent_current_health = max(0, opponent_current_health) # Ensure health doesn't go below 0
-                user_battle_stats['damage_dealt'] += user_damage
-
-                attack_desc = f"{user_pet['name']} attacks {opponent_pet['name']}!"
-                if user_event == "luck":
-                    user_battle_stats['lucky_hits'] += 1
-                    attack_desc += f" ✨ **Lucky Hit!** Deals **{user_damage}** damage!"
-                elif user_crit:
-                    user_battle_stats['critical_hits'] += 1
-                    attack_desc += f" 💥 **Critical Hit!** Deals **{user_damage}** damage!"
-                else:
-                    attack_desc += f" Deals **{user_damage}** damage."
-                round_log_entry += attack_desc + "\n"
-
-                if opponent_current_health <= 0:
-                    winner = user_pet
-                    loser = opponent_pet
-                    winner_owner = interaction.user
-                    loser_owner = opponent
-                    break # Exit loop, user wins
-
-                # Opponent attacks user
-                opponent_damage, opponent_crit, opponent_event = calculate_damage(opponent_pet, user_pet)
-                user_current_health -= opponent_damage
-                user_current_health = max(0, user_current_health) # Ensure health doesn't go below 0
-                opponent_battle_stats['damage_dealt'] += opponent_damage
-
-                attack_desc = f"{opponent_pet['name']} attacks {user_pet['name']}!"
-                if opponent_event == "luck":
-                    opponent_battle_stats['lucky_hits'] += 1
-                    attack_desc += f" ✨ **Lucky Hit!** Deals **{opponent_damage}** damage!"
-                elif opponent_crit:
-                    opponent_battle_stats['critical_hits'] += 1
-                    attack_desc += f" 💥 **Critical Hit!** Deals **{opponent_damage}** damage!"
-                else:
-                    attack_desc += f" Deals **{opponent_damage}** damage."
-                round_log_entry += attack_desc + "\n"
-
-                if user_current_health <= 0:
-                    winner = opponent_pet
-                    loser = user_pet
-                    winner_owner = opponent
-                    loser_owner = interaction.user
-                    break # Exit loop, opponent wins
-
-                # Update embed with round results
-                battle_log_text += round_log_entry
-                embed.description = battle_log_text[-1900:] # Keep description length reasonable
-                embed.set_field_at(0, name=f"{interaction.user.display_name}'s {user_pet['name']}", value=f"HP: {user_current_health}/{user_max_health}", inline=True)
-                embed.set_field_at(1, name=f"{opponent.display_name}'s {opponent_pet['name']}", value=f"HP: {opponent_current_health}/{opponent_max_health}", inline=True)
-                await battle_message.edit(embed=embed)
-
-                round_number += 1
-                await asyncio.sleep(2.5) # Pause between rounds
 
-            # --- Battle Conclusion ---
-            if not winner or not loser or not winner_owner or not loser_owner: # Check owner variables too
-                 # Should not happen in normal flow, but handle defensively
-                 logger.error(f"Battle concluded without a clear winner/loser/owner between {user_id} and {opponent_id}")
-                 await battle_message.edit(embed=create_error_embed("Battle Error", "An unexpected error occurred determining the winner."))
-                 return
-
-            # Update streaks and battle stats
-            winner_battle_stats = user_battle_stats if winner == user_pet else opponent_battle_stats
-            loser_battle_stats = opponent_battle_stats if loser == opponent_pet else user_battle_stats
-            winner_battle_stats['battles_won'] += 1
-            loser_battle_stats['battles_lost'] += 1
-
-            # Update battle record for profile display
-            winner_battle_record = winner.get('battleRecord', {"wins": 0, "losses": 0})
-            loser_battle_record = loser.get('battleRecord', {"wins": 0, "losses": 0})
-            
-            # Increment wins and losses without overwriting the entire record
-            if 'battleRecord' not in winner:
-                winner['battleRecord'] = {"wins": 0, "losses": 0}
-            if 'battleRecord' not in loser:
-                loser['battleRecord'] = {"wins": 0, "losses": 0}
-                
-            winner['battleRecord']['wins'] = winner_battle_record.get('wins', 0) + 1
-            loser['battleRecord']['losses'] = loser_battle_record.get('losses', 0) + 1
+            if not fast:
+                # --- Initial Battle Embed ---
+                embed = discord.Embed(
+                    title=f"⚔️ Battle Starting: {user_pet['name']} vs {opponent_pet['name']} ⚔️",
+                    description="The pets face off! Prepare for battle...",
+                    color=discord.Color.orange()
+                )
+                embed.add_field(name=f"{interaction.user.display_name}'s {user_pet['name']}", value=f"HP: {user_max_health}/{user_max_health}", inline=True)
+                embed.add_field(name=f"{opponent.display_name}'s {opponent_pet['name']}", value=f"HP: {opponent_max_health}/{opponent_max_health}", inline=True)
+                if thumbnail_icon:
+                    embed.set_thumbnail(url=thumbnail_icon)
+                battle_message = await send_reply(embed=embed, file=thumbnail_file)
+                thumbnail_file = None
+                await asyncio.sleep(3) # Pause for suspense
+
+                # --- Battle Replay ---
+                # Several rounds per edit on long battles keeps the edit count capped
+                shown_until = 0
+                battle_log_text = ""
+                for round_index in edit_schedule(len(rounds)):
+                    battle_log_text += "".join(r["log"] for r in rounds[shown_until:round_index + 1])
+                    shown_until = round_index + 1
+                    embed.description = battle_log_text[-1900:] # Keep description length reasonable
+                    embed.set_field_at(0, name=f"{interaction.user.display_name}'s {user_pet['name']}", value=f"HP: {rounds[round_index]['user_health']}/{user_max_health}", inline=True)
+                    embed.set_field_at(1, name=f"{opponent.display_name}'s {opponent_pet['name']}", value=f"HP: {rounds[round_index]['opponent_health']}/{opponent_max_health}", inline=True)
+                    await battle_message.edit(embed=embed)
+                    message_edits += 1
+                    await asyncio.sleep(BATTLE_EDIT_INTERVAL)
 
-            winner['killstreak'] = winner.get('killstreak', 0) + 1
-            winner['loss_streak'] = 0
-            loser['killstreak'] = 0
-            loser['loss_streak'] = loser.get('loss_streak', 0) + 1
+            # --- Battle Conclusion ---
+            user_won = battle["user_won"]
+            if user_won:
+                winner, loser = user_pet, opponent_pet
+                winner_owner, loser_owner = interaction.user, opponent
+            else:
+                winner, loser = opponent_pet, user_pet
+                winner_owner, loser_owner = opponent, interaction.user
 
-            # Calculate XP gains (more for winner, less for loser)
-            winner_xp_gain = random.randint(75, 150) + (winner['level'] * 5) # Scale slightly with level
+            # Calculate XP gains (more for winner, less for loser), scaled slightly with level
+            winner_xp_gain = random.randint(75, 150) + (winner['level'] * 5)
             loser_xp_gain = random.randint(25, 75) + (loser['level'] * 2)
-            winner['xp'] += winner_xp_gain
-            loser['xp'] += loser_xp_gain
-            winner_battle_stats['xp_earned'] = winner_xp_gain
-            loser_battle_stats['xp_earned'] = loser_xp_gain
-
-            # Process item duration decay
-            for item in winner.get('active_items', []):
-                item['battles_remaining'] = max(0, item.get('battles_remaining', 0) - 1)
-            for item in loser.get('active_items', []):
-                item['battles_remaining'] = max(0, item.get('battles_remaining', 0) - 1)
-            # Filter out expired items
-            winner['active_items'] = [item for item in winner.get('active_items', []) if item.get('battles_remaining', 0) > 0]
-            loser['active_items'] = [item for item in loser.get('active_items', []) if item.get('battles_remaining', 0) > 0]
-
-            # Update quests and achievements - Assume these functions handle DB updates or return updated dicts
-            completed_quests_winner, completed_achievements_winner, daily_bonus_winner = update_quests_and_achievements(winner, winner_battle_stats)
-            completed_quests_loser, completed_achievements_loser, daily_bonus_loser = update_quests_and_achievements(loser, loser_battle_stats)
-
-            # Check for level ups - Assume these functions handle DB updates or return updated dicts
-            winner, winner_leveled_up = check_level_up(winner)
-            loser, loser_leveled_up = check_level_up(loser)
-
-            # Save updated pet data to DB (if not handled by above functions)
-            # If check_level_up and update_quests return the modified dicts, update here:
-            update_pet_document(winner)
-            update_pet_document(loser)
+            winner_stored, loser_stored = ((user_pet_stored, opponent_pet_stored) if user_won
+                                           else (opponent_pet_stored, user_pet_stored))
+
+            # Record, streaks, XP, items, quests and level-ups for both pets, saved with the battle log
+            (winner, winner_result), (loser, loser_result) = await run_blocking(
+                commit_battle,
+                pets_collection,
+                [
+                    (winner_stored, True, user_battle_stats if user_won else opponent_battle_stats, winner_xp_gain),
+                    (loser_stored, False, opponent_battle_stats if user_won else user_battle_stats, loser_xp_gain),
+                ],
+                lambda pet_id: pets_collection.find_one({"_id": pet_id}),
+                int(now.timestamp()),
+                prepare_pet_for_battle,
+                logs_collection=battle_logs_collection,
+                log_doc={"user_id": user_id, "opponent_id": opponent_id, "guild_id": guild_id, "timestamp": now},
+            )
+            battle_committed = True
+            completed_quests_winner, completed_achievements_winner = winner_result["quests"], winner_result["achievements"]
+            completed_quests_loser, completed_achievements_loser = loser_result["quests"], loser_result["achievements"]
+            daily_bonus_winner, daily_bonus_loser = winner_result["daily_bonus"], loser_result["daily_bonus"]
+            winner_leveled_up, loser_leveled_up = winner_result["leveled_up"], loser_result["leveled_up"]
 
             # --- Final Battle Embed ---
             result_embed = discord.Embed(
@@ -1269,7 +1269,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 description=f"{winner_owner.mention}'s **{winner['name']}** defeated {loser_owner.mention}'s **{loser['name']}**!",
                 color=winner.get('color', discord.Color.gold())
             )
-            winner_icon, winner_icon_file = get_pet_icon_asset(str(winner_owner.id), guild_id, winner)
+            winner_icon, winner_icon_file = await run_blocking(get_pet_icon_asset, str(winner_owner.id), guild_id, winner)
             if battle_thumbnail_url and battle_thumbnail_url.startswith("attachment://"):
                 result_embed.set_thumbnail(url=battle_thumbnail_url)
             elif winner_icon and winner_icon_file is None:
@@ -1310,17 +1310,45 @@ class PetBattles(commands.GroupCog, name="petbattles"):
             result_embed.set_footer(text="Battle concluded.")
 
             # Add premium promotion view
-            premium_view = get_premium_promotion_view(user_id)
+            premium_view = await get_premium_promotion_view(user_id)
             embeds = [result_embed]
 
-            await battle_message.edit(embeds=embeds)
+            if fast:
+                battle_message = await send_reply(embeds=embeds, file=thumbnail_file)
+            else:
+                await battle_message.edit(embeds=embeds)
+                message_edits += 1
+            record_battle_render(len(rounds), message_edits, fast)
 
         except Exception as e:
-            logger.error(f"Error in battle command between {user_id} and {opponent_id}: {e}", exc_info=True)
-            error_embed = create_error_embed(
-                "Battle Error",
-                "An unexpected error occurred during the battle. Please try again later."
-            )
+            if battle_reserved and not battle_committed:
+                try:
+                    await run_blocking(
+                        release_pair_battle, battle_pair_counts_collection, guild_id, user_id, opponent_id, now
+                    )
+                except Exception as release_e:
+                    logger.error(f"Failed to release battle slot for {user_id} and {opponent_id}: {release_e}")
+            if isinstance(e, BattleCommitError):
+                logger.warning(f"Battle between {user_id} and {opponent_id} was not saved "
+                               f"(saved for pets: {e.committed}): {e}")
+                if e.committed:
+                    saved_names = ", ".join(
+                        f"**{pet['name']}**" for pet in (user_pet, opponent_pet) if pet["_id"] in e.committed
+                    )
+                    detail = (f"Only {saved_names} received XP and progress from this battle. "
+                              "It doesn't count toward today's limit; please try again.")
+                else:
+                    detail = "No XP or progress was awarded and it doesn't count toward today's limit; please try again."
+                error_embed = create_error_embed(
+                    "Battle Not Saved",
+                    f"These pets were busy in other battles and the result couldn't be saved. {detail}"
+                )
+            else:
+                logger.error(f"Error in battle command between {user_id} and {opponent_id}: {e}", exc_info=True)
+                error_embed = create_error_embed(
+                    "Battle Error",
+                    "An unexpected error occurred during the battle. Please try again later."
+                )
             try:
                 # Try to edit the existing message if possible, otherwise send new
                 if battle_message:
@@ -1337,7 +1365,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
         user_id = str(interaction.user.id)
         guild_id = str(interaction.guild.id)
         try:
-            pet = get_pet_document(user_id, guild_id)
+            pet = await get_pet_document_async(user_id, guild_id)
 
             if not pet:
                 embed = create_error_embed(
@@ -1347,17 +1375,18 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 return
 
-            pet = ensure_quests_and_achievements(pet) # Ensure quests are assigned
+            pet = await run_blocking(ensure_quests_and_achievements, pet) # Ensure quests are assigned
 
             # Check if all quests are complete
-            incomplete_quests = [q for q in pet.get('daily_quests', []) if not q.get('completed', False)]
+            daily_quests = hydrate_daily_quests(pet)
+            incomplete_quests = [q for q in daily_quests if not q.get('completed', False)]
             all_complete = not incomplete_quests
             bonus_claimed = pet.get('claimed_daily_completion_bonus', False)
 
             embed = discord.Embed(title="📅 Your Daily Quests", color=discord.Color.blue())
             icon_file = apply_pet_thumbnail(embed, pet)
 
-            if not pet.get('daily_quests'):
+            if not daily_quests:
                  embed.description = "You currently have no daily quests assigned. They reset daily at midnight UTC."
             elif all_complete:
                  now = datetime.now(timezone.utc)
@@ -1384,7 +1413,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                  embed.color = discord.Color.green()
             else:
                 embed.description = "Complete these quests for rewards!"
-                for quest in pet['daily_quests']:
+                for quest in daily_quests:
                      progress_bar = create_progress_bar(quest.get('progress', 0), quest['progress_required'])
                      status_emoji = "✅" if quest.get('completed') else "⏳"
                      reward_str = f"(+{quest['xp_reward']} XP, +{format_currency(quest['cash_reward'])})"
@@ -1398,7 +1427,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
             embed.set_footer(text="Quests reset daily at midnight UTC.")
 
             # Add premium promotion view
-            premium_view = get_premium_promotion_view(user_id)
+            premium_view = await get_premium_promotion_view(user_id)
             embeds = [embed]
             
             if icon_file:
@@ -1418,7 +1447,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
         user_id = str(interaction.user.id)
         guild_id = str(interaction.guild.id)
         try:
-            pet = get_pet_document(user_id, guild_id)
+            pet = await get_pet_document_async(user_id, guild_id)
 
             if not pet:
                 embed = create_error_embed(
@@ -1428,8 +1457,8 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 return
 
-            pet = ensure_quests_and_achievements(pet) # Ensure achievements are assigned
-            achievements_list = pet.get('achievements', [])
+            pet = await run_blocking(ensure_quests_and_achievements, pet) # Ensure achievements are assigned
+            achievements_list = hydrate_achievements(pet)
 
             embed = discord.Embed(title="🏆 Your Achievements 🏆", color=discord.Color.gold())
             icon_file = apply_pet_thumbnail(embed, pet)
@@ -1458,7 +1487,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
             embed.set_footer(text="Keep battling to unlock more!")
 
             # Add premium promotion view
-            premium_view = get_premium_promotion_view(user_id)
+            premium_view = await get_premium_promotion_view(user_id)
             embeds = [embed]
             
             if icon_file:
@@ -1486,7 +1515,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 [("level", -1), ("xp", -1)]
             ).limit(10)
 
-            top_pets_list = list(top_pets_cursor) # Convert cursor to list
+            top_pets_list = await run_blocking(list, top_pets_cursor) # Convert cursor to list
 
             embed = discord.Embed(
                 title=f"🏆 Top Pets Leaderboard - {interaction.guild.name} 🏆",
@@ -1529,7 +1558,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
             embed.set_footer(text="Battle your way to the top!")
 
             # Add premium promotion view
-            premium_view = get_premium_promotion_view(user_id)
+            premium_view = await get_premium_promotion_view(user_id)
             embeds = [embed]
             
             if icon_file:
@@ -1558,7 +1587,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
         VOTE_COOLDOWN_HOURS = 12
 
         try:
-            pet = get_pet_document(user_id, guild_id)
+            pet = await get_pet_document_async(user_id, guild_id)
             if not pet:
                 embed = create_error_embed(
                     "No Pet Found",
@@ -1567,7 +1596,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 return
 
-            pet = ensure_quests_and_achievements(pet) # Ensure fields exist
+            pet = await run_blocking(ensure_quests_and_achievements, pet) # Ensure fields exist
 
             # --- FIX: Check the stored token attribute ---
             if not self.topgg_token: # Check if token exists before proceeding
@@ -1635,7 +1664,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 else:
                     # Grant rewards
                     try:
-                        ent = get_user_entitlements(user_id)
+                        ent = await run_blocking(get_user_entitlements, user_id)
                         tier = ent.get('tier','free')
                         mult = 1.0
                         if tier == 'supporter':
@@ -1657,7 +1686,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                     pet['bonus_battle_allowance'] = 10 # Set the allowance amount
 
                     pet, leveled_up = check_level_up(pet) # Assume returns updated dict
-                    update_pet_document(pet) # Save changes
+                    await update_pet_document_async(pet) # Save changes
 
                     embed = create_success_embed(
                         "🎉 Thank You for Voting! 🎉",
@@ -1669,7 +1698,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                         embed.add_field(name="🌟 Level Up! 🌟", value=f"Your pet reached **Level {pet['level']}**!", inline=False)
 
                     # Add premium promotion view
-                    premium_view = get_premium_promotion_view(user_id)
+                    premium_view = await get_premium_promotion_view(user_id)
                     embeds = [embed]
                     
                     await interaction.followup.send(embeds=embeds, ephemeral=True) # Send reward confirmation privately
@@ -1691,7 +1720,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
         user_id = str(interaction.user.id)
         guild_id = str(interaction.guild.id)
 
-        pet = get_pet_document(user_id, guild_id)
+        pet = await get_pet_document_async(user_id, guild_id)
         if not pet:
             embed = create_error_embed(
                 "No Pet Found",
@@ -1700,7 +1729,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
 
-        pet = ensure_quests_and_achievements(pet) # Ensure balance field exists
+        pet = await run_blocking(ensure_quests_and_achievements, pet) # Ensure balance field exists
 
         embed = discord.Embed(
             title="🛒 Pet Shop 🛒",
@@ -1725,7 +1754,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
         embed.set_footer(text="Items provide temporary buffs for battles.")
         
         # Add premium promotion view
-        premium_view = get_premium_promotion_view(user_id)
+        premium_view = await get_premium_promotion_view(user_id)
         embeds = [embed]
         
         await interaction.response.send_message(embeds=embeds)
@@ -1740,13 +1769,13 @@ class PetBattles(commands.GroupCog, name="petbattles"):
         item_id = item_id.lower().strip() # Normalize item ID
 
         try:
-            pet = get_pet_document(user_id, guild_id)
+            pet = await get_pet_document_async(user_id, guild_id)
             if not pet:
                 embed = create_error_embed("No Pet Found", "You need a pet to buy items.")
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 return
 
-            pet = ensure_quests_and_achievements(pet) # Ensure fields exist
+            pet = await run_blocking(ensure_quests_and_achievements, pet) # Ensure fields exist
 
             # Find the item in the shop
             item_to_buy = SHOP_ITEMS.get(item_id)
@@ -1803,7 +1832,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
 
 
             # Save changes to DB
-            if update_pet_document(pet):
+            if await update_pet_document_async(pet):
                 embed = create_success_embed(
                     f"Item {action_text}!",
                     (f"You spent **{format_currency(cost)}** and acquired **{item_to_buy['name']}**!\n"
@@ -1812,7 +1841,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 )
                 
                 # Add premium promotion view
-                premium_view = get_premium_promotion_view(user_id)
+                premium_view = await get_premium_promotion_view(user_id)
                 embeds = [embed]
                 
                 await interaction.response.send_message(embeds=embeds, view=premium_view)
@@ -1836,7 +1865,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
         """Shows the user's pet rank in the global leaderboard."""
         user_id = str(interaction.user.id)
         try:
-            pet = get_pet_document(user_id, str(interaction.guild.id))
+            pet = await get_pet_document_async(user_id, str(interaction.guild.id))
             
             if not pet:
                 embed = create_error_embed(
@@ -1849,26 +1878,13 @@ class PetBattles(commands.GroupCog, name="petbattles"):
             # Defer response as global ranking might take time
             await interaction.response.defer()
             
-            # Get all pets sorted by level descending, then XP descending
-            all_pets_cursor = pets_collection.find({}).sort(
-                [("level", -1), ("xp", -1)]
-            )
-            
-            all_pets_list = list(all_pets_cursor) # Convert cursor to list
-            total_pets = len(all_pets_list)
-            
-            # Find user's pet rank
-            user_pet_rank = None
-            top_pets = []
-            for index, ranked_pet in enumerate(all_pets_list):
-                if index < 3:  # Get top 3 for display
-                    top_pets.append(ranked_pet)
-                    
-                if ranked_pet.get('_id') == pet.get('_id'):
-                    user_pet_rank = index + 1  # +1 because index is 0-based but ranks start at 1
-                    if index >= 3:  # If user isn't in top 3, add their pet to the display list
-                        ranked_pet['rank'] = user_pet_rank  # Add rank for later display
-                        top_pets.append(ranked_pet)
+            # Top 3, the user's rank and the total come from indexed queries
+            ranking = await run_blocking(get_global_ranking, pets_collection, pet, 3)
+            total_pets = ranking["total"]
+            user_pet_rank = ranking["rank"]
+            top_pets = list(ranking["top"])
+            if user_pet_rank > len(top_pets):  # If user isn't in top 3, add their pet to the display list
+                top_pets.append({**pet, 'rank': user_pet_rank})
             
             # Create embed
             embed = discord.Embed(
@@ -1925,7 +1941,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
             embed.set_footer(text="Battle to climb the global rankings!")
             
             # Add premium promotion view
-            premium_view = get_premium_promotion_view(user_id)
+            premium_view = await get_premium_promotion_view(user_id)
             embeds = [embed]
             
             if icon_file:
@@ -1953,7 +1969,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
         DAILY_TRAINING_LIMIT = 5  # Maximum trainings per day
         
         try:
-            pet = get_pet_document(user_id, guild_id)
+            pet = await get_pet_document_async(user_id, guild_id)
             if not pet:
                 embed = create_error_embed(
                     "No Pet Found",
@@ -1963,7 +1979,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 return
             
             # Ensure pet has necessary fields
-            pet = ensure_quests_and_achievements(pet)
+            pet = await run_blocking(ensure_quests_and_achievements, pet)
             
             # Check if pet has reached daily training limit
             training_count = pet.get('trainingCount', 0)
@@ -1996,7 +2012,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
             # Process training
             xp_gained = random.randint(TRAINING_XP_MIN, TRAINING_XP_MAX)
             try:
-                ent = get_user_entitlements(user_id)
+                ent = await run_blocking(get_user_entitlements, user_id)
                 tier = ent.get('tier','free')
                 mult = 1.0
                 if tier == 'supporter':
@@ -2016,7 +2032,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
             pet, leveled_up = check_level_up(pet)
             
             # Save changes
-            update_pet_document(pet)
+            await update_pet_document_async(pet)
             
             # Create success embed
             embed = create_success_embed(
@@ -2035,7 +2051,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 )
             
             # Add premium promotion view
-            premium_view = get_premium_promotion_view(user_id)
+            premium_view = await get_premium_promotion_view(user_id)
             embeds = [embed]
             
             await interaction.response.send_message(embeds=embeds, view=premium_view)
@@ -2054,7 +2070,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
         RENAME_COST = 200  # Cost in currency
         
         try:
-            pet = get_pet_document(user_id, guild_id)
+            pet = await get_pet_document_async(user_id, guild_id)
             if not pet:
                 embed = create_error_embed(
                     "No Pet Found",
@@ -2064,7 +2080,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 return
             
             # Ensure pet has necessary fields
-            pet = ensure_quests_and_achievements(pet)
+            pet = await run_blocking(ensure_quests_and_achievements, pet)
             
             # Validate name length
             if len(new_name) > 32:
@@ -2102,7 +2118,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
             pet['lastRenameTime'] = datetime.now(timezone.utc).isoformat()
             
             # Save changes
-            if update_pet_document(pet):
+            if await update_pet_document_async(pet):
                 embed = create_success_embed(
                     "✏️ Pet Renamed!",
                     f"You spent **{format_currency(RENAME_COST)}** to rename your pet.\n"
@@ -2112,7 +2128,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 icon_file = apply_pet_thumbnail(embed, pet)
                 
                 # Add premium promotion view
-                premium_view = get_premium_promotion_view(user_id)
+                premium_view = await get_premium_promotion_view(user_id)
                 embeds = [embed]
                 
                 if icon_file:
@@ -2141,7 +2157,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
             # Defer early to avoid interaction timeout; we'll use follow-up messages
             await interaction.response.defer()
 
-            pet = get_pet_document(user_id, guild_id)
+            pet = await get_pet_document_async(user_id, guild_id)
             if not pet:
                 embed = create_error_embed(
                     "No Pet Found",
@@ -2151,7 +2167,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 return
             
             # Ensure pet has necessary fields
-            pet = ensure_quests_and_achievements(pet)
+            pet = await run_blocking(ensure_quests_and_achievements, pet)
             
             # Get battle record
             battle_record = pet.get('battleRecord', {"wins": 0, "losses": 0})
@@ -2217,7 +2233,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 embed.add_field(name="✨ Active Buffs", value=buffs_text, inline=True)
             
             # Add achievement progress section - show 3 in-progress achievements
-            achievements = pet.get('achievements', [])
+            achievements = hydrate_achievements(pet)
             incomplete_achievements = [a for a in achievements if not a.get('completed', False)]
             if incomplete_achievements:
                 # Sort by progress percentage
@@ -2272,7 +2288,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
         MAX_STREAK_DAYS = 10   # For display purposes, cap visible streak at 10 days
         
         try:
-            pet = get_pet_document(user_id, guild_id)
+            pet = await get_pet_document_async(user_id, guild_id)
             if not pet:
                 embed = create_error_embed(
                     "No Pet Found",
@@ -2282,7 +2298,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 return
             
             # Ensure pet has necessary fields
-            pet = ensure_quests_and_achievements(pet)
+            pet = await run_blocking(ensure_quests_and_achievements, pet)
             
             # Check if they've already claimed today
             now = datetime.now(timezone.utc)
@@ -2346,7 +2362,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
             cash_reward = int(DAILY_REWARD_CASH * (1 + streak_bonus))
             try:
                 from services.premium import get_user_entitlements
-                ent = get_user_entitlements(user_id)
+                ent = await run_blocking(get_user_entitlements, user_id)
                 tier = ent.get('tier','free')
                 mult = 1.0
                 if tier == 'supporter':
@@ -2362,7 +2378,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
             # Apply premium XP multiplier
             try:
                 from services.premium import get_user_entitlements
-                ent = get_user_entitlements(user_id)
+                ent = await run_blocking(get_user_entitlements, user_id)
                 tier = ent.get('tier','free')
                 mult = 1.0
                 if tier == 'supporter':
@@ -2385,7 +2401,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
             pet, leveled_up = check_level_up(pet)
             
             # Save changes
-            update_pet_document(pet)
+            await update_pet_document_async(pet)
             
             # Create success embed
             if streak_broken:
@@ -2412,7 +2428,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 )
             
             # Add premium promotion view
-            premium_view = get_premium_promotion_view(user_id)
+            premium_view = await get_premium_promotion_view(user_id)
             embeds = [embed]
             
             await interaction.response.send_message(embeds=embeds, view=premium_view)
@@ -2435,7 +2451,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
         MAX_HUNT_CASH = 150  # Maximum currency reward
         
         try:
-            pet = get_pet_document(user_id, guild_id)
+            pet = await get_pet_document_async(user_id, guild_id)
             if not pet:
                 embed = create_error_embed(
                     "No Pet Found",
@@ -2445,7 +2461,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 return
             
             # Ensure pet has necessary fields
-            pet = ensure_quests_and_achievements(pet)
+            pet = await run_blocking(ensure_quests_and_achievements, pet)
             
             # Check if pet is on cooldown
             now = datetime.now(timezone.utc)
@@ -2539,7 +2555,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                             item_description = f"Found a **small treasure** worth {format_currency(bonus_cash)}!"
                 
                 # Save pet data
-                update_pet_document(pet)
+                await update_pet_document_async(pet)
                 
                 # Create success embed
                 embed = create_success_embed(
@@ -2565,7 +2581,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
                 embed.set_footer(text=f"New Balance: {format_currency(pet['balance'])} | Next hunt available in {HUNT_COOLDOWN_HOURS} hours")
             else:
                 # Failed hunt - no rewards
-                update_pet_document(pet)
+                await update_pet_document_async(pet)
                 
                 # Create failure embed
                 embed = discord.Embed(
@@ -2590,7 +2606,7 @@ class PetBattles(commands.GroupCog, name="petbattles"):
             icon_file = apply_pet_thumbnail(embed, pet)
             
             # Add premium promotion view
-            premium_view = get_premium_promotion_view(user_id)
+            premium_view = await get_premium_promotion_view(user_id)
             embeds = [embed]
             
             if icon_file:
@@ -11,10 +11,11 @@ def get_active_buff(active_items: List[Dict[str, Any]], stat_name: str) -> int:
             total_buff += item.get('value', 0)
     return total_buff
 
-def calculate_damage(attacker_pet: Dict[str, Any], defender_pet: Dict[str, Any]) -> Tuple[int, bool, str]:
+def calculate_damage(attacker_pet: Dict[str, Any], defender_pet: Dict[str, Any], rng=random) -> Tuple[int, bool, str]:
     """
     Calculates the damage dealt by the attacker to the defender, considering active items.
     Includes random multipliers, critical hit chance, and a chance for a lucky hit.
+    Pass a random.Random as rng for reproducible results (see petsimulator).
     Returns the damage value, a boolean for critical hit, and an event type ("normal" or "luck").
     """
     # Get active buffs
@@ -27,29 +28,29 @@ def calculate_damage(attacker_pet: Dict[str, Any], defender_pet: Dict[str, Any])
     effective_defense = defender_pet.get('defense', 10) + defender_defense_buff
 
     # --- Damage Calculation ---
-    attack_multiplier = random.randint(8, 15) / 10
-    defense_multiplier = random.randint(8, 15) / 10
+    attack_multiplier = rng.randint(8, 15) / 10
+    defense_multiplier = rng.randint(8, 15) / 10
 
     # Calculate base damage using effective stats
     base_damage = int(
-        (effective_strength * attack_multiplier * (random.randint(5, 15) / 10))
-        - (effective_defense * defense_multiplier * (random.randint(3, 10) / 10))
+        (effective_strength * attack_multiplier * (rng.randint(5, 15) / 10))
+        - (effective_defense * defense_multiplier * (rng.randint(3, 10) / 10))
     )
     base_damage = max(5, base_damage)  # Ensure minimum damage of 5
 
     # --- Critical Hit Check ---
     # Crit chance increases slightly if attacker level is lower
     crit_chance = 15 + (10 if attacker_pet.get('level', 1) < defender_pet.get('level', 1) else 0)
-    critical_hit = random.randint(1, 100) <= crit_chance
+    critical_hit = rng.randint(1, 100) <= crit_chance
 
     if critical_hit:
-        crit_multiplier = random.randint(15, 30) / 10 # Crit multiplier between 1.5x and 3.0x
+        crit_multiplier = rng.randint(15, 30) / 10 # Crit multiplier between 1.5x and 3.0x
         base_damage = int(base_damage * crit_multiplier)
 
     # --- Lucky Hit Check ---
     # 10% chance for a lucky hit adding bonus damage
-    if random.randint(1, 10) == 1:
-        luck_damage = random.randint(15, 50) # Add 15-50 extra damage on lucky hit
+    if rng.randint(1, 10) == 1:
+        luck_damage = rng.randint(15, 50) # Add 15-50 extra damage on lucky hit
         base_damage += luck_damage
         return base_damage, critical_hit, "luck" # Return damage, crit status, and 'luck' event
 
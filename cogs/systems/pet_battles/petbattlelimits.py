@@ -0,0 +1,87 @@
+# cogs/systems/pet_battles/petbattlelimits.py
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+# Counters outlive their UTC day by this much before the TTL monitor removes them
+COUNTER_GRACE = timedelta(days=1)
+TTL_INDEX_NAME = "expires_at_ttl"
+
+_ttl_index_ready = False
+
+
+def ensure_pair_counter_index(collection) -> None:
+    """Creates the TTL index that expires old daily counters (once per process)."""
+    global _ttl_index_ready
+    if _ttl_index_ready:
+        return
+    try:
+        collection.create_index("expires_at", name=TTL_INDEX_NAME, expireAfterSeconds=0)
+        _ttl_index_ready = True
+    except Exception as e:
+        logger.warning(f"Could not ensure battle pair counter TTL index: {e}")
+
+
+def pair_counter_id(guild_id: str, user_id: str, opponent_id: str, now: datetime) -> str:
+    """Counter key for a guild, the unordered pair of users and the UTC day."""
+    first, second = sorted((str(user_id), str(opponent_id)))
+    return f"{guild_id}:{first}:{second}:{now.astimezone(timezone.utc).strftime('%Y-%m-%d')}"
+
+
+def get_pair_battle_count(collection, guild_id: str, user_id: str, opponent_id: str,
+                          now: Optional[datetime] = None) -> int:
+    """Battles the pair has fought today in this guild."""
+    now = now or datetime.now(timezone.utc)
+    doc = collection.find_one({"_id": pair_counter_id(guild_id, user_id, opponent_id, now)}, {"count": 1})
+    return int((doc or {}).get("count", 0))
+
+
+def reserve_pair_battle(collection, guild_id: str, user_id: str, opponent_id: str, limit: int,
+                        now: Optional[datetime] = None) -> Tuple[bool, int]:
+    """
+    Atomically counts a battle for the pair if they are under today's limit.
+    Returns (allowed, count) where count includes this battle when allowed. The $lt guard
+    makes concurrent battles race-free: once the limit is reached the filter no longer
+    matches and the upsert collides with the existing counter instead of incrementing it.
+    """
+    ensure_pair_counter_index(collection)
+    now = now or datetime.now(timezone.utc)
+    counter_id = pair_counter_id(guild_id, user_id, opponent_id, now)
+    start_of_day = now.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    update: Dict[str, Any] = {
+        "$inc": {"count": 1},
+        "$setOnInsert": {
+            "guild_id": guild_id,
+            "pair": sorted((str(user_id), str(opponent_id))),
+            "day": start_of_day,
+            "expires_at": start_of_day + timedelta(days=1) + COUNTER_GRACE,
+        },
+    }
+    try:
+        doc = collection.find_one_and_update(
+            {"_id": counter_id, "count": {"$lt": limit}},
+            update,
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        return False, get_pair_battle_count(collection, guild_id, user_id, opponent_id, now)
+    return True, int((doc or {}).get("count", 1))
+
+
+def release_pair_battle(collection, guild_id: str, user_id: str, opponent_id: str,
+                        now: Optional[datetime] = None) -> None:
+    """
+    Gives back a battle reserved with reserve_pair_battle whose result was never saved.
+    `now` must be the time the battle was reserved at, so the same day's counter is used.
+    """
+    now = now or datetime.now(timezone.utc)
+    collection.update_one(
+        {"_id": pair_counter_id(guild_id, user_id, opponent_id, now), "count": {"$gt": 0}},
+        {"$inc": {"count": -1}},
+    )
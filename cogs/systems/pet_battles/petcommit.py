@@ -0,0 +1,264 @@
+# cogs/systems/pet_battles/petcommit.py
+import copy
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import ConfigurationError, OperationFailure
+
+from core.errors import AstroStatsError
+from .petquests import update_quests_and_achievements
+from .petstats import check_level_up
+
+logger = logging.getLogger(__name__)
+
+# Set to a fresh token by every committed battle; a commit only applies if it is unchanged
+REVISION_FIELD = "battle_rev"
+BATTLE_COMMIT_RETRIES = 3
+# Server error codes meaning this deployment can't run transactions (e.g. a standalone server)
+_TRANSACTIONS_UNSUPPORTED_CODES = {20}
+
+_transactions_supported: Optional[bool] = None
+
+_MISSING = object()
+
+
+class BattleCommitError(AstroStatsError):
+    """
+    A battle could not be fully saved. `committed` holds the ids of pets whose result was
+    written anyway; it is empty when nothing was saved.
+    """
+
+    def __init__(self, message: str, committed: Optional[List[Any]] = None):
+        super().__init__(message)
+        self.committed = list(committed or [])
+
+
+class _TransactionsUnsupported(Exception):
+    """The deployment cannot run multi-document transactions."""
+
+
+def pet_update_diff(before: Dict[str, Any], after: Dict[str, Any], prefix: str = "") -> Dict[str, Dict[str, Any]]:
+    """
+    Builds an update document holding only what changed between two versions of a pet:
+    $inc for numeric changes, $set for everything else (list items are set individually
+    when the list length is unchanged) and $unset for removed fields.
+    """
+    update: Dict[str, Dict[str, Any]] = {}
+
+    def add(op: str, path: str, value: Any) -> None:
+        update.setdefault(op, {})[path] = value
+
+    def walk(old: Any, new: Any, path: str) -> None:
+        if old is _MISSING:
+            add("$set", path, new)
+        elif old == new and type(old) is type(new):
+            return
+        elif isinstance(old, dict) and isinstance(new, dict):
+            for key, value in new.items():
+                walk(old.get(key, _MISSING), value, f"{path}.{key}")
+            for key in old.keys() - new.keys():
+                add("$unset", f"{path}.{key}", "")
+        elif isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+            for index, (old_item, new_item) in enumerate(zip(old, new)):
+                if old_item != new_item:
+                    add("$set", f"{path}.{index}", new_item)
+        elif (isinstance(old, (int, float)) and isinstance(new, (int, float))
+              and not isinstance(old, bool) and not isinstance(new, bool)):
+            add("$inc", path, new - old)
+        else:
+            add("$set", path, new)
+
+    for key, value in after.items():
+        if key in ("_id", REVISION_FIELD):
+            continue
+        walk(before.get(key, _MISSING), value, f"{prefix}{key}")
+    for key in before.keys() - after.keys():
+        if key not in ("_id", REVISION_FIELD):
+            add("$unset", f"{prefix}{key}", "")
+    return update
+
+
+def apply_pet_battle_result(pet: Dict[str, Any], won: bool, battle_stats: Dict[str, Any], xp_gain: int,
+                            used_at: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Applies a finished battle to one pet document in memory: battle record, streaks, XP, item
+    decay, quest/achievement progress and level-up. Depends only on this pet's document, so it
+    can be replayed onto a freshly read copy if the commit conflicts.
+    """
+    stats = dict(battle_stats, xp_earned=xp_gain)
+    stats["battles_won" if won else "battles_lost"] = stats.get("battles_won" if won else "battles_lost", 0) + 1
+
+    record = pet.setdefault("battleRecord", {"wins": 0, "losses": 0})
+    if won:
+        record["wins"] = record.get("wins", 0) + 1
+        pet["killstreak"] = pet.get("killstreak", 0) + 1
+        pet["loss_streak"] = 0
+    else:
+        record["losses"] = record.get("losses", 0) + 1
+        pet["killstreak"] = 0
+        pet["loss_streak"] = pet.get("loss_streak", 0) + 1
+    pet["xp"] += xp_gain
+    if used_at is not None:
+        pet["last_used_ts"] = used_at
+
+    # Item durations tick down once per battle; expired items are dropped
+    for item in pet.get("active_items", []):
+        item["battles_remaining"] = max(0, item.get("battles_remaining", 0) - 1)
+    pet["active_items"] = [item for item in pet.get("active_items", []) if item.get("battles_remaining", 0) > 0]
+
+    completed_quests, completed_achievements, daily_bonus = update_quests_and_achievements(pet, stats)
+    _, leveled_up = check_level_up(pet)
+    return {
+        "quests": completed_quests,
+        "achievements": completed_achievements,
+        "daily_bonus": daily_bonus,
+        "leveled_up": leveled_up,
+    }
+
+
+def build_pet_commit(before: Dict[str, Any], after: Dict[str, Any], token: ObjectId) -> Optional[UpdateOne]:
+    """UpdateOne writing only the changes to one pet, guarded by the revision it was read at."""
+    update = pet_update_diff(before, after)
+    if not update:
+        return None
+    update.setdefault("$set", {})[REVISION_FIELD] = token
+    # A missing revision matches null, so pets from before this field still commit
+    return UpdateOne({"_id": before["_id"], REVISION_FIELD: before.get(REVISION_FIELD)}, update)
+
+
+def _apply_entry(pet: Dict[str, Any], won: bool, stats: Dict[str, Any], xp_gain: int, used_at: Optional[int],
+                 prepare: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    after = copy.deepcopy(pet)
+    if prepare is not None:
+        after = prepare(after)
+    return after, apply_pet_battle_result(after, won, stats, xp_gain, used_at)
+
+
+def _commit_in_transaction(pets_collection, entries, used_at, prepare, logs_collection,
+                           log_doc) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Reads, updates and logs the battle in one transaction, so either every pet and the log
+    are written or nothing is. The driver retries the whole callback on write conflicts.
+    """
+    token = ObjectId()
+
+    def run(session):
+        results = []
+        requests = []
+        for pet, won, stats, xp_gain in entries:
+            before = pets_collection.find_one({"_id": pet["_id"]}, session=session)
+            if before is None:
+                raise BattleCommitError(f"Pet {pet['_id']} no longer exists; battle not saved")
+            after, result = _apply_entry(before, won, stats, xp_gain, used_at, prepare)
+            results.append((after, result))
+            op = build_pet_commit(before, after, token)
+            if op is not None:
+                requests.append(op)
+        if requests:
+            write = pets_collection.bulk_write(requests, session=session)
+            if write.matched_count != len(requests):
+                raise BattleCommitError("A pet changed during the battle transaction; battle not saved")
+        if logs_collection is not None and log_doc is not None:
+            logs_collection.insert_one(dict(log_doc), session=session)
+        return results
+
+    try:
+        session = pets_collection.database.client.start_session()
+    except (ConfigurationError, NotImplementedError) as e:
+        raise _TransactionsUnsupported(str(e)) from e
+    with session:
+        try:
+            return session.with_transaction(run)
+        except OperationFailure as e:
+            if e.code in _TRANSACTIONS_UNSUPPORTED_CODES:
+                raise _TransactionsUnsupported(str(e)) from e
+            raise
+
+
+def _commit_with_retries(pets_collection, entries, reload, used_at, prepare, max_attempts, logs_collection,
+                         log_doc) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Fallback for deployments without transactions: writes every pet's changes in one
+    bulk_write guarded by its revision, re-reading and replaying any pet another battle
+    committed in the meantime. The log is only written once every pet is saved.
+    """
+    token = ObjectId()
+    befores = [pet for pet, _, _, _ in entries]
+    results: List[Optional[Tuple[Dict[str, Any], Dict[str, Any]]]] = [None] * len(entries)
+    pending = list(range(len(entries)))
+    missing: List[int] = []
+
+    for attempt in range(max_attempts):
+        requests = []
+        for index in pending:
+            _, won, stats, xp_gain = entries[index]
+            results[index] = _apply_entry(befores[index], won, stats, xp_gain, used_at, prepare)
+            op = build_pet_commit(befores[index], results[index][0], token)
+            if op is not None:
+                requests.append(op)
+        if requests:
+            write = pets_collection.bulk_write(requests, ordered=False)
+            if write.matched_count == len(requests):
+                pending = []
+        else:
+            pending = []
+        if not pending:
+            break
+
+        # Some pet moved on since it was read; keep the ones we wrote and replay the others
+        still_pending = []
+        for index in pending:
+            current = reload(befores[index]["_id"])
+            if current is None:
+                # Deleted mid-battle: its result has nowhere to go
+                missing.append(index)
+                continue
+            if current.get(REVISION_FIELD) == token:
+                continue
+            befores[index] = current
+            still_pending.append(index)
+        pending = still_pending
+        if not pending:
+            break
+        logger.info(f"Battle commit conflict for {len(pending)} pet(s); replaying (attempt {attempt + 1})")
+
+    failed = set(pending) | set(missing)
+    if failed:
+        committed = [befores[index]["_id"] for index in range(len(entries)) if index not in failed]
+        logger.warning(f"Battle commit gave up on {len(failed)} pet(s); {len(committed)} pet(s) were saved")
+        raise BattleCommitError(
+            f"Battle results for {len(failed)} pet(s) were not saved after {max_attempts} attempts",
+            committed=committed,
+        )
+    if logs_collection is not None and log_doc is not None:
+        logs_collection.insert_one(dict(log_doc))
+    return results
+
+
+def commit_battle(pets_collection, entries: List[Tuple[Dict[str, Any], bool, Dict[str, Any], int]],
+                  reload: Callable[[Any], Optional[Dict[str, Any]]], used_at: Optional[int] = None,
+                  prepare: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+                  max_attempts: int = BATTLE_COMMIT_RETRIES, logs_collection=None,
+                  log_doc: Optional[Dict[str, Any]] = None) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Applies a battle to each (pet, won, battle_stats, xp_gain) entry and saves every pet
+    together with `log_doc` in `logs_collection`. Runs as one transaction when the deployment
+    supports them; otherwise falls back to a revision-guarded bulk_write that re-reads pets
+    with `reload(pet_id)` and replays conflicting results. `prepare` runs on each copy first
+    (e.g. assigning missing quests) so its changes ride along.
+    Returns (committed pet, result) per entry, in order. Raises BattleCommitError when the
+    battle wasn't fully saved; its `committed` lists any pets that were (fallback path only).
+    """
+    global _transactions_supported
+    if _transactions_supported is not False:
+        try:
+            results = _commit_in_transaction(pets_collection, entries, used_at, prepare, logs_collection, log_doc)
+            _transactions_supported = True
+            return results
+        except _TransactionsUnsupported as e:
+            logger.info(f"Transactions unavailable, committing battles without them: {e}")
+            _transactions_supported = False
+    return _commit_with_retries(pets_collection, entries, reload, used_at, prepare, max_attempts,
+                                logs_collection, log_doc)
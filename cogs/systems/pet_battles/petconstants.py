@@ -1,36 +1,44 @@
 ﻿# cogs/systems/pet_battles/petconstants.py
 
+# Battle metrics a quest or achievement can track (see petquests.METRIC_UPDATERS).
+# "killstreak" completes once the pet's current streak reaches progress_required;
+# the others add that battle's amount to the progress.
+QUEST_METRICS = (
+    "battles_won", "battles_lost", "battles_fought", "killstreak",
+    "critical_hits", "lucky_hits", "damage_dealt", "xp_earned",
+)
+
 # Define 20 Daily Quests with XP and Cash Rewards
 DAILY_QUESTS = [
-    {"id": 1, "description": "Win 3 battles", "progress_required": 3, "xp_reward": 100, "cash_reward": 50},
-    {"id": 2, "description": "Win 5 battles", "progress_required": 5, "xp_reward": 150, "cash_reward": 75},
-    {"id": 3, "description": "Win 10 battles", "progress_required": 10, "xp_reward": 300, "cash_reward": 150},
-    {"id": 4, "description": "Achieve a 3-battle win streak", "progress_required": 3, "xp_reward": 120, "cash_reward": 60},
-    {"id": 5, "description": "Achieve a 5-battle win streak", "progress_required": 5, "xp_reward": 250, "cash_reward": 125},
-    {"id": 6, "description": "Achieve a 2-battle killstreak", "progress_required": 2, "xp_reward": 80, "cash_reward": 40},
-    {"id": 7, "description": "Achieve a 4-battle killstreak", "progress_required": 4, "xp_reward": 200, "cash_reward": 100},
-    {"id": 8, "description": "Achieve a 5-battle killstreak", "progress_required": 5, "xp_reward": 300, "cash_reward": 150},
-    {"id": 9, "description": "Inflict 10 critical hits in battles", "progress_required": 10, "xp_reward": 200, "cash_reward": 100},
-    {"id": 10, "description": "Inflict 20 critical hits in battles", "progress_required": 20, "xp_reward": 400, "cash_reward": 200},
-    {"id": 11, "description": "Land 5 lucky hits", "progress_required": 5, "xp_reward": 150, "cash_reward": 75},
-    {"id": 12, "description": "Land 10 lucky hits", "progress_required": 10, "xp_reward": 300, "cash_reward": 150},
-    {"id": 13, "description": "Lose 3 battles (learn from mistakes)", "progress_required": 3, "xp_reward": 100, "cash_reward": 25}, # Lower cash for losing
-    {"id": 14, "description": "Lose 5 battles", "progress_required": 5, "xp_reward": 150, "cash_reward": 50}, # Lower cash for losing
-    {"id": 15, "description": "Earn 100 XP from battles", "progress_required": 100, "xp_reward": 200, "cash_reward": 100},
-    {"id": 16, "description": "Earn 300 XP from battles", "progress_required": 300, "xp_reward": 400, "cash_reward": 200},
-    {"id": 17, "description": "Participate in 5 battles", "progress_required": 5, "xp_reward": 150, "cash_reward": 75},
-    {"id": 18, "description": "Participate in 10 battles", "progress_required": 10, "xp_reward": 300, "cash_reward": 150},
-    {"id": 19, "description": "Deal 500 damage in total", "progress_required": 500, "xp_reward": 250, "cash_reward": 125},
-    {"id": 20, "description": "Deal 1000 damage in total", "progress_required": 1000, "xp_reward": 500, "cash_reward": 250}
+    {"id": 1, "metric": "battles_won", "description": "Win 3 battles", "progress_required": 3, "xp_reward": 100, "cash_reward": 50},
+    {"id": 2, "metric": "battles_won", "description": "Win 5 battles", "progress_required": 5, "xp_reward": 150, "cash_reward": 75},
+    {"id": 3, "metric": "battles_won", "description": "Win 10 battles", "progress_required": 10, "xp_reward": 300, "cash_reward": 150},
+    {"id": 4, "metric": "killstreak", "description": "Achieve a 3-battle win streak", "progress_required": 3, "xp_reward": 120, "cash_reward": 60},
+    {"id": 5, "metric": "killstreak", "description": "Achieve a 5-battle win streak", "progress_required": 5, "xp_reward": 250, "cash_reward": 125},
+    {"id": 6, "metric": "killstreak", "description": "Achieve a 2-battle killstreak", "progress_required": 2, "xp_reward": 80, "cash_reward": 40},
+    {"id": 7, "metric": "killstreak", "description": "Achieve a 4-battle killstreak", "progress_required": 4, "xp_reward": 200, "cash_reward": 100},
+    {"id": 8, "metric": "killstreak", "description": "Achieve a 5-battle killstreak", "progress_required": 5, "xp_reward": 300, "cash_reward": 150},
+    {"id": 9, "metric": "critical_hits", "description": "Inflict 10 critical hits in battles", "progress_required": 10, "xp_reward": 200, "cash_reward": 100},
+    {"id": 10, "metric": "critical_hits", "description": "Inflict 20 critical hits in battles", "progress_required": 20, "xp_reward": 400, "cash_reward": 200},
+    {"id": 11, "metric": "lucky_hits", "description": "Land 5 lucky hits", "progress_required": 5, "xp_reward": 150, "cash_reward": 75},
+    {"id": 12, "metric": "lucky_hits", "description": "Land 10 lucky hits", "progress_required": 10, "xp_reward": 300, "cash_reward": 150},
+    {"id": 13, "metric": "battles_lost", "description": "Lose 3 battles (learn from mistakes)", "progress_required": 3, "xp_reward": 100, "cash_reward": 25}, # Lower cash for losing
+    {"id": 14, "metric": "battles_lost", "description": "Lose 5 battles", "progress_required": 5, "xp_reward": 150, "cash_reward": 50}, # Lower cash for losing
+    {"id": 15, "metric": "xp_earned", "description": "Earn 100 XP from battles", "progress_required": 100, "xp_reward": 200, "cash_reward": 100},
+    {"id": 16, "metric": "xp_earned", "description": "Earn 300 XP from battles", "progress_required": 300, "xp_reward": 400, "cash_reward": 200},
+    {"id": 17, "metric": "battles_fought", "description": "Participate in 5 battles", "progress_required": 5, "xp_reward": 150, "cash_reward": 75},
+    {"id": 18, "metric": "battles_fought", "description": "Participate in 10 battles", "progress_required": 10, "xp_reward": 300, "cash_reward": 150},
+    {"id": 19, "metric": "damage_dealt", "description": "Deal 500 damage in total", "progress_required": 500, "xp_reward": 250, "cash_reward": 125},
+    {"id": 20, "metric": "damage_dealt", "description": "Deal 1000 damage in total", "progress_required": 1000, "xp_reward": 500, "cash_reward": 250}
 ]
 
 # Define 5 Achievements (Hard to reach) with XP and Cash Rewards
 ACHIEVEMENTS = [
-    {"id": 1, "description": "Win 50 battles", "progress_required": 50, "xp_reward": 2000, "cash_reward": 1000},
-    {"id": 2, "description": "Achieve a 10-battle killstreak", "progress_required": 10, "xp_reward": 2500, "cash_reward": 1250},
-    {"id": 3, "description": "Deal 5000 total damage", "progress_required": 5000, "xp_reward": 3000, "cash_reward": 1500},
-    {"id": 4, "description": "Land 50 critical hits", "progress_required": 50, "xp_reward": 2200, "cash_reward": 1100},
-    {"id": 5, "description": "Land 25 lucky hits", "progress_required": 25, "xp_reward": 1800, "cash_reward": 900}
+    {"id": 1, "metric": "battles_won", "description": "Win 50 battles", "progress_required": 50, "xp_reward": 2000, "cash_reward": 1000},
+    {"id": 2, "metric": "killstreak", "description": "Achieve a 10-battle killstreak", "progress_required": 10, "xp_reward": 2500, "cash_reward": 1250},
+    {"id": 3, "metric": "damage_dealt", "description": "Deal 5000 total damage", "progress_required": 5000, "xp_reward": 3000, "cash_reward": 1500},
+    {"id": 4, "metric": "critical_hits", "description": "Land 50 critical hits", "progress_required": 50, "xp_reward": 2200, "cash_reward": 1100},
+    {"id": 5, "metric": "lucky_hits", "description": "Land 25 lucky hits", "progress_required": 25, "xp_reward": 1800, "cash_reward": 900}
 ]
 
 # Bonus reward for completing all daily quests
@@ -0,0 +1,98 @@
+# cogs/systems/pet_battles/petmigrate.py
+"""One-time migration of pet quest/achievement progress to the compact {id: progress} form.
+
+Pets written before the compact form carry a full copy of every quest and achievement
+definition. This streams those documents in chunks, rewrites both fields with
+petquests.compact_progress and reports the average document size before and after.
+It runs from core.client.run_database_migration at startup and finds nothing to do once
+every pet is converted; pets are also converted whenever ensure_quests_and_achievements
+touches them. It can be run by hand to preview the size change:
+
+    python -m cogs.systems.pet_battles.petmigrate [--chunk-size 1000] [--dry-run]
+"""
+import argparse
+import logging
+from itertools import islice
+from typing import Any, Dict, List, Optional
+
+import bson
+from pymongo import UpdateOne
+
+from .petquests import ACHIEVEMENTS_BY_KEY, QUESTS_BY_KEY, compact_progress
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_CHUNK_SIZE = 1000
+_FIELDS = (("daily_quests", QUESTS_BY_KEY), ("achievements", ACHIEVEMENTS_BY_KEY))
+LEGACY_FILTER = {"$or": [{field: {"$type": "array"}} for field, _ in _FIELDS]}
+
+
+def compact_fields(pet: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+    """The compact value of each of the pet's list-form progress fields."""
+    return {
+        field: compact_progress(pet[field], definitions_by_key)
+        for field, definitions_by_key in _FIELDS
+        if isinstance(pet.get(field), list)
+    }
+
+
+def migrate_quest_progress(pets_collection, chunk_size: int = MIGRATION_CHUNK_SIZE,
+                           dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Converts every pet still holding list-form quests or achievements, one bulk write per chunk.
+    Returns counts and the average BSON size of the converted documents before and after.
+    """
+    cursor = pets_collection.find(LEGACY_FILTER, batch_size=chunk_size)
+    scanned = migrated = 0
+    bytes_before = bytes_after = 0
+    while True:
+        chunk: List[Dict[str, Any]] = list(islice(cursor, chunk_size))
+        if not chunk:
+            break
+        operations = []
+        for pet in chunk:
+            scanned += 1
+            fields = compact_fields(pet)
+            if not fields:
+                continue
+            bytes_before += len(bson.encode(pet))
+            bytes_after += len(bson.encode(dict(pet, **fields)))
+            # Matching the old values lets a concurrent write to either field win
+            guard = {"_id": pet["_id"], **{field: pet[field] for field in fields}}
+            operations.append(UpdateOne(guard, {"$set": fields}))
+        if operations and not dry_run:
+            result = pets_collection.bulk_write(operations, ordered=False)
+            migrated += result.modified_count
+        elif dry_run:
+            migrated += len(operations)
+        logger.info(f"Quest progress migration: {migrated} pets converted so far")
+
+    report = {
+        "scanned": scanned,
+        "migrated": migrated,
+        "avg_bytes_before": bytes_before / scanned if scanned else 0.0,
+        "avg_bytes_after": bytes_after / scanned if scanned else 0.0,
+        "dry_run": dry_run,
+    }
+    logger.info(
+        f"Quest progress migration finished: {migrated}/{scanned} pets, average document "
+        f"{report['avg_bytes_before']:.0f} -> {report['avg_bytes_after']:.0f} bytes"
+    )
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Convert pet quest progress to the compact stored form")
+    parser.add_argument("--chunk-size", type=int, default=MIGRATION_CHUNK_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="Report sizes without writing")
+    args = parser.parse_args(argv)
+
+    from services.database.connection import get_database
+    logging.basicConfig(level=logging.INFO)
+    report = migrate_quest_progress(get_database()["pets"], args.chunk_size, args.dry_run)
+    print(f"{'Would convert' if args.dry_run else 'Converted'} {report['migrated']:,} of {report['scanned']:,} pets")
+    print(f"Average document size: {report['avg_bytes_before']:.0f} -> {report['avg_bytes_after']:.0f} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,106 @@
 ﻿# cogs/systems/pet_battles/petquests.py
 import random
 import logging
-from typing import List, Tuple, Dict, Any
-from pymongo import MongoClient
+from typing import Any, Callable, Dict, List, Tuple
 from bson import ObjectId  # Import ObjectId
 
 from .petconstants import DAILY_QUESTS, ACHIEVEMENTS, DAILY_COMPLETION_BONUS
 from services.premium import get_user_entitlements
-from config.settings import MONGODB_URI
+from services.database.connection import get_client, get_database
 
-# Initialize the database connection
-mongo_client = MongoClient(MONGODB_URI)
-db = mongo_client['astrostats_database']
+# Shared database connection
+mongo_client = get_client()
+db = get_database()
 pets_collection = db['pets']
 
 logger = logging.getLogger(__name__)
 
-def assign_daily_quests(pet: Dict[str, Any]) -> Dict[str, Any]:
-    """Assigns random daily quests to a pet. Base 3 plus premium bonus."""
+# Pets store quest and achievement progress as {str(id): progress}; descriptions, requirements
+# and rewards come from petconstants. An entry is complete once progress reaches progress_required.
+QUESTS_BY_KEY: Dict[str, Dict[str, Any]] = {str(quest["id"]): quest for quest in DAILY_QUESTS}
+ACHIEVEMENTS_BY_KEY: Dict[str, Dict[str, Any]] = {str(achievement["id"]): achievement for achievement in ACHIEVEMENTS}
+
+
+def compact_progress(entries: Any, definitions_by_key: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Stored {id: progress} form of a quest or achievement list. Already-compact maps are returned
+    as they are; entries whose id is no longer defined are dropped.
+    """
+    if isinstance(entries, dict):
+        return entries
+    progress_by_key: Dict[str, int] = {}
+    for entry in entries or []:
+        key = str(entry.get('id'))
+        definition = definitions_by_key.get(key)
+        if definition is None:
+            continue
+        required = definition['progress_required']
+        progress = required if entry.get('completed') else entry.get('progress', 0)
+        progress_by_key[key] = min(progress, required)
+    return progress_by_key
+
+
+def _hydrate_entry(definition: Dict[str, Any], progress: int) -> Dict[str, Any]:
+    return {
+        "id": definition["id"],
+        "description": definition["description"],
+        "progress_required": definition["progress_required"],
+        "progress": progress,
+        "completed": progress >= definition["progress_required"],
+        "xp_reward": definition["xp_reward"],
+        "cash_reward": definition["cash_reward"],
+    }
+
+
+def hydrate_progress(progress: Any, definitions_by_key: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Full entries (description, requirement, rewards, progress, completed) for stored progress."""
+    return [
+        _hydrate_entry(definitions_by_key[key], value)
+        for key, value in compact_progress(progress, definitions_by_key).items()
+        if key in definitions_by_key
+    ]
+
+
+def hydrate_daily_quests(pet: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The pet's daily quests joined with their definitions, in assignment order."""
+    return hydrate_progress(pet.get('daily_quests'), QUESTS_BY_KEY)
+
+
+def hydrate_achievements(pet: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The pet's achievements joined with their definitions."""
+    return hydrate_progress(pet.get('achievements'), ACHIEVEMENTS_BY_KEY)
+
+
+def compact_quest_progress(pet: Dict[str, Any]) -> bool:
+    """Converts list-form quests/achievements on the pet to the stored map form. Returns True if it changed."""
+    changed = False
+    for field, definitions_by_key in (('daily_quests', QUESTS_BY_KEY), ('achievements', ACHIEVEMENTS_BY_KEY)):
+        if isinstance(pet.get(field), list):
+            pet[field] = compact_progress(pet[field], definitions_by_key)
+            changed = True
+    return changed
+
+
+def daily_quest_count(entitlements: Dict[str, Any]) -> int:
+    """Number of daily quests for an owner: base 3 plus premium bonus."""
+    try:
+        num_quests = 3 + int(entitlements.get('dailyPetQuestsBonus', 0))
+    except Exception:
+        num_quests = 3
+    return max(1, min(len(DAILY_QUESTS), num_quests))
+
+def generate_daily_quests(num_quests: int) -> Dict[str, int]:
+    """Builds a fresh set of randomly chosen daily quests, in stored {id: progress} form."""
+    return {str(quest["id"]): 0 for quest in random.sample(DAILY_QUESTS, num_quests)}
+
+def assign_daily_quests(pet: Dict[str, Any], persist: bool = True) -> Dict[str, Any]:
+    """Assigns random daily quests to a pet. Base 3 plus premium bonus. persist=False only updates the dict."""
     try:
         user_id = str(pet.get('user_id', ''))
         ent = get_user_entitlements(user_id) if user_id else {"dailyPetQuestsBonus": 0}
-        num_quests = 3 + int(ent.get('dailyPetQuestsBonus', 0))
     except Exception:
-        num_quests = 3
-    num_quests = max(1, min(len(DAILY_QUESTS), num_quests))
-    random_daily_quests = random.sample(DAILY_QUESTS, num_quests)
-    pet_daily_quests = []
-    for quest in random_daily_quests:
-        pet_daily_quests.append({
-            "id": quest["id"],
-            "description": quest["description"],
-            "progress_required": quest["progress_required"],
-            "progress": 0,
-            "completed": False,
-            "xp_reward": quest["xp_reward"],
-            "cash_reward": quest["cash_reward"] # Include cash reward
-        })
+        ent = {}
+    pet_daily_quests = generate_daily_quests(daily_quest_count(ent))
     pet['daily_quests'] = pet_daily_quests
     pet['claimed_daily_completion_bonus'] = False # Reset bonus claim status
     # Ensure _id is ObjectId if present
@@ -48,7 +112,7 @@ def assign_daily_quests(pet: Dict[str, Any]) -> Dict[str, Any]:
             logger.error(f"Could not convert pet_id {pet_id} to ObjectId for daily quest update.")
             pet_id = None # Avoid updating if ID is invalid
 
-    if pet_id is not None:
+    if persist and pet_id is not None:
         pets_collection.update_one(
             {"_id": pet_id, "is_locked": {"$ne": True}},
             {"$set": {"daily_quests": pet_daily_quests, "claimed_daily_completion_bonus": False}}
@@ -56,19 +120,9 @@ def assign_daily_quests(pet: Dict[str, Any]) -> Dict[str, Any]:
     return pet
 
 
-def assign_achievements(pet: Dict[str, Any]) -> Dict[str, Any]:
-    """Assigns all achievements to a pet if they don't exist."""
-    pet_achievements = []
-    for achievement in ACHIEVEMENTS:
-        pet_achievements.append({
-            "id": achievement["id"],
-            "description": achievement["description"],
-            "progress_required": achievement["progress_required"],
-            "progress": 0,
-            "completed": False,
-            "xp_reward": achievement["xp_reward"],
-            "cash_reward": achievement["cash_reward"] # Include cash reward
-        })
+def assign_achievements(pet: Dict[str, Any], persist: bool = True) -> Dict[str, Any]:
+    """Assigns all achievements to a pet if they don't exist. persist=False only updates the dict."""
+    pet_achievements = {str(achievement["id"]): 0 for achievement in ACHIEVEMENTS}
     pet['achievements'] = pet_achievements
     # Ensure _id is ObjectId if present
     pet_id = pet.get('_id')
@@ -79,16 +133,20 @@ def assign_achievements(pet: Dict[str, Any]) -> Dict[str, Any]:
             logger.error(f"Could not convert pet_id {pet_id} to ObjectId for achievement update.")
             pet_id = None # Avoid updating if ID is invalid
 
-    if pet_id is not None:
+    if persist and pet_id is not None:
         pets_collection.update_one({"_id": pet_id, "is_locked": {"$ne": True}}, {"$set": {"achievements": pet_achievements}})
     return pet
 
 
-def ensure_quests_and_achievements(pet: Dict[str, Any]) -> Dict[str, Any]:
-    """Ensures a pet has both daily quests and achievements assigned."""
-    updated = False
+def ensure_quests_and_achievements(pet: Dict[str, Any], persist: bool = True) -> Dict[str, Any]:
+    """
+    Ensures a pet has both daily quests and achievements assigned.
+    With persist=False nothing is written, so the caller can save the changes with its own update.
+    """
+    # Documents from before the compact form are converted on first touch
+    updated = compact_quest_progress(pet)
     if 'daily_quests' not in pet or not pet['daily_quests']:
-        pet = assign_daily_quests(pet)
+        pet = assign_daily_quests(pet, persist)
         updated = True
     else:
         # Top-up daily quests if current entitlements allow more than currently assigned
@@ -97,28 +155,19 @@ def ensure_quests_and_achievements(pet: Dict[str, Any]) -> Dict[str, Any]:
                 ent = get_user_entitlements(str(pet.get('user_id', '')))
                 desired = 3 + int(ent.get('dailyPetQuestsBonus', 0) or 0)
                 desired = max(1, min(len(DAILY_QUESTS), desired))
-                current = len(pet.get('daily_quests', []))
+                current = len(pet.get('daily_quests', {}))
                 if current < desired:
                     # Add additional unique quests
-                    existing_ids = {q.get('id') for q in pet['daily_quests']}
-                    candidates = [q for q in DAILY_QUESTS if q['id'] not in existing_ids]
+                    candidates = [q for q in DAILY_QUESTS if str(q['id']) not in pet['daily_quests']]
                     to_add = desired - current
                     if candidates and to_add > 0:
                         for quest in random.sample(candidates, min(len(candidates), to_add)):
-                            pet['daily_quests'].append({
-                                "id": quest["id"],
-                                "description": quest["description"],
-                                "progress_required": quest["progress_required"],
-                                "progress": 0,
-                                "completed": False,
-                                "xp_reward": quest["xp_reward"],
-                                "cash_reward": quest["cash_reward"]
-                            })
+                            pet['daily_quests'][str(quest["id"])] = 0
                         updated = True
         except Exception:
             pass
     if 'achievements' not in pet or not pet['achievements']:
-        pet = assign_achievements(pet)
+        pet = assign_achievements(pet, persist)
         updated = True
     # Add missing fields if they don't exist (for backward compatibility)
     if 'balance' not in pet:
@@ -132,7 +181,7 @@ def ensure_quests_and_achievements(pet: Dict[str, Any]) -> Dict[str, Any]:
         updated = True
 
     # Save if any updates were made during ensure step
-    if updated:
+    if updated and persist:
          # Ensure _id is ObjectId if present
         pet_id = pet.get('_id')
         if pet_id is not None and not isinstance(pet_id, ObjectId):
@@ -155,166 +204,118 @@ def ensure_quests_and_achievements(pet: Dict[str, Any]) -> Dict[str, Any]:
     return pet
 
 
+def _add_progress(progress: int, required: int, pet: Dict[str, Any], amount: int) -> int:
+    return min(required, progress + amount)
+
+
+def _reach_streak(progress: int, required: int, pet: Dict[str, Any], amount: int) -> int:
+    # Streak goals look at the pet's current streak rather than accumulating
+    return required if pet.get('killstreak', 0) >= required else progress
+
+
+# metric -> new progress for an entry tracking it, given (progress, progress_required, pet, amount)
+METRIC_UPDATERS: Dict[str, Callable[[int, int, Dict[str, Any], int], int]] = {
+    "battles_won": _add_progress,
+    "battles_lost": _add_progress,
+    "battles_fought": _add_progress,
+    "killstreak": _reach_streak,
+    "critical_hits": _add_progress,
+    "lucky_hits": _add_progress,
+    "damage_dealt": _add_progress,
+    "xp_earned": _add_progress,
+}
+
+
+def _compile_dispatch(definitions: List[Dict[str, Any]]) -> Dict[str, Tuple[int, str, Callable]]:
+    return {
+        str(definition["id"]): (definition["progress_required"], definition["metric"], METRIC_UPDATERS[definition["metric"]])
+        for definition in definitions
+    }
+
+
+# stored key -> (progress_required, metric, updater), compiled once (quest and achievement ids overlap)
+QUEST_DISPATCH = _compile_dispatch(DAILY_QUESTS)
+ACHIEVEMENT_DISPATCH = _compile_dispatch(ACHIEVEMENTS)
+
+
+def battle_metrics(pet: Dict[str, Any], battle_stats: Dict[str, Any]) -> Dict[str, int]:
+    """
+    What this battle moved, per metric. Metrics at 0 didn't change; the streak only counts
+    while it is running, since a lost battle resets it before quests are updated.
+    """
+    return dict(battle_stats, battles_fought=1, killstreak=pet.get('killstreak', 0))
+
+
+def _reward_multiplier(pet: Dict[str, Any]) -> float:
+    """XP and cash multiplier for the owner's premium tier (1.0 if it can't be looked up)."""
+    try:
+        tier = get_user_entitlements(str(pet.get('user_id', ''))).get('tier', 'free')
+    except Exception:
+        return 1.0
+    return {"supporter": 1.2, "sponsor": 1.5, "vip": 1.75}.get(tier, 1.0)
+
+
+def _advance(progress_by_key: Dict[str, int], pet: Dict[str, Any], changed: Dict[str, int],
+             dispatch: Dict[str, Tuple[int, str, Callable]],
+             definitions_by_key: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Runs the updater for every open entry watching a changed metric, in place on the stored map.
+    Returns the entries it completed, hydrated.
+    """
+    completed = []
+    for key, progress in progress_by_key.items():
+        compiled = dispatch.get(key)
+        if compiled is None:
+            continue
+        required, metric, update = compiled
+        if progress >= required:
+            continue
+        amount = changed.get(metric)
+        if not amount:
+            continue
+        progress = update(progress, required, pet, amount)
+        progress_by_key[key] = progress
+        if progress >= required:
+            completed.append(_hydrate_entry(definitions_by_key[key], progress))
+    return completed
+
+
+def _all_complete(progress_by_key: Dict[str, int], dispatch: Dict[str, Tuple[int, str, Callable]]) -> bool:
+    return all(progress >= dispatch[key][0] for key, progress in progress_by_key.items() if key in dispatch)
+
+
 def update_quests_and_achievements(pet: Dict[str, Any], battle_stats: Dict[str, Any]) -> Tuple[List[Dict], List[Dict], bool]:
     """
     Updates quest and achievement progress based on battle stats.
     Awards XP and cash upon completion.
     Checks for daily completion bonus.
     Returns lists of completed quests, completed achievements, and if the daily bonus was awarded.
+    Progress is updated in the pet's stored maps; the returned entries are hydrated.
     """
-    completed_quests_this_update = []
-    completed_achievements_this_update = []
-    daily_bonus_awarded = False
+    changed = battle_metrics(pet, battle_stats)
 
     # --- Update Daily Quests ---
-    all_daily_quests_completed_before = all(q.get('completed', False) for q in pet.get('daily_quests', []))
-
-    for quest in pet.get('daily_quests', []):
-        if quest.get('completed', False):
-            continue
-
-        initial_progress = quest.get('progress', 0)
-
-        # Update progress based on quest description and battle stats
-        if "Win " in quest['description']:
-            quest['progress'] = min(quest['progress_required'], initial_progress + battle_stats.get('battles_won', 0))
-        elif "battle win streak" in quest['description']:
-             # Check current killstreak against required progress directly
-            if pet.get('killstreak', 0) >= quest['progress_required']:
-                 quest['progress'] = quest['progress_required']
-            # No else needed, progress stays as is if streak not met
-        elif "battle killstreak" in quest['description']:
-            # Check current killstreak against required progress directly
-            if pet.get('killstreak', 0) >= quest['progress_required']:
-                quest['progress'] = quest['progress_required']
-        elif "Inflict" in quest['description'] and "critical hits" in quest['description']:
-            quest['progress'] = min(quest['progress_required'], initial_progress + battle_stats.get('critical_hits', 0))
-        elif "Land" in quest['description'] and "lucky hits" in quest['description']:
-            quest['progress'] = min(quest['progress_required'], initial_progress + battle_stats.get('lucky_hits', 0))
-        elif "Lose" in quest['description']:
-            quest['progress'] = min(quest['progress_required'], initial_progress + battle_stats.get('battles_lost', 0))
-        elif "Earn" in quest['description'] and "XP from battles" in quest['description']:
-            quest['progress'] = min(quest['progress_required'], initial_progress + battle_stats.get('xp_earned', 0))
-        elif "Participate in" in quest['description'] and "battles" in quest['description']:
-            quest['progress'] = min(quest['progress_required'], initial_progress + 1) # Increment by 1 per battle
-        elif "Deal" in quest['description'] and "damage in total" in quest['description']:
-            quest['progress'] = min(quest['progress_required'], initial_progress + battle_stats.get('damage_dealt', 0))
-
-        # Check for completion
-        if quest['progress'] >= quest['progress_required'] and not quest.get('completed', False):
-            quest['completed'] = True
-            # Apply XP multiplier by tier
-            try:
-                ent = get_user_entitlements(str(pet.get('user_id','')))
-                tier = ent.get('tier','free')
-                mult = 1.0
-                if tier == 'supporter':
-                    mult = 1.2
-                elif tier == 'sponsor':
-                    mult = 1.5
-                elif tier == 'vip':
-                    mult = 1.75
-                pet['xp'] += int(round(quest.get('xp_reward', 0) * mult))
-            except Exception:
-                pet['xp'] += quest.get('xp_reward', 0)
-            try:
-                ent = get_user_entitlements(str(pet.get('user_id','')))
-                tier = ent.get('tier','free')
-                mult = 1.0
-                if tier == 'supporter':
-                    mult = 1.2
-                elif tier == 'sponsor':
-                    mult = 1.5
-                elif tier == 'vip':
-                    mult = 1.75
-                pet['balance'] = pet.get('balance', 0) + int(round(quest.get('cash_reward', 0) * mult))
-            except Exception:
-                pet['balance'] = pet.get('balance', 0) + quest.get('cash_reward', 0)
-            completed_quests_this_update.append(quest)
+    daily_quests = pet['daily_quests'] = compact_progress(pet.get('daily_quests'), QUESTS_BY_KEY)
+    completed_quests = _advance(daily_quests, pet, changed, QUEST_DISPATCH, QUESTS_BY_KEY)
+    rewards = [(q['xp_reward'], q['cash_reward']) for q in completed_quests]
 
     # --- Check for Daily Completion Bonus ---
-    all_daily_quests_completed_now = all(q.get('completed', False) for q in pet.get('daily_quests', []))
-    if all_daily_quests_completed_now and not pet.get('claimed_daily_completion_bonus', False):
-        try:
-            ent = get_user_entitlements(str(pet.get('user_id','')))
-            tier = ent.get('tier','free')
-            mult = 1.0
-            if tier == 'supporter':
-                mult = 1.2
-            elif tier == 'sponsor':
-                mult = 1.5
-            elif tier == 'vip':
-                mult = 1.75
-            pet['xp'] += int(round(DAILY_COMPLETION_BONUS['xp'] * mult))
-        except Exception:
-            pet['xp'] += DAILY_COMPLETION_BONUS['xp']
-        try:
-            ent = get_user_entitlements(str(pet.get('user_id','')))
-            tier = ent.get('tier','free')
-            mult = 1.0
-            if tier == 'supporter':
-                mult = 1.2
-            elif tier == 'sponsor':
-                mult = 1.5
-            elif tier == 'vip':
-                mult = 1.75
-            pet['balance'] = pet.get('balance', 0) + int(round(DAILY_COMPLETION_BONUS['cash'] * mult))
-        except Exception:
-            pet['balance'] = pet.get('balance', 0) + DAILY_COMPLETION_BONUS['cash']
+    daily_bonus_awarded = False
+    if not pet.get('claimed_daily_completion_bonus', False) and _all_complete(daily_quests, QUEST_DISPATCH):
+        rewards.append((DAILY_COMPLETION_BONUS['xp'], DAILY_COMPLETION_BONUS['cash']))
         pet['claimed_daily_completion_bonus'] = True
         daily_bonus_awarded = True
 
-
     # --- Update Achievements ---
-    for achievement in pet.get('achievements', []):
-        if achievement.get('completed', False):
-            continue
+    achievements = pet['achievements'] = compact_progress(pet.get('achievements'), ACHIEVEMENTS_BY_KEY)
+    completed_achievements = _advance(achievements, pet, changed, ACHIEVEMENT_DISPATCH, ACHIEVEMENTS_BY_KEY)
+    rewards.extend((a['xp_reward'], a['cash_reward']) for a in completed_achievements)
 
-        initial_progress = achievement.get('progress', 0)
-
-        # Update progress based on achievement description and battle stats
-        if "Win " in achievement['description']:
-            achievement['progress'] = min(achievement['progress_required'], initial_progress + battle_stats.get('battles_won', 0))
-        elif "battle killstreak" in achievement['description']:
-             # Check current killstreak against required progress directly
-            if pet.get('killstreak', 0) >= achievement['progress_required']:
-                 achievement['progress'] = achievement['progress_required']
-        elif "Deal" in achievement['description'] and "total damage" in achievement['description']:
-            achievement['progress'] = min(achievement['progress_required'], initial_progress + battle_stats.get('damage_dealt', 0))
-        elif "Land" in achievement['description'] and "critical hits" in achievement['description']:
-            achievement['progress'] = min(achievement['progress_required'], initial_progress + battle_stats.get('critical_hits', 0))
-        elif "Land" in achievement['description'] and "lucky hits" in achievement['description']:
-            achievement['progress'] = min(achievement['progress_required'], initial_progress + battle_stats.get('lucky_hits', 0))
-
-        # Check for completion
-        if achievement['progress'] >= achievement['progress_required'] and not achievement.get('completed', False):
-            achievement['completed'] = True
-            try:
-                ent = get_user_entitlements(str(pet.get('user_id','')))
-                tier = ent.get('tier','free')
-                mult = 1.0
-                if tier == 'supporter':
-                    mult = 1.2
-                elif tier == 'sponsor':
-                    mult = 1.5
-                elif tier == 'vip':
-                    mult = 1.75
-                pet['xp'] += int(round(achievement.get('xp_reward', 0) * mult))
-            except Exception:
-                pet['xp'] += achievement.get('xp_reward', 0)
-            try:
-                ent = get_user_entitlements(str(pet.get('user_id','')))
-                tier = ent.get('tier','free')
-                mult = 1.0
-                if tier == 'supporter':
-                    mult = 1.2
-                elif tier == 'sponsor':
-                    mult = 1.5
-                elif tier == 'vip':
-                    mult = 1.75
-                pet['balance'] = pet.get('balance', 0) + int(round(achievement.get('cash_reward', 0) * mult))
-            except Exception:
-                pet['balance'] = pet.get('balance', 0) + achievement.get('cash_reward', 0)
-            completed_achievements_this_update.append(achievement)
+    # One entitlements lookup covers every reward from this battle
+    if rewards:
+        multiplier = _reward_multiplier(pet)
+        for xp, cash in rewards:
+            pet['xp'] += int(round(xp * multiplier))
+            pet['balance'] = pet.get('balance', 0) + int(round(cash * multiplier))
 
-    return completed_quests_this_update, completed_achievements_this_update, daily_bonus_awarded
+    return completed_quests, completed_achievements, daily_bonus_awarded
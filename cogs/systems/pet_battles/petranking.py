@@ -0,0 +1,67 @@
+# cogs/systems/pet_battles/petranking.py
+import logging
+from typing import Any, Dict, List, Optional
+
+from pymongo import ASCENDING, DESCENDING
+
+logger = logging.getLogger(__name__)
+
+# Global ordering: highest level first, then highest XP, ties broken by oldest pet
+RANK_SORT = [("level", DESCENDING), ("xp", DESCENDING), ("_id", ASCENDING)]
+RANK_INDEX_NAME = "level_xp_rank"
+
+_rank_index_ready = False
+
+
+def ensure_rank_index(collection) -> None:
+    """Creates the compound index that backs ranking queries (once per process)."""
+    global _rank_index_ready
+    if _rank_index_ready:
+        return
+    try:
+        collection.create_index(RANK_SORT, name=RANK_INDEX_NAME)
+        _rank_index_ready = True
+    except Exception as e:
+        logger.warning(f"Could not ensure pet rank index: {e}")
+
+
+def ranked_above_query(pet: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Builds a filter matching every pet that sorts strictly ahead of the given pet.
+    Each branch is a range scan on the rank index, so counting it does not load documents.
+    """
+    level = pet.get("level", 0)
+    xp = pet.get("xp", 0)
+    return {"$or": [
+        {"level": {"$gt": level}},
+        {"level": level, "xp": {"$gt": xp}},
+        {"level": level, "xp": xp, "_id": {"$lt": pet["_id"]}},
+    ]}
+
+
+def get_pet_rank(collection, pet: Dict[str, Any]) -> int:
+    """Returns the 1-based global rank of a pet."""
+    return collection.count_documents(ranked_above_query(pet)) + 1
+
+
+def get_top_ranked_pets(collection, limit: int = 3) -> List[Dict[str, Any]]:
+    """Returns the highest ranked pets globally."""
+    return list(collection.find({}).sort(RANK_SORT).limit(limit))
+
+
+def get_global_ranking(collection, pet: Dict[str, Any], top_n: int = 3) -> Dict[str, Any]:
+    """
+    Returns the top pets, the given pet's rank and the total pet count
+    using a fixed number of indexed queries regardless of collection size.
+    """
+    ensure_rank_index(collection)
+    top_pets = get_top_ranked_pets(collection, top_n)
+    rank: Optional[int] = None
+    for index, ranked_pet in enumerate(top_pets):
+        if ranked_pet.get("_id") == pet.get("_id"):
+            rank = index + 1
+            break
+    if rank is None:
+        rank = get_pet_rank(collection, pet)
+    total = collection.estimated_document_count()
+    return {"top": top_pets, "rank": rank, "total": max(total, rank)}
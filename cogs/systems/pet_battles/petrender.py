@@ -0,0 +1,105 @@
+# cogs/systems/pet_battles/petrender.py
+import math
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+
+from config.settings import BATTLE_MAX_MESSAGE_EDITS
+from .petbattle import calculate_damage, get_active_buff
+
+# Pause after each battle message edit
+BATTLE_EDIT_INTERVAL = 2.5
+
+_metrics_lock = threading.Lock()
+_metrics: Dict[str, int] = {"battles": 0, "fast_battles": 0, "rounds": 0, "edits": 0, "max_edits": 0}
+
+
+def _new_battle_stats() -> Dict[str, int]:
+    return {"damage_dealt": 0, "critical_hits": 0, "lucky_hits": 0, "battles_won": 0, "battles_lost": 0, "xp_earned": 0}
+
+
+def _describe_attack(attacker: Dict[str, Any], defender: Dict[str, Any], damage: int, crit: bool, event: str,
+                     stats: Dict[str, int]) -> str:
+    stats["damage_dealt"] += damage
+    attack_desc = f"{attacker['name']} attacks {defender['name']}!"
+    if event == "luck":
+        stats["lucky_hits"] += 1
+        attack_desc += f" ✨ **Lucky Hit!** Deals **{damage}** damage!"
+    elif crit:
+        stats["critical_hits"] += 1
+        attack_desc += f" 💥 **Critical Hit!** Deals **{damage}** damage!"
+    else:
+        attack_desc += f" Deals **{damage}** damage."
+    return attack_desc + "\n"
+
+
+def simulate_battle(user_pet: Dict[str, Any], opponent_pet: Dict[str, Any],
+                    damage_fn: Callable[[Dict[str, Any], Dict[str, Any]], Tuple[int, bool, str]] = calculate_damage
+                    ) -> Dict[str, Any]:
+    """
+    Fights the whole battle up front so it can be replayed at any pace.
+    Each round records its log text and both pets' health after it; the user's pet attacks first.
+    """
+    user_max_health = user_pet['health'] + get_active_buff(user_pet.get('active_items', []), 'health')
+    opponent_max_health = opponent_pet['health'] + get_active_buff(opponent_pet.get('active_items', []), 'health')
+    user_health, opponent_health = user_max_health, opponent_max_health
+    user_stats, opponent_stats = _new_battle_stats(), _new_battle_stats()
+    rounds: List[Dict[str, Any]] = []
+
+    while user_health > 0 and opponent_health > 0:
+        log = f"\n\n**--- Round {len(rounds) + 1} ---**\n"
+        damage, crit, event = damage_fn(user_pet, opponent_pet)
+        opponent_health = max(0, opponent_health - damage)
+        log += _describe_attack(user_pet, opponent_pet, damage, crit, event, user_stats)
+        if opponent_health > 0:
+            damage, crit, event = damage_fn(opponent_pet, user_pet)
+            user_health = max(0, user_health - damage)
+            log += _describe_attack(opponent_pet, user_pet, damage, crit, event, opponent_stats)
+        rounds.append({"log": log, "user_health": user_health, "opponent_health": opponent_health})
+
+    return {
+        "rounds": rounds,
+        "user_won": opponent_health <= 0,
+        "user_max_health": user_max_health,
+        "opponent_max_health": opponent_max_health,
+        "user_stats": user_stats,
+        "opponent_stats": opponent_stats,
+    }
+
+
+def edit_schedule(round_count: int, max_edits: int = BATTLE_MAX_MESSAGE_EDITS) -> List[int]:
+    """
+    Indexes of the rounds after which the battle message is edited. The deciding round is left
+    to the result embed; the rest are batched evenly so there are at most max_edits edits,
+    always ending on the last round before the result.
+    """
+    shown = round_count - 1
+    if shown <= 0 or max_edits <= 0:
+        return []
+    batch = math.ceil(shown / max_edits)
+    return [min(start + batch, shown) - 1 for start in range(0, shown, batch)]
+
+
+def record_battle_render(rounds: int, edits: int, fast: bool) -> None:
+    """Counts a rendered battle towards the edits-per-battle metrics."""
+    with _metrics_lock:
+        _metrics["battles"] += 1
+        _metrics["fast_battles"] += int(fast)
+        _metrics["rounds"] += rounds
+        _metrics["edits"] += edits
+        _metrics["max_edits"] = max(_metrics["max_edits"], edits)
+
+
+def get_battle_render_metrics() -> Dict[str, Any]:
+    """Snapshot of battle rendering counters, including average edits per battle."""
+    with _metrics_lock:
+        snapshot: Dict[str, Any] = dict(_metrics)
+    battles = snapshot["battles"]
+    snapshot["edits_per_battle"] = round(snapshot["edits"] / battles, 2) if battles else 0.0
+    snapshot["rounds_per_battle"] = round(snapshot["rounds"] / battles, 2) if battles else 0.0
+    return snapshot
+
+
+def reset_battle_render_metrics() -> None:
+    with _metrics_lock:
+        for key in _metrics:
+            _metrics[key] = 0
@@ -0,0 +1,250 @@
+# cogs/systems/pet_battles/petsimulator.py
+"""Seedable battle simulation for balance testing.
+
+Three views of the rules in petbattle.calculate_damage:
+  * simulate_seeded_battle replays one battle draw for draw with a random.Random, so a seed
+    reproduces it exactly (round logs included);
+  * battle_odds enumerates every outcome of calculate_damage once per matchup into an exact
+    per-hit damage distribution, derives how many hits each pet needs for a knockout, and from
+    that the exact win rate and battle-length distribution;
+  * monte_carlo samples those knockout counts in large batches, two draws per battle, so a
+    million battles take a few seconds without leaving the standard library (no NumPy).
+
+Profiles are plain pet dicts built from INITIAL_STATS, LEVEL_UP_INCREASES and SHOP_ITEMS, and
+build_profile accepts alternative level-up increases so tuning can be tried offline:
+    python -m cogs.systems.pet_battles.petsimulator --levels 10 12 --items-a minor_str_potion
+"""
+import argparse
+import bisect
+import random
+from collections import Counter
+from functools import lru_cache
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .petbattle import calculate_damage, get_active_buff
+from .petconstants import INITIAL_STATS, LEVEL_UP_INCREASES, SHOP_ITEMS
+from .petrender import simulate_battle
+
+# Battles drawn per random.choices call on the Monte Carlo path
+SAMPLE_CHUNK = 65536
+
+
+def build_profile(level: int = 1, items: Iterable[str] = (), increases: Optional[Dict[str, int]] = None,
+                  name: str = "Pet") -> Dict[str, Any]:
+    """A pet at `level` with the level-up increases applied and the given SHOP_ITEMS keys active."""
+    increases = increases or LEVEL_UP_INCREASES
+    pet = {
+        "name": name,
+        "level": level,
+        "strength": INITIAL_STATS["strength"] + increases["strength"] * (level - 1),
+        "defense": INITIAL_STATS["defense"] + increases["defense"] * (level - 1),
+        "health": INITIAL_STATS["health"] + increases["health"] * (level - 1),
+        "active_items": [],
+    }
+    for item_id in items:
+        item = SHOP_ITEMS[item_id]
+        pet["active_items"].append({
+            "item_id": item_id, "stat": item["stat"], "value": item["value"], "battles_remaining": item["duration"],
+        })
+    return pet
+
+
+def simulate_seeded_battle(pet_a: Dict[str, Any], pet_b: Dict[str, Any], seed: Optional[int] = None,
+                           rng: Optional[random.Random] = None) -> Dict[str, Any]:
+    """One full battle (pet_a attacks first) using calculate_damage with a private generator."""
+    rng = rng or random.Random(seed)
+    return simulate_battle(pet_a, pet_b, damage_fn=lambda attacker, defender: calculate_damage(attacker, defender, rng))
+
+
+def _crit_chance(attacker: Dict[str, Any], defender: Dict[str, Any]) -> int:
+    return 15 + (10 if attacker.get('level', 1) < defender.get('level', 1) else 0)
+
+
+@lru_cache(maxsize=1024)
+def _hit_distribution(strength: int, defense: int, crit_chance: int) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """Every damage value one hit can deal with its cumulative integer weight (same float math as calculate_damage)."""
+    base: Counter = Counter()
+    for attack in range(8, 16):
+        attack_multiplier = attack / 10
+        for defend in range(8, 16):
+            defense_multiplier = defend / 10
+            for spread in range(5, 16):
+                for block in range(3, 11):
+                    damage = int((strength * attack_multiplier * (spread / 10))
+                                 - (defense * defense_multiplier * (block / 10)))
+                    base[max(5, damage)] += 1
+
+    # Crit roll (1-100) then a 1.5x-3.0x multiplier; weights scaled so both branches share a denominator
+    after_crit: Counter = Counter()
+    for damage, count in base.items():
+        after_crit[damage] += count * (100 - crit_chance) * 16
+        for crit in range(15, 31):
+            after_crit[int(damage * (crit / 10))] += count * crit_chance
+
+    # Lucky hit: 1 in 10 adds 15-50
+    final: Counter = Counter()
+    for damage, count in after_crit.items():
+        final[damage] += count * 9 * 36
+        for luck in range(15, 51):
+            final[damage + luck] += count
+
+    values = tuple(sorted(final))
+    return values, tuple(accumulate(final[value] for value in values))
+
+
+def hit_distribution(attacker: Dict[str, Any], defender: Dict[str, Any]) -> Dict[int, float]:
+    """Exact probability of each damage value for one attack, buffs included."""
+    values, cumulative = _matchup_distribution(attacker, defender)
+    total = cumulative[-1]
+    previous = 0
+    probabilities = {}
+    for value, weight in zip(values, cumulative):
+        probabilities[value] = (weight - previous) / total
+        previous = weight
+    return probabilities
+
+
+def _matchup_distribution(attacker: Dict[str, Any], defender: Dict[str, Any]):
+    strength = attacker.get('strength', 10) + get_active_buff(attacker.get('active_items', []), 'strength')
+    defense = defender.get('defense', 10) + get_active_buff(defender.get('active_items', []), 'defense')
+    return _hit_distribution(strength, defense, _crit_chance(attacker, defender))
+
+
+@lru_cache(maxsize=1024)
+def _knockout_distribution(values: Tuple[int, ...], cumulative: Tuple[int, ...], health: int) -> Tuple[float, ...]:
+    """
+    Probability that the n-th hit (index n-1) is the one that takes `health` to zero, found by
+    tracking the exact distribution of damage taken so far while the defender is still standing.
+    """
+    total = cumulative[-1]
+    probabilities = [(weight - previous) / total for previous, weight in zip((0,) + cumulative[:-1], cumulative)]
+    # at_least[i]: chance a hit deals values[i] or more
+    at_least = list(accumulate(reversed(probabilities)))[::-1]
+
+    alive = [0.0] * health
+    alive[0] = 1.0
+    knockouts: List[float] = []
+    remaining = 1.0
+    while remaining > 1e-12:
+        standing = [0.0] * health
+        knocked = 0.0
+        for taken, chance in enumerate(alive):
+            if not chance:
+                continue
+            lethal = bisect.bisect_left(values, health - taken)
+            if lethal < len(values):
+                knocked += chance * at_least[lethal]
+            for index in range(lethal):
+                standing[taken + values[index]] += chance * probabilities[index]
+        knockouts.append(knocked)
+        remaining -= knocked
+        alive = standing
+    return tuple(knockouts)
+
+
+def _knockouts(attacker: Dict[str, Any], defender: Dict[str, Any]) -> Tuple[float, ...]:
+    health = defender['health'] + get_active_buff(defender.get('active_items', []), 'health')
+    return _knockout_distribution(*_matchup_distribution(attacker, defender), max(1, health))
+
+
+def battle_odds(pet_a: Dict[str, Any], pet_b: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Exact win probability and battle-length distribution for pet_a attacking first. pet_a wins
+    when it needs no more hits than pet_b, since it strikes first in every round.
+    """
+    a_knockouts, b_knockouts = _knockouts(pet_a, pet_b), _knockouts(pet_b, pet_a)
+    # b_survives[n]: chance pet_b needs more than n hits
+    b_survives = [1.0 - total for total in accumulate(b_knockouts)]
+    a_survives = [1.0 - total for total in accumulate(a_knockouts)]
+
+    def survives(table: List[float], hits: int) -> float:
+        return 1.0 if hits <= 0 else (table[hits - 1] if hits <= len(table) else 0.0)
+
+    rounds: Dict[int, float] = {}
+    win_rate_a = 0.0
+    for length in range(1, max(len(a_knockouts), len(b_knockouts)) + 1):
+        a_wins_now = (a_knockouts[length - 1] if length <= len(a_knockouts) else 0.0) * survives(b_survives, length - 1)
+        b_wins_now = (b_knockouts[length - 1] if length <= len(b_knockouts) else 0.0) * survives(a_survives, length)
+        win_rate_a += a_wins_now
+        if a_wins_now + b_wins_now > 0:
+            rounds[length] = a_wins_now + b_wins_now
+    return {
+        "win_rate_a": win_rate_a,
+        "mean_rounds": sum(length * chance for length, chance in rounds.items()),
+        "rounds_distribution": rounds,
+    }
+
+
+def _percentile(histogram: Dict[int, int], total: int, fraction: float) -> int:
+    lengths = sorted(histogram)
+    running = list(accumulate(histogram[length] for length in lengths))
+    return lengths[min(len(lengths) - 1, bisect.bisect_left(running, fraction * total))]
+
+
+def monte_carlo(pet_a: Dict[str, Any], pet_b: Dict[str, Any], battles: int = 100_000, seed: Optional[int] = None,
+                chunk: int = SAMPLE_CHUNK) -> Dict[str, Any]:
+    """
+    Simulates `battles` battles (pet_a attacks first, as the challenger does) and returns the
+    win rate plus the distribution of battle lengths in rounds. Each battle draws how many hits
+    each pet needs for a knockout, in batches of `chunk`, so a battle costs two samples however
+    long it lasts.
+    """
+    rng = random.Random(seed)
+    a_knockouts, b_knockouts = _knockouts(pet_a, pet_b), _knockouts(pet_b, pet_a)
+    a_lengths, a_cumulative = range(1, len(a_knockouts) + 1), list(accumulate(a_knockouts))
+    b_lengths, b_cumulative = range(1, len(b_knockouts) + 1), list(accumulate(b_knockouts))
+
+    wins_a = 0
+    lengths: Counter = Counter()
+    for start in range(0, battles, chunk):
+        size = min(chunk, battles - start)
+        a_hits = rng.choices(a_lengths, cum_weights=a_cumulative, k=size)
+        b_hits = rng.choices(b_lengths, cum_weights=b_cumulative, k=size)
+        for a_needed, b_needed in zip(a_hits, b_hits):
+            if a_needed <= b_needed:
+                wins_a += 1
+                lengths[a_needed] += 1
+            else:
+                lengths[b_needed] += 1
+
+    histogram = dict(sorted(lengths.items()))
+    return {
+        "battles": battles,
+        "wins_a": wins_a,
+        "wins_b": battles - wins_a,
+        "win_rate_a": wins_a / battles if battles else 0.0,
+        "mean_rounds": sum(length * count for length, count in histogram.items()) / battles if battles else 0.0,
+        "rounds_p50": _percentile(histogram, battles, 0.5) if battles else 0,
+        "rounds_p90": _percentile(histogram, battles, 0.9) if battles else 0,
+        "rounds_histogram": histogram,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Monte Carlo pet battle balance check")
+    parser.add_argument("--levels", type=int, nargs=2, default=(1, 1), metavar=("A", "B"))
+    parser.add_argument("--items-a", nargs="*", default=[], choices=sorted(SHOP_ITEMS))
+    parser.add_argument("--items-b", nargs="*", default=[], choices=sorted(SHOP_ITEMS))
+    parser.add_argument("--increases", type=int, nargs=3, metavar=("STR", "DEF", "HP"),
+                        help="Level-up increases to try instead of LEVEL_UP_INCREASES")
+    parser.add_argument("--battles", type=int, default=100_000)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    increases = dict(zip(("strength", "defense", "health"), args.increases)) if args.increases else None
+    pet_a = build_profile(args.levels[0], args.items_a, increases, name="A")
+    pet_b = build_profile(args.levels[1], args.items_b, increases, name="B")
+    report = monte_carlo(pet_a, pet_b, args.battles, args.seed)
+    odds = battle_odds(pet_a, pet_b)
+
+    print(f"A (level {pet_a['level']}) wins {report['win_rate_a']:.2%} of {report['battles']:,} battles "
+          f"(exact {odds['win_rate_a']:.2%}) against B (level {pet_b['level']})")
+    print(f"Rounds: mean {report['mean_rounds']:.2f}, p50 {report['rounds_p50']}, p90 {report['rounds_p90']}")
+    peak = max(report["rounds_histogram"].values())
+    for length, count in report["rounds_histogram"].items():
+        print(f"  {length:>3} {'#' * max(1, round(40 * count / peak))} {count / report['battles']:.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,9 @@ from discord.ext import commands
 from discord import app_commands, Interaction, Embed, Color, ButtonStyle
 from discord.ui import View, Button
 from services.premium import get_user_entitlements
+from services.database.async_operations import run_blocking
+from services.database.connection import get_client, get_database
+from cogs.systems.squib_game.squibsession import SquibSession
 from ui.embeds import get_premium_promotion_embed, get_premium_promotion_view
 
 # Third-Party Imports
@@ -84,10 +87,10 @@ squib_game_stats: Optional[Collection] = None
 try:
     if MONGODB_URI:
         # Set serverSelectionTimeoutMS to handle connection issues faster
-        mongo_client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=30000, connectTimeoutMS=20000, socketTimeoutMS=20000)
+        mongo_client = get_client()
         # The ismaster command is cheap and does not require auth.
         mongo_client.admin.command('ping')
-        db = mongo_client['astrostats_database'] # Consider making the DB name configurable
+        db = get_database()
         squib_game_sessions = db['squib_game_sessions']
         squib_game_stats = db['squib_game_stats']
     else:
@@ -437,14 +440,14 @@ async def update_player_stats(winner_id: Optional[str], guild_id: str, participa
 
         if bulk_ops:
              # Perform bulk write
-             update_result = squib_game_stats.bulk_write(bulk_ops, ordered=False) # ordered=False allows non-atomic operations
+             update_result = await run_blocking(squib_game_stats.bulk_write, bulk_ops, ordered=False) # ordered=False allows non-atomic operations
         else:
              logger.warning("No valid participants found to update stats.")
 
 
         # Fetch the winner's updated stats separately AFTER the bulk write completes
         if winner_id:
-            updated_stats = squib_game_stats.find_one({"user_id": winner_id, "guild_id": guild_id})
+            updated_stats = await run_blocking(squib_game_stats.find_one, {"user_id": winner_id, "guild_id": guild_id})
             winner_new_wins = updated_stats.get("wins", 0) if updated_stats else 0
 
         return winner_new_wins
@@ -484,7 +487,8 @@ async def conclude_game_auto(bot: commands.Bot, interaction: Interaction, game_d
     # Update game state in DB
     winner_id = winner.get('user_id') if winner else None # Use .get safely
     try:
-        squib_game_sessions.update_one(
+        await run_blocking(
+            squib_game_sessions.update_one,
             {"_id": game_doc["_id"]},
             {"$set": {
                 "current_game_state": "completed",
@@ -504,7 +508,7 @@ async def conclude_game_auto(bot: commands.Bot, interaction: Interaction, game_d
 
     if winner and winner_id:
         winner_username = winner.get('username', 'Unknown Winner')
-        winner_avatar = await get_guild_avatar_url(interaction.guild, int(winner_id))
+        winner_avatar = await get_guild_avatar_url(interaction.guild if interaction else None, int(winner_id))
         if winner_avatar:
             final_embed.set_thumbnail(url=winner_avatar)
 
@@ -547,73 +551,68 @@ async def conclude_game_auto(bot: commands.Bot, interaction: Interaction, game_d
 
 
 # --- Game Loop (Original Structure, adapted for enhanced functions, fixed DB check) ---
-async def run_game_loop(bot: commands.Bot, interaction: Interaction, game_db_id: Any, guild_id: str):
-    """Run the main game loop for a Squib Game. (Adapted from original structure)"""
-    channel = interaction.channel
+async def run_game_loop(bot: commands.Bot, interaction: Optional[Interaction], game_db_id: Any, guild_id: str,
+                        session: Optional[SquibSession] = None, channel: Optional[discord.abc.Messageable] = None):
+    """Run the main game loop for a Squib Game. (Adapted from original structure)
+
+    The SquibSession is the source of truth while the game runs; each round only queues a
+    background checkpoint of its eliminations and round counter. Resumed games pass the
+    rehydrated session and their channel with no interaction.
+    """
+    if interaction is not None:
+        channel = interaction.channel
     if not isinstance(channel, discord.TextChannel): # Check if it's a text channel
         logger.error(f"Game loop {game_db_id}: Invalid channel type {type(channel)}. Aborting.")
         return # Stop if channel is invalid
+    guild = channel.guild
 
     # Track interaction age to handle 15-minute timeout
     interaction_start_time = datetime.datetime.now(timezone.utc)
     interaction_timeout_threshold = datetime.timedelta(minutes=14)  # Use 14 minutes to be safe
 
     try:
-        while True:
-            # Check if interaction is approaching timeout (15-minute limit)
-            current_time = datetime.datetime.now(timezone.utc)
-            if current_time - interaction_start_time > interaction_timeout_threshold:
-                logger.warning(f"Game loop {game_db_id}: Interaction approaching timeout, switching to channel-only mode.")
-                # Switch to using channel for all future messages
-                interaction = None
-            
+        if session is None:
             # Fixed check: Compare with None
             if squib_game_sessions is None:
                  logger.error(f"Game loop {game_db_id}: Database not available. Stopping.")
                  await channel.send(f"{EMOJI_ERROR} Database connection lost. Game aborted.")
-                 break
-
-            # Fetch latest game state inside loop
-            game = squib_game_sessions.find_one({"_id": game_db_id})
+                 return
 
+            game = await run_blocking(squib_game_sessions.find_one, {"_id": game_db_id})
             if not game:
                 logger.warning(f"Game loop {game_db_id}: Game document not found. Stopping.")
-                break
-            current_state = game.get("current_game_state")
-            if current_state != "in_progress":
-                if current_state == "completed" and interaction:
-                     logger.warning(f"Game loop {game_db_id} detected completed state; ensuring final message.")
-                     if not game.get("winner_user_id") and not game.get("ended_at"):
-                          winner = None
-                          final_round = game.get("current_round", 0)
-                          final_embeds = await conclude_game_auto(bot, interaction, game, guild_id, final_round, winner=winner)
-                          winner_id = winner.get("user_id") if winner else None
-                          premium_view = get_premium_promotion_view(winner_id) if winner_id else None
-                          try:
-                              await safe_send_with_view(interaction, embeds=final_embeds, view=premium_view)
-                          except discord.HTTPException as e:
-                              # Handle cases where both interaction and channel.send fail
-                              logger.error(f"Failed to send final message for {game_db_id} after state check: {e}")
-                              try:
-                                  await channel.send(content=f"{EMOJI_ERROR} Game concluded but failed to send final message. Check game status with `/squibgames status`.")
-                              except:
-                                  pass  # Last resort - don't crash the bot
-                     else:
-                          pass
+                return
+            if game.get("current_game_state") != "in_progress":
+                logger.warning(f"Game loop {game_db_id}: Game is not in progress. Stopping.")
+                return
+            session = SquibSession.from_document(game, squib_game_sessions)
+
+        while True:
+            # Check if interaction is approaching timeout (15-minute limit)
+            current_time = datetime.datetime.now(timezone.utc)
+            if interaction is not None and current_time - interaction_start_time > interaction_timeout_threshold:
+                logger.warning(f"Game loop {game_db_id}: Interaction approaching timeout, switching to channel-only mode.")
+                # Switch to using channel for all future messages
+                interaction = None
 
+            if session.stopped:
+                # A checkpoint found the game cancelled or removed
                 break
 
-            current_round = game.get("current_round", 0)
-            participants_before = game.get("participants", [])
-            alive_before = [p for p in participants_before if p.get("status") == "alive"]
+            current_round = session.current_round
+            alive_before = session.alive()
 
             if len(alive_before) <= 1:
+                # Make sure the final eliminations are stored before concluding
+                await session.flush()
+                if session.stopped:
+                    break
                 winner = alive_before[0] if len(alive_before) == 1 else None
-                final_embeds = await conclude_game_auto(bot, interaction, game, guild_id, current_round, winner=winner)
+                final_embeds = await conclude_game_auto(bot, interaction, session.as_document(), guild_id, current_round, winner=winner)
                 winner_id = winner.get("user_id") if winner else None
-                premium_view = get_premium_promotion_view(winner_id) if winner_id else None
+                premium_view = await get_premium_promotion_view(winner_id) if winner_id else None
                 try:
-                     await safe_send_with_view(interaction, embeds=final_embeds, view=premium_view)
+                     await safe_send_with_view(interaction or channel, embeds=final_embeds, view=premium_view)
                 except discord.HTTPException as e:
                      logger.error(f"Failed to send final message for {game_db_id}: {e}")
                      try:
@@ -625,25 +624,14 @@ async def run_game_loop(bot: commands.Bot, interaction: Interaction, game_db_id:
             # --- Play the next round ---
             next_round_num = current_round + 1
 
-            updated_participants, minigame, eliminated_this_round = play_minigame_round(participants_before)
+            updated_participants, minigame, eliminated_this_round = play_minigame_round(session.participants)
             eliminated_names = [p.get('username', 'Unknown') for p in eliminated_this_round]
             alive_after_round = [p for p in updated_participants if p.get("status") == "alive"]
             survived_this_round = [p for p in alive_after_round if p not in eliminated_this_round]
 
-            # Update DB
-            try:
-                update_result = squib_game_sessions.update_one(
-                    {"_id": game_db_id},
-                    {"$set": {"participants": updated_participants}, "$inc": {"current_round": 1}}
-                )
-                if update_result.matched_count == 0:
-                     logger.error(f"Game loop {game_db_id}: Failed to find game document during round update for round {next_round_num}. Stopping.")
-                     await channel.send(f"{EMOJI_ERROR} Critical error: Game data lost during round {next_round_num}. Game aborted.")
-                     break
-            except Exception as e:
-                logger.error(f"Game loop {game_db_id}: Failed DB update for round {next_round_num}: {e}. Stopping.")
-                await channel.send(f"{EMOJI_ERROR} Database error during round {next_round_num}. Game aborted.")
-                break
+            # Update in-memory state; the delta is checkpointed in the background
+            session.apply_round(updated_participants, eliminated_this_round)
+            session.schedule_checkpoint()
 
             # --- Announce Round Results (using enhanced generation) ---
             round_flavor = generate_round_flavor_text(minigame, eliminated_this_round, survived_this_round)
@@ -664,7 +652,7 @@ async def run_game_loop(bot: commands.Bot, interaction: Interaction, game_db_id:
             # Try setting thumbnail (adapted from v2)
             thumb_player = random.choice(eliminated_this_round) if eliminated_this_round else random.choice(alive_after_round) if alive_after_round else None
             if thumb_player and thumb_player.get('user_id'):
-                avatar_url = await get_guild_avatar_url(interaction.guild, int(thumb_player['user_id']))
+                avatar_url = await get_guild_avatar_url(guild, int(thumb_player['user_id']))
                 if avatar_url:
                     round_embed.set_thumbnail(url=avatar_url)
 
@@ -673,7 +661,7 @@ async def run_game_loop(bot: commands.Bot, interaction: Interaction, game_db_id:
 
             # Send round update using safe_send_with_view
             try:
-                await safe_send_with_view(interaction, embeds=[round_embed])
+                await safe_send_with_view(interaction or channel, embeds=[round_embed])
             except discord.HTTPException as e:
                  logger.warning(f"Failed to send round update for round {next_round_num} of {game_db_id}: {e}")
                  try:
@@ -692,7 +680,8 @@ async def run_game_loop(bot: commands.Bot, interaction: Interaction, game_db_id:
             await channel.send(f"{EMOJI_ERROR} A critical error occurred in the game loop. The game has been stopped.")
             # Attempt to mark game as errored/cancelled in DB
             if squib_game_sessions is not None: # Check again before using
-                 squib_game_sessions.update_one(
+                 await run_blocking(
+                     squib_game_sessions.update_one,
                       {"_id": game_db_id, "current_game_state": "in_progress"}, # Only update if still marked as in_progress
                       {"$set": {"current_game_state": "errored"}}
                  )
@@ -738,10 +727,10 @@ class JoinButtonView(View):
                  from services.premium import get_user_entitlements
                  # Get host_id from game document, then get their entitlements
                  if squib_game_sessions is not None:
-                     game = squib_game_sessions.find_one({"guild_id": self.guild_id, "session_id": self.game_id})
+                     game = await run_blocking(squib_game_sessions.find_one, {"guild_id": self.guild_id, "session_id": self.game_id})
                      if game:
                          host_id = str(game.get("host_user_id"))
-                         ent = get_user_entitlements(host_id)
+                         ent = await run_blocking(get_user_entitlements, host_id)
                          if ent:
                              cap = ent.get("squibgamesMaxPlayers")
                              if isinstance(cap, int) and cap > 0:
@@ -794,7 +783,7 @@ class JoinButtonView(View):
 
         try:
             # Find the specific game this button belongs to
-            game = squib_game_sessions.find_one({
+            game = await run_blocking(squib_game_sessions.find_one, {
                 "guild_id": self.guild_id,
                 "session_id": self.game_id,
             })
@@ -835,7 +824,7 @@ class JoinButtonView(View):
             # Enforce max players based on host entitlements if specified
             try:
                 host_id = str(game.get("host_user_id"))
-                ent = get_user_entitlements(host_id)
+                ent = await run_blocking(get_user_entitlements, host_id)
                 cap = ent.get("squibgamesMaxPlayers")
                 if isinstance(cap, int) and cap > 0:
                     # Don't allow join if cap reached
@@ -859,7 +848,8 @@ class JoinButtonView(View):
                 "username": interaction.user.display_name, # Use display_name
                 "status": "alive"
             }
-            result = squib_game_sessions.update_one(
+            result = await run_blocking(
+                squib_game_sessions.update_one,
                 {"_id": game["_id"]},
                 {"$push": {"participants": new_participant}}
             )
@@ -886,15 +876,101 @@ class SquibGames(commands.GroupCog, name="squibgames"): # Reverted name
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.run_tasks: Dict[str, asyncio.Task] = {}
+        self.sessions: Dict[str, SquibSession] = {} # Live state of running games, by session_id
+        self._resume_task: Optional[asyncio.Task] = None
         if mongo_client is None: # Fixed check
              logger.critical("SquibGames initialized WITHOUT a MongoDB connection.")
 
+    async def cog_load(self):
+        """Resume games that were in progress when the bot last stopped."""
+        self._resume_task = asyncio.create_task(self.resume_in_progress_games())
+
     # Cleanup tasks on cog unload
     def cog_unload(self):
         """Cancel any running game loop tasks when the cog is unloaded."""
+        if self._resume_task and not self._resume_task.done():
+            self._resume_task.cancel()
         for task in self.run_tasks.values():
             task.cancel()
         self.run_tasks.clear()
+        self.sessions.clear()
+
+    def start_game_task(self, session: SquibSession, interaction: Optional[Interaction] = None,
+                        channel: Optional[discord.abc.Messageable] = None) -> asyncio.Task:
+        """Starts (or restarts) the game loop task for a session and tracks it until it finishes."""
+        session_id = session.session_id
+        if session_id in self.run_tasks:
+            logger.warning(f"Task already exists for session {session_id}. Cancelling old one.")
+            self.run_tasks[session_id].cancel()
+
+        task = asyncio.create_task(
+            run_game_loop(self.bot, interaction, session.db_id, session.guild_id, session=session, channel=channel)
+        )
+        self.run_tasks[session_id] = task
+        self.sessions[session_id] = session
+
+        # Add callback to remove task from dict when done/cancelled
+        def cleanup_task(fut: asyncio.Task):
+            # Ensure removal happens even if task raises exception
+            try:
+                # Log exception if one occurred in the task
+                if fut.cancelled():
+                    pass
+                elif fut.exception():
+                    exc = fut.exception()
+                    logger.error(f"Game loop task {session_id} raised an exception: {exc}", exc_info=exc)
+            except Exception as cb_e:
+                 # Log errors within the callback itself
+                 logger.error(f"Error during game loop task cleanup callback for {session_id}: {cb_e}", exc_info=True)
+            finally:
+                 # Remove task from tracking dict regardless of outcome
+                 if self.run_tasks.get(session_id) is fut:
+                     del self.run_tasks[session_id]
+                     self.sessions.pop(session_id, None)
+
+        task.add_done_callback(cleanup_task)
+        return task
+
+    async def resume_in_progress_games(self):
+        """Rehydrates in-progress games from their last checkpoint and restarts their loops."""
+        await self.bot.wait_until_ready()
+        if squib_game_sessions is None:
+            return
+
+        try:
+            cursor = squib_game_sessions.find({"current_game_state": "in_progress"})
+            games = await run_blocking(list, cursor)
+        except Exception as e:
+            logger.error(f"Failed to load in-progress squib games for resume: {e}", exc_info=True)
+            return
+
+        for game in games:
+            session_id = game.get("session_id", "UnknownSession")
+            if session_id in self.run_tasks:
+                continue
+
+            channel_id = game.get("channel_id")
+            channel = self.bot.get_channel(int(channel_id)) if channel_id else None
+            if not isinstance(channel, discord.TextChannel):
+                # Nowhere to announce rounds; release the guild so a new game can be started
+                logger.warning(f"Cannot resume squib session {session_id}: channel {channel_id} unavailable.")
+                try:
+                    await run_blocking(
+                        squib_game_sessions.update_one,
+                        {"_id": game["_id"], "current_game_state": "in_progress"},
+                        {"$set": {"current_game_state": "errored", "ended_at": datetime.datetime.now(timezone.utc)}}
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to mark unresumable squib session {session_id} as errored: {e}")
+                continue
+
+            session = SquibSession.from_document(game, squib_game_sessions)
+            try:
+                await channel.send(f"{EMOJI_RUN} The bot restarted - resuming this Squib Game from round **{session.current_round}**.")
+            except discord.HTTPException as e:
+                logger.warning(f"Failed to announce resume of squib session {session_id}: {e}")
+            self.start_game_task(session, channel=channel)
+            logger.info(f"Resumed squib session {session_id} at round {session.current_round}")
 
 
     @app_commands.command(name="start", description="Start a new multi-minigame Squib Game session")
@@ -913,7 +989,7 @@ class SquibGames(commands.GroupCog, name="squibgames"): # Reverted name
 
         # Check for existing game (using enhanced check)
         try:
-            existing_game = squib_game_sessions.find_one({
+            existing_game = await run_blocking(squib_game_sessions.find_one, {
                 "guild_id": guild_id,
                 "current_game_state": {"$in": ["waiting_for_players", "in_progress"]}
             })
@@ -936,7 +1012,7 @@ class SquibGames(commands.GroupCog, name="squibgames"): # Reverted name
 
         try:
             # Create session using original function name
-            session_id, new_session_doc = create_new_session(guild_id, user_id, interaction.user.display_name)
+            session_id, new_session_doc = await run_blocking(create_new_session, guild_id, user_id, interaction.user.display_name)
         except ConnectionError: # Catch specific error from create_new_session
              await interaction.followup.send(f"{EMOJI_ERROR} Database connection error prevented session creation.", ephemeral=True)
              return
@@ -966,7 +1042,7 @@ class SquibGames(commands.GroupCog, name="squibgames"): # Reverted name
         # Player Count Embed (now shows capacity based on host entitlements)
         try:
             from services.premium import get_user_entitlements
-            ent = get_user_entitlements(user_id)
+            ent = await run_blocking(get_user_entitlements, user_id)
             cap = ent.get("squibgamesMaxPlayers")
             cap_text = str(cap) if isinstance(cap, int) and cap > 0 else "∞"
         except Exception:
@@ -980,7 +1056,7 @@ class SquibGames(commands.GroupCog, name="squibgames"): # Reverted name
         view = JoinButtonView(game_id=session_id, guild_id=guild_id)
         
         # Add premium promotion button
-        premium_view = get_premium_promotion_view(str(interaction.user.id))
+        premium_view = await get_premium_promotion_view(str(interaction.user.id))
         
         await interaction.followup.send(embeds=[main_embed, player_embed], view=view)
         if premium_view:
@@ -1001,7 +1077,7 @@ class SquibGames(commands.GroupCog, name="squibgames"): # Reverted name
 
         # Find the game waiting for players
         try:
-            game = squib_game_sessions.find_one({
+            game = await run_blocking(squib_game_sessions.find_one, {
                 "guild_id": guild_id,
                 "current_game_state": "waiting_for_players" # Only run games that are waiting
             })
@@ -1054,11 +1130,13 @@ class SquibGames(commands.GroupCog, name="squibgames"): # Reverted name
 
         # Update game state to in_progress
         try:
-            update_result = squib_game_sessions.update_one(
+            update_result = await run_blocking(
+                squib_game_sessions.update_one,
                 {"_id": db_id},
                 {"$set": {
                     "current_game_state": "in_progress",
-                    "started_at": datetime.datetime.now(timezone.utc) # Add start time
+                    "started_at": datetime.datetime.now(timezone.utc), # Add start time
+                    "channel_id": str(interaction.channel_id) # Lets the game resume here after a restart
                     }}
             )
             if update_result.matched_count == 0:
@@ -1102,37 +1180,12 @@ class SquibGames(commands.GroupCog, name="squibgames"): # Reverted name
                   await interaction.channel.send(embed=start_embed, content=f"{EMOJI_WARNING} Game starting (interaction followup failed).")
              return # Don't start loop if we can't confirm
 
-        # Start the game loop task (using original structure)
-        if session_id in self.run_tasks:
-            logger.warning(f"Task already exists for session {session_id}. Cancelling old one.")
-            self.run_tasks[session_id].cancel()
-
-        # Pass necessary arguments based on original run_game_loop signature
-        # Ensure db_id is passed correctly
-        task = asyncio.create_task(
-            run_game_loop(self.bot, interaction, db_id, guild_id)
+        # Start the game loop task with the in-memory session as the source of truth
+        session = SquibSession.from_document(
+            {**game, "current_game_state": "in_progress", "channel_id": str(interaction.channel_id)},
+            squib_game_sessions
         )
-        self.run_tasks[session_id] = task
-
-        # Add callback to remove task from dict when done/cancelled
-        def cleanup_task(fut: asyncio.Task):
-            # Ensure removal happens even if task raises exception
-            try:
-                # Log exception if one occurred in the task
-                if fut.cancelled():
-                    pass
-                elif fut.exception():
-                    exc = fut.exception()
-                    logger.error(f"Game loop task {session_id} raised an exception: {exc}", exc_info=exc)
-            except Exception as cb_e:
-                 # Log errors within the callback itself
-                 logger.error(f"Error during game loop task cleanup callback for {session_id}: {cb_e}", exc_info=True)
-            finally:
-                 # Remove task from tracking dict regardless of outcome
-                 if session_id in self.run_tasks:
-                     del self.run_tasks[session_id]
-
-        task.add_done_callback(cleanup_task)
+        self.start_game_task(session, interaction=interaction)
 
 
     @app_commands.command(name="status", description="View the current Squib Game session status")
@@ -1148,7 +1201,7 @@ class SquibGames(commands.GroupCog, name="squibgames"): # Reverted name
 
         guild_id = str(interaction.guild_id)
         try:
-            game = squib_game_sessions.find_one({
+            game = await run_blocking(squib_game_sessions.find_one, {
                 "guild_id": guild_id,
                 "current_game_state": {"$in": ["waiting_for_players", "in_progress"]}
             })
@@ -1172,6 +1225,11 @@ class SquibGames(commands.GroupCog, name="squibgames"): # Reverted name
         current_round = game.get('current_round', 0)
         host_id = game.get('host_user_id')
         participants = game.get('participants', [])
+        # A running game's live state can be ahead of its last checkpoint
+        live_session = self.sessions.get(game.get('session_id'))
+        if live_session is not None:
+            current_round = live_session.current_round
+            participants = live_session.participants
         alive_players = [p for p in participants if p.get("status") == "alive"]
         eliminated_players = [p for p in participants if p.get("status") == "eliminated"]
 
@@ -1224,7 +1282,7 @@ class SquibGames(commands.GroupCog, name="squibgames"): # Reverted name
         user_id = str(interaction.user.id)
 
         try:
-            game = squib_game_sessions.find_one({
+            game = await run_blocking(squib_game_sessions.find_one, {
                 "guild_id": guild_id,
                 "current_game_state": {"$in": ["waiting_for_players", "in_progress"]}
             })
@@ -1254,7 +1312,8 @@ class SquibGames(commands.GroupCog, name="squibgames"): # Reverted name
 
         # Update DB to cancelled
         try:
-            squib_game_sessions.update_one(
+            await run_blocking(
+                squib_game_sessions.update_one,
                 {"_id": game["_id"]},
                 {"$set": {"current_game_state": "cancelled", "ended_at": datetime.datetime.now(timezone.utc)}}
             )
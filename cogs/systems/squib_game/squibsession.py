@@ -0,0 +1,129 @@
+# cogs/systems/squib_game/squibsession.py
+"""
+In-memory state for a running Squib Game.
+
+The game task owns a SquibSession and treats it as the source of truth while rounds are
+played; Mongo only receives checkpoints of what changed (new eliminations and the round
+counter) instead of the whole participants array every round. Checkpoints run in the
+background, one at a time, and a failed write keeps its delta so the next one retries it.
+After a restart the session is rebuilt from the last checkpointed document.
+"""
+import asyncio
+import datetime
+import logging
+from datetime import timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.database.async_operations import run_blocking
+
+logger = logging.getLogger(__name__)
+
+
+class SquibSession:
+    """Authoritative state of one in-progress Squib Game."""
+
+    def __init__(self, game_doc: Dict[str, Any], collection: Any = None):
+        self.db_id = game_doc.get("_id")
+        self.session_id = game_doc.get("session_id", "UnknownSession")
+        self.guild_id = game_doc.get("guild_id")
+        self.host_user_id = game_doc.get("host_user_id")
+        self.channel_id = game_doc.get("channel_id")
+        self.current_round: int = game_doc.get("current_round", 0)
+        self.participants: List[Dict[str, Any]] = [dict(p) for p in game_doc.get("participants", [])]
+        self.collection = collection
+        # Set when a checkpoint finds the game is no longer in progress (e.g. cancelled)
+        self.stopped = False
+        self.checkpoints_written = 0
+        self._pending_eliminations: List[str] = []
+        self._round_dirty = False
+        self._checkpoint_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_document(cls, game_doc: Dict[str, Any], collection: Any = None) -> "SquibSession":
+        """Rehydrates a session from its last checkpointed document."""
+        return cls(game_doc, collection)
+
+    def alive(self) -> List[Dict[str, Any]]:
+        return [p for p in self.participants if p.get("status") == "alive"]
+
+    def as_document(self) -> Dict[str, Any]:
+        """Current state in the stored document shape (for embeds and game conclusion)."""
+        return {
+            "_id": self.db_id,
+            "session_id": self.session_id,
+            "guild_id": self.guild_id,
+            "host_user_id": self.host_user_id,
+            "current_game_state": "in_progress",
+            "current_round": self.current_round,
+            "participants": self.participants,
+        }
+
+    def apply_round(self, updated_participants: List[Dict[str, Any]], eliminated: List[Dict[str, Any]]) -> None:
+        """Records the outcome of a round and queues its delta for the next checkpoint."""
+        self.participants = updated_participants
+        self.current_round += 1
+        self._round_dirty = True
+        self._pending_eliminations.extend(p["user_id"] for p in eliminated if p.get("user_id"))
+
+    def has_pending_changes(self) -> bool:
+        return self._round_dirty or bool(self._pending_eliminations)
+
+    def build_checkpoint(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Update document and array filters for the pending delta.
+
+        The round is written with $set rather than $inc so a retried checkpoint is idempotent.
+        """
+        update_set: Dict[str, Any] = {
+            "current_round": self.current_round,
+            "checkpointed_at": datetime.datetime.now(timezone.utc),
+        }
+        array_filters: List[Dict[str, Any]] = []
+        if self._pending_eliminations:
+            update_set["participants.$[out].status"] = "eliminated"
+            array_filters.append({"out.user_id": {"$in": list(self._pending_eliminations)}})
+        return {"$set": update_set}, array_filters
+
+    async def checkpoint(self) -> bool:
+        """Writes the pending delta; returns False if it could not be stored."""
+        if not self.has_pending_changes() or self.collection is None:
+            return True
+
+        eliminations = self._pending_eliminations
+        update, array_filters = self.build_checkpoint()
+        self._pending_eliminations = []
+        self._round_dirty = False
+        try:
+            result = await run_blocking(
+                self.collection.update_one,
+                {"_id": self.db_id, "current_game_state": "in_progress"},
+                update,
+                array_filters=array_filters or None,
+            )
+        except Exception as e:
+            logger.error(f"Checkpoint failed for squib session {self.session_id}: {e}", exc_info=True)
+            # Keep the delta so the next checkpoint retries it
+            self._pending_eliminations = eliminations + self._pending_eliminations
+            self._round_dirty = True
+            return False
+
+        if result.matched_count == 0:
+            logger.warning(f"Squib session {self.session_id} is no longer in progress; stopping.")
+            self.stopped = True
+        self.checkpoints_written += 1
+        return True
+
+    def schedule_checkpoint(self) -> None:
+        """Starts a background checkpoint unless one is already running."""
+        if self._checkpoint_task is not None and not self._checkpoint_task.done():
+            return
+        self._checkpoint_task = asyncio.create_task(self.checkpoint())
+
+    async def flush(self) -> bool:
+        """Waits for any running checkpoint, then writes whatever is still pending."""
+        if self._checkpoint_task is not None:
+            try:
+                await self._checkpoint_task
+            except Exception:
+                pass
+            self._checkpoint_task = None
+        return await self.checkpoint()
@@ -18,9 +18,64 @@ TFT_API = os.getenv('TFT_API')
 FORTNITE_API_KEY = os.getenv('FORTNITE_API_KEY')
 MARVEL_RIVALS_API_KEY = os.getenv('MARVEL_RIVALS_API_KEY')
 TOPGG_TOKEN = os.getenv('TOPGG_TOKEN')
+# Tracker.gg (Apex): most requests in flight at once and per-request timeout
+TRN_MAX_CONCURRENCY = int(os.getenv('TRN_MAX_CONCURRENCY', 4))
+TRN_TIMEOUT_SECONDS = float(os.getenv('TRN_TIMEOUT_SECONDS', 10))
+
+# Riot API rate limiting (limits are refreshed from response headers once requests are made)
+RIOT_APP_RATE_LIMIT = os.getenv('RIOT_APP_RATE_LIMIT', '20:1,100:120')
+RIOT_MAX_RETRIES = int(os.getenv('RIOT_MAX_RETRIES', 3))
+# Data Dragon static data: local snapshot for warm restarts, and how often to look for a new patch
+DDRAGON_CACHE_PATH = os.getenv('DDRAGON_CACHE_PATH', os.path.join('.cache', 'ddragon.json'))
+DDRAGON_REFRESH_SECONDS = int(os.getenv('DDRAGON_REFRESH_SECONDS', 21600))
+# Match history cache: in-memory entries per game, optional SQLite file, and TTL of recent match id lists
+MATCH_CACHE_SIZE = int(os.getenv('MATCH_CACHE_SIZE', 2000))
+MATCH_CACHE_DB_PATH = os.getenv('MATCH_CACHE_DB_PATH')
+MATCH_IDS_TTL_SECONDS = int(os.getenv('MATCH_IDS_TTL_SECONDS', 120))
+# Riot ID <-> PUUID cache: in-memory size and TTL, and optional Mongo write-through with its own expiry
+RIOT_IDENTITY_CACHE_SIZE = int(os.getenv('RIOT_IDENTITY_CACHE_SIZE', 20000))
+RIOT_IDENTITY_TTL_SECONDS = int(os.getenv('RIOT_IDENTITY_TTL_SECONDS', 6 * 60 * 60))
+RIOT_IDENTITY_PERSIST = os.getenv('RIOT_IDENTITY_PERSIST', 'false').lower() in ('1', 'true', 'yes')
+RIOT_IDENTITY_DB_TTL_SECONDS = int(os.getenv('RIOT_IDENTITY_DB_TTL_SECONDS', 7 * 24 * 60 * 60))
+
+# Player stats cache (Apex, Fortnite, Marvel Rivals): fresh TTL per provider, how long an
+# expired entry is still served while it refreshes, TTL for players not found, and size
+STATS_CACHE_TTL_APEX = int(os.getenv('STATS_CACHE_TTL_APEX', 300))
+STATS_CACHE_TTL_FORTNITE = int(os.getenv('STATS_CACHE_TTL_FORTNITE', 300))
+STATS_CACHE_TTL_MARVEL_RIVALS = int(os.getenv('STATS_CACHE_TTL_MARVEL_RIVALS', 600))
+STATS_CACHE_STALE_SECONDS = int(os.getenv('STATS_CACHE_STALE_SECONDS', 1800))
+STATS_CACHE_NEGATIVE_TTL_SECONDS = int(os.getenv('STATS_CACHE_NEGATIVE_TTL_SECONDS', 60))
+STATS_CACHE_SIZE = int(os.getenv('STATS_CACHE_SIZE', 5000))
+
+# Shared outbound HTTP pools: connection caps (overall, per host, and overrides such as
+# "fortnite-api.com=8,discord.com=4"), DNS cache and keep-alive lifetimes, request timeout
+HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', 100))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv('HTTP_MAX_CONNECTIONS_PER_HOST', 20))
+HTTP_HOST_CONNECTION_LIMITS = os.getenv('HTTP_HOST_CONNECTION_LIMITS', '')
+HTTP_DNS_CACHE_SECONDS = int(os.getenv('HTTP_DNS_CACHE_SECONDS', 300))
+HTTP_KEEPALIVE_SECONDS = float(os.getenv('HTTP_KEEPALIVE_SECONDS', 30))
+HTTP_TIMEOUT_SECONDS = float(os.getenv('HTTP_TIMEOUT_SECONDS', 20))
 
 # MongoDB configuration
 MONGODB_URI = os.getenv('MONGODB_URI')
+# Shared connection pool used by every database consumer
+MONGODB_DB_NAME = os.getenv('MONGODB_DB_NAME', 'astrostats_database')
+MONGODB_MAX_POOL_SIZE = int(os.getenv('MONGODB_MAX_POOL_SIZE', 50))
+MONGODB_MIN_POOL_SIZE = int(os.getenv('MONGODB_MIN_POOL_SIZE', 0))
+MONGODB_MAX_IDLE_TIME_MS = int(os.getenv('MONGODB_MAX_IDLE_TIME_MS', 300000))
+MONGODB_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGODB_WAIT_QUEUE_TIMEOUT_MS', 10000))
+MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGODB_SERVER_SELECTION_TIMEOUT_MS', 30000))
+MONGODB_CONNECT_TIMEOUT_MS = int(os.getenv('MONGODB_CONNECT_TIMEOUT_MS', 20000))
+MONGODB_SOCKET_TIMEOUT_MS = int(os.getenv('MONGODB_SOCKET_TIMEOUT_MS', 20000))
+MONGODB_READ_PREFERENCE = os.getenv('MONGODB_READ_PREFERENCE', 'primary')
+# Worker threads used to run blocking PyMongo calls off the event loop
+MONGODB_EXECUTOR_WORKERS = int(os.getenv('MONGODB_EXECUTOR_WORKERS', 16))
+# Raw battle logs older than this many days are rolled up into daily summaries...
+BATTLE_LOG_ROLLUP_AFTER_DAYS = int(os.getenv('BATTLE_LOG_ROLLUP_AFTER_DAYS', 7))
+# ...and any left after this many days are removed by a TTL index
+BATTLE_LOG_RETENTION_DAYS = int(os.getenv('BATTLE_LOG_RETENTION_DAYS', 30))
+# Most times a battle message is edited while replaying rounds (rounds are batched to fit)
+BATTLE_MAX_MESSAGE_EDITS = int(os.getenv('BATTLE_MAX_MESSAGE_EDITS', 6))
 
 # Discord webhook for error logging
 ERROR_WEBHOOK_URL = os.getenv('ERROR_WEBHOOK_URL')
@@ -56,6 +56,14 @@ def mock_env_vars():
     }):
         yield
 
+@pytest.fixture(autouse=True)
+def clear_stats_cache():
+    from services.api.statscache import get_stats_cache
+    from services.api.riotidentity import get_riot_identity_cache
+    get_stats_cache().clear()
+    get_riot_identity_cache().clear()
+    yield
+
 @pytest.fixture
 def free_tier_user():
     return {
@@ -6,12 +6,14 @@ import asyncio
 import discord
 from discord.ext import commands, tasks
 import datetime
-from pymongo import MongoClient, UpdateOne # Import UpdateOne
+from pymongo import UpdateOne # Import UpdateOne
 from bson import ObjectId # Import ObjectId
 
-from config.settings import TOKEN, BLACKLISTED_GUILDS, MONGODB_URI # Import MONGODB_URI
+from config.settings import TOKEN, BLACKLISTED_GUILDS
 from core.errors import setup_error_handlers
 from services.database.welcome import get_welcome_settings
+from services.database.async_operations import run_blocking, shutdown_executor
+from services.database.connection import get_database, close_client
 
 logger = logging.getLogger(__name__) # Use __name__ for logger
 # logger = logging.getLogger('discord.gateway') # Keep gateway logs less verbose if needed
@@ -21,13 +23,7 @@ logger = logging.getLogger(__name__) # Use __name__ for logger
 async def run_database_migration():
     """Adds new fields to existing pet documents if they don't exist."""
     try:
-        client = MongoClient(
-            MONGODB_URI,
-            serverSelectionTimeoutMS=30000,
-            connectTimeoutMS=20000,
-            socketTimeoutMS=20000,
-        )
-        db = client['astrostats_database']
+        db = get_database()
         pets_collection = db['pets']
         welcome_collection = db['welcome_settings']
         logger.debug("Running database migration check for pets and welcome settings...")
@@ -84,6 +80,10 @@ async def run_database_migration():
         else:
             logger.debug("No pet documents required migration.")
 
+        # Convert quest/achievement progress to the compact {id: progress} form
+        from cogs.systems.pet_battles.petmigrate import migrate_quest_progress
+        await run_blocking(migrate_quest_progress, pets_collection)
+
         # Migrate welcome settings from custom_image_url to custom_image_data
         logger.debug("Migrating welcome settings...")
         welcome_docs = welcome_collection.find({"custom_image_url": {"$exists": True, "$ne": None}})
@@ -110,7 +110,6 @@ async def run_database_migration():
 
         # Summary info for tests and visibility
         logger.info("Database migration check completed.")
-        client.close()
     except Exception as e:
         logger.error(f"Database migration failed: {e}", exc_info=True)
 # --- End Database Migration Logic ---
@@ -128,6 +127,16 @@ class AstroStatsBot(commands.Bot):
         self._emoji_cache = {}
         self.processed_issues = {}
 
+    async def close(self):
+        """Close the bot, then release the shared HTTP sessions, database pool and executor."""
+        await super().close()
+        from services.api.http import close_http_client
+        await close_http_client()
+        from services.premium.watcher import stop_entitlements_watcher
+        await asyncio.to_thread(stop_entitlements_watcher)
+        shutdown_executor(wait=False)
+        close_client()
+
     async def setup_hook(self):
         """Called when the bot is started. Used to load cogs and sync commands."""
         # --- Run Database Migration ---
@@ -136,7 +145,10 @@ class AstroStatsBot(commands.Bot):
         
         # Initialize premium service connection early
         from services.premium import initialize_premium_service
+        from services.premium.watcher import start_entitlements_watcher
         initialize_premium_service()
+        # Push premium changes into the entitlements cache where change streams are supported
+        start_entitlements_watcher()
 
         # Import cog setup functions only when needed to avoid circular imports
         from cogs.games.apex import setup as setup_apex
@@ -350,7 +362,7 @@ class AstroStatsBot(commands.Bot):
         """Called when a new member joins a guild."""
         try:
             # Get welcome settings for the guild
-            welcome_settings = get_welcome_settings(str(member.guild.id))
+            welcome_settings = await run_blocking(get_welcome_settings, str(member.guild.id))
             
             # Check if welcome messages are enabled for this guild
             if not welcome_settings or not welcome_settings.enabled:
@@ -0,0 +1,92 @@
+"""Request coalescing for identical concurrent lookups.
+
+When a player link is shared in a busy server, many users run the same command for the
+same name within seconds, and each invocation would fan out its own upstream requests. A
+``SingleFlight`` group lets the first caller for a key do the work while every caller that
+arrives before it finishes awaits the same future, so N identical commands cost one set
+of requests. Results (and errors) are shared, never stored: once the call completes the
+next caller starts a fresh one. Groups count how many calls were de-duplicated.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Shares one in-flight call per key between concurrent callers."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self.calls = 0
+        self.executions = 0
+        self.deduplicated = 0
+        self.errors = 0
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    def start(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> "asyncio.Future[T]":
+        """
+        Returns the future for key, calling fn() only if no call for key is running. The
+        call runs as its own task, so it isn't tied to any one caller.
+        """
+        self.calls += 1
+        future = self._inflight.get(key)
+        if future is not None:
+            self.deduplicated += 1
+            return future
+        self.executions += 1
+        future = asyncio.ensure_future(fn())
+        self._inflight[key] = future
+
+        def _done(done: "asyncio.Future[Any]") -> None:
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+            # Retrieve the error even if every waiter went away, so it isn't reported as unhandled
+            if not done.cancelled() and done.exception() is not None:
+                self.errors += 1
+
+        future.add_done_callback(_done)
+        return future
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Awaits fn() for key, joining the call already in flight if there is one. Every
+        caller gets the same result object, so callers must not mutate it.
+        """
+        # Shield so one cancelled command doesn't cancel the call others are waiting on
+        return await asyncio.shield(self.start(key, fn))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Snapshot of calls made and how many of them were served by another call."""
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "deduplicated": self.deduplicated,
+            "errors": self.errors,
+            "in_flight": len(self._inflight),
+            "dedup_ratio": round(self.deduplicated / self.calls, 3) if self.calls else 0.0,
+        }
+
+
+_groups: Dict[str, SingleFlight] = {}
+
+
+def get_singleflight(name: str) -> SingleFlight:
+    """Returns the process-wide group called name, creating it on first use."""
+    group = _groups.get(name)
+    if group is None:
+        group = _groups[name] = SingleFlight(name)
+    return group
+
+
+def get_singleflight_metrics(name: Optional[str] = None) -> Dict[str, Any]:
+    """Metrics for one named group, or for every group keyed by name."""
+    if name is not None:
+        return get_singleflight(name).get_metrics()
+    return {group_name: group.get_metrics() for group_name, group in sorted(_groups.items())}
@@ -1,72 +1,109 @@
-﻿import logging
-import requests
+﻿import asyncio
+import logging
 from typing import Optional, Dict
 from urllib.parse import quote
 
+import aiohttp
+
 from config.constants import APEX_PLATFORM_MAPPING
-from config.settings import TRN_API_KEY
+from config.settings import TRN_API_KEY, TRN_MAX_CONCURRENCY, TRN_TIMEOUT_SECONDS
 from core.errors import APIError, ResourceNotFoundError
+from services.api.http import get_session
 
 logger = logging.getLogger(__name__)
 
-
-def fetch_apex_stats(platform: str, name: str) -> Dict:
-    """
-    Fetch Apex Legends player stats from the TRN API.
-
-    Args:
-        platform: The platform (Xbox, Playstation, Origin)
-        name: The player's username
-
-    Returns:
-        The player stats data
-
-    Raises:
-        ResourceNotFoundError: If the player is not found
-        APIError: If there's an API error
-        ValueError: If the platform is invalid
-    """
-    api_platform = APEX_PLATFORM_MAPPING.get(platform)
-    if not api_platform:
-        raise ValueError(f"Invalid platform: {platform}")
-
-    name_encoded = quote(name)
-    url = f"https://public-api.tracker.gg/v2/apex/standard/profile/{api_platform}/{name_encoded}"
-
-    if not TRN_API_KEY:
-        logger.error("API key not found. Please check your .env file.")
-        raise APIError("API key not configured")
-
-    headers = {"TRN-Api-Key": TRN_API_KEY}
-
-    try:
-        response = requests.get(url, headers=headers)
-        status_code = response.status_code
-
-        if status_code == 200:
-            return response.json()
-        elif status_code == 404:
-            raise ResourceNotFoundError(f"No Apex Legends stats found for {name} on {platform}")
-        elif status_code == 403:
-            logger.error(
-                f"Access forbidden (403) when fetching stats for {name} on {api_platform}."
-            )
-            raise APIError("Invalid API key or insufficient permissions")
-        elif status_code in (502, 503, 520, 521, 522, 523, 524):
-            # Cloudflare/origin server errors
-            logger.warning(
-                f"Tracker.gg API unavailable (HTTP {status_code}) when fetching stats for {name} on {api_platform}."
-            )
-            raise APIError("The Apex Tracker API is currently unavailable. Please try again in a few minutes.")
-        else:
-            logger.error(
-                f"Failed to fetch stats for {name} on {api_platform}. HTTP {status_code} received."
-            )
-            raise APIError(f"API returned status code {status_code}")
-
-    except requests.RequestException as e:
-        logger.error(f"Request error occurred: {e}", exc_info=True)
-        raise APIError(f"Request error: {str(e)}")
+TRACKER_PROFILE_URL = "https://public-api.tracker.gg/v2/apex/standard/profile"
+# Cloudflare/origin server errors
+TRACKER_UNAVAILABLE_STATUSES = (502, 503, 520, 521, 522, 523, 524)
+
+
+class TrackerClient:
+    """Tracker.gg client on the shared keep-alive pool, with timeouts and a cap on requests in flight."""
+
+    def __init__(self, max_concurrency: int = TRN_MAX_CONCURRENCY, timeout_seconds: float = TRN_TIMEOUT_SECONDS):
+        self.timeout = aiohttp.ClientTimeout(total=timeout_seconds, sock_connect=min(5.0, timeout_seconds))
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.requests = 0
+        self.timeouts = 0
+
+    async def fetch_apex_stats(self, platform: str, name: str) -> Dict:
+        """
+        Fetch Apex Legends player stats from the TRN API.
+
+        Args:
+            platform: The platform (Xbox, Playstation, Origin)
+            name: The player's username
+
+        Returns:
+            The player stats data
+
+        Raises:
+            ResourceNotFoundError: If the player is not found
+            APIError: If there's an API error or the request times out
+            ValueError: If the platform is invalid
+        """
+        api_platform = APEX_PLATFORM_MAPPING.get(platform)
+        if not api_platform:
+            raise ValueError(f"Invalid platform: {platform}")
+
+        name_encoded = quote(name)
+        url = f"{TRACKER_PROFILE_URL}/{api_platform}/{name_encoded}"
+
+        if not TRN_API_KEY:
+            logger.error("API key not found. Please check your .env file.")
+            raise APIError("API key not configured")
+
+        headers = {"TRN-Api-Key": TRN_API_KEY}
+
+        async with self._slots:
+            self.requests += 1
+            try:
+                async with get_session(url).get(url, headers=headers, timeout=self.timeout) as response:
+                    status_code = response.status
+
+                    if status_code == 200:
+                        return await response.json()
+                    elif status_code == 404:
+                        raise ResourceNotFoundError(f"No Apex Legends stats found for {name} on {platform}")
+                    elif status_code == 403:
+                        logger.error(
+                            f"Access forbidden (403) when fetching stats for {name} on {api_platform}."
+                        )
+                        raise APIError("Invalid API key or insufficient permissions")
+                    elif status_code in TRACKER_UNAVAILABLE_STATUSES:
+                        logger.warning(
+                            f"Tracker.gg API unavailable (HTTP {status_code}) when fetching stats for {name} on {api_platform}."
+                        )
+                        raise APIError("The Apex Tracker API is currently unavailable. Please try again in a few minutes.")
+                    else:
+                        logger.error(
+                            f"Failed to fetch stats for {name} on {api_platform}. HTTP {status_code} received."
+                        )
+                        raise APIError(f"API returned status code {status_code}")
+
+            except asyncio.TimeoutError as e:
+                self.timeouts += 1
+                logger.error(f"Timed out fetching Apex stats for {name} on {api_platform}")
+                raise APIError("The Apex Tracker API took too long to respond. Please try again later.") from e
+            except aiohttp.ClientError as e:
+                logger.error(f"Request error occurred: {e}", exc_info=True)
+                raise APIError(f"Request error: {str(e)}") from e
+
+
+_tracker_client: Optional[TrackerClient] = None
+
+
+def get_tracker_client() -> TrackerClient:
+    """Returns the process-wide Tracker.gg client, creating it on first use."""
+    global _tracker_client
+    if _tracker_client is None:
+        _tracker_client = TrackerClient()
+    return _tracker_client
+
+
+async def fetch_apex_stats(platform: str, name: str) -> Dict:
+    """Fetch Apex Legends player stats through the shared Tracker.gg client."""
+    return await get_tracker_client().fetch_apex_stats(platform, name)
 
 
 def get_formatted_percentile(percentile: Optional[float]) -> str:
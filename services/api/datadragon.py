@@ -0,0 +1,183 @@
+"""Data Dragon static data (patch version and champions), loaded once per patch.
+
+The champion list is indexed by numeric key (as used by mastery and spectator data), by
+Data Dragon id (``MonkeyKing``, as used in match data and emoji names) and by display name
+(``Wukong``). The snapshot is persisted to DDRAGON_CACHE_PATH so restarts start warm, and
+lookups schedule a background check for a new patch once DDRAGON_REFRESH_SECONDS have passed.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from config.settings import DDRAGON_CACHE_PATH, DDRAGON_REFRESH_SECONDS
+from services.api.http import get_session
+from services.api.riot import get_riot_client
+
+logger = logging.getLogger(__name__)
+
+DDRAGON_BASE_URL = "https://ddragon.leagueoflegends.com"
+DDRAGON_VERSIONS_URL = f"{DDRAGON_BASE_URL}/api/versions.json"
+DEFAULT_DDRAGON_VERSION = "13.1.1"
+# After a failed cold load, callers use the defaults for this long before trying again
+COLD_LOAD_RETRY_SECONDS = 60
+
+
+class DataDragon:
+    """In-memory Data Dragon snapshot with a file-backed warm start."""
+
+    def __init__(self, cache_path: Optional[str] = DDRAGON_CACHE_PATH, refresh_seconds: int = DDRAGON_REFRESH_SECONDS):
+        self.cache_path = cache_path
+        self.refresh_seconds = refresh_seconds
+        self.version: Optional[str] = None
+        self.champions_by_key: Dict[int, Dict[str, str]] = {}
+        self._key_by_id: Dict[str, int] = {}
+        self._key_by_name: Dict[str, int] = {}
+        self._checked_at = 0.0
+        self._load_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.downloads = 0
+        self._load_from_disk()
+
+    # --- Snapshot management ---
+
+    def _set_snapshot(self, version: str, champions: Dict[int, Dict[str, str]]) -> None:
+        """Swaps in a new version and its indexes in one step."""
+        self._key_by_id = {champ["id"].lower(): key for key, champ in champions.items()}
+        self._key_by_name = {champ["name"].lower(): key for key, champ in champions.items()}
+        self.champions_by_key = champions
+        self.version = version
+
+    def _load_from_disk(self) -> None:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            champions = {int(key): {"id": champ_id, "name": name} for key, (champ_id, name) in data["champions"].items()}
+            self._set_snapshot(data["version"], champions)
+            logger.info(f"Loaded Data Dragon {self.version} ({len(champions)} champions) from {self.cache_path}")
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable Data Dragon cache {self.cache_path}: {e}")
+
+    def _save_to_disk(self) -> None:
+        if not self.cache_path:
+            return
+        try:
+            directory = os.path.dirname(self.cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            data = {
+                "version": self.version,
+                "champions": {str(key): [champ["id"], champ["name"]] for key, champ in self.champions_by_key.items()},
+            }
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            logger.warning(f"Failed to persist Data Dragon cache to {self.cache_path}: {e}")
+
+    async def _fetch_json(self, session: Optional[aiohttp.ClientSession], url: str) -> Any:
+        return await get_riot_client().get_json(session or get_session(url), url)
+
+    async def refresh(self, session: Optional[aiohttp.ClientSession] = None) -> bool:
+        """Checks for a new patch and downloads its champion list; returns True if it changed."""
+        versions = await self._fetch_json(session, DDRAGON_VERSIONS_URL)
+        self._checked_at = time.monotonic()
+        if not versions:
+            return False
+        latest = versions[0]
+        if latest == self.version and self.champions_by_key:
+            return False
+
+        champions_url = f"{DDRAGON_BASE_URL}/cdn/{latest}/data/en_US/champion.json"
+        payload = await self._fetch_json(session, champions_url)
+        self.downloads += 1
+        if not payload or "data" not in payload:
+            logger.error(f"Data Dragon champion data for {latest} unavailable")
+            return False
+
+        champions = {}
+        for champ in payload["data"].values():
+            try:
+                champions[int(champ["key"])] = {"id": champ["id"], "name": champ["name"]}
+            except (KeyError, TypeError, ValueError):
+                continue
+        self._set_snapshot(latest, champions)
+        self._save_to_disk()
+        logger.info(f"Data Dragon updated to {latest} ({len(champions)} champions)")
+        return True
+
+    async def ensure_loaded(self, session: Optional[aiohttp.ClientSession] = None) -> None:
+        """Loads data on first use; afterwards only schedules background refreshes."""
+        if self.version and self.champions_by_key:
+            if time.monotonic() - self._checked_at >= self.refresh_seconds:
+                self._schedule_refresh()
+            return
+
+        async with self._load_lock:
+            # Another caller may have finished (or failed) the cold load while we waited
+            if self.version and self.champions_by_key:
+                return
+            if self._checked_at and time.monotonic() - self._checked_at < COLD_LOAD_RETRY_SECONDS:
+                return
+            try:
+                await self.refresh(session)
+            except Exception as e:
+                self._checked_at = time.monotonic()
+                logger.error(f"Failed to load Data Dragon data: {e}")
+
+    def _schedule_refresh(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        # Mark as checked now so concurrent lookups don't queue more refreshes
+        self._checked_at = time.monotonic()
+        self._refresh_task = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"Background Data Dragon refresh failed: {e}")
+
+    # --- Lookups ---
+
+    async def get_version(self, session: Optional[aiohttp.ClientSession] = None) -> str:
+        await self.ensure_loaded(session)
+        return self.version or DEFAULT_DDRAGON_VERSION
+
+    async def get_champion_name(self, champion_key: int, session: Optional[aiohttp.ClientSession] = None) -> str:
+        """Display name for a numeric champion key, or "Unknown"."""
+        await self.ensure_loaded(session)
+        try:
+            champ = self.champions_by_key.get(int(champion_key))
+        except (TypeError, ValueError):
+            champ = None
+        return champ["name"] if champ else "Unknown"
+
+    def champion_id_for_name(self, champion_name: str) -> Optional[str]:
+        """Data Dragon id (e.g. ``MonkeyKing``) for a display name or id, if loaded."""
+        lowered = (champion_name or "").lower()
+        key = self._key_by_name.get(lowered, self._key_by_id.get(lowered))
+        return self.champions_by_key[key]["id"] if key is not None else None
+
+    def display_name_for_id(self, champion_id: str) -> Optional[str]:
+        """Display name (e.g. ``Wukong``) for a Data Dragon id, if loaded."""
+        key = self._key_by_id.get((champion_id or "").lower())
+        return self.champions_by_key[key]["name"] if key is not None else None
+
+
+_data_dragon: Optional[DataDragon] = None
+
+
+def get_data_dragon() -> DataDragon:
+    """Returns the process-wide Data Dragon cache, creating it on first use."""
+    global _data_dragon
+    if _data_dragon is None:
+        _data_dragon = DataDragon()
+    return _data_dragon
@@ -0,0 +1,236 @@
+"""Process-wide HTTP sessions with keep-alive pooling for outbound API calls.
+
+Each upstream host gets one long-lived ``aiohttp.ClientSession`` whose connector keeps
+connections alive, caches DNS lookups and caps how many connections may be open to a
+host at once, so repeat requests skip DNS, TCP and TLS setup. A trace config on every
+session records per-host request latency and whether each request got a fresh or a
+reused connection. Sessions are created lazily inside the running loop and closed by
+``close_http_client`` when the bot shuts down.
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from config.settings import (
+    HTTP_DNS_CACHE_SECONDS,
+    HTTP_HOST_CONNECTION_LIMITS,
+    HTTP_KEEPALIVE_SECONDS,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_CONNECTIONS_PER_HOST,
+    HTTP_TIMEOUT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Every Riot routing value (europe, euw1, na1...) shares one pool; the connector still
+# caps connections per routing host
+RIOT_UPSTREAM = "api.riotgames.com"
+
+
+def parse_host_limits(value: Optional[str]) -> Dict[str, int]:
+    """Parses per-host connection caps such as ``fortnite-api.com=8,discord.com=4``."""
+    limits = {}
+    for part in (value or "").split(","):
+        host, _, limit = part.strip().partition("=")
+        try:
+            limits[host.strip().lower()] = int(limit)
+        except ValueError:
+            continue
+    return limits
+
+
+def upstream_key(url_or_host: str) -> str:
+    """The pool a URL belongs to: its host, with every Riot routing host folded together."""
+    host = (urlsplit(url_or_host).hostname if "://" in url_or_host else url_or_host) or ""
+    host = host.lower()
+    if host.endswith("." + RIOT_UPSTREAM):
+        return RIOT_UPSTREAM
+    return host
+
+
+class HostStats:
+    """Request, latency and connection reuse counters for one host."""
+
+    __slots__ = ("requests", "errors", "total_seconds", "max_seconds", "new_connections", "reused_connections")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.new_connections = 0
+        self.reused_connections = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        connections = self.new_connections + self.reused_connections
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "avg_ms": round(self.total_seconds / self.requests * 1000, 1) if self.requests else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 1),
+            "new_connections": self.new_connections,
+            "reused_connections": self.reused_connections,
+            "reuse_ratio": round(self.reused_connections / connections, 3) if connections else 0.0,
+        }
+
+
+class HttpClientManager:
+    """Owns one pooled session per upstream host and the counters for all of them."""
+
+    def __init__(self, max_connections: int = HTTP_MAX_CONNECTIONS,
+                 max_connections_per_host: int = HTTP_MAX_CONNECTIONS_PER_HOST,
+                 host_limits: Optional[Dict[str, int]] = None,
+                 dns_cache_seconds: int = HTTP_DNS_CACHE_SECONDS,
+                 keepalive_seconds: float = HTTP_KEEPALIVE_SECONDS,
+                 timeout_seconds: float = HTTP_TIMEOUT_SECONDS):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.host_limits = parse_host_limits(HTTP_HOST_CONNECTION_LIMITS) if host_limits is None else host_limits
+        self.dns_cache_seconds = dns_cache_seconds
+        self.keepalive_seconds = keepalive_seconds
+        self.timeout = aiohttp.ClientTimeout(total=timeout_seconds)
+        self._sessions: Dict[str, Tuple[aiohttp.ClientSession, asyncio.AbstractEventLoop]] = {}
+        self._stats: Dict[str, HostStats] = {}
+        # Closes of replaced sessions still running; held so they aren't garbage collected
+        self._retiring: Set["asyncio.Task[None]"] = set()
+        self.sessions_created = 0
+
+    def _host_stats(self, host: str) -> HostStats:
+        stats = self._stats.get(host)
+        if stats is None:
+            stats = self._stats[host] = HostStats()
+        return stats
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx: SimpleNamespace, params):
+            ctx.stats = self._host_stats((params.url.host or "").lower())
+            ctx.start = asyncio.get_running_loop().time()
+
+        async def on_request_end(session, ctx: SimpleNamespace, params):
+            elapsed = asyncio.get_running_loop().time() - ctx.start
+            ctx.stats.requests += 1
+            ctx.stats.total_seconds += elapsed
+            ctx.stats.max_seconds = max(ctx.stats.max_seconds, elapsed)
+
+        async def on_request_exception(session, ctx: SimpleNamespace, params):
+            ctx.stats.errors += 1
+
+        async def on_connection_create_end(session, ctx: SimpleNamespace, params):
+            ctx.stats.new_connections += 1
+
+        async def on_connection_reuseconn(session, ctx: SimpleNamespace, params):
+            ctx.stats.reused_connections += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_end)
+        trace.on_request_exception.append(on_request_exception)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace
+
+    def _create_session(self, key: str) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.host_limits.get(key, self.max_connections_per_host),
+            ttl_dns_cache=self.dns_cache_seconds,
+            keepalive_timeout=self.keepalive_seconds,
+        )
+        self.sessions_created += 1
+        logger.debug(f"Opening pooled HTTP session for {key}")
+        return aiohttp.ClientSession(connector=connector, timeout=self.timeout, trace_configs=[self._trace_config()])
+
+    def get_session(self, url_or_host: str) -> aiohttp.ClientSession:
+        """
+        Returns the shared session for a URL's host, opening it on first use. The session
+        must not be closed by the caller; it lives until close() runs.
+        """
+        key = upstream_key(url_or_host)
+        loop = asyncio.get_running_loop()
+        entry = self._sessions.get(key)
+        # A session is bound to the loop that opened it, so a new loop gets a new one
+        if entry is not None and not entry[0].closed and entry[1] is loop:
+            return entry[0]
+        if entry is not None:
+            self._retire(key, *entry)
+        session = self._create_session(key)
+        self._sessions[key] = (session, loop)
+        return session
+
+    def _retire(self, key: str, session: aiohttp.ClientSession, session_loop: asyncio.AbstractEventLoop) -> None:
+        """Closes a session that is being replaced because it belongs to another loop."""
+        if session.closed:
+            return
+        if session_loop.is_running():
+            # Still running in another thread, so close it there
+            asyncio.run_coroutine_threadsafe(session.close(), session_loop)
+            return
+        # Its loop has stopped and can't run close(); closing from this loop releases the pool
+        task = asyncio.ensure_future(self._close_session(key, session))
+        self._retiring.add(task)
+        task.add_done_callback(self._retiring.discard)
+
+    @staticmethod
+    async def _close_session(key: str, session: aiohttp.ClientSession) -> None:
+        try:
+            await session.close()
+        except Exception as e:
+            logger.error(f"Error closing HTTP session for {key}: {e}")
+
+    @asynccontextmanager
+    async def session(self, url_or_host: str) -> AsyncIterator[aiohttp.ClientSession]:
+        """Stands in for ``async with aiohttp.ClientSession() as session`` without closing the pool."""
+        yield self.get_session(url_or_host)
+
+    async def close(self) -> None:
+        """Closes every session, including ones opened on loops that have since stopped."""
+        sessions, self._sessions = self._sessions, {}
+        loop = asyncio.get_running_loop()
+        for key, (session, session_loop) in sessions.items():
+            if session_loop is loop:
+                await self._close_session(key, session)
+            else:
+                self._retire(key, session, session_loop)
+        if self._retiring:
+            await asyncio.gather(*self._retiring)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Snapshot of open sessions and per-host latency and connection reuse."""
+        return {
+            "sessions": sum(1 for session, _ in self._sessions.values() if not session.closed),
+            "sessions_created": self.sessions_created,
+            "hosts": {host: stats.snapshot() for host, stats in sorted(self._stats.items())},
+        }
+
+
+_http_client: Optional[HttpClientManager] = None
+
+
+def get_http_client() -> HttpClientManager:
+    """Returns the process-wide HTTP client manager, creating it on first use."""
+    global _http_client
+    if _http_client is None:
+        _http_client = HttpClientManager()
+    return _http_client
+
+
+def get_session(url_or_host: str) -> aiohttp.ClientSession:
+    """Shortcut for get_http_client().get_session()."""
+    return get_http_client().get_session(url_or_host)
+
+
+def http_session(url_or_host: str):
+    """Shortcut for get_http_client().session()."""
+    return get_http_client().session(url_or_host)
+
+
+async def close_http_client() -> None:
+    """Closes the shared HTTP sessions; called when the bot shuts down."""
+    if _http_client is not None:
+        await _http_client.close()
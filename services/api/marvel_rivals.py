@@ -7,6 +7,7 @@ import aiohttp
 from config.constants import MARVEL_RIVALS_CURRENT_SEASON
 from config.settings import MARVEL_RIVALS_API_KEY
 from core.errors import APIError, ResourceNotFoundError
+from services.api.http import http_session
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +22,7 @@ async def fetch_marvel_rivals_player(name: str, season: int = MARVEL_RIVALS_CURR
     url = f"https://marvelrivalsapi.com/api/v1/player/{encoded_name}?season={season}"
     headers = {"x-api-key": MARVEL_RIVALS_API_KEY}
 
-    timeout = aiohttp.ClientTimeout(total=20)
-    async with aiohttp.ClientSession(timeout=timeout) as session:
+    async with http_session(url) as session:
         try:
             async with session.get(url, headers=headers) as response:
                 status_code = response.status
@@ -0,0 +1,189 @@
+"""Cache for League and TFT match payloads used by the match history embeds.
+
+Finished matches never change, so details are cached by match id with no expiry: a bounded
+in-memory LRU backed by an optional SQLite file (MATCH_CACHE_DB_PATH). Only the fields the
+embeds read are kept. Recent match id lists do change, so they get a short TTL instead;
+together this lets repeated views of the same player make no Riot calls.
+"""
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from config.settings import MATCH_CACHE_DB_PATH, MATCH_CACHE_SIZE, MATCH_IDS_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+def compact_lol_match(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Keeps the fields read by LeagueCog.create_match_history_embed."""
+    info = payload.get("info", {})
+    return {"info": {
+        "gameDuration": info.get("gameDuration", 0),
+        "participants": [
+            {
+                "puuid": p.get("puuid"),
+                "win": p.get("win", False),
+                "championName": p.get("championName", "Unknown"),
+                "kills": p.get("kills", 0),
+                "deaths": p.get("deaths", 0),
+                "assists": p.get("assists", 0),
+            }
+            for p in info.get("participants", [])
+        ],
+    }}
+
+
+def compact_tft_match(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Keeps the fields read by TFTCog.create_match_history_embed (active traits only)."""
+    info = payload.get("info", {})
+    return {"info": {
+        "game_length": info.get("game_length", 0),
+        "participants": [
+            {
+                "puuid": p.get("puuid"),
+                "placement": p.get("placement", 0),
+                "level": p.get("level", 0),
+                "traits": [
+                    {"name": t.get("name", ""), "tier_current": t.get("tier_current", 0)}
+                    for t in p.get("traits", []) if t.get("tier_current", 0) > 0
+                ],
+            }
+            for p in info.get("participants", [])
+        ],
+    }}
+
+
+class LRUCache:
+    """Bounded least-recently-used mapping with an optional per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, stored_at = entry
+        if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        self._data[key] = (value, time.monotonic())
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteMatchStore:
+    """On-disk tier: one table of compact match JSON per game."""
+
+    def __init__(self, path: str, table: str):
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (match_id TEXT PRIMARY KEY, data TEXT NOT NULL)")
+            self._conn.commit()
+
+    def get(self, match_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT data FROM {self.table} WHERE match_id = ?", (match_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, match_id: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (match_id, data) VALUES (?, ?)",
+                (match_id, json.dumps(data, separators=(",", ":"))),
+            )
+            self._conn.commit()
+
+
+class MatchCache:
+    """Match-detail cache for one game, plus the short-lived recent match id lists."""
+
+    def __init__(self, name: str, compactor: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 max_entries: int = MATCH_CACHE_SIZE, db_path: Optional[str] = MATCH_CACHE_DB_PATH,
+                 ids_ttl_seconds: float = MATCH_IDS_TTL_SECONDS):
+        self.name = name
+        self.compactor = compactor
+        self.memory = LRUCache(max_entries)
+        self.recent_ids = LRUCache(max_entries, ttl_seconds=ids_ttl_seconds)
+        self.store: Optional[SQLiteMatchStore] = None
+        if db_path:
+            try:
+                self.store = SQLiteMatchStore(db_path, f"{name}_matches")
+            except Exception as e:
+                logger.error(f"Match cache disk tier unavailable at {db_path}: {e}")
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    async def get(self, match_id: str) -> Optional[Dict[str, Any]]:
+        data = self.memory.get(match_id)
+        if data is not None:
+            self.hits += 1
+            return data
+        if self.store is not None:
+            try:
+                data = await asyncio.to_thread(self.store.get, match_id)
+            except Exception as e:
+                logger.error(f"Match cache disk read failed for {match_id}: {e}")
+                data = None
+            if data is not None:
+                self.disk_hits += 1
+                self.memory.put(match_id, data)
+                return data
+        self.misses += 1
+        return None
+
+    async def put(self, match_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Stores the compact form of a Riot match payload and returns it."""
+        data = self.compactor(payload)
+        self.memory.put(match_id, data)
+        if self.store is not None:
+            try:
+                await asyncio.to_thread(self.store.put, match_id, data)
+            except Exception as e:
+                logger.error(f"Match cache disk write failed for {match_id}: {e}")
+        return data
+
+    def get_ids(self, key: str) -> Optional[List[str]]:
+        return self.recent_ids.get(key)
+
+    def put_ids(self, key: str, match_ids: List[str]) -> None:
+        self.recent_ids.put(key, list(match_ids))
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self.memory),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+
+_match_caches: Dict[str, MatchCache] = {}
+_COMPACTORS = {"lol": compact_lol_match, "tft": compact_tft_match}
+
+
+def get_match_cache(game: str) -> MatchCache:
+    """Returns the process-wide match cache for "lol" or "tft"."""
+    if game not in _match_caches:
+        _match_caches[game] = MatchCache(game, _COMPACTORS[game])
+    return _match_caches[game]
@@ -0,0 +1,237 @@
+"""Shared Riot API client with per-region and per-method rate limiting.
+
+Riot enforces an application limit per routing value (``euw1``, ``europe``...) and a
+separate limit per API method, advertised in the ``X-App-Rate-Limit`` and
+``X-Method-Rate-Limit`` headers as ``count:seconds`` pairs. Requests wait in a FIFO queue
+per (routing value, method) until both buckets have room, 429s block the offending bucket
+for ``Retry-After`` seconds, and retries are capped.
+"""
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from config.settings import RIOT_APP_RATE_LIMIT, RIOT_MAX_RETRIES
+
+logger = logging.getLogger(__name__)
+
+RIOT_API_HOST_SUFFIX = ".api.riotgames.com"
+# Trailing path segments that are part of the method rather than a parameter
+STATIC_METHOD_SUFFIXES = {"ids", "top"}
+RETRYABLE_SERVER_STATUSES = {500, 502, 503, 504}
+
+
+def parse_rate_limits(header_value: Optional[str]) -> List[Tuple[int, float]]:
+    """Parses a Riot rate limit header such as ``20:1,100:120`` into (count, seconds) pairs."""
+    limits = []
+    for part in (header_value or "").split(","):
+        count, _, window = part.strip().partition(":")
+        try:
+            limits.append((int(count), float(window)))
+        except ValueError:
+            continue
+    return limits
+
+
+def method_key(path: str) -> str:
+    """Groups request paths by Riot API method, dropping path parameters.
+
+    ``/lol/summoner/v4/summoners/by-puuid/<puuid>`` -> ``lol/summoner/v4/summoners/by-puuid``
+    ``/lol/match/v5/matches/by-puuid/<puuid>/ids`` -> ``lol/match/v5/matches/by-puuid/ids``
+    """
+    segments = [s for s in path.split("/") if s]
+    key = segments[:4]
+    selector = next((s for s in segments[4:] if s.startswith("by-")), None)
+    if selector:
+        key.append(selector)
+    if len(segments) > 4 and segments[-1] in STATIC_METHOD_SUFFIXES:
+        key.append(segments[-1])
+    return "/".join(key)
+
+
+class RateLimitBucket:
+    """Sliding-window bucket enforcing one or more (count, seconds) limits."""
+
+    def __init__(self, limits: List[Tuple[int, float]]):
+        self.limits = list(limits)
+        self.history: Deque[float] = deque()
+        self.blocked_until = 0.0
+
+    def update_limits(self, limits: List[Tuple[int, float]]) -> None:
+        if limits and limits != self.limits:
+            self.limits = list(limits)
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one more request fits in every window (0 if it fits now)."""
+        longest = max((window for _, window in self.limits), default=0.0)
+        while self.history and self.history[0] <= now - longest:
+            self.history.popleft()
+
+        wait = max(0.0, self.blocked_until - now)
+        for count, window in self.limits:
+            in_window = [t for t in self.history if t > now - window]
+            if len(in_window) >= count:
+                wait = max(wait, in_window[len(in_window) - count] + window - now)
+        return wait
+
+    def record(self, now: float) -> None:
+        self.history.append(now)
+
+    def block(self, until: float) -> None:
+        self.blocked_until = max(self.blocked_until, until)
+
+
+class RiotClient:
+    """Rate-limited JSON fetcher shared by the League and TFT cogs.
+
+    Non-Riot URLs (e.g. Data Dragon) are fetched directly without rate limiting.
+    """
+
+    def __init__(self, app_limits: Optional[List[Tuple[int, float]]] = None, max_retries: int = RIOT_MAX_RETRIES,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep):
+        self.default_app_limits = app_limits if app_limits is not None else parse_rate_limits(RIOT_APP_RATE_LIMIT)
+        self.max_retries = max_retries
+        self._clock = clock
+        self._sleep = sleep
+        self._app_buckets: Dict[str, RateLimitBucket] = {}
+        self._method_buckets: Dict[Tuple[str, str], RateLimitBucket] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self._queue_depth: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.max_queue_depth = 0
+        self.requests = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.wait_seconds = 0.0
+
+    def _app_bucket(self, routing: str) -> RateLimitBucket:
+        if routing not in self._app_buckets:
+            self._app_buckets[routing] = RateLimitBucket(self.default_app_limits)
+        return self._app_buckets[routing]
+
+    def _method_bucket(self, key: Tuple[str, str]) -> RateLimitBucket:
+        # Method limits are unknown until Riot reports them in a response header
+        if key not in self._method_buckets:
+            self._method_buckets[key] = RateLimitBucket([])
+        return self._method_buckets[key]
+
+    async def acquire(self, routing: str, method: str) -> None:
+        """Waits until a request for this routing value and method fits both rate limits."""
+        key = (routing, method)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._queue_depth[key] += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth())
+        try:
+            async with lock:
+                app_bucket = self._app_bucket(routing)
+                method_bucket = self._method_bucket(key)
+                while True:
+                    now = self._clock()
+                    wait = max(app_bucket.wait_time(now), method_bucket.wait_time(now))
+                    if wait <= 0:
+                        app_bucket.record(now)
+                        method_bucket.record(now)
+                        return
+                    self.wait_seconds += wait
+                    await self._sleep(wait)
+        finally:
+            self._queue_depth[key] -= 1
+
+    def _update_from_headers(self, routing: str, method: str, headers) -> None:
+        self._app_bucket(routing).update_limits(parse_rate_limits(headers.get("X-App-Rate-Limit")))
+        self._method_bucket((routing, method)).update_limits(parse_rate_limits(headers.get("X-Method-Rate-Limit")))
+
+    def _handle_429(self, routing: str, method: str, headers) -> Tuple[float, bool]:
+        """Blocks the bucket Riot says was exceeded.
+
+        Returns the back-off and whether a bucket now enforces it (service-level 429s are
+        not tied to our key, so the caller has to sleep them out itself).
+        """
+        self.rate_limited += 1
+        try:
+            retry_after = float(headers.get("Retry-After", 1))
+        except (TypeError, ValueError):
+            retry_after = 1.0
+        until = self._clock() + retry_after
+        limit_type = (headers.get("X-Rate-Limit-Type") or "").lower()
+        logger.warning(f"Riot API rate limited ({limit_type or 'service'}) on {routing} {method}; retrying in {retry_after}s")
+        if limit_type == "application":
+            self._app_bucket(routing).block(until)
+            return retry_after, True
+        if limit_type == "method":
+            self._method_bucket((routing, method)).block(until)
+            return retry_after, True
+        return retry_after, False
+
+    async def get_json(self, session: aiohttp.ClientSession, url: str, headers: Optional[dict] = None) -> Optional[Any]:
+        """GETs a URL and returns its JSON, or None on 404, errors or exhausted retries."""
+        parts = urlsplit(url)
+        host = parts.hostname or ""
+        is_riot = host.endswith(RIOT_API_HOST_SUFFIX)
+        routing = host[:-len(RIOT_API_HOST_SUFFIX)] if is_riot else host
+        method = method_key(parts.path)
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+            if is_riot:
+                await self.acquire(routing, method)
+            self.requests += 1
+            backoff, bucket_blocked = 0.0, False
+            try:
+                async with session.get(url, headers=headers) as response:
+                    if is_riot:
+                        self._update_from_headers(routing, method, response.headers)
+                    if response.status == 200:
+                        return await response.json()
+                    elif response.status == 404:
+                        return None
+                    elif response.status == 429:
+                        backoff, bucket_blocked = self._handle_429(routing, method, response.headers)
+                    elif response.status in RETRYABLE_SERVER_STATUSES:
+                        backoff = 0.5 * (2 ** attempt)
+                        logger.warning(f"Server error {response.status} from {url}; retrying in {backoff}s")
+                    else:
+                        logger.error(f"Error fetching data from {url}: {response.status} - {response.reason}")
+                        return None
+            except Exception as e:
+                logger.error(f"Exception during fetch_data: {e}")
+                return None
+
+            # A blocked bucket makes the next acquire wait; anything else backs off here
+            if attempt < self.max_retries and not bucket_blocked:
+                await self._sleep(backoff)
+
+        logger.error(f"Giving up on {url} after {self.max_retries} retries")
+        return None
+
+    def queue_depth(self, routing: Optional[str] = None) -> int:
+        """Requests currently waiting for a rate limit slot (optionally for one routing value)."""
+        return sum(depth for (r, _), depth in self._queue_depth.items() if routing is None or r == routing)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Snapshot of queue depths and throttling counters."""
+        return {
+            "queued": self.queue_depth(),
+            "queued_by_bucket": {f"{r} {m}": d for (r, m), d in self._queue_depth.items() if d},
+            "max_queue_depth": self.max_queue_depth,
+            "requests": self.requests,
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "wait_seconds": round(self.wait_seconds, 3),
+        }
+
+
+_riot_client: Optional[RiotClient] = None
+
+
+def get_riot_client() -> RiotClient:
+    """Returns the process-wide Riot client, creating it on first use."""
+    global _riot_client
+    if _riot_client is None:
+        _riot_client = RiotClient()
+    return _riot_client
@@ -0,0 +1,213 @@
+"""Riot ID <-> PUUID resolution cache shared by the League and TFT cogs.
+
+account-v1 answers are kept in a bounded in-memory LRU with a TTL, indexed both ways, so
+repeat profile, compare and live game lookups skip account-v1 for known players. With
+RIOT_IDENTITY_PERSIST enabled, every resolution is also written through to Mongo and read
+back on a memory miss, so restarts start warm; a TTL index expires stored identities.
+
+PUUIDs are encrypted per API key, so identities are namespaced by the key they were
+resolved with ("lol" or "tft") and never shared between the two.
+"""
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from config.settings import (
+    RIOT_IDENTITY_CACHE_SIZE,
+    RIOT_IDENTITY_DB_TTL_SECONDS,
+    RIOT_IDENTITY_PERSIST,
+    RIOT_IDENTITY_TTL_SECONDS,
+)
+from services.database.async_operations import run_blocking
+
+logger = logging.getLogger(__name__)
+
+ACCOUNT_BY_RIOT_ID_URL = "https://europe.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
+ACCOUNT_BY_PUUID_URL = "https://europe.api.riotgames.com/riot/account/v1/accounts/by-puuid/{puuid}"
+IDENTITY_COLLECTION = "riot_identities"
+TTL_INDEX_NAME = "updatedAt_ttl"
+RIOT_ID_INDEX_NAME = "namespace_riotIdKey"
+
+AccountFetch = Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+
+
+def riot_id_key(game_name: str, tag_line: str) -> str:
+    """Riot IDs are case-insensitive; this is the form they are indexed under."""
+    return f"{game_name.strip()}#{tag_line.strip()}".casefold()
+
+
+def ensure_identity_indexes(collection, ttl_seconds: int = RIOT_IDENTITY_DB_TTL_SECONDS) -> None:
+    """Creates the Riot ID lookup index and the TTL index that expires stored identities."""
+    try:
+        collection.create_index([("namespace", 1), ("riotIdKey", 1)], name=RIOT_ID_INDEX_NAME)
+        collection.create_index("updatedAt", name=TTL_INDEX_NAME, expireAfterSeconds=ttl_seconds)
+    except Exception as e:
+        logger.warning(f"Could not ensure Riot identity indexes: {e}")
+
+
+class RiotIdentityCache:
+    """Bounded two-way Riot ID/PUUID map with optional Mongo write-through."""
+
+    def __init__(self, max_entries: int = RIOT_IDENTITY_CACHE_SIZE, ttl_seconds: float = RIOT_IDENTITY_TTL_SECONDS,
+                 collection=None, db_ttl_seconds: int = RIOT_IDENTITY_DB_TTL_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.collection = collection
+        self.db_ttl_seconds = db_ttl_seconds
+        self._clock = clock
+        # (namespace, puuid) -> (stored_at, account); the Riot ID index points into it
+        self._accounts: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, str]]]" = OrderedDict()
+        self._riot_ids: Dict[Tuple[str, str], str] = {}
+        self._indexes_ready = False
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def _cached(self, namespace: str, puuid: str) -> Optional[Dict[str, str]]:
+        entry = self._accounts.get((namespace, puuid))
+        if entry is None:
+            return None
+        if self._clock() - entry[0] >= self.ttl_seconds:
+            self._drop((namespace, puuid))
+            return None
+        self._accounts.move_to_end((namespace, puuid))
+        return entry[1]
+
+    def _drop(self, key: Tuple[str, str]) -> None:
+        _, account = self._accounts.pop(key)
+        index_key = (key[0], riot_id_key(account["gameName"], account["tagLine"]))
+        if self._riot_ids.get(index_key) == key[1]:
+            del self._riot_ids[index_key]
+
+    def remember(self, namespace: str, account: Dict[str, str]) -> None:
+        """Caches an account in memory under both its PUUID and its Riot ID."""
+        key = (namespace, account["puuid"])
+        if key in self._accounts:
+            self._drop(key)
+        self._accounts[key] = (self._clock(), account)
+        self._riot_ids[(namespace, riot_id_key(account["gameName"], account["tagLine"]))] = account["puuid"]
+        while len(self._accounts) > self.max_entries:
+            self._drop(next(iter(self._accounts)))
+
+    @staticmethod
+    def _account(payload: Dict[str, Any], game_name: str = "", tag_line: str = "") -> Dict[str, str]:
+        return {
+            "puuid": payload["puuid"],
+            "gameName": payload.get("gameName") or game_name,
+            "tagLine": payload.get("tagLine") or tag_line,
+        }
+
+    async def _load(self, namespace: str, query: Dict[str, Any]) -> Optional[Dict[str, str]]:
+        if self.collection is None:
+            return None
+        try:
+            doc = await run_blocking(self.collection.find_one, dict(query, namespace=namespace))
+        except Exception as e:
+            logger.warning(f"Riot identity lookup failed: {e}")
+            return None
+        if not doc:
+            return None
+        updated_at = doc.get("updatedAt")
+        if updated_at is not None:
+            if updated_at.tzinfo is None:
+                updated_at = updated_at.replace(tzinfo=timezone.utc)
+            # The TTL monitor only runs once a minute; don't trust what it hasn't removed yet
+            if datetime.now(timezone.utc) - updated_at > timedelta(seconds=self.db_ttl_seconds):
+                return None
+        self.db_hits += 1
+        account = self._account(doc)
+        self.remember(namespace, account)
+        return account
+
+    async def _store(self, namespace: str, account: Dict[str, str]) -> None:
+        self.remember(namespace, account)
+        if self.collection is None:
+            return
+        try:
+            if not self._indexes_ready:
+                await run_blocking(ensure_identity_indexes, self.collection, self.db_ttl_seconds)
+                self._indexes_ready = True
+            await run_blocking(
+                self.collection.update_one,
+                {"_id": f"{namespace}:{account['puuid']}"},
+                {"$set": dict(account, namespace=namespace,
+                              riotIdKey=riot_id_key(account["gameName"], account["tagLine"]),
+                              updatedAt=datetime.now(timezone.utc))},
+                upsert=True,
+            )
+        except Exception as e:
+            logger.warning(f"Could not persist Riot identity for {account['puuid']}: {e}")
+
+    async def by_riot_id(self, namespace: str, game_name: str, tag_line: str,
+                         fetch: AccountFetch) -> Optional[Dict[str, str]]:
+        """
+        Resolves gameName#tagLine to {puuid, gameName, tagLine}: from memory, then Mongo,
+        then account-v1 through fetch(url). Returns None if Riot doesn't know the account.
+        """
+        index_key = riot_id_key(game_name, tag_line)
+        puuid = self._riot_ids.get((namespace, index_key))
+        account = self._cached(namespace, puuid) if puuid else None
+        if account is not None:
+            self.hits += 1
+            return account
+        account = await self._load(namespace, {"riotIdKey": index_key})
+        if account is not None:
+            return account
+
+        self.misses += 1
+        payload = await fetch(ACCOUNT_BY_RIOT_ID_URL.format(game_name=game_name, tag_line=tag_line))
+        if not payload or not payload.get("puuid"):
+            return None
+        account = self._account(payload, game_name, tag_line)
+        await self._store(namespace, account)
+        return account
+
+    async def by_puuid(self, namespace: str, puuid: str, fetch: AccountFetch) -> Optional[Dict[str, str]]:
+        """Resolves a PUUID to its current Riot ID the same way by_riot_id resolves the reverse."""
+        account = self._cached(namespace, puuid)
+        if account is not None:
+            self.hits += 1
+            return account
+        account = await self._load(namespace, {"_id": f"{namespace}:{puuid}"})
+        if account is not None:
+            return account
+
+        self.misses += 1
+        payload = await fetch(ACCOUNT_BY_PUUID_URL.format(puuid=puuid))
+        if not payload or not payload.get("gameName"):
+            return None
+        account = self._account(dict(payload, puuid=puuid))
+        await self._store(namespace, account)
+        return account
+
+    def clear(self) -> None:
+        self._accounts.clear()
+        self._riot_ids.clear()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Snapshot of cache size and where lookups were answered."""
+        return {
+            "entries": len(self._accounts),
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "persistent": self.collection is not None,
+        }
+
+
+_identity_cache: Optional[RiotIdentityCache] = None
+
+
+def get_riot_identity_cache() -> RiotIdentityCache:
+    """Returns the process-wide identity cache, creating it (and its collection) on first use."""
+    global _identity_cache
+    if _identity_cache is None:
+        collection = None
+        if RIOT_IDENTITY_PERSIST:
+            from services.database.connection import get_database
+            collection = get_database()[IDENTITY_COLLECTION]
+        _identity_cache = RiotIdentityCache(collection=collection)
+    return _identity_cache
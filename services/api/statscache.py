@@ -0,0 +1,171 @@
+"""Shared cache for third-party player stats (Apex, Fortnite, Marvel Rivals).
+
+Entries are keyed by (provider, scope, normalised player name), where scope is whatever
+else selects the stats: a platform, a time window or a season. Each provider has its own
+TTL. Once an entry is older than that, it is still served for STATS_CACHE_STALE_SECONDS
+while a background refresh replaces it, so popular players always answer instantly. Players
+the API reports as missing (ResourceNotFoundError) are remembered for a shorter negative
+TTL, and concurrent lookups of the same player share one upstream call. Other errors are
+never cached.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from config.settings import (
+    STATS_CACHE_NEGATIVE_TTL_SECONDS,
+    STATS_CACHE_SIZE,
+    STATS_CACHE_STALE_SECONDS,
+    STATS_CACHE_TTL_APEX,
+    STATS_CACHE_TTL_FORTNITE,
+    STATS_CACHE_TTL_MARVEL_RIVALS,
+)
+from core.errors import ResourceNotFoundError
+from core.singleflight import SingleFlight, get_singleflight
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_TTLS = {
+    "apex": STATS_CACHE_TTL_APEX,
+    "fortnite": STATS_CACHE_TTL_FORTNITE,
+    "marvel_rivals": STATS_CACHE_TTL_MARVEL_RIVALS,
+}
+DEFAULT_TTL_SECONDS = 300
+
+StatsKey = Tuple[str, str, str]
+
+
+def normalise_name(name: str) -> str:
+    """Case- and whitespace-insensitive form of a player name."""
+    return " ".join(str(name).split()).casefold()
+
+
+def stats_key(provider: str, scope: Any, name: str) -> StatsKey:
+    return provider, str(scope).casefold(), normalise_name(name)
+
+
+class StatsCache:
+    """Bounded LRU of stats payloads with stale-while-revalidate and shared in-flight fetches."""
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None,
+                 negative_ttl_seconds: float = STATS_CACHE_NEGATIVE_TTL_SECONDS,
+                 stale_seconds: float = STATS_CACHE_STALE_SECONDS,
+                 max_entries: int = STATS_CACHE_SIZE,
+                 clock: Callable[[], float] = time.monotonic,
+                 flight: Optional[SingleFlight] = None):
+        self.ttls = dict(PROVIDER_TTLS if ttls is None else ttls)
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        # key -> (stored_at, payload, found); found is False for a cached 404
+        self._entries: "OrderedDict[StatsKey, Tuple[float, Any, bool]]" = OrderedDict()
+        # Shared fetches; the process-wide cache passes the registered group so its metrics are reported
+        self._flight = flight if flight is not None else SingleFlight("stats_cache")
+        # Background refreshes nobody awaits; held so they aren't garbage collected mid-flight
+        self._refreshes: Set["asyncio.Task[Any]"] = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.refresh_errors = 0
+
+    def ttl(self, provider: str) -> float:
+        return self.ttls.get(provider, DEFAULT_TTL_SECONDS)
+
+    def _store(self, key: StatsKey, payload: Any, found: bool) -> None:
+        self._entries[key] = (self._clock(), payload, found)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _fetch(self, key: StatsKey, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            payload = await fetch()
+        except ResourceNotFoundError:
+            self._store(key, None, False)
+            raise
+        # None means the fetcher couldn't tell; don't pin that answer
+        if payload is not None:
+            self._store(key, payload, True)
+        return payload
+
+    def _revalidate(self, key: StatsKey, fetch: Callable[[], Awaitable[Any]]) -> None:
+        if self._flight.in_flight(key):
+            return
+        future = self._flight.start(key, lambda: self._fetch(key, fetch))
+        self._refreshes.add(future)
+
+        def _log_failure(done: "asyncio.Future[Any]") -> None:
+            self._refreshes.discard(done)
+            if done.cancelled():
+                return
+            error = done.exception()
+            if error is not None and not isinstance(error, ResourceNotFoundError):
+                self.refresh_errors += 1
+                logger.warning(f"Background refresh of {key[0]} stats for {key[2]} failed: {error}")
+
+        future.add_done_callback(_log_failure)
+
+    async def get(self, provider: str, scope: Any, name: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Returns the stats for a player, calling fetch() only when nothing usable is cached.
+        Raises ResourceNotFoundError for players recently reported missing; any other error
+        from fetch() is raised to every caller waiting on it.
+        """
+        key = stats_key(provider, scope, name)
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, payload, found = entry
+            age = self._clock() - stored_at
+            if not found:
+                if age < self.negative_ttl_seconds:
+                    self.negative_hits += 1
+                    self._entries.move_to_end(key)
+                    raise ResourceNotFoundError(f"No {provider} stats found for {name}")
+            elif age < self.ttl(provider):
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return payload
+            elif age < self.ttl(provider) + self.stale_seconds:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._revalidate(key, fetch)
+                return payload
+
+        self.misses += 1
+        return await self._flight.do(key, lambda: self._fetch(key, fetch))
+
+    def invalidate(self, provider: str, scope: Any, name: str) -> None:
+        self._entries.pop(stats_key(provider, scope, name), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Snapshot of cache size and hit/miss counters."""
+        lookups = self.hits + self.stale_hits + self.negative_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "coalesced": self._flight.deduplicated,
+            "refreshing": len(self._refreshes),
+            "refresh_errors": self.refresh_errors,
+            "hit_ratio": round((lookups - self.misses) / lookups, 3) if lookups else 0.0,
+        }
+
+
+_stats_cache: Optional[StatsCache] = None
+
+
+def get_stats_cache() -> StatsCache:
+    """Returns the process-wide stats cache, creating it on first use."""
+    global _stats_cache
+    if _stats_cache is None:
+        _stats_cache = StatsCache(flight=get_singleflight("stats_cache"))
+    return _stats_cache
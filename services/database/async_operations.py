@@ -0,0 +1,143 @@
+"""Awaitable data-access layer for MongoDB.
+
+PyMongo's synchronous API blocks the calling thread for the whole round-trip,
+which stalls every other interaction when it is called from a command handler.
+The helpers here run those calls on a dedicated, bounded thread pool (the same
+model Motor uses) and mirror the function surface of
+``services.database.operations``.
+"""
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from config.settings import MONGODB_EXECUTOR_WORKERS
+from services.database import operations
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Create the database thread pool on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=max(1, MONGODB_EXECUTOR_WORKERS),
+            thread_name_prefix="mongodb",
+        )
+    return _executor
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking database call on the database thread pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def to_async(func: Callable[..., T]) -> Callable[..., "asyncio.Future[T]"]:
+    """Wrap a blocking database helper so it can be awaited."""
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        return await run_blocking(func, *args, **kwargs)
+    return wrapper
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    """Shut down the database thread pool (it is recreated on next use)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait)
+        _executor = None
+        logger.info("MongoDB executor shut down")
+
+
+# Pet Operations
+async def get_pet(user_id: str, guild_id: str) -> Optional[Dict[str, Any]]:
+    """Get a pet by user ID and guild ID."""
+    return await run_blocking(operations.get_pet, user_id, guild_id)
+
+async def create_pet(pet_data: Dict[str, Any]) -> str:
+    """Create a new pet and return its ID."""
+    return await run_blocking(operations.create_pet, pet_data)
+
+async def update_pet(pet_id: str, update_data: Dict[str, Any]) -> bool:
+    """Update a pet by ID."""
+    return await run_blocking(operations.update_pet, pet_id, update_data)
+
+async def get_top_pets(guild_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """Get the top pets by level and XP."""
+    return await run_blocking(operations.get_top_pets, guild_id, limit)
+
+# Battle Log Operations
+async def log_battle(user_id: str, opponent_id: str, guild_id: str) -> str:
+    """Log a battle between two users."""
+    return await run_blocking(operations.log_battle, user_id, opponent_id, guild_id)
+
+async def count_battles_today(user_id: str, opponent_id: str, guild_id: str) -> int:
+    """Count battles between two users today."""
+    return await run_blocking(operations.count_battles_today, user_id, opponent_id, guild_id)
+
+# Squib Game Operations
+async def create_squib_game_session(session_data: Dict[str, Any]) -> str:
+    """Create a new Squib Game session."""
+    return await run_blocking(operations.create_squib_game_session, session_data)
+
+async def get_active_squib_game(guild_id: str) -> Optional[Dict[str, Any]]:
+    """Get the active Squib Game session for a guild."""
+    return await run_blocking(operations.get_active_squib_game, guild_id)
+
+async def update_squib_game(game_id: str, update_data: Dict[str, Any]) -> bool:
+    """Update a Squib Game session."""
+    return await run_blocking(operations.update_squib_game, game_id, update_data)
+
+async def update_squib_game_stats(user_id: str, guild_id: str, win_increment: int = 0) -> int:
+    """Update a user's Squib Game stats and return their win count."""
+    return await run_blocking(operations.update_squib_game_stats, user_id, guild_id, win_increment)
+
+# Bingo Game Operations
+async def create_bingo_session(session_data: Dict[str, Any]) -> str:
+    """Create a new Bingo Game session."""
+    return await run_blocking(operations.create_bingo_session, session_data)
+
+async def get_active_bingo_game(guild_id: str) -> Optional[Dict[str, Any]]:
+    """Get the active Bingo Game session for a guild."""
+    return await run_blocking(operations.get_active_bingo_game, guild_id)
+
+async def update_bingo_game(game_id: str, update_data: Dict[str, Any]) -> bool:
+    """Update a Bingo Game session."""
+    return await run_blocking(operations.update_bingo_game, game_id, update_data)
+
+async def update_bingo_stats(user_id: str, guild_id: str, username: str, win_increment: int = 0) -> int:
+    """Update a user's Bingo stats (server) and return their win count."""
+    return await run_blocking(operations.update_bingo_stats, user_id, guild_id, username, win_increment)
+
+async def update_bingo_global_stats(user_id: str, username: str, win_increment: int = 0) -> int:
+    """Update a user's Bingo global stats and return their win count."""
+    return await run_blocking(operations.update_bingo_global_stats, user_id, username, win_increment)
+
+
+__all__ = [
+    "run_blocking",
+    "to_async",
+    "shutdown_executor",
+    "get_pet",
+    "create_pet",
+    "update_pet",
+    "get_top_pets",
+    "log_battle",
+    "count_battles_today",
+    "create_squib_game_session",
+    "get_active_squib_game",
+    "update_squib_game",
+    "update_squib_game_stats",
+    "create_bingo_session",
+    "get_active_bingo_game",
+    "update_bingo_game",
+    "update_bingo_stats",
+    "update_bingo_global_stats",
+]
@@ -0,0 +1,143 @@
+# services/database/battle_logs.py
+"""Retention for battle_logs: daily roll-ups plus a TTL backstop.
+
+Raw logs older than BATTLE_LOG_ROLLUP_AFTER_DAYS are folded into one summary document per
+guild and UTC day (battle count and per-pair counts) and then deleted. A TTL index removes any
+raw log older than BATTLE_LOG_RETENTION_DAYS that compaction did not reach.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+from config.settings import BATTLE_LOG_RETENTION_DAYS, BATTLE_LOG_ROLLUP_AFTER_DAYS
+
+logger = logging.getLogger(__name__)
+
+TTL_INDEX_NAME = "timestamp_ttl"
+SUMMARY_INDEX_NAME = "guild_day"
+COMPACTION_CHUNK_SIZE = 5000
+# Applied batch keys kept per summary; only the latest can be re-applied after a crash
+_BATCH_HISTORY = 20
+
+
+def ensure_battle_log_indexes(logs, summaries, retention_days: int = BATTLE_LOG_RETENTION_DAYS) -> None:
+    """Creates the raw-log TTL index (updating its expiry if retention changed) and the summary index."""
+    if BATTLE_LOG_ROLLUP_AFTER_DAYS >= retention_days:
+        logger.warning(
+            f"BATTLE_LOG_ROLLUP_AFTER_DAYS ({BATTLE_LOG_ROLLUP_AFTER_DAYS}) should be below "
+            f"BATTLE_LOG_RETENTION_DAYS ({retention_days}) or logs expire before they are rolled up"
+        )
+    expire_after = int(timedelta(days=retention_days).total_seconds())
+    try:
+        logs.create_index("timestamp", name=TTL_INDEX_NAME, expireAfterSeconds=expire_after)
+    except OperationFailure:
+        # Index exists with another expiry; collMod changes it in place without a rebuild
+        try:
+            logs.database.command("collMod", logs.name, index={"name": TTL_INDEX_NAME, "expireAfterSeconds": expire_after})
+        except Exception as e:
+            logger.warning(f"Could not update battle log TTL index: {e}")
+    except Exception as e:
+        logger.warning(f"Could not ensure battle log TTL index: {e}")
+    try:
+        summaries.create_index([("guild_id", ASCENDING), ("day", ASCENDING)], name=SUMMARY_INDEX_NAME)
+    except Exception as e:
+        logger.warning(f"Could not ensure battle summary index: {e}")
+
+
+def _as_utc(value: datetime) -> datetime:
+    # PyMongo returns naive datetimes that are already UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def summary_id(guild_id: str, day: datetime) -> str:
+    return f"{guild_id}:{day.strftime('%Y-%m-%d')}"
+
+
+def pair_key(user_id: str, opponent_id: str) -> str:
+    first, second = sorted((str(user_id), str(opponent_id)))
+    return f"{first}:{second}"
+
+
+def _apply_batch(summaries, guild_id: str, day: datetime, docs: List[Dict[str, Any]]) -> bool:
+    """Adds one batch of raw logs to its daily summary; False if the batch was already applied."""
+    pair_counts: Dict[str, int] = defaultdict(int)
+    for doc in docs:
+        pair_counts[pair_key(doc.get("user_id"), doc.get("opponent_id"))] += 1
+    timestamps = [_as_utc(doc["timestamp"]) for doc in docs]
+    # Deterministic for the same raw documents, so a re-run after a crash is recognised
+    batch_key = f"{docs[0]['_id']}:{docs[-1]['_id']}:{len(docs)}"
+    update = {
+        "$inc": {"battles": len(docs), **{f"pair_counts.{key}": count for key, count in pair_counts.items()}},
+        "$min": {"first_at": min(timestamps)},
+        "$max": {"last_at": max(timestamps)},
+        "$push": {"batches": {"$each": [batch_key], "$slice": -_BATCH_HISTORY}},
+        "$setOnInsert": {"guild_id": guild_id, "day": day},
+    }
+    try:
+        summaries.update_one({"_id": summary_id(guild_id, day), "batches": {"$ne": batch_key}}, update, upsert=True)
+    except DuplicateKeyError:
+        return False
+    return True
+
+
+def compact_battle_logs(logs, summaries, now: Optional[datetime] = None,
+                        rollup_after_days: int = BATTLE_LOG_ROLLUP_AFTER_DAYS,
+                        chunk_size: int = COMPACTION_CHUNK_SIZE) -> Dict[str, int]:
+    """
+    Rolls raw logs from complete UTC days older than rollup_after_days into daily summaries and
+    deletes them. Safe to re-run or interrupt: each batch is recorded on its summary before the
+    raw logs are deleted, and a batch that is already recorded is not counted twice.
+    Returns how many raw documents were moved and how many summary batches were written.
+    """
+    now = _as_utc(now or datetime.now(timezone.utc))
+    cutoff = now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=rollup_after_days)
+    report = {"moved": 0, "batches": 0, "already_applied": 0}
+
+    while True:
+        docs = list(
+            logs.find(
+                {"timestamp": {"$lt": cutoff}},
+                {"guild_id": 1, "user_id": 1, "opponent_id": 1, "timestamp": 1},
+            ).sort("_id", ASCENDING).limit(chunk_size)
+        )
+        if not docs:
+            break
+
+        groups: Dict[Tuple[str, datetime], List[Dict[str, Any]]] = defaultdict(list)
+        for doc in docs:
+            day = _as_utc(doc["timestamp"]).replace(hour=0, minute=0, second=0, microsecond=0)
+            groups[(str(doc.get("guild_id")), day)].append(doc)
+        for (guild_id, day), batch in groups.items():
+            if _apply_batch(summaries, guild_id, day, batch):
+                report["batches"] += 1
+            else:
+                report["already_applied"] += 1
+
+        result = logs.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}})
+        report["moved"] += result.deleted_count
+        if len(docs) < chunk_size:
+            break
+
+    logger.info(
+        f"Battle log compaction moved {report['moved']} logs into {report['batches']} summary batches "
+        f"({report['already_applied']} already applied)"
+    )
+    return report
+
+
+def get_daily_summaries(summaries, guild_id: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+    """Daily summaries for a guild with start <= day < end, oldest first."""
+    return list(summaries.find(
+        {"guild_id": str(guild_id), "day": {"$gte": start, "$lt": end}},
+        {"batches": 0},
+    ).sort("day", ASCENDING))
+
+
+def top_pairs(summary: Dict[str, Any], limit: int = 5) -> List[Tuple[str, str, int]]:
+    """The most frequent pairs in a summary as (user_id, opponent_id, battles)."""
+    ranked = sorted(summary.get("pair_counts", {}).items(), key=lambda item: (-item[1], item[0]))
+    return [(*key.split(":", 1), count) for key, count in ranked[:limit]]
@@ -0,0 +1,190 @@
+# services/database/connection.py
+"""Process-wide MongoDB client registry.
+
+Every module that needs the database asks this registry for a handle instead of
+constructing its own MongoClient, so the bot keeps one connection pool and one
+set of monitor threads. Pool size, timeouts and read preference come from
+config.settings.
+"""
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from pymongo import MongoClient, monitoring
+from pymongo.collection import Collection
+from pymongo.database import Database
+
+from config.settings import (
+    MONGODB_URI,
+    MONGODB_DB_NAME,
+    MONGODB_MAX_POOL_SIZE,
+    MONGODB_MIN_POOL_SIZE,
+    MONGODB_MAX_IDLE_TIME_MS,
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+    MONGODB_CONNECT_TIMEOUT_MS,
+    MONGODB_SOCKET_TIMEOUT_MS,
+    MONGODB_READ_PREFERENCE,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Counts connection pool events so the registry can report pool usage."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pools = 0
+        self.pool_clears = 0
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.checkout_failures = 0
+
+    def _bump(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def pool_created(self, event):
+        self._bump("pools")
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._bump("pool_clears")
+
+    def pool_closed(self, event):
+        with self._lock:
+            self.pools = max(0, self.pools - 1)
+
+    def connection_created(self, event):
+        self._bump("connections_created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._bump("connections_closed")
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._bump("checkout_failures")
+
+    def connection_checked_out(self, event):
+        self._bump("checkouts")
+
+    def connection_checked_in(self, event):
+        self._bump("checkins")
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "pools": self.pools,
+                "pool_clears": self.pool_clears,
+                "connections_created": self.connections_created,
+                "connections_closed": self.connections_closed,
+                "connections_open": self.connections_created - self.connections_closed,
+                "connections_in_use": self.checkouts - self.checkins,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+            }
+
+
+_client: Optional[MongoClient] = None
+_pool_listener: Optional[PoolStatsListener] = None
+_client_lock = threading.Lock()
+
+
+def get_client_options() -> Dict[str, Any]:
+    """Keyword arguments used to construct the shared MongoClient."""
+    return {
+        "maxPoolSize": MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": MONGODB_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGODB_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": MONGODB_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": MONGODB_SOCKET_TIMEOUT_MS,
+        "readPreference": MONGODB_READ_PREFERENCE,
+    }
+
+
+def get_client() -> MongoClient:
+    """Return the shared MongoClient, creating it on first use."""
+    global _client, _pool_listener
+    if _client is not None:
+        return _client
+    with _client_lock:
+        if _client is None:
+            listener = PoolStatsListener()
+            _client = MongoClient(MONGODB_URI, event_listeners=[listener], **get_client_options())
+            _pool_listener = listener
+            logger.debug(
+                "Shared MongoDB client created (maxPoolSize=%s, readPreference=%s)",
+                MONGODB_MAX_POOL_SIZE, MONGODB_READ_PREFERENCE,
+            )
+    return _client
+
+
+def get_database(name: Optional[str] = None) -> Database:
+    """Return a database handle from the shared client."""
+    return get_client()[name or MONGODB_DB_NAME]
+
+
+def get_collection(name: str, db_name: Optional[str] = None) -> Collection:
+    """Return a collection handle from the shared client."""
+    return get_database(db_name)[name]
+
+
+def ping() -> bool:
+    """Ping the server through the shared client; returns False if unreachable."""
+    try:
+        get_client().admin.command("ping")
+        return True
+    except Exception as e:
+        logger.error("MongoDB ping failed: %s", e)
+        return False
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Report configured limits and live counters for the shared connection pool."""
+    stats: Dict[str, Any] = {
+        "initialized": _client is not None,
+        "max_pool_size": MONGODB_MAX_POOL_SIZE,
+        "min_pool_size": MONGODB_MIN_POOL_SIZE,
+        "read_preference": MONGODB_READ_PREFERENCE,
+    }
+    if _pool_listener is not None:
+        stats.update(_pool_listener.snapshot())
+    return stats
+
+
+def close_client() -> None:
+    """Close the shared client and its pool (a new one is created on next use)."""
+    global _client, _pool_listener
+    with _client_lock:
+        if _client is None:
+            return
+        logger.info("Closing shared MongoDB client. Pool stats: %s", get_pool_stats())
+        try:
+            _client.close()
+        finally:
+            _client = None
+            _pool_listener = None
+
+
+__all__ = [
+    "PoolStatsListener",
+    "get_client_options",
+    "get_client",
+    "get_database",
+    "get_collection",
+    "ping",
+    "get_pool_stats",
+    "close_client",
+]
@@ -49,8 +49,9 @@ class Pet:
     balance: int = 0 # Added balance field
     killstreak: int = 0
     loss_streak: int = 0
-    daily_quests: List[PetQuest] = field(default_factory=list)
-    achievements: List[PetAchievement] = field(default_factory=list)
+    # Stored as {quest/achievement id: progress}; petquests.hydrate_* builds PetQuest-shaped entries
+    daily_quests: Dict[str, int] = field(default_factory=dict)
+    achievements: Dict[str, int] = field(default_factory=dict)
     active_items: List[ActiveItem] = field(default_factory=list) # Added active items/buffs
     last_vote_reward_time: Optional[str] = None
     claimed_daily_completion_bonus: bool = False # Track if daily bonus was claimed
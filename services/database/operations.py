@@ -2,15 +2,13 @@ import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timezone
 
-from pymongo import MongoClient
-
-from config.settings import MONGODB_URI
+from services.database.connection import get_client, get_database
 
 logger = logging.getLogger(__name__)
 
-# Initialize MongoDB client
-client = MongoClient(MONGODB_URI)
-db = client['astrostats_database']
+# Shared MongoDB client
+client = get_client()
+db = get_database()
 
 # Collections
 pets_collection = db['pets']
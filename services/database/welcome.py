@@ -6,7 +6,7 @@ from typing import Optional, Dict, Any
 from pymongo import MongoClient
 from pymongo.errors import PyMongoError
 
-from config.settings import MONGODB_URI
+from services.database.connection import get_client
 from services.database.models import WelcomeSettings
 
 logger = logging.getLogger(__name__)
@@ -25,7 +25,7 @@ def _init_db_if_needed() -> None:
     if _mongo_client is not None and _welcome_collection is not None:
         return
     try:
-        _mongo_client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=30000, connectTimeoutMS=20000, socketTimeoutMS=20000)
+        _mongo_client = get_client()
         db = _mongo_client[WELCOME_DB_NAME]
         _welcome_collection = db[WELCOME_COLLECTION_NAME]
         # Light ping
@@ -12,6 +12,8 @@ import unicodedata
 import math
 import random
 
+from services.api.http import http_session
+
 # Try to import PIL, fallback if not available
 try:
     from PIL import Image, ImageDraw, ImageFont, ImageFilter
@@ -36,7 +38,7 @@ class BattleImageGenerator:
     async def download_avatar(self, avatar_url: str) -> Optional[Image.Image]:
         """Download and process user avatar."""
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_session(avatar_url) as session:
                 async with session.get(avatar_url) as response:
                     if response.status == 200:
                         avatar_data = await response.read()
@@ -1,12 +1,15 @@
+import asyncio
 import logging
 import os
+import threading
 import time
-from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from pymongo import MongoClient
 from pymongo.errors import PyMongoError
 
-from config.settings import MONGODB_URI
+from services.database.connection import get_client
 
 
 logger = logging.getLogger(__name__)
@@ -21,9 +24,61 @@ _mongo_client: Optional[MongoClient] = None
 _users_collection = None
 _fallback_users_collection = None
 
-# Simple in-memory cache: discordId -> (expires_at_epoch_s, entitlements_dict)
-_ENTITLEMENTS_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
 _CACHE_TTL_SECONDS = 5 * 60
+# Users with no account are the common case; cache their free entitlements too
+_NEGATIVE_CACHE_TTL_SECONDS = int(os.getenv("ENTITLEMENTS_NEGATIVE_TTL_SECONDS", _CACHE_TTL_SECONDS))
+# Lookups that raised are only cached briefly so a DB blip doesn't pin users to free
+_ERROR_CACHE_TTL_SECONDS = 30
+_CACHE_MAX_ENTRIES = int(os.getenv("ENTITLEMENTS_CACHE_SIZE", 10000))
+
+
+class _EntitlementsCache(OrderedDict):
+    """
+    discordId -> (expires_at_epoch_s, entitlements_dict), bounded to max_entries.
+    Expired entries are dropped when read; the least recently used go first once full.
+    """
+
+    def __init__(self, max_entries: int):
+        super().__init__()
+        self.max_entries = max_entries
+        # Written from the event loop, the database pool and the change-stream watcher
+        self._lock = threading.RLock()
+
+    def __setitem__(self, key: str, value: Tuple[float, Dict[str, Any]]) -> None:
+        with self._lock:
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            while len(self) > self.max_entries:
+                self.popitem(last=False)
+
+    def pop(self, key: str, *default: Any) -> Any:
+        with self._lock:
+            return super().pop(key, *default)
+
+    def clear(self) -> None:
+        with self._lock:
+            super().clear()
+
+    def lookup(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        """Return unexpired entitlements for key, dropping the entry if it has expired."""
+        with self._lock:
+            entry = super().get(key)
+            if entry is None:
+                return None
+            if now >= entry[0]:
+                super().pop(key, None)
+                return None
+            self.move_to_end(key)
+            return entry[1]
+
+
+_ENTITLEMENTS_CACHE = _EntitlementsCache(_CACHE_MAX_ENTRIES)
+# TTL for users with an account; raised while services.premium.watcher pushes invalidations
+_positive_ttl_seconds = _CACHE_TTL_SECONDS
+# Bumped on every invalidation so lookups that raced one don't cache what they read
+_invalidation_count = 0
+# discordId -> future resolving to a {discordId: entitlements} batch that includes it
+_INFLIGHT_LOOKUPS: Dict[str, "asyncio.Future[Dict[str, Dict[str, Any]]]"] = {}
 
 
 def initialize_premium_service() -> None:
@@ -36,12 +91,7 @@ def _init_db_if_needed() -> None:
     if _mongo_client is not None and _users_collection is not None:
         return
     try:
-        _mongo_client = MongoClient(
-            MONGODB_URI, 
-            serverSelectionTimeoutMS=30000,
-            connectTimeoutMS=20000,
-            socketTimeoutMS=20000
-        )
+        _mongo_client = get_client()
         db = _mongo_client[USERS_DB_NAME]
         _users_collection = db[USERS_COLLECTION_NAME]
         # prepare fallback collection handle too
@@ -62,11 +112,16 @@ def _init_db_if_needed() -> None:
         _fallback_users_collection = None
 
 
-def get_user_by_discord_id(discord_id: str) -> Optional[Dict[str, Any]]:
-    """Fetch the user document by exact discordId string. Returns None on not found or DB error."""
+def get_user_by_discord_id(discord_id: str, raise_errors: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Fetch the user document by exact discordId string. Returns None on not found or DB error;
+    with raise_errors, a DB error (or no connection) is raised instead so callers can tell it apart.
+    """
     try:
         _init_db_if_needed()
         if _users_collection is None:
+            if raise_errors:
+                raise PyMongoError("premium users collection is unavailable")
             return None
         doc = _users_collection.find_one({"discordId": str(discord_id)})
         if not doc and _fallback_users_collection is not None:
@@ -77,9 +132,13 @@ def get_user_by_discord_id(discord_id: str) -> Optional[Dict[str, Any]]:
         return doc
     except PyMongoError as e:
         logger.error("DB error fetching user by discordId %s: %s", discord_id, e, exc_info=True)
+        if raise_errors:
+            raise
         return None
     except Exception as e:
         logger.error("Unexpected error fetching user by discordId %s: %s", discord_id, e, exc_info=True)
+        if raise_errors:
+            raise
         return None
 
 
@@ -106,6 +165,25 @@ def is_premium_active(user_doc: Optional[Dict[str, Any]], now_epoch_s: Optional[
     return True
 
 
+def _cache_expiry(user_doc: Optional[Dict[str, Any]], now: float, ttl: float) -> float:
+    """
+    When a cached entitlement for user_doc should expire: after ttl, but no later than the end
+    of the paid period, because a subscription lapsing on time produces no change event.
+    """
+    expires_at = now + ttl
+    period_end = (user_doc or {}).get("currentPeriodEnd")
+    if period_end is None:
+        return expires_at
+    try:
+        period_end = int(period_end)
+    except Exception:
+        return expires_at
+    # Already lapsed: the doc resolves to free, which only a change event can alter
+    if period_end <= now:
+        return expires_at
+    return min(expires_at, period_end)
+
+
 def _tier_entitlements(role: Optional[str]) -> Dict[str, Any]:
     # Map exactly; unknown or None -> free
     tiers: Dict[str, Dict[str, Any]] = {
@@ -182,39 +260,167 @@ def get_entitlements(user_doc: Optional[Dict[str, Any]]) -> Dict[str, Any]:
 def get_user_entitlements(discord_id: str) -> Dict[str, Any]:
     """Get entitlements for a discordId with a 5-minute cache. On DB error, return free."""
     now = time.time()
-    cache_entry = _ENTITLEMENTS_CACHE.get(str(discord_id))
-    if cache_entry:
-        expires_at, ent = cache_entry
-        if now < expires_at:
-            return ent
+    ent = _ENTITLEMENTS_CACHE.lookup(str(discord_id), now)
+    if ent is not None:
+        return ent
 
+    invalidations = _invalidation_count
     try:
-        # Attempt to get user data with timeout protection
-        user_doc = get_user_by_discord_id(str(discord_id))
+        # Errors must reach us so an outage is cached for the error TTL, not as "no account"
+        user_doc = get_user_by_discord_id(str(discord_id), raise_errors=True)
         ent = get_entitlements(user_doc)
+        expires_at = (_cache_expiry(user_doc, now, _positive_ttl_seconds) if user_doc
+                      else now + _NEGATIVE_CACHE_TTL_SECONDS)
     except Exception as e:
         logger.warning("Falling back to free entitlements due to error for discordId %s: %s", discord_id, e)
         ent = _tier_entitlements(None)
+        expires_at = now + _ERROR_CACHE_TTL_SECONDS
 
     # Cache the result even if it's free tier due to error
-    _ENTITLEMENTS_CACHE[str(discord_id)] = (now + _CACHE_TTL_SECONDS, ent)
+    if invalidations == _invalidation_count:
+        _ENTITLEMENTS_CACHE[str(discord_id)] = (expires_at, ent)
     return ent
 
 
+def get_many_entitlements(discord_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Get entitlements for many discordIds using one $in query per users collection. On DB error, return free."""
+    now = time.time()
+    result: Dict[str, Dict[str, Any]] = {}
+    missing: List[str] = []
+    for discord_id in {str(d) for d in discord_ids}:
+        ent = _ENTITLEMENTS_CACHE.lookup(discord_id, now)
+        if ent is not None:
+            result[discord_id] = ent
+        else:
+            missing.append(discord_id)
+    if not missing:
+        return result
+
+    docs: Dict[str, Dict[str, Any]] = {}
+    failed = False
+    invalidations = _invalidation_count
+    try:
+        _init_db_if_needed()
+        if _users_collection is None:
+            raise PyMongoError("premium users collection is unavailable")
+        for doc in _users_collection.find({"discordId": {"$in": missing}}):
+            docs[str(doc.get("discordId"))] = doc
+        not_found = [d for d in missing if d not in docs]
+        if not_found and _fallback_users_collection is not None:
+            for doc in _fallback_users_collection.find({"discordId": {"$in": not_found}}):
+                docs.setdefault(str(doc.get("discordId")), doc)
+    except Exception as e:
+        failed = True
+        logger.warning("Falling back to free entitlements for %d users due to error: %s", len(missing), e)
+
+    for discord_id in missing:
+        user_doc = docs.get(discord_id)
+        ent = get_entitlements(user_doc)
+        if user_doc:
+            expires_at = _cache_expiry(user_doc, now, _positive_ttl_seconds)
+        else:
+            expires_at = now + (_ERROR_CACHE_TTL_SECONDS if failed else _NEGATIVE_CACHE_TTL_SECONDS)
+        if invalidations == _invalidation_count:
+            _ENTITLEMENTS_CACHE[discord_id] = (expires_at, ent)
+        result[discord_id] = ent
+    return result
+
+
+async def _lookup_batch(discord_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    from services.database.async_operations import run_blocking
+
+    try:
+        return await run_blocking(get_many_entitlements, discord_ids)
+    except Exception as e:
+        logger.warning("Falling back to free entitlements for %d users due to error: %s", len(discord_ids), e)
+        return {discord_id: _tier_entitlements(None) for discord_id in discord_ids}
+
+
+async def get_many_entitlements_async(discord_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Awaitable get_many_entitlements. Cache hits are answered without leaving the event loop;
+    misses are resolved in one batch on the database thread pool, and callers asking for a
+    user whose lookup is already in flight wait for that lookup instead of starting another.
+    """
+    now = time.time()
+    result: Dict[str, Dict[str, Any]] = {}
+    pending: Dict[str, "asyncio.Future[Dict[str, Dict[str, Any]]]"] = {}
+    missing: List[str] = []
+    for discord_id in {str(d) for d in discord_ids}:
+        ent = _ENTITLEMENTS_CACHE.lookup(discord_id, now)
+        if ent is not None:
+            result[discord_id] = ent
+        elif discord_id in _INFLIGHT_LOOKUPS:
+            pending[discord_id] = _INFLIGHT_LOOKUPS[discord_id]
+        else:
+            missing.append(discord_id)
+
+    if missing:
+        batch = asyncio.ensure_future(_lookup_batch(missing))
+        for discord_id in missing:
+            _INFLIGHT_LOOKUPS[discord_id] = batch
+            pending[discord_id] = batch
+
+        def _clear_inflight(done: "asyncio.Future", keys: List[str] = missing) -> None:
+            for key in keys:
+                if _INFLIGHT_LOOKUPS.get(key) is done:
+                    del _INFLIGHT_LOOKUPS[key]
+
+        batch.add_done_callback(_clear_inflight)
+
+    for discord_id, future in pending.items():
+        # Shield so one cancelled caller doesn't cancel the lookup others are waiting on
+        batch_result = await asyncio.shield(future)
+        result[discord_id] = batch_result.get(discord_id) or _tier_entitlements(None)
+    return result
+
+
+async def get_user_entitlements_async(discord_id: str) -> Dict[str, Any]:
+    """Awaitable get_user_entitlements; concurrent misses for the same user share one lookup."""
+    return (await get_many_entitlements_async([discord_id]))[str(discord_id)]
+
+
 def invalidate_user_entitlements(discord_id: str) -> None:
     """Invalidate cached entitlements for a user."""
+    global _invalidation_count
     try:
+        _invalidation_count += 1
         _ENTITLEMENTS_CACHE.pop(str(discord_id), None)
     except Exception:
         pass
 
 
+def invalidate_all_entitlements() -> None:
+    """Drop every cached entitlement, e.g. after missing user change events."""
+    global _invalidation_count
+    _invalidation_count += 1
+    _ENTITLEMENTS_CACHE.clear()
+
+
+def refresh_user_entitlements(user_doc: Dict[str, Any]) -> None:
+    """Replace a user's cached entitlements from a freshly read user document."""
+    global _invalidation_count
+    discord_id = str(user_doc.get("discordId"))
+    _invalidation_count += 1
+    _ENTITLEMENTS_CACHE[discord_id] = (_cache_expiry(user_doc, time.time(), _positive_ttl_seconds),
+                                       get_entitlements(user_doc))
+
+
+def set_entitlements_ttl(seconds: Optional[int]) -> None:
+    """Set how long entitlements of users with an account are cached; None restores the default."""
+    global _positive_ttl_seconds
+    _positive_ttl_seconds = _CACHE_TTL_SECONDS if seconds is None else seconds
+
+
 __all__ = [
     "initialize_premium_service",
     "get_user_by_discord_id",
     "is_premium_active",
     "get_entitlements",
     "get_user_entitlements",
+    "get_many_entitlements",
+    "get_user_entitlements_async",
+    "get_many_entitlements_async",
     "invalidate_user_entitlements",
 ]
 
@@ -0,0 +1,167 @@
+"""Push-based entitlement invalidation from MongoDB change streams on the users collections.
+
+While the watcher is running, each insert/update/replace of a user document refreshes (primary
+collection) or invalidates (fallback collection) exactly that user's cached entitlements, so the
+cache TTL can be raised to ENTITLEMENTS_WATCHED_TTL_SECONDS. Change streams need a replica set;
+on a standalone server or mongomock the watcher stops and the normal TTL applies.
+"""
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+import services.premium as premium
+
+logger = logging.getLogger(__name__)
+
+WATCH_ENABLED = os.getenv("ENTITLEMENTS_CHANGE_STREAMS", "true").lower() in ("1", "true", "yes")
+WATCHED_TTL_SECONDS = int(os.getenv("ENTITLEMENTS_WATCHED_TTL_SECONDS", 6 * 60 * 60))
+# Server error codes meaning change streams will never work on this deployment
+_UNSUPPORTED_CODES = {40573, 115}
+_RETRY_SECONDS = 5
+_MAX_RETRY_SECONDS = 300
+
+
+class ChangeStreamsUnsupported(Exception):
+    """The deployment cannot open change streams."""
+
+
+class EntitlementsWatcher:
+    """Background thread per users collection, applying change events to the entitlements cache."""
+
+    def __init__(self, collections: List[Any], watched_ttl_seconds: int = WATCHED_TTL_SECONDS):
+        # The first collection is authoritative; later ones only matter when it has no document
+        self.collections = collections
+        self.watched_ttl_seconds = watched_ttl_seconds
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._connected = [False] * len(collections)
+        self._state_lock = threading.Lock()
+        self.events_applied = 0
+
+    @property
+    def active(self) -> bool:
+        """True while every collection's stream is open, i.e. no update can be missed."""
+        return bool(self._connected) and all(self._connected)
+
+    def start(self) -> None:
+        for index, collection in enumerate(self.collections):
+            thread = threading.Thread(
+                target=self._run, args=(index, collection),
+                name=f"entitlements-watch-{index}", daemon=True,
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads = []
+        premium.set_entitlements_ttl(None)
+
+    def _set_connected(self, index: int, connected: bool) -> None:
+        with self._state_lock:
+            was_active = self.active
+            self._connected[index] = connected
+            if self.active and not was_active:
+                premium.set_entitlements_ttl(self.watched_ttl_seconds)
+                logger.info("Entitlements change streams active; cache TTL raised to %ss", self.watched_ttl_seconds)
+            elif was_active and not self.active:
+                # Events may be missed until the stream reopens, so nothing cached under the long TTL can be trusted
+                premium.set_entitlements_ttl(None)
+                premium.invalidate_all_entitlements()
+
+    def apply_change(self, index: int, change: Dict[str, Any]) -> None:
+        """Refresh or invalidate the cache entry for the user a change event touched."""
+        operation = change.get("operationType")
+        if operation in ("insert", "update", "replace"):
+            doc = change.get("fullDocument")
+            discord_id = (doc or {}).get("discordId")
+            if discord_id is None:
+                # Document deleted again before the lookup, or not a bot user
+                return
+            if index == 0:
+                premium.refresh_user_entitlements(doc)
+            else:
+                premium.invalidate_user_entitlements(discord_id)
+            self.events_applied += 1
+        elif operation == "delete":
+            # Only the _id survives a delete; deletes are rare enough to flush everything
+            premium.invalidate_all_entitlements()
+            self.events_applied += 1
+        elif operation in ("drop", "rename", "dropDatabase", "invalidate"):
+            premium.invalidate_all_entitlements()
+
+    def _watch(self, index: int, collection: Any, resume_token: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        try:
+            stream = collection.watch(
+                full_document="updateLookup", max_await_time_ms=1000, resume_after=resume_token,
+            )
+        except OperationFailure as e:
+            if e.code in _UNSUPPORTED_CODES:
+                raise ChangeStreamsUnsupported(str(e)) from e
+            raise
+        except (AttributeError, TypeError, NotImplementedError) as e:
+            # mongomock and other stand-ins have no watch()
+            raise ChangeStreamsUnsupported(str(e)) from e
+
+        with stream:
+            self._set_connected(index, True)
+            while not self._stop.is_set():
+                change = stream.try_next()
+                resume_token = stream.resume_token or resume_token
+                if change is not None:
+                    self.apply_change(index, change)
+        return resume_token
+
+    def _run(self, index: int, collection: Any) -> None:
+        resume_token = None
+        delay = _RETRY_SECONDS
+        while not self._stop.is_set():
+            try:
+                resume_token = self._watch(index, collection, resume_token)
+            except ChangeStreamsUnsupported as e:
+                logger.info("Change streams unavailable for entitlements (%s); using %ss cache TTL", e, premium._CACHE_TTL_SECONDS)
+                self._set_connected(index, False)
+                return
+            except PyMongoError as e:
+                logger.warning("Entitlements change stream lost: %s; retrying in %ss", e, delay)
+                self._set_connected(index, False)
+                if isinstance(e, OperationFailure):
+                    # The resume token may have fallen off the oplog
+                    resume_token = None
+                self._stop.wait(delay)
+                delay = min(delay * 2, _MAX_RETRY_SECONDS)
+                continue
+            except Exception as e:
+                logger.error("Entitlements watcher stopped: %s", e, exc_info=True)
+                self._set_connected(index, False)
+                return
+            delay = _RETRY_SECONDS
+        self._set_connected(index, False)
+
+
+_watcher: Optional[EntitlementsWatcher] = None
+
+
+def start_entitlements_watcher() -> Optional[EntitlementsWatcher]:
+    """Start watching the users collections if enabled and initialized; returns the watcher."""
+    global _watcher
+    if not WATCH_ENABLED or _watcher is not None:
+        return _watcher
+    collections = [c for c in (premium._users_collection, premium._fallback_users_collection) if c is not None]
+    if not collections:
+        return None
+    _watcher = EntitlementsWatcher(collections)
+    _watcher.start()
+    return _watcher
+
+
+def stop_entitlements_watcher() -> None:
+    global _watcher
+    if _watcher is not None:
+        _watcher.stop()
+        _watcher = None
@@ -132,7 +132,7 @@ class TestApexStatsWorkflows:
             
             # 2. Call Apex API ✓
             from services.api.apex import fetch_apex_stats
-            api_response = fetch_apex_stats(platform, username)
+            api_response = await fetch_apex_stats(platform, username)
             
             # 3. Parse response data ✓
             segments = api_response["data"]["segments"]
@@ -237,7 +237,7 @@ class TestApexStatsWorkflows:
                 
                 try:
                     from services.api.apex import fetch_apex_stats
-                    result = fetch_apex_stats("Xbox", "testuser")
+                    result = await fetch_apex_stats("Xbox", "testuser")
                 except Exception as e:
                     error_occurred = True
                     error_type = type(e).__name__
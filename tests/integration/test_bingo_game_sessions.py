@@ -0,0 +1,155 @@
+"""
+Integration tests for Bingo game sessions.
+Runs the real game loop against an in-memory sessions collection and checks
+how many database writes each called number costs.
+"""
+import copy
+import random
+
+import discord
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from cogs.systems.bingo_game import (
+    BINGO_RANGE_MAX,
+    HALFWAY_POINT_RATIO,
+    build_number_call_update,
+    check_bingo,
+    generate_bingo_card,
+    run_game_loop,
+)
+
+
+class FakeSessionsCollection:
+    """Minimal in-memory stand-in for bingo_sessions that records every query"""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.find_one_calls = 0
+        self.update_calls = []
+
+    def find_one(self, query):
+        self.find_one_calls += 1
+        return copy.deepcopy(self.doc)
+
+    def update_one(self, query, update, array_filters=None):
+        self.update_calls.append((query, update, array_filters))
+        filters = {}
+        for f in array_filters or []:
+            (key, cond), = f.items()
+            name, field = key.split(".")
+            filters[name] = (field, set(cond["$in"]))
+
+        def targets(path):
+            _, ident, field = path.split(".", 2)
+            name = ident[2:-1]
+            key, allowed = filters[name]
+            return [p for p in self.doc["participants"] if p[key] in allowed], field
+
+        for field, value in update.get("$push", {}).items():
+            self.doc.setdefault(field, []).append(value)
+        for path, value in update.get("$addToSet", {}).items():
+            players, field = targets(path)
+            for p in players:
+                if value not in p[field]:
+                    p[field].append(value)
+        for path, value in update.get("$set", {}).items():
+            if path.startswith("participants.$["):
+                players, field = targets(path)
+                for p in players:
+                    p[field] = value
+            else:
+                self.doc[path] = value
+        return MagicMock(modified_count=1)
+
+
+def make_game(players):
+    return {
+        "_id": "game-1",
+        "guild_id": "987654321",
+        "current_game_state": "in_progress",
+        "called_numbers": [],
+        "halfway_break_shown": False,
+        "participants": [
+            {
+                "user_id": str(1000 + i),
+                "username": f"player{i}",
+                "card": generate_bingo_card(),
+                "marked": [],
+                "has_bingo": False,
+            }
+            for i in range(players)
+        ],
+    }
+
+
+async def run_loop_until_winner(sessions):
+    channel = MagicMock(spec=discord.TextChannel)
+    channel.send = AsyncMock(return_value=MagicMock(edit=AsyncMock()))
+    interaction = MagicMock()
+    interaction.channel = channel
+
+    with patch('cogs.systems.bingo_game.bingo_sessions', sessions), \
+         patch('cogs.systems.bingo_game.NUMBER_CALL_DELAY', 0), \
+         patch('cogs.systems.bingo_game.asyncio.sleep', new=AsyncMock()), \
+         patch('cogs.systems.bingo_game.ViewCardButton', MagicMock()), \
+         patch('cogs.systems.bingo_game.conclude_game', new=AsyncMock(return_value=[MagicMock()])) as mock_conclude, \
+         patch('cogs.systems.bingo_game.safe_send_with_view', new=AsyncMock()), \
+         patch('cogs.systems.bingo_game.get_premium_promotion_view', return_value=None):
+        await run_game_loop(MagicMock(), interaction, "game-1", "987654321")
+    return mock_conclude
+
+
+class TestBingoGameSessions:
+    """Test complete Bingo game sessions"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("players", [5, 50])
+    async def test_one_write_per_called_number(self, players):
+        """Each called number costs exactly one update, regardless of player count"""
+        random.seed(players)
+        sessions = FakeSessionsCollection(make_game(players))
+
+        mock_conclude = await run_loop_until_winner(sessions)
+
+        numbers_called = len(sessions.doc["called_numbers"])
+        halfway_writes = 1 if numbers_called >= int(BINGO_RANGE_MAX * HALFWAY_POINT_RATIO) else 0
+        call_writes = [u for u in sessions.update_calls if "$push" in u[1]]
+
+        assert len(call_writes) == numbers_called
+        assert len(sessions.update_calls) == numbers_called + halfway_writes
+        # One read per loop iteration: every call plus the final winner check
+        assert sessions.find_one_calls == numbers_called + 1
+        mock_conclude.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_stored_state_matches_calls(self):
+        """Marks and bingo flags written in the single update match the called numbers"""
+        random.seed(3)
+        sessions = FakeSessionsCollection(make_game(10))
+
+        await run_loop_until_winner(sessions)
+
+        called = set(sessions.doc["called_numbers"])
+        winners = [p for p in sessions.doc["participants"] if p["has_bingo"]]
+        assert winners
+        for p in sessions.doc["participants"]:
+            on_card = {n for row in p["card"] for n in row if n in called}
+            assert set(p["marked"]) == on_card
+            assert p["has_bingo"] == check_bingo(p["card"], called)
+
+    def test_build_number_call_update_without_hits(self):
+        """A number on nobody's card only pushes the call"""
+        update, array_filters = build_number_call_update(42, [], [])
+
+        assert update == {"$push": {"called_numbers": 42}}
+        assert array_filters == []
+
+    def test_build_number_call_update_with_bingo(self):
+        """Marks and bingos are addressed with array filters"""
+        update, array_filters = build_number_call_update(7, ["1", "2"], ["2"])
+
+        assert update["$addToSet"] == {"participants.$[hit].marked": 7}
+        assert update["$set"] == {"participants.$[won].has_bingo": True}
+        assert {"hit.user_id": {"$in": ["1", "2"]}} in array_filters
+        assert {"won.user_id": {"$in": ["2"]}} in array_filters
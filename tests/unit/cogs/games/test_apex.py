@@ -54,12 +54,11 @@ class TestApexCog:
 
     @pytest.mark.asyncio
     async def test_apex_command_success(self, apex_cog, mock_interaction, mock_apex_data):
-        with patch('cogs.games.apex.fetch_apex_stats') as mock_fetch, \
+        with patch('cogs.games.apex.fetch_apex_stats', new_callable=AsyncMock) as mock_fetch, \
              patch('cogs.games.apex.get_conditional_embed') as mock_conditional, \
-             patch('cogs.games.apex.get_premium_promotion_view') as mock_premium_view, \
-             patch('asyncio.to_thread') as mock_thread:
+             patch('cogs.games.apex.get_premium_promotion_view') as mock_premium_view:
             
-            mock_thread.return_value = mock_apex_data
+            mock_fetch.return_value = mock_apex_data
             mock_conditional.return_value = None
             mock_premium_view.return_value = MagicMock()
             
@@ -85,10 +84,10 @@ class TestApexCog:
 
     @pytest.mark.asyncio
     async def test_apex_command_resource_not_found(self, apex_cog, mock_interaction):
-        with patch('asyncio.to_thread') as mock_thread, \
+        with patch('cogs.games.apex.fetch_apex_stats', new_callable=AsyncMock) as mock_fetch, \
              patch('cogs.games.apex.send_error_embed') as mock_error:
             
-            mock_thread.side_effect = ResourceNotFoundError("User not found")
+            mock_fetch.side_effect = ResourceNotFoundError("User not found")
             
             await apex_cog.stats.callback(apex_cog, mock_interaction, "Xbox", "nonexistentuser")
             
@@ -98,10 +97,10 @@ class TestApexCog:
 
     @pytest.mark.asyncio
     async def test_apex_command_api_error(self, apex_cog, mock_interaction):
-        with patch('asyncio.to_thread') as mock_thread, \
+        with patch('cogs.games.apex.fetch_apex_stats', new_callable=AsyncMock) as mock_fetch, \
              patch('cogs.games.apex.send_error_embed') as mock_error:
             
-            mock_thread.side_effect = Exception("API Error")
+            mock_fetch.side_effect = Exception("API Error")
             
             await apex_cog.stats.callback(apex_cog, mock_interaction, "Xbox", "testuser")
             
@@ -111,10 +110,10 @@ class TestApexCog:
 
     @pytest.mark.asyncio
     async def test_apex_command_no_data(self, apex_cog, mock_interaction):
-        with patch('asyncio.to_thread') as mock_thread, \
+        with patch('cogs.games.apex.fetch_apex_stats', new_callable=AsyncMock) as mock_fetch, \
              patch('cogs.games.apex.send_error_embed') as mock_error:
             
-            mock_thread.return_value = {}
+            mock_fetch.return_value = {}
             
             await apex_cog.stats.callback(apex_cog, mock_interaction, "Xbox", "testuser")
             
@@ -124,10 +123,10 @@ class TestApexCog:
 
     @pytest.mark.asyncio
     async def test_apex_command_no_segments(self, apex_cog, mock_interaction):
-        with patch('asyncio.to_thread') as mock_thread, \
+        with patch('cogs.games.apex.fetch_apex_stats', new_callable=AsyncMock) as mock_fetch, \
              patch('cogs.games.apex.send_error_embed') as mock_error:
 
-            mock_thread.return_value = {"data": {"segments": []}}
+            mock_fetch.return_value = {"data": {"segments": []}}
 
             await apex_cog.stats.callback(apex_cog, mock_interaction, "Xbox", "testuser")
 
@@ -135,6 +134,37 @@ class TestApexCog:
             error_call = mock_error.call_args[0]
             assert error_call[1] == "Account Not Found"
 
+    @pytest.mark.asyncio
+    async def test_apex_compare_fetches_players_in_parallel(self, apex_cog, mock_interaction, mock_apex_data):
+        started = []
+        both_started = asyncio.Event()
+
+        async def fetch(platform, name):
+            started.append(name)
+            if len(started) == 2:
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), timeout=1)
+            return mock_apex_data
+
+        with patch('cogs.games.apex.fetch_apex_stats', side_effect=fetch), \
+             patch('cogs.games.apex.send_error_embed') as mock_error:
+            await apex_cog.compare.callback(apex_cog, mock_interaction, "Xbox", "player1", "Playstation", "player2")
+
+        assert started == ["player1", "player2"]
+        mock_error.assert_not_called()
+        mock_interaction.followup.send.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_apex_repeat_lookups_are_served_from_cache(self, apex_cog, mock_apex_data):
+        with patch('cogs.games.apex.fetch_apex_stats', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.return_value = mock_apex_data
+
+            first = await apex_cog._fetch_player_data("Xbox", "Streamer")
+            second = await apex_cog._fetch_player_data("Xbox", " streamer ")
+
+        assert first["data"] is second["data"]
+        mock_fetch.assert_awaited_once_with("Xbox", "Streamer")
+
     def test_build_embed_structure(self, apex_cog, mock_apex_data):
         segments = mock_apex_data["data"]["segments"]
         lifetime = segments[0]["stats"]
@@ -263,11 +293,11 @@ class TestApexCog:
         platforms = ["Xbox", "Playstation", "Origin (PC)"]
         
         for platform in platforms:
-            with patch('asyncio.to_thread') as mock_thread, \
+            with patch('cogs.games.apex.fetch_apex_stats', new_callable=AsyncMock) as mock_fetch, \
                  patch('cogs.games.apex.get_conditional_embed') as mock_conditional, \
                  patch('cogs.games.apex.get_premium_promotion_view') as mock_premium_view:
                 
-                mock_thread.return_value = mock_apex_data
+                mock_fetch.return_value = mock_apex_data
                 mock_conditional.return_value = None
                 mock_premium_view.return_value = MagicMock()
                 
@@ -130,4 +130,53 @@ class TestLeagueCommand:
         
         # Should have well-structured embed fields
         for field in expected_fields:
-            assert len(field) > 0
\ No newline at end of file
+            assert len(field) > 0
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_profiles_share_one_load(self):
+        """Test that the same profile requested at once is only fetched once"""
+        import asyncio
+        from cogs.games.league import LeagueCog
+        from core.singleflight import get_singleflight
+
+        bot = MagicMock()
+        bot.loop.create_task.side_effect = lambda coro: coro.close()
+        cog = LeagueCog(bot)
+        release = asyncio.Event()
+
+        async def load_profile(*args):
+            await release.wait()
+            return {
+                "puuid": "test-puuid",
+                "summoner_data": {"summonerLevel": 150, "profileIconId": 4023},
+                "league_data": [],
+                "live_game_data": None,
+                "participants_data": None,
+            }
+
+        interactions = []
+        for _ in range(3):
+            interaction = MagicMock(spec=discord.Interaction)
+            interaction.user = MagicMock(id=987654321)
+            interaction.response = AsyncMock()
+            interaction.followup = AsyncMock()
+            interactions.append(interaction)
+
+        group = get_singleflight("league_profile")
+        deduplicated = group.deduplicated
+        with patch('cogs.games.league.LOL_API', 'test-key'), \
+             patch.object(cog, '_load_profile', side_effect=load_profile) as mock_load, \
+             patch.object(cog, 'get_latest_ddragon_version', AsyncMock(return_value="14.1.1")), \
+             patch('cogs.games.league.LeagueProfileView'):
+            commands = [
+                asyncio.ensure_future(cog.profile.callback(cog, interaction, "EUW1", riotid))
+                for interaction, riotid in zip(interactions, ["Faker#KR1", "faker#kr1", "FAKER#KR1"])
+            ]
+            await asyncio.sleep(0)
+            release.set()
+            await asyncio.gather(*commands)
+
+        mock_load.assert_called_once()
+        assert group.deduplicated - deduplicated == 2
+        for interaction in interactions:
+            interaction.followup.send.assert_called_once()
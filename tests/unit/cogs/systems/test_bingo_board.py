@@ -0,0 +1,115 @@
+import random
+
+import pytest
+
+from cogs.systems.bingo_game import (
+    check_bingo,
+    count_remaining_numbers,
+    format_bingo_card,
+    generate_bingo_card,
+)
+from cogs.systems.bingo_game.bingoboard import (
+    BingoBoard,
+    FREE_BIT,
+    LINE_MASKS,
+    cell_bit,
+    has_line,
+    marked_mask,
+    remaining_cells,
+)
+
+
+def _scan_has_bingo(card, marked):
+    """Reference list-scan check used before the bitboard engine"""
+    lines = [list(row) for row in card]
+    lines += [[card[r][c] for r in range(5)] for c in range(5)]
+    lines.append([card[i][i] for i in range(5)])
+    lines.append([card[i][4 - i] for i in range(5)])
+    return any(all(n == 0 or n in marked for n in line) for line in lines)
+
+
+class TestBingoBoard:
+    """Test the bitboard bingo engine"""
+
+    def test_line_masks(self):
+        """There are 12 five-cell winning lines, all including distinct cells"""
+        assert len(LINE_MASKS) == 12
+        assert len(set(LINE_MASKS)) == 12
+        assert all(mask.bit_count() == 5 for mask in LINE_MASKS)
+
+    def test_free_cell_always_marked(self):
+        """The centre FREE cell counts as marked"""
+        card = generate_bingo_card()
+
+        mask = marked_mask(card, set())
+
+        assert mask == FREE_BIT
+        assert remaining_cells(mask) == 24
+
+    def test_matches_list_scan(self):
+        """check_bingo and count_remaining_numbers agree with the old scans"""
+        rng = random.Random(7)
+        for _ in range(300):
+            card = generate_bingo_card()
+            marked = set(rng.sample(range(1, 76), rng.randint(0, 60)))
+            numbers = [n for row in card for n in row if n != 0]
+
+            assert check_bingo(card, marked) == _scan_has_bingo(card, marked)
+            assert count_remaining_numbers(card, marked) == sum(1 for n in numbers if n not in marked)
+
+    def test_diagonal_through_free_cell(self):
+        """A diagonal needs only its four numbered cells"""
+        card = generate_bingo_card()
+        marked = {card[i][i] for i in range(5) if i != 2}
+
+        assert check_bingo(card, marked) is True
+        assert has_line(marked_mask(card, marked)) is True
+
+    def test_format_marks_cells(self):
+        """format_bingo_card brackets marked numbers"""
+        card = generate_bingo_card()
+        number = card[0][0]
+
+        text = format_bingo_card(card, {number})
+
+        assert f"[{number:2d}]" in text
+        assert "FREE" in text
+
+    def test_call_touches_only_cards_with_number(self):
+        """The inverted index only updates cards that hold the called number"""
+        card_a = [[1, 16, 31, 46, 61], [2, 17, 32, 47, 62], [3, 18, 0, 48, 63], [4, 19, 34, 49, 64], [5, 20, 35, 50, 65]]
+        card_b = [[6, 21, 36, 51, 66], [7, 22, 37, 52, 67], [8, 23, 0, 53, 68], [9, 24, 39, 54, 69], [10, 25, 40, 55, 70]]
+        board = BingoBoard([card_a, card_b])
+
+        assert board.call(1) == [0]
+        assert board.call(75) == []
+        assert board.masks[0] == FREE_BIT | cell_bit(0, 0)
+        assert board.masks[1] == FREE_BIT
+
+    def test_from_participants_replays_calls(self):
+        """Replaying called numbers reproduces marks, winners and standings"""
+        card_a = [[1, 16, 31, 46, 61], [2, 17, 32, 47, 62], [3, 18, 0, 48, 63], [4, 19, 34, 49, 64], [5, 20, 35, 50, 65]]
+        card_b = [[6, 21, 36, 51, 66], [7, 22, 37, 52, 67], [8, 23, 0, 53, 68], [9, 24, 39, 54, 69], [10, 25, 40, 55, 70]]
+        participants = [{"card": card_a}, {"card": card_b}]
+
+        board = BingoBoard.from_participants(participants, [1, 2, 3, 4, 5, 6])
+
+        assert board.winners() == [0]
+        assert sorted(board.marked_numbers(0)) == [1, 2, 3, 4, 5]
+        assert board.marked_numbers(1) == [6]
+        assert board.standings() == [(0, 19), (1, 23)]
+
+    @pytest.mark.parametrize("players", [1, 10, 50])
+    def test_full_game_matches_reference(self, players):
+        """A whole game on the board matches per-call list scans"""
+        rng = random.Random(players)
+        participants = [{"card": generate_bingo_card()} for _ in range(players)]
+        board = BingoBoard.from_participants(participants)
+        called = set()
+
+        for number in rng.sample(range(1, 76), 75):
+            called.add(number)
+            board.call(number)
+            for index, p in enumerate(participants):
+                assert board.has_bingo(index) == _scan_has_bingo(p["card"], called)
+                assert board.remaining(index) == count_remaining_numbers(p["card"], called)
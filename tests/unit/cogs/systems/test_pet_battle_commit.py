@@ -0,0 +1,228 @@
+import copy
+from unittest.mock import MagicMock, patch
+
+import mongomock
+import pytest
+from bson import ObjectId
+
+from cogs.systems.pet_battles import petcommit
+from cogs.systems.pet_battles.petcommit import (
+    REVISION_FIELD,
+    BattleCommitError,
+    commit_battle,
+    pet_update_diff,
+)
+
+
+def _pet(user_id, **extra):
+    pet = {
+        "_id": ObjectId(),
+        "user_id": user_id,
+        "guild_id": "g",
+        "name": f"Pet{user_id}",
+        "level": 1,
+        "xp": 0,
+        "strength": 10,
+        "defense": 10,
+        "health": 100,
+        "balance": 0,
+        "killstreak": 0,
+        "loss_streak": 0,
+        "battleRecord": {"wins": 0, "losses": 0},
+        "active_items": [],
+        "daily_quests": [],
+        "achievements": [],
+        "claimed_daily_completion_bonus": True,
+    }
+    pet.update(extra)
+    return pet
+
+
+def _stats():
+    return {"damage_dealt": 40, "critical_hits": 1, "lucky_hits": 0, "battles_won": 0, "battles_lost": 0, "xp_earned": 0}
+
+
+class TestPetBattleCommit:
+    """Test the single-write battle commit"""
+
+    @pytest.fixture(autouse=True)
+    def no_entitlements(self):
+        with patch("cogs.systems.pet_battles.petquests.get_user_entitlements", return_value={}):
+            yield
+
+    @pytest.fixture(autouse=True)
+    def reset_transaction_support(self):
+        petcommit._transactions_supported = None
+        yield
+        petcommit._transactions_supported = None
+
+    @pytest.fixture
+    def pets(self):
+        collection = mongomock.MongoClient().db.pets
+
+        # mongomock cannot take pymongo request objects, so apply them one by one
+        def bulk_write(requests, ordered=True):
+            matched = sum(collection.update_one(op._filter, op._doc).matched_count for op in requests)
+            return MagicMock(matched_count=matched)
+
+        collection.bulk_write = MagicMock(side_effect=bulk_write)
+        return collection
+
+    def _reload(self, pets):
+        return lambda pet_id: pets.find_one({"_id": pet_id})
+
+    def test_diff_sends_only_changes(self):
+        """Numbers become $inc, changed list items a positional $set, removed fields $unset"""
+        before = _pet("1", daily_quests=[{"id": 1, "progress": 0}, {"id": 2, "progress": 1}], old_field=True)
+        after = copy.deepcopy(before)
+        after["xp"] += 90
+        after["battleRecord"]["wins"] += 1
+        after["daily_quests"][1]["progress"] = 2
+        after["last_used_ts"] = 1700000000
+        del after["old_field"]
+
+        assert pet_update_diff(before, after) == {
+            "$inc": {"xp": 90, "battleRecord.wins": 1},
+            "$set": {"daily_quests.1": {"id": 2, "progress": 2}, "last_used_ts": 1700000000},
+            "$unset": {"old_field": ""},
+        }
+
+    def test_both_pets_written_in_one_bulk_write(self, pets):
+        """Winner and loser are committed together with only their changed fields"""
+        winner, loser = _pet("1"), _pet("2", killstreak=4)
+        pets.insert_many([copy.deepcopy(winner), copy.deepcopy(loser)])
+
+        (winner_after, winner_result), (loser_after, _) = commit_battle(
+            pets, [(winner, True, _stats(), 100), (loser, False, _stats(), 30)], self._reload(pets), used_at=1700000000,
+        )
+
+        assert pets.bulk_write.call_count == 1
+        assert pets.bulk_write.call_args.kwargs["ordered"] is False
+        stored_winner = pets.find_one({"_id": winner["_id"]})
+        stored_loser = pets.find_one({"_id": loser["_id"]})
+        assert stored_winner["battleRecord"] == {"wins": 1, "losses": 0}
+        assert stored_winner["xp"] == winner_after["xp"]
+        assert stored_winner["last_used_ts"] == 1700000000
+        assert stored_loser["killstreak"] == 0 and stored_loser["loss_streak"] == 1
+        assert stored_winner[REVISION_FIELD] == stored_loser[REVISION_FIELD]
+        assert winner_result["leveled_up"] is (winner_after["level"] > 1)
+
+    def test_concurrent_battles_do_not_overwrite_each_other(self, pets):
+        """A battle committed from a stale read is replayed onto the newer pet state"""
+        shared, first_opponent, second_opponent = _pet("1"), _pet("2"), _pet("3")
+        pets.insert_many([copy.deepcopy(shared), copy.deepcopy(first_opponent), copy.deepcopy(second_opponent)])
+        # Both battles read the shared pet before either commits
+        stale_shared = copy.deepcopy(shared)
+
+        commit_battle(pets, [(shared, True, _stats(), 10), (first_opponent, False, _stats(), 5)], self._reload(pets))
+        commit_battle(pets, [(stale_shared, True, _stats(), 20), (second_opponent, False, _stats(), 5)], self._reload(pets))
+
+        stored = pets.find_one({"_id": shared["_id"]})
+        assert stored["battleRecord"]["wins"] == 2
+        assert stored["killstreak"] == 2
+        assert stored["xp"] == 30
+        assert pets.bulk_write.call_count == 3
+        assert pets.find_one({"_id": second_opponent["_id"]})["battleRecord"]["losses"] == 1
+
+    def test_gives_up_loudly_when_every_write_conflicts(self, pets):
+        """A battle that never gets its write in raises instead of returning unsaved results"""
+        pet = _pet("1")
+        pets.insert_one(copy.deepcopy(pet))
+        pets.bulk_write = MagicMock(return_value=MagicMock(matched_count=0))
+
+        # Another battle commits the pet every time this one re-reads it
+        def reload(pet_id):
+            return dict(pets.find_one({"_id": pet_id}), **{REVISION_FIELD: ObjectId()})
+
+        with pytest.raises(BattleCommitError) as raised:
+            commit_battle(pets, [(pet, True, _stats(), 10)], reload, max_attempts=3)
+
+        assert raised.value.committed == []
+        assert pets.bulk_write.call_count == 3
+        assert pets.find_one({"_id": pet["_id"]})["battleRecord"] == {"wins": 0, "losses": 0}
+
+    def test_prepared_fields_saved_with_result(self, pets):
+        """Fields filled in before the battle are written by the same commit"""
+        pet = _pet("1")
+        del pet["balance"]
+        pets.insert_one(copy.deepcopy(pet))
+
+        def prepare(doc):
+            doc.setdefault("balance", 0)
+            return doc
+
+        commit_battle(pets, [(pet, True, _stats(), 10)], self._reload(pets), prepare=prepare)
+
+        assert pets.find_one({"_id": pet["_id"]})["balance"] == 0
+        assert pets.bulk_write.call_count == 1
+
+    def test_log_written_only_after_every_pet_commits(self, pets):
+        """Without transactions the battle log follows a complete commit"""
+        logs = mongomock.MongoClient().db.battle_logs
+        winner, loser = _pet("1"), _pet("2")
+        pets.insert_many([copy.deepcopy(winner), copy.deepcopy(loser)])
+
+        commit_battle(pets, [(winner, True, _stats(), 10), (loser, False, _stats(), 5)], self._reload(pets),
+                      logs_collection=logs, log_doc={"user_id": "1", "opponent_id": "2"})
+
+        assert petcommit._transactions_supported is False
+        assert logs.count_documents({"user_id": "1", "opponent_id": "2"}) == 1
+
+    def test_deleted_pet_is_a_failure(self, pets):
+        """A pet deleted mid-battle fails the commit and names the pet that was saved"""
+        logs = mongomock.MongoClient().db.battle_logs
+        winner, loser = _pet("1"), _pet("2")
+        pets.insert_one(copy.deepcopy(winner))
+
+        with pytest.raises(BattleCommitError) as raised:
+            commit_battle(pets, [(winner, True, _stats(), 10), (loser, False, _stats(), 5)], self._reload(pets),
+                          logs_collection=logs, log_doc={"user_id": "1"})
+
+        assert raised.value.committed == [winner["_id"]]
+        assert pets.find_one({"_id": winner["_id"]})["battleRecord"]["wins"] == 1
+        assert logs.count_documents({}) == 0
+
+    def test_transaction_saves_pets_and_log_together(self):
+        """With transactions both pets and the log are written in the same session"""
+        winner, loser = _pet("1"), _pet("2")
+        stored = {winner["_id"]: copy.deepcopy(winner), loser["_id"]: copy.deepcopy(loser)}
+        session = MagicMock()
+        session.__enter__.return_value = session
+        session.with_transaction.side_effect = lambda callback: callback(session)
+        pets = MagicMock()
+        pets.database.client.start_session.return_value = session
+        pets.find_one.side_effect = lambda query, session=None: copy.deepcopy(stored.get(query["_id"]))
+        pets.bulk_write.return_value = MagicMock(matched_count=2)
+        logs = MagicMock()
+        reload = MagicMock()
+
+        (winner_after, _), (loser_after, _) = commit_battle(
+            pets, [(winner, True, _stats(), 10), (loser, False, _stats(), 5)], reload,
+            logs_collection=logs, log_doc={"user_id": "1"},
+        )
+
+        requests = pets.bulk_write.call_args.args[0]
+        assert [op._filter["_id"] for op in requests] == [winner["_id"], loser["_id"]]
+        assert pets.bulk_write.call_args.kwargs["session"] is session
+        logs.insert_one.assert_called_once_with({"user_id": "1"}, session=session)
+        assert winner_after["battleRecord"]["wins"] == 1 and loser_after["battleRecord"]["losses"] == 1
+        assert petcommit._transactions_supported is True
+        reload.assert_not_called()
+
+    def test_transaction_aborts_when_a_pet_is_gone(self):
+        """A missing pet aborts the transaction before anything is written"""
+        pet = _pet("1")
+        session = MagicMock()
+        session.__enter__.return_value = session
+        session.with_transaction.side_effect = lambda callback: callback(session)
+        pets = MagicMock()
+        pets.database.client.start_session.return_value = session
+        pets.find_one.return_value = None
+        logs = MagicMock()
+
+        with pytest.raises(BattleCommitError) as raised:
+            commit_battle(pets, [(pet, True, _stats(), 10)], MagicMock(), logs_collection=logs, log_doc={})
+
+        assert raised.value.committed == []
+        pets.bulk_write.assert_not_called()
+        logs.insert_one.assert_not_called()
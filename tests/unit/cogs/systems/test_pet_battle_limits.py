@@ -0,0 +1,84 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import mongomock
+import pytest
+
+from cogs.systems.pet_battles import petbattlelimits
+from cogs.systems.pet_battles.petbattlelimits import (
+    get_pair_battle_count,
+    pair_counter_id,
+    release_pair_battle,
+    reserve_pair_battle,
+)
+
+# Far enough ahead that mongomock's TTL emulation keeps the counters
+NOW = datetime(2099, 3, 14, 21, 30, tzinfo=timezone.utc)
+
+
+class TestPetBattleLimits:
+    """Test the daily battle-pair counters"""
+
+    @pytest.fixture
+    def counters(self):
+        petbattlelimits._ttl_index_ready = False
+        return mongomock.MongoClient().db.battle_pair_counts
+
+    def test_pair_key_is_unordered(self):
+        """Either user starting the battle counts against the same pair"""
+        assert pair_counter_id("g", "1", "2", NOW) == pair_counter_id("g", "2", "1", NOW) == "g:1:2:2099-03-14"
+
+    def test_limit_enforced(self, counters):
+        """Battles are counted up to the limit, then refused without incrementing"""
+        results = [reserve_pair_battle(counters, "g", "1", "2", 3, NOW) for _ in range(3)]
+        assert results == [(True, 1), (True, 2), (True, 3)]
+
+        assert reserve_pair_battle(counters, "g", "2", "1", 3, NOW) == (False, 3)
+        assert get_pair_battle_count(counters, "g", "1", "2", NOW) == 3
+
+        # A raised limit (e.g. a vote bonus) allows more battles the same day
+        assert reserve_pair_battle(counters, "g", "1", "2", 13, NOW) == (True, 4)
+
+    def test_new_day_and_other_guilds_start_fresh(self, counters):
+        """Counters are per guild and per UTC day"""
+        reserve_pair_battle(counters, "g", "1", "2", 1, NOW)
+
+        assert reserve_pair_battle(counters, "other", "1", "2", 1, NOW)[0] is True
+        assert reserve_pair_battle(counters, "g", "1", "2", 1, NOW + timedelta(hours=3))[0] is True
+
+    def test_counter_expires_after_its_day(self, counters):
+        """Counters carry a TTL expiry and the TTL index is created"""
+        reserve_pair_battle(counters, "g", "1", "2", 5, NOW)
+
+        doc = counters.find_one({"_id": "g:1:2:2099-03-14"})
+        assert doc["pair"] == ["1", "2"]
+        assert doc["expires_at"].replace(tzinfo=timezone.utc) == datetime(2099, 3, 16, tzinfo=timezone.utc)
+        indexes = counters.index_information()
+        assert indexes[petbattlelimits.TTL_INDEX_NAME]["expireAfterSeconds"] == 0
+
+    def test_concurrent_battles_never_exceed_limit(self, counters):
+        """Concurrent reservations for one pair allow exactly `limit` battles"""
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: reserve_pair_battle(counters, "g", "1", "2", 5, NOW), range(20)))
+
+        assert sum(1 for allowed, _ in results if allowed) == 5
+        assert get_pair_battle_count(counters, "g", "1", "2", NOW) == 5
+
+    def test_released_battle_leaves_count_unchanged(self, counters):
+        """A battle whose commit failed gives its slot back, even at the limit"""
+        reserve_pair_battle(counters, "g", "1", "2", 2, NOW)
+        assert reserve_pair_battle(counters, "g", "2", "1", 2, NOW) == (True, 2)
+
+        release_pair_battle(counters, "g", "2", "1", NOW)
+
+        assert get_pair_battle_count(counters, "g", "1", "2", NOW) == 1
+        assert reserve_pair_battle(counters, "g", "1", "2", 2, NOW) == (True, 2)
+
+    def test_release_never_goes_below_zero(self, counters):
+        """Releasing without a matching reservation is a no-op"""
+        release_pair_battle(counters, "g", "1", "2", NOW)
+        reserve_pair_battle(counters, "g", "1", "2", 3, NOW)
+        release_pair_battle(counters, "g", "1", "2", NOW)
+        release_pair_battle(counters, "g", "1", "2", NOW)
+
+        assert get_pair_battle_count(counters, "g", "1", "2", NOW) == 0
@@ -0,0 +1,69 @@
+import pytest
+
+from cogs.systems.pet_battles import petrender
+from cogs.systems.pet_battles.petrender import (
+    edit_schedule,
+    get_battle_render_metrics,
+    record_battle_render,
+    simulate_battle,
+)
+
+
+def _pet(name, health, **extra):
+    return {"name": name, "health": health, "strength": 10, "defense": 10, "level": 1, "active_items": [], **extra}
+
+
+class TestPetBattleRender:
+    """Test battle precomputation and edit batching"""
+
+    @pytest.fixture(autouse=True)
+    def fresh_metrics(self):
+        petrender.reset_battle_render_metrics()
+        yield
+        petrender.reset_battle_render_metrics()
+
+    def test_simulation_matches_round_rules(self):
+        """User attacks first; the defender does not strike back once knocked out"""
+        hits = iter([(30, False, "normal"), (10, True, "normal"), (40, False, "luck"), (99, False, "normal")])
+        user = _pet("Rex", 100)
+        opponent = _pet("Tom", 50, active_items=[{"stat": "health", "value": 20, "battles_remaining": 1}])
+
+        battle = simulate_battle(user, opponent, damage_fn=lambda attacker, defender: next(hits))
+
+        assert battle["user_won"] is True
+        assert battle["opponent_max_health"] == 70
+        assert [(r["user_health"], r["opponent_health"]) for r in battle["rounds"]] == [(90, 40), (90, 0)]
+        assert "Critical Hit" in battle["rounds"][0]["log"]
+        assert "Lucky Hit" in battle["rounds"][1]["log"]
+        assert battle["user_stats"] == {"damage_dealt": 70, "critical_hits": 0, "lucky_hits": 1,
+                                        "battles_won": 0, "battles_lost": 0, "xp_earned": 0}
+        assert battle["opponent_stats"]["critical_hits"] == 1
+
+    def test_real_damage_battle_finishes(self):
+        """The default damage function always produces a decided battle"""
+        battle = simulate_battle(_pet("A", 100, defense=60), _pet("B", 100, defense=60))
+        last = battle["rounds"][-1]
+        assert (last["opponent_health"] == 0) is battle["user_won"]
+        assert min(last["user_health"], last["opponent_health"]) == 0
+
+    @pytest.mark.parametrize("rounds", [1, 2, 5, 7, 8, 40, 97])
+    def test_edit_schedule_is_capped(self, rounds):
+        """Short battles edit every round; long ones batch rounds under the cap"""
+        schedule = edit_schedule(rounds, max_edits=6)
+
+        assert len(schedule) <= 6
+        assert schedule == sorted(set(schedule))
+        if rounds > 1:
+            assert schedule[-1] == rounds - 2
+        if rounds <= 7:
+            assert schedule == list(range(rounds - 1))
+
+    def test_edits_per_battle_metric(self):
+        record_battle_render(rounds=12, edits=7, fast=False)
+        record_battle_render(rounds=4, edits=0, fast=True)
+
+        metrics = get_battle_render_metrics()
+        assert metrics["battles"] == 2
+        assert metrics["fast_battles"] == 1
+        assert metrics["edits_per_battle"] == 3.5
+        assert metrics["max_edits"] == 7
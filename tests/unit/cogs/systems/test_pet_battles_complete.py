@@ -355,6 +355,41 @@ class TestPetBattlesComplete:
                 # Should still process with default capacity
                 mock_mongo_setup['pets'].find.assert_called_once()
 
+    def test_enforce_user_pet_capacity_writes_only_differences(self, mock_premium_entitlements):
+        """Test capacity enforcement writes only pets whose state changes and skips unchanged users"""
+        import mongomock
+        from cogs.systems.pet_battles import enforce_user_pet_capacity, _CAPACITY_CHECKS
+        
+        pets = mongomock.MongoClient()['db']['pets']
+        ids = [ObjectId() for _ in range(3)]
+        pets.insert_many([
+            {"_id": ids[0], "user_id": "cap_user", "guild_id": "g", "is_active": True, "is_locked": False, "last_used_ts": 3},
+            {"_id": ids[1], "user_id": "cap_user", "guild_id": "g", "is_active": False, "is_locked": False, "last_used_ts": 2},
+            {"_id": ids[2], "user_id": "cap_user", "guild_id": "g", "is_active": False, "is_locked": False, "last_used_ts": 1},
+        ])
+        _CAPACITY_CHECKS.pop(("cap_user", "g"), None)
+        
+        with patch('cogs.systems.pet_battles.pets_collection', wraps=pets) as collection:
+            with patch('services.premium.get_user_entitlements', return_value=mock_premium_entitlements['vip']):
+                # Already within capacity: no writes
+                enforce_user_pet_capacity("cap_user", "g")
+                collection.update_many.assert_not_called()
+                
+                # Unchanged tier and count: skipped without reading the pets
+                enforce_user_pet_capacity("cap_user", "g")
+                collection.find.assert_called_once()
+            
+            with patch('services.premium.get_user_entitlements', return_value=mock_premium_entitlements['free']):
+                # Downgrade: only the two extra pets are locked
+                enforce_user_pet_capacity("cap_user", "g")
+                collection.update_many.assert_called_once_with(
+                    {"_id": {"$in": [ids[1], ids[2]]}}, {"$set": {"is_locked": True, "is_active": False}}
+                )
+        
+        assert pets.find_one({"_id": ids[0]})["is_active"] is True
+        assert pets.count_documents({"user_id": "cap_user", "is_locked": True}) == 2
+        _CAPACITY_CHECKS.pop(("cap_user", "g"), None)
+
     @pytest.mark.asyncio
     async def test_resolve_guild_member_prefers_cached_member(self):
         """Test guild member resolution uses cache before fetch."""
@@ -963,3 +998,37 @@ class TestPetBattlesComplete:
                 
             # All operations should succeed independently
             assert mock_mongo_setup['pets'].update_one.call_count == 5
+
+    @pytest.mark.asyncio
+    async def test_reset_daily_quests_chunked_bulk_writes(self):
+        """Test the midnight reset prefetches entitlements per chunk and writes in unordered batches"""
+        import mongomock
+        from cogs.systems.pet_battles import PetBattles
+        
+        pets = mongomock.MongoClient().db.pets
+        pets.insert_many(
+            [{"user_id": str(i % 4), "daily_quests": [], "is_locked": False} for i in range(25)]
+            + [{"user_id": "locked", "daily_quests": [], "is_locked": True}]
+        )
+        entitlements = MagicMock(side_effect=lambda ids: {i: {"dailyPetQuestsBonus": 2 if i == "0" else 0} for i in ids})
+        bulk_write = MagicMock(side_effect=lambda ops, ordered: MagicMock(modified_count=len(ops)))
+        
+        with patch('cogs.systems.pet_battles.pets_collection', pets), \
+             patch.object(pets, 'bulk_write', bulk_write), \
+             patch('cogs.systems.pet_battles.get_many_entitlements', entitlements), \
+             patch('cogs.systems.pet_battles.QUEST_RESET_CHUNK_SIZE', 10):
+            await PetBattles.reset_daily_quests.coro(MagicMock())
+        
+        # 25 unlocked pets in chunks of 10: one prefetch and one unordered bulk write per chunk
+        assert entitlements.call_count == 3
+        assert bulk_write.call_count == 3
+        assert all(c.kwargs.get("ordered") is False for c in bulk_write.call_args_list)
+        
+        owners = {str(p["_id"]): p["user_id"] for p in pets.find({})}
+        operations = [op for c in bulk_write.call_args_list for op in c.args[0]]
+        assert len(operations) == 25
+        for op in operations:
+            quests = op._doc["$set"]["daily_quests"]
+            expected = 5 if owners[str(op._filter["_id"])] == "0" else 3
+            assert len(quests) == expected
+            assert op._filter["is_locked"] == {"$ne": True}
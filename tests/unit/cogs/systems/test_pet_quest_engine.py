@@ -0,0 +1,85 @@
+import random
+from unittest.mock import patch
+
+import pytest
+
+from cogs.systems.pet_battles import petquests
+from cogs.systems.pet_battles.petconstants import ACHIEVEMENTS, DAILY_QUESTS, QUEST_METRICS
+
+
+def _progress(*ids, **progress):
+    stored = dict.fromkeys((str(i) for i in ids), 0)
+    stored.update(progress)
+    return stored
+
+
+def _stats(**values):
+    stats = {"damage_dealt": 0, "critical_hits": 0, "lucky_hits": 0, "battles_won": 0, "battles_lost": 0, "xp_earned": 0}
+    stats.update(values)
+    return stats
+
+
+def _pet(quests, achievements=None, **extra):
+    pet = {"user_id": "1", "xp": 0, "balance": 0, "killstreak": 0, "claimed_daily_completion_bonus": True,
+           "daily_quests": quests, "achievements": achievements or {}}
+    pet.update(extra)
+    return pet
+
+
+class TestPetQuestEngine:
+    """Test the metric dispatch for quest and achievement progress"""
+
+    @pytest.fixture(autouse=True)
+    def free_tier(self):
+        with patch("cogs.systems.pet_battles.petquests.get_user_entitlements", return_value={}) as lookup:
+            yield lookup
+
+    def test_every_definition_has_a_known_metric(self):
+        for definition in DAILY_QUESTS + ACHIEVEMENTS:
+            assert definition["metric"] in QUEST_METRICS
+            assert definition["metric"] in petquests.METRIC_UPDATERS
+
+    def test_only_watching_quests_progress(self):
+        pet = _pet(_progress(1, 13, 19, 17))
+
+        petquests.update_quests_and_achievements(pet, _stats(battles_won=1, damage_dealt=120))
+
+        assert pet["daily_quests"] == {"1": 1, "13": 0, "19": 120, "17": 1}
+
+    def test_streak_quests_complete_only_while_streak_runs(self):
+        streak_quest = next(q for q in DAILY_QUESTS if q["id"] == 6)
+        pet = _pet(_progress(6), killstreak=0)
+
+        petquests.update_quests_and_achievements(pet, _stats(battles_lost=1))
+        assert pet["daily_quests"] == {"6": 0}
+
+        pet["killstreak"] = 2
+        completed, _, _ = petquests.update_quests_and_achievements(pet, _stats(battles_won=1))
+        assert [q["id"] for q in completed] == [6]
+        assert completed[0]["description"] == streak_quest["description"]
+        assert pet["daily_quests"] == {"6": 2}
+        assert pet["xp"] == streak_quest["xp_reward"]
+
+    def test_rewards_use_one_entitlements_lookup(self, free_tier):
+        free_tier.return_value = {"tier": "vip"}
+        pet = _pet({"1": 2, "17": 4}, claimed_daily_completion_bonus=False)
+
+        completed, _, bonus = petquests.update_quests_and_achievements(pet, _stats(battles_won=1))
+
+        assert len(completed) == 2 and bonus
+        assert free_tier.call_count == 1
+        assert pet["xp"] == sum(int(round(x * 1.75)) for x in (100, 150, 500))
+
+    def test_matches_description_matching(self):
+        """Random battles complete the same entries as the old substring matcher"""
+        from benchmarks.bench_quests import compact_pet, legacy_update, make_battles, make_pet, play
+
+        rng = random.Random(3)
+        template = make_pet(8, rng)
+        battles = make_battles(400, rng)
+        with patch("benchmarks.bench_quests.premium.get_user_entitlements", return_value={}):
+            legacy = play(legacy_update, template, battles)
+        dispatch = play(petquests.update_quests_and_achievements, compact_pet(template), battles)
+
+        assert legacy[1] == dispatch[1]
+        assert (legacy[0]["xp"], legacy[0]["balance"]) == (dispatch[0]["xp"], dispatch[0]["balance"])
@@ -0,0 +1,111 @@
+import copy
+from unittest.mock import MagicMock, patch
+
+import mongomock
+import pytest
+
+from cogs.systems.pet_battles import petquests
+from cogs.systems.pet_battles.petconstants import ACHIEVEMENTS, DAILY_QUESTS
+from cogs.systems.pet_battles.petmigrate import migrate_quest_progress
+
+
+def _legacy_entries(definitions, **progress):
+    """Quest copies as pets stored them before the compact form."""
+    entries = []
+    for definition in definitions:
+        value = progress.get(str(definition["id"]), 0)
+        entries.append({
+            "id": definition["id"],
+            "description": definition["description"],
+            "progress_required": definition["progress_required"],
+            "progress": value,
+            "completed": value >= definition["progress_required"],
+            "xp_reward": definition["xp_reward"],
+            "cash_reward": definition["cash_reward"],
+        })
+    return entries
+
+
+class TestPetQuestStorage:
+    """Test the compact quest/achievement progress form"""
+
+    @pytest.fixture(autouse=True)
+    def free_tier(self):
+        with patch("cogs.systems.pet_battles.petquests.get_user_entitlements", return_value={}):
+            yield
+
+    def test_new_quests_store_only_ids_and_progress(self):
+        pet = petquests.assign_daily_quests({"user_id": "1"}, persist=False)
+        pet = petquests.assign_achievements(pet, persist=False)
+
+        assert len(pet["daily_quests"]) == 3
+        assert set(pet["daily_quests"].values()) == {0}
+        assert pet["achievements"] == {str(a["id"]): 0 for a in ACHIEVEMENTS}
+
+    def test_hydration_joins_definitions(self):
+        quest = DAILY_QUESTS[0]
+        pet = {"daily_quests": {str(quest["id"]): quest["progress_required"], "999": 1}}
+
+        [entry] = petquests.hydrate_daily_quests(pet)
+
+        assert entry["description"] == quest["description"]
+        assert entry["xp_reward"] == quest["xp_reward"]
+        assert entry["completed"] is True
+
+    def test_legacy_lists_round_trip(self):
+        """Old full copies hydrate the same way and compact to their progress"""
+        legacy = _legacy_entries(DAILY_QUESTS[:3], **{"1": 2, "2": 5})
+        legacy[2]["completed"] = True  # completed flag wins over stale progress
+
+        assert petquests.hydrate_progress(legacy, petquests.QUESTS_BY_KEY)[:2] == legacy[:2]
+        assert petquests.compact_progress(legacy, petquests.QUESTS_BY_KEY) == {"1": 2, "2": 5, "3": 10}
+
+    def test_ensure_converts_legacy_pets(self):
+        pet = {"user_id": "1", "daily_quests": _legacy_entries(DAILY_QUESTS[:3]),
+               "achievements": _legacy_entries(ACHIEVEMENTS, **{"1": 7})}
+
+        pet = petquests.ensure_quests_and_achievements(pet, persist=False)
+
+        assert pet["daily_quests"] == {"1": 0, "2": 0, "3": 0}
+        assert pet["achievements"]["1"] == 7
+
+    def test_migration_streams_and_reports_sizes(self):
+        pets = mongomock.MongoClient().db.pets
+
+        # mongomock cannot take pymongo request objects, so apply them one by one
+        def bulk_write(requests, ordered=True):
+            modified = sum(pets.update_one(op._filter, op._doc).modified_count for op in requests)
+            return MagicMock(modified_count=modified)
+
+        pets.bulk_write = MagicMock(side_effect=bulk_write)
+        pets.insert_many([
+            {"user_id": str(i), "daily_quests": _legacy_entries(DAILY_QUESTS[:3], **{"1": 1}),
+             "achievements": _legacy_entries(ACHIEVEMENTS)}
+            for i in range(5)
+        ] + [{"user_id": "new", "daily_quests": {"4": 0}, "achievements": {"1": 0}}])
+
+        dry = migrate_quest_progress(pets, chunk_size=2, dry_run=True)
+        assert dry["migrated"] == 5
+        assert pets.count_documents({"daily_quests": {"$type": "array"}}) == 5
+
+        report = migrate_quest_progress(pets, chunk_size=2)
+
+        assert report["scanned"] == 5 and report["migrated"] == 5
+        assert report["avg_bytes_after"] < report["avg_bytes_before"] / 5
+        converted = pets.find_one({"user_id": "0"})
+        assert converted["daily_quests"] == {"1": 1, "2": 0, "3": 0}
+        assert pets.find_one({"user_id": "new"})["daily_quests"] == {"4": 0}
+        assert pets.bulk_write.call_count == 3
+        assert migrate_quest_progress(pets)["scanned"] == 0
+
+    def test_battle_commit_increments_progress_in_place(self):
+        from cogs.systems.pet_battles.petcommit import pet_update_diff
+
+        before = {"_id": 1, "xp": 0, "balance": 0, "killstreak": 1, "claimed_daily_completion_bonus": True,
+                  "daily_quests": {"19": 100, "1": 0}, "achievements": {"3": 10}}
+        after = copy.deepcopy(before)
+
+        petquests.update_quests_and_achievements(after, {"damage_dealt": 40})
+
+        update = pet_update_diff(before, after)
+        assert update["$inc"] == {"daily_quests.19": 40, "achievements.3": 40}
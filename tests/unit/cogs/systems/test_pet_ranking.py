@@ -0,0 +1,79 @@
+import random
+
+import mongomock
+import pytest
+from unittest.mock import MagicMock
+
+from cogs.systems.pet_battles import petranking
+from cogs.systems.pet_battles.petranking import (
+    RANK_SORT,
+    get_global_ranking,
+    get_pet_rank,
+    ranked_above_query,
+)
+
+
+class TestPetRanking:
+    """Test indexed global pet ranking"""
+
+    @pytest.fixture
+    def pets(self):
+        """Mongomock collection with pets that share levels and XP values"""
+        collection = mongomock.MongoClient().db.pets
+        rng = random.Random(42)
+        collection.insert_many([
+            {"user_id": str(i), "name": f"Pet{i}", "level": rng.randint(1, 5), "xp": rng.choice([0, 50, 100])}
+            for i in range(200)
+        ])
+        petranking._rank_index_ready = False
+        return collection
+
+    def _full_sort_ranks(self, collection):
+        ordered = list(collection.find({}).sort(RANK_SORT))
+        return {pet["_id"]: index + 1 for index, pet in enumerate(ordered)}
+
+    def test_rank_matches_full_sort(self, pets):
+        """count_documents rank agrees with sorting the whole collection"""
+        expected = self._full_sort_ranks(pets)
+
+        for pet in pets.find({}):
+            assert get_pet_rank(pets, pet) == expected[pet["_id"]]
+
+    def test_global_ranking_top_and_total(self, pets):
+        """Top pets are in rank order and total counts every pet"""
+        expected = self._full_sort_ranks(pets)
+        pet = pets.find_one({"user_id": "150"})
+
+        ranking = get_global_ranking(pets, pet, 3)
+
+        assert [expected[p["_id"]] for p in ranking["top"]] == [1, 2, 3]
+        assert ranking["rank"] == expected[pet["_id"]]
+        assert ranking["total"] == 200
+
+    def test_global_ranking_for_top_pet_skips_count(self):
+        """A pet in the top list is ranked without an extra count query"""
+        top_pet = {"_id": 1, "level": 9, "xp": 10}
+        collection = MagicMock()
+        collection.find.return_value.sort.return_value.limit.return_value = [top_pet]
+        collection.estimated_document_count.return_value = 5
+
+        ranking = get_global_ranking(collection, top_pet, 3)
+
+        assert ranking["rank"] == 1
+        collection.count_documents.assert_not_called()
+
+    def test_ranked_above_query_breaks_ties_by_id(self):
+        """Pets with equal level and XP are ordered by _id"""
+        query = ranked_above_query({"_id": 7, "level": 3, "xp": 40})
+
+        assert {"level": 3, "xp": 40, "_id": {"$lt": 7}} in query["$or"]
+
+    def test_rank_index_created_once(self):
+        """The rank index is only requested once per process"""
+        petranking._rank_index_ready = False
+        collection = MagicMock()
+
+        petranking.ensure_rank_index(collection)
+        petranking.ensure_rank_index(collection)
+
+        collection.create_index.assert_called_once_with(RANK_SORT, name=petranking.RANK_INDEX_NAME)
@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from cogs.systems.pet_battles.petbattle import calculate_damage
+from cogs.systems.pet_battles.petsimulator import (
+    battle_odds,
+    build_profile,
+    hit_distribution,
+    monte_carlo,
+    simulate_seeded_battle,
+)
+
+
+class TestPetSimulator:
+    """Test the seedable battle simulator"""
+
+    def test_profiles_apply_levels_and_items(self):
+        pet = build_profile(5, ["minor_str_potion"], increases={"strength": 2, "defense": 3, "health": 10})
+
+        assert (pet["strength"], pet["defense"], pet["health"]) == (18, 22, 140)
+        assert pet["active_items"][0]["stat"] == "strength"
+        assert pet["active_items"][0]["battles_remaining"] > 0
+
+    def test_seeded_battle_is_reproducible(self):
+        """The same seed replays the same battle draw for draw"""
+        a, b = build_profile(3, name="A"), build_profile(4, name="B")
+
+        first = simulate_seeded_battle(a, b, seed=42)
+        second = simulate_seeded_battle(a, b, seed=42)
+
+        assert first["rounds"] == second["rounds"]
+        assert first["user_won"] == second["user_won"]
+
+    def test_hit_distribution_matches_calculate_damage(self):
+        """Every sampled hit is in the exact distribution and the means agree"""
+        attacker = build_profile(2, ["minor_str_potion"])
+        defender = build_profile(3)
+        distribution = hit_distribution(attacker, defender)
+        rng = random.Random(7)
+
+        samples = [calculate_damage(attacker, defender, rng)[0] for _ in range(20000)]
+
+        assert sum(distribution.values()) == pytest.approx(1.0)
+        assert set(samples) <= set(distribution)
+        expected_mean = sum(value * chance for value, chance in distribution.items())
+        assert sum(samples) / len(samples) == pytest.approx(expected_mean, rel=0.02)
+
+    def test_exact_odds_match_real_battles(self):
+        """battle_odds agrees with battles fought through calculate_damage"""
+        a, b = build_profile(4, name="A"), build_profile(5, name="B")
+        rng = random.Random(3)
+        battles = 3000
+
+        wins = sum(simulate_seeded_battle(a, b, rng=rng)["user_won"] for _ in range(battles))
+        odds = battle_odds(a, b)
+
+        assert sum(odds["rounds_distribution"].values()) == pytest.approx(1.0)
+        # Within about four standard errors
+        assert wins / battles == pytest.approx(odds["win_rate_a"], abs=0.04)
+
+    def test_monte_carlo_is_seeded_and_converges(self):
+        a, b = build_profile(10), build_profile(12)
+
+        report = monte_carlo(a, b, battles=200_000, seed=1)
+
+        assert report == monte_carlo(a, b, battles=200_000, seed=1)
+        assert report["wins_a"] + report["wins_b"] == 200_000
+        assert sum(report["rounds_histogram"].values()) == 200_000
+        odds = battle_odds(a, b)
+        assert report["win_rate_a"] == pytest.approx(odds["win_rate_a"], abs=0.005)
+        assert report["mean_rounds"] == pytest.approx(odds["mean_rounds"], abs=0.05)
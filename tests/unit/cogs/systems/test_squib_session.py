@@ -0,0 +1,168 @@
+import asyncio
+import copy
+
+import discord
+import mongomock
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from cogs.systems.squib_game import SquibGames, run_game_loop
+from cogs.systems.squib_game.squibsession import SquibSession
+
+
+def _game_doc(players=4, **overrides):
+    doc = {
+        "session_id": "987654321_111_1700000000",
+        "guild_id": "987654321",
+        "host_user_id": "1000",
+        "channel_id": "555",
+        "current_round": 0,
+        "current_game_state": "in_progress",
+        "participants": [
+            {"user_id": str(1000 + i), "username": f"player{i}", "status": "alive"}
+            for i in range(players)
+        ],
+    }
+    doc.update(overrides)
+    return doc
+
+
+class FakeSessionsCollection:
+    """In-memory sessions collection supporting the $set/arrayFilters checkpoint shape
+    (mongomock does not implement array filters)"""
+
+    def __init__(self, doc):
+        self.doc = copy.deepcopy(doc)
+        self.find_one = MagicMock(side_effect=lambda query: copy.deepcopy(self.doc))
+        self.update_one = MagicMock(side_effect=self._update_one)
+
+    def _update_one(self, query, update, array_filters=None):
+        if any(self.doc.get(k) != v for k, v in query.items()):
+            return MagicMock(matched_count=0)
+        out = set(array_filters[0]["out.user_id"]["$in"]) if array_filters else set()
+        for path, value in update["$set"].items():
+            if path == "participants.$[out].status":
+                for p in self.doc["participants"]:
+                    if p["user_id"] in out:
+                        p["status"] = value
+            else:
+                self.doc[path] = value
+        return MagicMock(matched_count=1)
+
+
+def _eliminate(session, user_ids):
+    updated = copy.deepcopy(session.participants)
+    eliminated = []
+    for p in updated:
+        if p["user_id"] in user_ids:
+            p["status"] = "eliminated"
+            eliminated.append(p)
+    session.apply_round(updated, eliminated)
+
+
+class TestSquibSession:
+    """Test the in-memory Squib Game state and its checkpoints"""
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_writes_only_delta(self):
+        """A checkpoint sets the round and flips only the newly eliminated players"""
+        doc = {**_game_doc(), "_id": "g1"}
+        sessions_collection = FakeSessionsCollection(doc)
+        session = SquibSession.from_document(doc, sessions_collection)
+
+        _eliminate(session, {"1001"})
+        update, array_filters = session.build_checkpoint()
+        assert "participants" not in update["$set"]
+        assert update["$set"]["participants.$[out].status"] == "eliminated"
+        assert array_filters == [{"out.user_id": {"$in": ["1001"]}}]
+
+        assert await session.checkpoint() is True
+        stored = sessions_collection.doc
+        assert stored["current_round"] == 1
+        assert [p["status"] for p in stored["participants"]] == ["alive", "eliminated", "alive", "alive"]
+        assert session.has_pending_changes() is False
+
+    @pytest.mark.asyncio
+    async def test_failed_checkpoint_is_retried(self):
+        """Eliminations from a failed write are kept for the next checkpoint"""
+        collection = MagicMock()
+        collection.update_one.side_effect = [Exception("network"), MagicMock(matched_count=1)]
+        session = SquibSession.from_document({**_game_doc(), "_id": "g1"}, collection)
+
+        _eliminate(session, {"1001"})
+        assert await session.checkpoint() is False
+        _eliminate(session, {"1002"})
+        assert await session.checkpoint() is True
+
+        _, update = collection.update_one.call_args[0]
+        assert update["$set"]["current_round"] == 2
+        assert collection.update_one.call_args[1]["array_filters"] == [{"out.user_id": {"$in": ["1001", "1002"]}}]
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_detects_cancelled_game(self):
+        """A checkpoint that matches nothing marks the session stopped"""
+        doc = {**_game_doc(), "_id": "g1"}
+        sessions_collection = FakeSessionsCollection({**doc, "current_game_state": "cancelled"})
+        session = SquibSession.from_document(doc, sessions_collection)
+
+        _eliminate(session, {"1001"})
+        await session.checkpoint()
+
+        assert session.stopped is True
+        assert sessions_collection.doc["current_round"] == 0
+
+    @pytest.mark.asyncio
+    async def test_game_loop_checkpoints_instead_of_rereading(self):
+        """The loop plays from memory: no per-round reads or full participant rewrites"""
+        doc = {**_game_doc(players=6), "_id": "g1"}
+        collection = FakeSessionsCollection(doc)
+        session = SquibSession.from_document(doc, collection)
+
+        channel = MagicMock(spec=discord.TextChannel)
+        channel.send = AsyncMock()
+
+        with patch('cogs.systems.squib_game.squib_game_sessions', collection), \
+             patch('cogs.systems.squib_game.asyncio.sleep', new=AsyncMock()), \
+             patch('cogs.systems.squib_game.conclude_game_auto', new=AsyncMock(return_value=[MagicMock()])) as mock_conclude, \
+             patch('cogs.systems.squib_game.get_premium_promotion_view', return_value=None):
+            await run_game_loop(MagicMock(), None, doc["_id"], doc["guild_id"], session=session, channel=channel)
+
+        collection.find_one.assert_not_called()
+        for call in collection.update_one.call_args_list:
+            assert "participants" not in call[0][1]["$set"]
+
+        stored = collection.doc
+        assert stored["current_round"] == session.current_round
+        assert [p["status"] for p in stored["participants"]] == [p["status"] for p in session.participants]
+        assert len(session.alive()) <= 1
+        mock_conclude.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_resume_in_progress_games(self):
+        """Games in progress at startup restart from their checkpoint; unreachable ones are released"""
+        sessions_collection = mongomock.MongoClient().db.squib_game_sessions
+        resumable = _game_doc(current_round=3)
+        resumable["participants"][0]["status"] = "eliminated"
+        resumable["_id"] = sessions_collection.insert_one(resumable).inserted_id
+        orphan = _game_doc(session_id="other", channel_id=None)
+        orphan["_id"] = sessions_collection.insert_one(orphan).inserted_id
+
+        channel = MagicMock(spec=discord.TextChannel)
+        channel.send = AsyncMock()
+        bot = MagicMock()
+        bot.wait_until_ready = AsyncMock()
+        bot.get_channel.return_value = channel
+
+        with patch('cogs.systems.squib_game.squib_game_sessions', sessions_collection), \
+             patch('cogs.systems.squib_game.run_game_loop', new=AsyncMock()) as mock_loop:
+            cog = SquibGames(bot)
+            await cog.resume_in_progress_games()
+            await asyncio.sleep(0)
+
+        mock_loop.assert_awaited_once()
+        session = mock_loop.call_args[1]["session"]
+        assert session.current_round == 3
+        assert len(session.alive()) == 3
+        assert mock_loop.call_args[1]["channel"] is channel
+        bot.get_channel.assert_called_once_with(555)
+        assert sessions_collection.find_one({"_id": orphan["_id"]})["current_game_state"] == "errored"
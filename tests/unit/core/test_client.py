@@ -320,15 +320,13 @@ class TestDatabaseMigration:
         """Test successful database migration"""
         from core.client import run_database_migration
         
-        with patch('core.client.MongoClient') as mock_mongo, \
+        with patch('core.client.get_database') as mock_get_database, \
              patch('core.client.logger') as mock_logger:
             
-            mock_client = MagicMock()
             mock_db = MagicMock()
             mock_collection = MagicMock()
             
-            mock_mongo.return_value = mock_client
-            mock_client.__getitem__.return_value = mock_db
+            mock_get_database.return_value = mock_db
             mock_db.__getitem__.return_value = mock_collection
             mock_collection.find.return_value = []  # No pets to migrate
             
@@ -341,7 +339,7 @@ class TestDatabaseMigration:
         """Test database migration error handling"""
         from core.client import run_database_migration
         
-        with patch('core.client.MongoClient', side_effect=Exception("Connection failed")), \
+        with patch('core.client.get_database', side_effect=Exception("Connection failed")), \
              patch('core.client.logger') as mock_logger:
             
             await run_database_migration()
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from core.singleflight import SingleFlight, get_singleflight, get_singleflight_metrics
+
+
+class HeldCall:
+    """Upstream stand-in that blocks until released"""
+
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class TestSingleFlight:
+    """Test request coalescing for identical concurrent calls"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        group = SingleFlight("test")
+        call = HeldCall({"v": 1})
+
+        waiters = [asyncio.ensure_future(group.do("player", call)) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert group.in_flight("player")
+        call.release.set()
+
+        results = await asyncio.gather(*waiters)
+        assert all(result is results[0] for result in results)
+        assert call.calls == 1
+        metrics = group.get_metrics()
+        assert metrics["calls"] == 5 and metrics["executions"] == 1 and metrics["deduplicated"] == 4
+        assert metrics["in_flight"] == 0 and metrics["dedup_ratio"] == 0.8
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_separately(self):
+        group = SingleFlight("test")
+        first, second = HeldCall(1), HeldCall(2)
+        first.release.set()
+        second.release.set()
+
+        assert await asyncio.gather(group.do("a", first), group.do("b", second)) == [1, 2]
+        assert group.get_metrics()["deduplicated"] == 0
+
+    @pytest.mark.asyncio
+    async def test_results_are_not_kept_after_completion(self):
+        group = SingleFlight("test")
+        call = HeldCall({"v": 1})
+        call.release.set()
+
+        await group.do("player", call)
+        await group.do("player", call)
+
+        assert call.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_waiter(self):
+        group = SingleFlight("test")
+        call = HeldCall(error=ValueError("down"))
+
+        waiters = [asyncio.ensure_future(group.do("player", call)) for _ in range(3)]
+        await asyncio.sleep(0)
+        call.release.set()
+
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert call.calls == 1
+        assert group.get_metrics()["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_call(self):
+        group = SingleFlight("test")
+        call = HeldCall({"v": 1})
+
+        first = asyncio.ensure_future(group.do("player", call))
+        second = asyncio.ensure_future(group.do("player", call))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        call.release.set()
+
+        assert await second == {"v": 1}
+        assert first.cancelled()
+
+    def test_named_groups_are_shared(self):
+        group = get_singleflight("test_named_group")
+
+        assert get_singleflight("test_named_group") is group
+        assert get_singleflight_metrics("test_named_group") == group.get_metrics()
+        assert "test_named_group" in get_singleflight_metrics()
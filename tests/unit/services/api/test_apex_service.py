@@ -1,8 +1,35 @@
-import pytest
-import requests
+import asyncio
+from contextlib import contextmanager
 from unittest.mock import patch, MagicMock
 from urllib.parse import quote
 
+import aiohttp
+import pytest
+
+
+class FakeResponse:
+    def __init__(self, status, payload=None):
+        self.status = status
+        self.payload = payload
+
+    async def json(self):
+        return self.payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@contextmanager
+def patch_tracker(response=None, side_effect=None):
+    """Serves Tracker.gg requests from a fake pooled session and yields its get()"""
+    session = MagicMock()
+    session.get = MagicMock(return_value=response, side_effect=side_effect)
+    with patch('services.api.apex.get_session', return_value=session):
+        yield session.get
+
 
 class TestApexAPIService:
     """Test Apex Legends API service functions"""
@@ -10,9 +37,7 @@ class TestApexAPIService:
     @pytest.fixture
     def mock_response_success(self):
         """Mock successful API response"""
-        response = MagicMock()
-        response.status_code = 200
-        response.json.return_value = {
+        return FakeResponse(200, {
             "data": {
                 "platformInfo": {
                     "platformSlug": "origin",
@@ -68,104 +93,101 @@ class TestApexAPIService:
                     }
                 ]
             }
-        }
-        return response
+        })
 
     @pytest.fixture
     def mock_response_not_found(self):
         """Mock 404 not found response"""
-        response = MagicMock()
-        response.status_code = 404
-        return response
+        return FakeResponse(404)
 
     @pytest.fixture
     def mock_response_forbidden(self):
         """Mock 403 forbidden response"""
-        response = MagicMock()
-        response.status_code = 403
-        return response
+        return FakeResponse(403)
 
     @pytest.fixture
     def mock_response_server_error(self):
         """Mock 500 server error response"""
-        response = MagicMock()
-        response.status_code = 500
-        return response
+        return FakeResponse(500)
 
-    def test_fetch_apex_stats_success(self, mock_response_success):
+    @pytest.mark.asyncio
+    async def test_fetch_apex_stats_success(self, mock_response_success):
         """Test successful API call to fetch Apex stats"""
-        from services.api.apex import fetch_apex_stats
+        from services.api.apex import fetch_apex_stats, get_tracker_client
         
         with patch('services.api.apex.TRN_API_KEY', 'test_api_key'):
-            with patch('requests.get', return_value=mock_response_success) as mock_get:
-                result = fetch_apex_stats("Origin (PC)", "TestPlayer")
+            with patch_tracker(mock_response_success) as mock_get:
+                result = await fetch_apex_stats("Origin (PC)", "TestPlayer")
                 
                 # Verify API call
                 expected_url = "https://public-api.tracker.gg/v2/apex/standard/profile/origin/TestPlayer"
                 expected_headers = {"TRN-Api-Key": "test_api_key"}
                 
-                mock_get.assert_called_once_with(expected_url, headers=expected_headers)
+                mock_get.assert_called_once_with(expected_url, headers=expected_headers,
+                                                 timeout=get_tracker_client().timeout)
                 
                 # Verify result
-                assert result == mock_response_success.json.return_value
+                assert result == mock_response_success.payload
 
-    def test_fetch_apex_stats_player_not_found(self, mock_response_not_found):
+    @pytest.mark.asyncio
+    async def test_fetch_apex_stats_player_not_found(self, mock_response_not_found):
         """Test API call when player is not found"""
         from services.api.apex import fetch_apex_stats
         from core.errors import ResourceNotFoundError
         
         with patch('services.api.apex.TRN_API_KEY', 'test_api_key'):
-            with patch('requests.get', return_value=mock_response_not_found):
+            with patch_tracker(mock_response_not_found):
                 with pytest.raises(ResourceNotFoundError, match="No Apex Legends stats found for TestPlayer on Origin \\(PC\\)"):
-                    fetch_apex_stats("Origin (PC)", "TestPlayer")
+                    await fetch_apex_stats("Origin (PC)", "TestPlayer")
 
-    def test_fetch_apex_stats_invalid_api_key(self, mock_response_forbidden):
+    @pytest.mark.asyncio
+    async def test_fetch_apex_stats_invalid_api_key(self, mock_response_forbidden):
         """Test API call with invalid API key (403)"""
         from services.api.apex import fetch_apex_stats
         from core.errors import APIError
         
         with patch('services.api.apex.TRN_API_KEY', 'invalid_key'):
-            with patch('requests.get', return_value=mock_response_forbidden):
+            with patch_tracker(mock_response_forbidden):
                 with pytest.raises(APIError, match="Invalid API key or insufficient permissions"):
-                    fetch_apex_stats("Origin (PC)", "TestPlayer")
+                    await fetch_apex_stats("Origin (PC)", "TestPlayer")
 
-    def test_fetch_apex_stats_server_error(self, mock_response_server_error):
+    @pytest.mark.asyncio
+    async def test_fetch_apex_stats_server_error(self, mock_response_server_error):
         """Test API call with server error"""
         from services.api.apex import fetch_apex_stats
         from core.errors import APIError
         
         with patch('services.api.apex.TRN_API_KEY', 'test_api_key'):
-            with patch('requests.get', return_value=mock_response_server_error):
+            with patch_tracker(mock_response_server_error):
                 with pytest.raises(APIError, match="API returned status code 500"):
-                    fetch_apex_stats("Origin (PC)", "TestPlayer")
+                    await fetch_apex_stats("Origin (PC)", "TestPlayer")
 
-    def test_fetch_apex_stats_no_api_key(self):
+    @pytest.mark.asyncio
+    async def test_fetch_apex_stats_no_api_key(self):
         """Test API call when API key is not configured"""
         from services.api.apex import fetch_apex_stats
         from core.errors import APIError
         
         with patch('services.api.apex.TRN_API_KEY', None):
             with pytest.raises(APIError, match="API key not configured"):
-                fetch_apex_stats("Origin (PC)", "TestPlayer")
+                await fetch_apex_stats("Origin (PC)", "TestPlayer")
 
-    def test_fetch_apex_stats_invalid_platform(self):
+    @pytest.mark.asyncio
+    async def test_fetch_apex_stats_invalid_platform(self):
         """Test API call with invalid platform"""
         from services.api.apex import fetch_apex_stats
         
         with patch('services.api.apex.TRN_API_KEY', 'test_api_key'):
             with pytest.raises(ValueError, match="Invalid platform: InvalidPlatform"):
-                fetch_apex_stats("InvalidPlatform", "TestPlayer")
+                await fetch_apex_stats("InvalidPlatform", "TestPlayer")
 
-    def test_fetch_apex_stats_platform_mapping(self):
+    @pytest.mark.asyncio
+    async def test_fetch_apex_stats_platform_mapping(self):
         """Test platform mapping works correctly"""
         from services.api.apex import fetch_apex_stats
         
         with patch('services.api.apex.TRN_API_KEY', 'test_api_key'):
-            with patch('requests.get') as mock_get:
-                mock_response = MagicMock()
-                mock_response.status_code = 200
-                mock_response.json.return_value = {}
-                mock_get.return_value = mock_response
+            with patch_tracker(FakeResponse(200, {})) as mock_get:
                 
                 # Test all platform mappings
                 platform_tests = [
@@ -175,26 +197,23 @@ class TestApexAPIService:
                 ]
                 
                 for display_platform, api_platform in platform_tests:
-                    fetch_apex_stats(display_platform, "TestPlayer")
+                    await fetch_apex_stats(display_platform, "TestPlayer")
                     
                     # Check the URL contains correct platform
                     call_args = mock_get.call_args[0]
                     assert api_platform in call_args[0]
 
-    def test_fetch_apex_stats_username_encoding(self):
+    @pytest.mark.asyncio
+    async def test_fetch_apex_stats_username_encoding(self):
         """Test username is properly URL encoded"""
         from services.api.apex import fetch_apex_stats
         
         with patch('services.api.apex.TRN_API_KEY', 'test_api_key'):
-            with patch('requests.get') as mock_get:
-                mock_response = MagicMock()
-                mock_response.status_code = 200
-                mock_response.json.return_value = {}
-                mock_get.return_value = mock_response
+            with patch_tracker(FakeResponse(200, {})) as mock_get:
                 
                 # Test username with special characters
                 special_username = "Test Player#1234"
-                fetch_apex_stats("Origin (PC)", special_username)
+                await fetch_apex_stats("Origin (PC)", special_username)
                 
                 # Check URL contains encoded username
                 call_args = mock_get.call_args[0]
@@ -203,15 +222,16 @@ class TestApexAPIService:
                 assert encoded_username in url
                 assert special_username not in url  # Original should not be in URL
 
-    def test_fetch_apex_stats_request_exception(self):
-        """Test handling of requests exceptions"""
+    @pytest.mark.asyncio
+    async def test_fetch_apex_stats_request_exception(self):
+        """Test handling of aiohttp client errors"""
         from services.api.apex import fetch_apex_stats
         from core.errors import APIError
         
         with patch('services.api.apex.TRN_API_KEY', 'test_api_key'):
-            with patch('requests.get', side_effect=requests.RequestException("Network error")):
+            with patch_tracker(side_effect=aiohttp.ClientError("Network error")):
                 with pytest.raises(APIError, match="Request error: Network error"):
-                    fetch_apex_stats("Origin (PC)", "TestPlayer")
+                    await fetch_apex_stats("Origin (PC)", "TestPlayer")
 
     def test_get_percentile_label_top_tier(self):
         """Test percentile label for top tier performance"""
@@ -346,18 +366,15 @@ class TestApexAPIService:
             assert len(display_platform) > 0
             assert len(api_platform) > 0
 
-    def test_api_url_construction(self):
+    @pytest.mark.asyncio
+    async def test_api_url_construction(self):
         """Test API URL is constructed correctly"""
         from services.api.apex import fetch_apex_stats
         
         with patch('services.api.apex.TRN_API_KEY', 'test_key'):
-            with patch('requests.get') as mock_get:
-                mock_response = MagicMock()
-                mock_response.status_code = 200
-                mock_response.json.return_value = {}
-                mock_get.return_value = mock_response
+            with patch_tracker(FakeResponse(200, {})) as mock_get:
                 
-                fetch_apex_stats("Origin (PC)", "TestUser")
+                await fetch_apex_stats("Origin (PC)", "TestUser")
                 
                 # Check URL structure
                 call_args = mock_get.call_args[0]
@@ -366,18 +383,15 @@ class TestApexAPIService:
                 assert url.startswith("https://public-api.tracker.gg/v2/apex/standard/profile/")
                 assert "/origin/TestUser" in url
 
-    def test_api_headers_structure(self):
+    @pytest.mark.asyncio
+    async def test_api_headers_structure(self):
         """Test API headers are structured correctly"""
         from services.api.apex import fetch_apex_stats
         
         with patch('services.api.apex.TRN_API_KEY', 'test_key_123'):
-            with patch('requests.get') as mock_get:
-                mock_response = MagicMock()
-                mock_response.status_code = 200
-                mock_response.json.return_value = {}
-                mock_get.return_value = mock_response
+            with patch_tracker(FakeResponse(200, {})) as mock_get:
                 
-                fetch_apex_stats("Origin (PC)", "TestUser")
+                await fetch_apex_stats("Origin (PC)", "TestUser")
                 
                 # Check headers
                 call_kwargs = mock_get.call_args[1]
@@ -386,39 +400,33 @@ class TestApexAPIService:
                 assert 'TRN-Api-Key' in headers
                 assert headers['TRN-Api-Key'] == 'test_key_123'
 
-    def test_error_logging(self):
+    @pytest.mark.asyncio
+    async def test_error_logging(self):
         """Test that errors are logged appropriately"""
         from services.api.apex import fetch_apex_stats
         
         with patch('services.api.apex.TRN_API_KEY', 'test_key'):
-            with patch('requests.get') as mock_get:
+            with patch_tracker(FakeResponse(403)):
                 with patch('services.api.apex.logger') as mock_logger:
                     # Test 403 error logging
-                    mock_response = MagicMock()
-                    mock_response.status_code = 403
-                    mock_get.return_value = mock_response
-                    
                     try:
-                        fetch_apex_stats("Origin (PC)", "TestUser")
+                        await fetch_apex_stats("Origin (PC)", "TestUser")
                     except:
                         pass
                     
                     mock_logger.error.assert_called()
 
-    def test_api_service_type_validation(self):
+    @pytest.mark.asyncio
+    async def test_api_service_type_validation(self):
         """Test API service function parameter types"""
         from services.api.apex import fetch_apex_stats
         
         # Should accept string parameters
         with patch('services.api.apex.TRN_API_KEY', 'test_key'):
-            with patch('requests.get') as mock_get:
-                mock_response = MagicMock()
-                mock_response.status_code = 200
-                mock_response.json.return_value = {}
-                mock_get.return_value = mock_response
+            with patch_tracker(FakeResponse(200, {})) as mock_get:
                 
                 # Should not raise type errors
-                result = fetch_apex_stats("Origin (PC)", "TestUser")
+                result = await fetch_apex_stats("Origin (PC)", "TestUser")
                 assert isinstance(result, dict)
 
     def test_percentile_edge_cases(self):
@@ -446,27 +454,30 @@ class TestApexAPIService:
         result = format_stat_value(negative_stat)
         assert "-1" in result
 
-    def test_request_timeout_handling(self):
+    @pytest.mark.asyncio
+    async def test_request_timeout_handling(self):
         """Test handling of request timeouts"""
         from services.api.apex import fetch_apex_stats
         from core.errors import APIError
         
         with patch('services.api.apex.TRN_API_KEY', 'test_key'):
-            with patch('requests.get', side_effect=requests.Timeout("Request timed out")):
-                with pytest.raises(APIError, match="Request error: Request timed out"):
-                    fetch_apex_stats("Origin (PC)", "TestUser")
+            with patch_tracker(side_effect=asyncio.TimeoutError()):
+                with pytest.raises(APIError, match="took too long to respond"):
+                    await fetch_apex_stats("Origin (PC)", "TestUser")
 
-    def test_connection_error_handling(self):
+    @pytest.mark.asyncio
+    async def test_connection_error_handling(self):
         """Test handling of connection errors"""
         from services.api.apex import fetch_apex_stats
         from core.errors import APIError
         
         with patch('services.api.apex.TRN_API_KEY', 'test_key'):
-            with patch('requests.get', side_effect=requests.ConnectionError("Connection failed")):
+            with patch_tracker(side_effect=aiohttp.ClientConnectionError("Connection failed")):
                 with pytest.raises(APIError, match="Request error: Connection failed"):
-                    fetch_apex_stats("Origin (PC)", "TestUser")
+                    await fetch_apex_stats("Origin (PC)", "TestUser")
 
-    def test_api_key_configuration_check(self):
+    @pytest.mark.asyncio
+    async def test_api_key_configuration_check(self):
         """Test API key configuration is checked before making requests"""
         from services.api.apex import fetch_apex_stats
         from core.errors import APIError
@@ -474,9 +485,38 @@ class TestApexAPIService:
         # Test with empty string
         with patch('services.api.apex.TRN_API_KEY', ''):
             with pytest.raises(APIError, match="API key not configured"):
-                fetch_apex_stats("Origin (PC)", "TestUser")
+                await fetch_apex_stats("Origin (PC)", "TestUser")
         
         # Test with None
         with patch('services.api.apex.TRN_API_KEY', None):
             with pytest.raises(APIError, match="API key not configured"):
-                fetch_apex_stats("Origin (PC)", "TestUser")
\ No newline at end of file
+                await fetch_apex_stats("Origin (PC)", "TestUser")
+
+    @pytest.mark.asyncio
+    async def test_tracker_client_bounds_requests_in_flight(self):
+        """Test the client never has more than max_concurrency requests open"""
+        from services.api.apex import TrackerClient
+
+        in_flight = peak = 0
+
+        class SlowResponse(FakeResponse):
+            async def __aenter__(self):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                return self
+
+            async def __aexit__(self, *exc):
+                nonlocal in_flight
+                in_flight -= 1
+                return False
+
+        client = TrackerClient(max_concurrency=2, timeout_seconds=3)
+        with patch('services.api.apex.TRN_API_KEY', 'test_key'):
+            with patch_tracker(side_effect=lambda *a, **kw: SlowResponse(200, {})) as mock_get:
+                await asyncio.gather(*(client.fetch_apex_stats("Xbox", f"player{i}") for i in range(5)))
+
+        assert peak == 2
+        assert mock_get.call_count == 5 and client.requests == 5
+        assert mock_get.call_args[1]["timeout"].total == 3
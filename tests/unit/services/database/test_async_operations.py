@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+
+class TestAsyncOperations:
+    """Test the awaitable data-access layer"""
+
+    @pytest.fixture
+    def mock_collections(self):
+        """Mock the collections used by services.database.operations"""
+        mock_pets = MagicMock()
+        mock_battles = MagicMock()
+        mock_bingo_sessions = MagicMock()
+
+        patches = [
+            patch('services.database.operations.pets_collection', mock_pets),
+            patch('services.database.operations.battle_logs_collection', mock_battles),
+            patch('services.database.operations.bingo_sessions', mock_bingo_sessions),
+        ]
+
+        for p in patches:
+            p.start()
+
+        yield {
+            'pets': mock_pets,
+            'battles': mock_battles,
+            'bingo_sessions': mock_bingo_sessions,
+        }
+
+        for p in patches:
+            p.stop()
+
+    @pytest.mark.asyncio
+    async def test_run_blocking_runs_off_loop_thread(self):
+        """Blocking calls execute on the database thread pool"""
+        from services.database.async_operations import run_blocking
+
+        loop_thread = threading.get_ident()
+        worker_thread = await run_blocking(threading.get_ident)
+
+        assert worker_thread != loop_thread
+
+    @pytest.mark.asyncio
+    async def test_run_blocking_passes_args_and_kwargs(self):
+        """Positional and keyword arguments are forwarded"""
+        from services.database.async_operations import run_blocking
+
+        func = MagicMock(return_value="ok")
+        result = await run_blocking(func, "a", b=2)
+
+        assert result == "ok"
+        func.assert_called_once_with("a", b=2)
+
+    @pytest.mark.asyncio
+    async def test_run_blocking_propagates_exceptions(self):
+        """Exceptions raised by the blocking call reach the awaiting coroutine"""
+        from services.database.async_operations import run_blocking
+
+        func = MagicMock(side_effect=ValueError("boom"))
+        with pytest.raises(ValueError):
+            await run_blocking(func)
+
+    @pytest.mark.asyncio
+    async def test_run_blocking_keeps_loop_responsive(self):
+        """A slow database call does not stall other tasks"""
+        from services.database.async_operations import run_blocking
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        await asyncio.gather(run_blocking(time.sleep, 0.2), ticker())
+
+        assert ticks == 5
+
+    @pytest.mark.asyncio
+    async def test_to_async_wraps_function(self):
+        """to_async turns a blocking helper into a coroutine function"""
+        from services.database.async_operations import to_async
+
+        def add(a, b):
+            return a + b
+
+        async_add = to_async(add)
+
+        assert async_add.__name__ == "add"
+        assert await async_add(2, 3) == 5
+
+    @pytest.mark.asyncio
+    async def test_get_pet(self, mock_collections):
+        """get_pet mirrors the blocking helper"""
+        from services.database.async_operations import get_pet
+
+        mock_collections['pets'].find_one.return_value = {"name": "Fluffy"}
+
+        result = await get_pet("123", "456")
+
+        assert result == {"name": "Fluffy"}
+        mock_collections['pets'].find_one.assert_called_once_with({"user_id": "123", "guild_id": "456"})
+
+    @pytest.mark.asyncio
+    async def test_log_battle(self, mock_collections):
+        """log_battle returns the inserted id as a string"""
+        from services.database.async_operations import log_battle
+
+        mock_collections['battles'].insert_one.return_value = MagicMock(inserted_id="abc")
+
+        result = await log_battle("1", "2", "3")
+
+        assert result == "abc"
+        mock_collections['battles'].insert_one.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_update_bingo_game(self, mock_collections):
+        """update_bingo_game reports whether a document was modified"""
+        from services.database.async_operations import update_bingo_game
+
+        mock_collections['bingo_sessions'].update_one.return_value = MagicMock(modified_count=1)
+
+        assert await update_bingo_game("game", {"current_game_state": "completed"}) is True
+
+    def test_surface_matches_operations(self):
+        """Every public blocking operation has an awaitable counterpart"""
+        import inspect
+        from services.database import operations, async_operations
+
+        blocking = {
+            name for name, obj in vars(operations).items()
+            if inspect.isfunction(obj) and obj.__module__ == operations.__name__ and not name.startswith('_')
+        }
+
+        for name in blocking:
+            assert inspect.iscoroutinefunction(getattr(async_operations, name)), name
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone
+
+import mongomock
+import pytest
+from unittest.mock import patch
+
+from services.database.battle_logs import (
+    TTL_INDEX_NAME,
+    compact_battle_logs,
+    ensure_battle_log_indexes,
+    get_daily_summaries,
+    top_pairs,
+)
+
+NOW = datetime(2025, 6, 20, 12, 0, tzinfo=timezone.utc)
+OLD_DAY = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+
+class TestBattleLogRetention:
+    """Test battle log roll-ups and retention"""
+
+    @pytest.fixture
+    def db(self):
+        return mongomock.MongoClient().db
+
+    def _log(self, db, user_id, opponent_id, timestamp, guild_id="g1"):
+        db.battle_logs.insert_one({
+            "user_id": user_id, "opponent_id": opponent_id, "guild_id": guild_id, "timestamp": timestamp,
+        })
+
+    def test_old_logs_rolled_into_daily_summaries(self, db):
+        """Old raw logs become per-guild daily summaries; recent ones stay raw"""
+        for hour in range(3):
+            self._log(db, "1", "2", OLD_DAY + timedelta(hours=hour))
+        self._log(db, "2", "1", OLD_DAY + timedelta(hours=5))
+        self._log(db, "3", "1", OLD_DAY + timedelta(hours=6))
+        self._log(db, "1", "2", OLD_DAY + timedelta(hours=7), guild_id="g2")
+        self._log(db, "1", "2", NOW - timedelta(days=1))
+
+        report = compact_battle_logs(db.battle_logs, db.battle_log_daily, now=NOW, rollup_after_days=7)
+
+        assert report["moved"] == 6
+        assert db.battle_logs.count_documents({}) == 1
+        summary = db.battle_log_daily.find_one({"_id": "g1:2025-06-01"})
+        assert summary["battles"] == 5
+        assert top_pairs(summary) == [("1", "2", 4), ("1", "3", 1)]
+        assert db.battle_log_daily.find_one({"_id": "g2:2025-06-01"})["battles"] == 1
+
+    def test_compaction_is_idempotent(self, db):
+        """A re-run after an interrupted compaction does not double count"""
+        for minute in range(5):
+            self._log(db, "1", "2", OLD_DAY + timedelta(minutes=minute))
+
+        # Simulate a crash after the summaries were written but before the raw logs were deleted
+        with patch.object(db.battle_logs, 'delete_many', side_effect=RuntimeError("crash")):
+            with pytest.raises(RuntimeError):
+                compact_battle_logs(db.battle_logs, db.battle_log_daily, now=NOW)
+
+        report = compact_battle_logs(db.battle_logs, db.battle_log_daily, now=NOW)
+        again = compact_battle_logs(db.battle_logs, db.battle_log_daily, now=NOW)
+
+        assert report == {"moved": 5, "batches": 0, "already_applied": 1}
+        assert again["moved"] == 0
+        assert db.battle_log_daily.find_one({"_id": "g1:2025-06-01"})["battles"] == 5
+
+    def test_chunks_accumulate_into_one_summary(self, db):
+        """Several chunks for the same day add up"""
+        for minute in range(7):
+            self._log(db, "1", "2", OLD_DAY + timedelta(minutes=minute))
+
+        report = compact_battle_logs(db.battle_logs, db.battle_log_daily, now=NOW, chunk_size=3)
+
+        assert report["moved"] == 7
+        assert report["batches"] == 3
+        summaries = get_daily_summaries(db.battle_log_daily, "g1", OLD_DAY, OLD_DAY + timedelta(days=1))
+        assert [s["battles"] for s in summaries] == [7]
+        assert "batches" not in summaries[0]
+
+    def test_ttl_index_created_and_updated(self, db):
+        """Raw retention is a TTL index whose expiry follows the configured days"""
+        ensure_battle_log_indexes(db.battle_logs, db.battle_log_daily, retention_days=30)
+
+        info = db.battle_logs.index_information()[TTL_INDEX_NAME]
+        assert info["expireAfterSeconds"] == 30 * 86400
+        assert "guild_day" in db.battle_log_daily.index_information()
@@ -0,0 +1,87 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+
+class TestConnectionRegistry:
+    """Test the shared MongoDB client registry"""
+
+    @pytest.fixture
+    def fresh_registry(self):
+        """Reset the registry around each test so a mocked client is created"""
+        import services.database.connection as connection
+
+        saved = (connection._client, connection._pool_listener)
+        connection._client = None
+        connection._pool_listener = None
+        yield connection
+        connection._client, connection._pool_listener = saved
+
+    def test_get_client_is_shared(self, fresh_registry):
+        """Repeated calls return the same client instance"""
+        with patch('services.database.connection.MongoClient') as mock_client_cls:
+            first = fresh_registry.get_client()
+            second = fresh_registry.get_client()
+
+        assert first is second
+        mock_client_cls.assert_called_once()
+
+    def test_get_client_uses_configured_options(self, fresh_registry):
+        """Pool size, timeouts and read preference come from settings"""
+        with patch('services.database.connection.MONGODB_MAX_POOL_SIZE', 7), \
+             patch('services.database.connection.MONGODB_READ_PREFERENCE', 'secondaryPreferred'), \
+             patch('services.database.connection.MongoClient') as mock_client_cls:
+            fresh_registry.get_client()
+
+        kwargs = mock_client_cls.call_args.kwargs
+        assert kwargs['maxPoolSize'] == 7
+        assert kwargs['readPreference'] == 'secondaryPreferred'
+        assert 'serverSelectionTimeoutMS' in kwargs
+        assert isinstance(kwargs['event_listeners'][0], fresh_registry.PoolStatsListener)
+
+    def test_get_collection_uses_default_database(self, fresh_registry):
+        """Collection handles come from the shared client and default database"""
+        mock_client = MagicMock()
+        with patch('services.database.connection.MongoClient', return_value=mock_client), \
+             patch('services.database.connection.MONGODB_DB_NAME', 'test_db'):
+            fresh_registry.get_collection('pets')
+
+        mock_client.__getitem__.assert_called_with('test_db')
+        mock_client.__getitem__.return_value.__getitem__.assert_called_with('pets')
+
+    def test_ping_failure_returns_false(self, fresh_registry):
+        """ping reports an unreachable server without raising"""
+        mock_client = MagicMock()
+        mock_client.admin.command.side_effect = Exception("unreachable")
+        with patch('services.database.connection.MongoClient', return_value=mock_client):
+            assert fresh_registry.ping() is False
+
+    def test_pool_stats_track_events(self, fresh_registry):
+        """Pool listener events are reflected in get_pool_stats"""
+        with patch('services.database.connection.MongoClient'):
+            fresh_registry.get_client()
+
+        listener = fresh_registry._pool_listener
+        listener.pool_created(None)
+        listener.connection_created(None)
+        listener.connection_created(None)
+        listener.connection_checked_out(None)
+        listener.connection_closed(None)
+
+        stats = fresh_registry.get_pool_stats()
+        assert stats['initialized'] is True
+        assert stats['pools'] == 1
+        assert stats['connections_open'] == 1
+        assert stats['connections_in_use'] == 1
+        assert stats['checkouts'] == 1
+
+    def test_close_client_resets_registry(self, fresh_registry):
+        """close_client closes the pool and a new client is created on next use"""
+        with patch('services.database.connection.MongoClient') as mock_client_cls:
+            client = fresh_registry.get_client()
+            fresh_registry.close_client()
+
+            client.close.assert_called_once()
+            assert fresh_registry.get_pool_stats()['initialized'] is False
+
+            fresh_registry.get_client()
+            assert mock_client_cls.call_count == 2
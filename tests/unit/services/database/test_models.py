@@ -132,8 +132,8 @@ class TestDatabaseModels:
         assert pet.balance == 0
         assert pet.killstreak == 0
         assert pet.loss_streak == 0
-        assert pet.daily_quests == []
-        assert pet.achievements == []
+        assert pet.daily_quests == {}
+        assert pet.achievements == {}
         assert pet.active_items == []
         assert pet.last_vote_reward_time is None
         assert pet.claimed_daily_completion_bonus is False
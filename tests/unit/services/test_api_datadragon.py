@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from services.api.datadragon import DDRAGON_VERSIONS_URL, DataDragon
+
+
+def _champion_payload():
+    return {"data": {
+        "Ahri": {"id": "Ahri", "key": "103", "name": "Ahri"},
+        "MonkeyKing": {"id": "MonkeyKing", "key": "62", "name": "Wukong"},
+        "LeeSin": {"id": "LeeSin", "key": "64", "name": "Lee Sin"},
+    }}
+
+
+def _fake_riot_client(versions):
+    """Riot client stub serving versions.json and champion.json"""
+    def get_json(session, url, headers=None):
+        if url == DDRAGON_VERSIONS_URL:
+            return list(versions)
+        if url.endswith("/champion.json"):
+            return _champion_payload()
+        return None
+
+    client = MagicMock()
+    client.get_json = AsyncMock(side_effect=get_json)
+    return client
+
+
+class TestDataDragon:
+    """Test the Data Dragon static-data cache"""
+
+    @pytest.mark.asyncio
+    async def test_champion_json_downloaded_once(self, tmp_path):
+        """Many lookups (e.g. a 10-player live game) download champion.json once"""
+        client = _fake_riot_client(["14.2.1", "14.1.1"])
+        dd = DataDragon(cache_path=str(tmp_path / "ddragon.json"))
+
+        with patch('services.api.datadragon.get_riot_client', return_value=client):
+            names = await asyncio.gather(*[dd.get_champion_name(key, MagicMock()) for key in (103, 62, 64, 999) * 3])
+
+        assert names[:4] == ["Ahri", "Wukong", "Lee Sin", "Unknown"]
+        assert dd.downloads == 1
+        assert client.get_json.call_count == 2
+        assert dd.version == "14.2.1"
+
+    @pytest.mark.asyncio
+    async def test_restart_is_warm(self, tmp_path):
+        """A new instance loads the persisted snapshot without network calls"""
+        path = str(tmp_path / "ddragon.json")
+        with patch('services.api.datadragon.get_riot_client', return_value=_fake_riot_client(["14.2.1"])):
+            await DataDragon(cache_path=path).get_version(MagicMock())
+
+        with open(path) as f:
+            assert json.load(f)["champions"]["62"] == ["MonkeyKing", "Wukong"]
+
+        dd = DataDragon(cache_path=path, refresh_seconds=3600)
+        dd._checked_at = float("inf")  # Pretend the patch check just happened
+        client = _fake_riot_client(["14.2.1"])
+        with patch('services.api.datadragon.get_riot_client', return_value=client):
+            assert await dd.get_champion_name(62) == "Wukong"
+        client.get_json.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_new_patch_refreshes_in_background(self, tmp_path):
+        """Stale data is served immediately while a background refresh picks up a new patch"""
+        client = _fake_riot_client(["14.1.1"])
+        dd = DataDragon(cache_path=str(tmp_path / "ddragon.json"), refresh_seconds=0)
+
+        with patch('services.api.datadragon.get_riot_client', return_value=client):
+            assert await dd.get_version(MagicMock()) == "14.1.1"
+            # Riot ships a new patch
+            client.get_json.side_effect = _fake_riot_client(["14.2.1", "14.1.1"]).get_json.side_effect
+            assert await dd.get_version(MagicMock()) == "14.1.1"
+            await dd._refresh_task
+
+        assert dd.version == "14.2.1"
+        assert dd.downloads == 2
+
+    @pytest.mark.asyncio
+    async def test_name_and_id_lookups(self, tmp_path):
+        """Display names and Data Dragon ids resolve in both directions"""
+        dd = DataDragon(cache_path=str(tmp_path / "ddragon.json"))
+        with patch('services.api.datadragon.get_riot_client', return_value=_fake_riot_client(["14.2.1"])):
+            await dd.ensure_loaded(MagicMock())
+
+        assert dd.champion_id_for_name("Wukong") == "MonkeyKing"
+        assert dd.champion_id_for_name("monkeyking") == "MonkeyKing"
+        assert dd.display_name_for_id("LeeSin") == "Lee Sin"
+        assert dd.display_name_for_id("Nobody") is None
+
+    @pytest.mark.asyncio
+    async def test_unavailable_service_falls_back(self, tmp_path):
+        """Without Data Dragon the default version and "Unknown" are returned"""
+        client = MagicMock()
+        client.get_json = AsyncMock(return_value=None)
+        dd = DataDragon(cache_path=str(tmp_path / "ddragon.json"))
+
+        with patch('services.api.datadragon.get_riot_client', return_value=client):
+            assert await dd.get_version(MagicMock()) == "13.1.1"
+            assert await dd.get_champion_name(62, MagicMock()) == "Unknown"
+
+        # The second lookup did not hammer the unavailable service again
+        assert client.get_json.call_count == 1
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from services.api.http import RIOT_UPSTREAM, HttpClientManager, parse_host_limits, upstream_key
+
+
+@pytest_asyncio.fixture
+async def server():
+    async def ok(request):
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/ok", ok)
+    server = TestServer(app)
+    await server.start_server()
+    yield server
+    await server.close()
+
+
+class TestHttpClientManager:
+    """Test the shared keep-alive HTTP sessions"""
+
+    def test_riot_routing_hosts_share_one_pool(self):
+        assert upstream_key("https://euw1.api.riotgames.com/lol/x") == RIOT_UPSTREAM
+        assert upstream_key("https://europe.api.riotgames.com/riot/y") == RIOT_UPSTREAM
+        assert upstream_key("https://Fortnite-API.com/v2/stats") == "fortnite-api.com"
+        assert upstream_key("top.gg") == "top.gg"
+
+    def test_parse_host_limits_skips_bad_entries(self):
+        assert parse_host_limits("fortnite-api.com=8, discord.com=4,bad,x=y") == {"fortnite-api.com": 8, "discord.com": 4}
+        assert parse_host_limits(None) == {}
+
+    @pytest.mark.asyncio
+    async def test_session_is_reused_per_host_with_tuned_connector(self):
+        manager = HttpClientManager(max_connections=50, max_connections_per_host=5, host_limits={"top.gg": 2},
+                                    dns_cache_seconds=120)
+        try:
+            session = manager.get_session("https://top.gg/api/bots/1/check")
+            assert manager.get_session("top.gg") is session
+            assert manager.get_session("https://api.nasa.gov/planetary/apod") is not session
+            assert session.connector.limit == 50
+            assert session.connector.limit_per_host == 2
+            assert session.connector.use_dns_cache and session.connector._cached_hosts._ttl == 120
+            async with manager.session("https://top.gg/other") as borrowed:
+                assert borrowed is session
+            assert not session.closed
+        finally:
+            await manager.close()
+        assert session.closed
+        assert manager.get_metrics()["sessions"] == 0
+
+    @pytest.mark.asyncio
+    async def test_counts_latency_and_connection_reuse(self, server):
+        manager = HttpClientManager()
+        url = str(server.make_url("/ok"))
+        try:
+            for _ in range(3):
+                async with manager.get_session(url).get(url) as response:
+                    assert await response.json() == {"ok": True}
+        finally:
+            await manager.close()
+
+        metrics = manager.get_metrics()
+        stats = metrics["hosts"][server.host]
+        assert metrics["sessions_created"] == 1
+        assert stats["requests"] == 3 and stats["errors"] == 0
+        assert stats["new_connections"] == 1 and stats["reused_connections"] == 2
+        assert stats["avg_ms"] >= 0 and stats["max_ms"] >= stats["avg_ms"]
+
+    def test_session_from_a_stopped_loop_is_closed_when_replaced(self):
+        manager = HttpClientManager()
+
+        async def open_session():
+            return manager.get_session("top.gg")
+
+        async def reopen():
+            fresh = manager.get_session("top.gg")
+            await manager.close()
+            return fresh
+
+        old_loop, new_loop = asyncio.new_event_loop(), asyncio.new_event_loop()
+        try:
+            stale = old_loop.run_until_complete(open_session())
+            old_loop.close()
+            fresh = new_loop.run_until_complete(reopen())
+        finally:
+            old_loop.close()
+            new_loop.close()
+        assert fresh is not stale
+        assert stale.closed and fresh.closed
+        assert manager.get_metrics()["sessions_created"] == 2
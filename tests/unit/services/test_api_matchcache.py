@@ -0,0 +1,125 @@
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from services.api.matchcache import (
+    LRUCache,
+    MatchCache,
+    compact_lol_match,
+    compact_tft_match,
+)
+
+
+def _lol_payload(match_id="EUW1_1"):
+    return {
+        "metadata": {"matchId": match_id, "participants": ["p1", "p2"]},
+        "info": {
+            "gameDuration": 1834,
+            "gameMode": "CLASSIC",
+            "participants": [
+                {"puuid": "p1", "win": True, "championName": "MonkeyKing", "kills": 7, "deaths": 2, "assists": 9,
+                 "item0": 3078, "perks": {"styles": []}, "challenges": {"kda": 8.0}},
+                {"puuid": "p2", "win": False, "championName": "Ahri", "kills": 1, "deaths": 7, "assists": 3},
+            ],
+        },
+    }
+
+
+def _tft_payload():
+    return {
+        "info": {
+            "game_length": 2100.5,
+            "participants": [
+                {"puuid": "p1", "placement": 1, "level": 9, "units": [{"character_id": "TFT_X"}],
+                 "traits": [{"name": "Set13_A", "tier_current": 2}, {"name": "Set13_B", "tier_current": 0}]},
+            ],
+        },
+    }
+
+
+class TestMatchCache:
+    """Test the match-detail cache"""
+
+    def test_compaction_keeps_embed_fields_only(self):
+        """Compact payloads hold just what the match history embeds read"""
+        lol = compact_lol_match(_lol_payload())
+        assert set(lol) == {"info"}
+        assert set(lol["info"]) == {"gameDuration", "participants"}
+        assert lol["info"]["participants"][0] == {
+            "puuid": "p1", "win": True, "championName": "MonkeyKing", "kills": 7, "deaths": 2, "assists": 9,
+        }
+
+        tft = compact_tft_match(_tft_payload())
+        assert tft["info"]["participants"][0]["traits"] == [{"name": "Set13_A", "tier_current": 2}]
+        assert "units" not in tft["info"]["participants"][0]
+
+    def test_lru_evicts_least_recently_used(self):
+        """The memory tier is bounded and keeps recently read entries"""
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert len(cache) == 2
+
+    @pytest.mark.asyncio
+    async def test_hit_rate_reported(self):
+        """Hits and misses are counted"""
+        cache = MatchCache("lol", compact_lol_match, max_entries=10, db_path=None)
+
+        assert await cache.get("EUW1_1") is None
+        await cache.put("EUW1_1", _lol_payload())
+        assert (await cache.get("EUW1_1"))["info"]["gameDuration"] == 1834
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_survives_restart(self, tmp_path):
+        """With a SQLite path, a new cache serves matches stored by the previous one"""
+        path = str(tmp_path / "matches.db")
+        await MatchCache("lol", compact_lol_match, db_path=path).put("EUW1_1", _lol_payload())
+
+        fresh = MatchCache("lol", compact_lol_match, db_path=path)
+        data = await fresh.get("EUW1_1")
+
+        assert data == compact_lol_match(_lol_payload())
+        assert fresh.get_stats()["disk_hits"] == 1
+
+    def test_recent_ids_expire(self):
+        """Recent match id lists are only reused within their TTL"""
+        cache = MatchCache("lol", compact_lol_match, db_path=None, ids_ttl_seconds=60)
+        cache.put_ids("europe:p1:9", ["EUW1_1"])
+
+        assert cache.get_ids("europe:p1:9") == ["EUW1_1"]
+        with patch('services.api.matchcache.time.monotonic', return_value=10 ** 9):
+            assert cache.get_ids("europe:p1:9") is None
+
+    @pytest.mark.asyncio
+    async def test_repeated_match_history_makes_no_riot_calls(self):
+        """A second Match History view for the same player is served from cache"""
+        from cogs.games.league import LeagueCog
+
+        bot = MagicMock()
+        bot.loop = MagicMock()
+        cog = LeagueCog(bot)
+        fetch = AsyncMock(side_effect=lambda session, url, headers=None: (
+            ["EUW1_1"] if url.endswith("ids?count=9") else _lol_payload()
+        ))
+        cache = MatchCache("lol", compact_lol_match, db_path=None)
+
+        with patch.object(cog, 'fetch_data', fetch), \
+             patch('cogs.games.league.get_match_cache', return_value=cache), \
+             patch.object(cog, 'get_emoji_for_champion', AsyncMock(return_value="")):
+            first = await cog.create_match_history_embed(MagicMock(), "p1", "EUW1", {}, "Name#EUW")
+            calls_after_first = fetch.await_count
+            second = await cog.create_match_history_embed(MagicMock(), "p1", "EUW1", {}, "Name#EUW")
+
+        assert calls_after_first == 2
+        assert fetch.await_count == 2
+        assert first.fields[0].value == second.fields[0].value
+        assert "7/2/9" in second.fields[0].value
@@ -0,0 +1,180 @@
+import asyncio
+
+import pytest
+from unittest.mock import MagicMock
+
+from services.api.riot import RateLimitBucket, RiotClient, method_key, parse_rate_limits
+
+
+class FakeClock:
+    """Monotonic clock advanced only by the client's sleeps"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+class FakeResponse:
+    def __init__(self, status, payload=None, headers=None):
+        self.status = status
+        self.reason = "reason"
+        self.headers = headers or {}
+        self._payload = payload
+
+    async def json(self):
+        return self._payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """Returns queued responses in order and records request times"""
+
+    def __init__(self, responses, clock):
+        self.responses = list(responses)
+        self.clock = clock
+        self.request_times = []
+
+    def get(self, url, headers=None):
+        self.request_times.append(self.clock.now)
+        response = self.responses.pop(0) if self.responses else FakeResponse(200, {"ok": True})
+        return response
+
+
+SUMMONER_URL = "https://euw1.api.riotgames.com/lol/summoner/v4/summoners/by-puuid/abc"
+
+
+class TestRiotClient:
+    """Test the shared Riot API client"""
+
+    def test_parse_rate_limits(self):
+        """Rate limit headers parse into (count, seconds) pairs"""
+        assert parse_rate_limits("20:1,100:120") == [(20, 1.0), (100, 120.0)]
+        assert parse_rate_limits(None) == []
+        assert parse_rate_limits("garbage") == []
+
+    def test_method_key_drops_parameters(self):
+        """Path parameters are removed so one method shares one bucket"""
+        assert method_key("/lol/summoner/v4/summoners/by-puuid/abc") == "lol/summoner/v4/summoners/by-puuid"
+        assert method_key("/lol/match/v5/matches/by-puuid/abc/ids") == "lol/match/v5/matches/by-puuid/ids"
+        assert method_key("/lol/match/v5/matches/EUW1_123") == "lol/match/v5/matches"
+        assert method_key("/riot/account/v1/accounts/by-riot-id/name/tag") == "riot/account/v1/accounts/by-riot-id"
+        assert method_key("/tft/league/v1/by-puuid/abc") == "tft/league/v1/by-puuid"
+
+    def test_bucket_waits_for_oldest_request_in_window(self):
+        """A full window waits until its oldest request expires"""
+        bucket = RateLimitBucket([(2, 10.0)])
+        bucket.record(0.0)
+        bucket.record(4.0)
+
+        assert bucket.wait_time(5.0) == pytest.approx(5.0)
+        assert bucket.wait_time(10.0) == 0
+
+    @pytest.mark.asyncio
+    async def test_burst_is_queued_within_app_limit(self):
+        """A burst larger than the app limit waits instead of failing"""
+        clock = FakeClock()
+        client = RiotClient(app_limits=[(3, 1.0)], clock=clock, sleep=clock.sleep)
+        session = FakeSession([], clock)
+
+        results = await asyncio.gather(*[client.get_json(session, SUMMONER_URL, {}) for _ in range(7)])
+
+        assert all(r == {"ok": True} for r in results)
+        # Never more than 3 requests in any 1s window
+        times = session.request_times
+        assert all(sum(1 for t in times if s <= t < s + 1.0) <= 3 for s in times)
+        metrics = client.get_metrics()
+        # The four requests beyond the limit queued together
+        assert metrics["max_queue_depth"] == 4
+        assert metrics["queued"] == 0
+        assert metrics["rate_limited"] == 0
+
+    @pytest.mark.asyncio
+    async def test_method_limit_learned_from_headers(self):
+        """X-Method-Rate-Limit from a response throttles later calls to that method only"""
+        clock = FakeClock()
+        client = RiotClient(app_limits=[(100, 1.0)], clock=clock, sleep=clock.sleep)
+        headers = {"X-App-Rate-Limit": "100:1", "X-Method-Rate-Limit": "1:5"}
+        session = FakeSession([FakeResponse(200, {}, headers), FakeResponse(200, {}, headers), FakeResponse(200, {}, headers)], clock)
+
+        await client.get_json(session, SUMMONER_URL, {})
+        await client.get_json(session, "https://euw1.api.riotgames.com/lol/league/v4/entries/by-puuid/abc", {})
+        await client.get_json(session, SUMMONER_URL, {})
+
+        assert session.request_times == [1000.0, 1000.0, 1005.0]
+
+    @pytest.mark.asyncio
+    async def test_regions_have_separate_buckets(self):
+        """One region's exhausted bucket does not delay another region"""
+        clock = FakeClock()
+        client = RiotClient(app_limits=[(1, 10.0)], clock=clock, sleep=clock.sleep)
+        session = FakeSession([], clock)
+
+        await client.get_json(session, SUMMONER_URL, {})
+        await client.get_json(session, "https://na1.api.riotgames.com/lol/summoner/v4/summoners/by-puuid/abc", {})
+
+        assert session.request_times == [1000.0, 1000.0]
+
+    @pytest.mark.asyncio
+    async def test_429_blocks_bucket_then_retries(self):
+        """A method 429 waits Retry-After before the retry"""
+        clock = FakeClock()
+        client = RiotClient(app_limits=[(100, 1.0)], clock=clock, sleep=clock.sleep)
+        session = FakeSession([
+            FakeResponse(429, headers={"Retry-After": "3", "X-Rate-Limit-Type": "method"}),
+            FakeResponse(200, {"puuid": "abc"}),
+        ], clock)
+
+        result = await client.get_json(session, SUMMONER_URL, {})
+
+        assert result == {"puuid": "abc"}
+        assert session.request_times == [1000.0, 1003.0]
+        assert client.get_metrics()["rate_limited"] == 1
+        assert client.get_metrics()["retries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_retries_are_capped(self):
+        """Repeated 429s give up after max_retries instead of recursing forever"""
+        clock = FakeClock()
+        client = RiotClient(app_limits=[], max_retries=2, clock=clock, sleep=clock.sleep)
+        session = FakeSession([FakeResponse(429, headers={"Retry-After": "1"}) for _ in range(10)], clock)
+
+        result = await client.get_json(session, SUMMONER_URL, {})
+
+        assert result is None
+        assert len(session.request_times) == 3
+
+    @pytest.mark.asyncio
+    async def test_non_riot_hosts_skip_rate_limits(self):
+        """Data Dragon requests are not rate limited and 404s return None"""
+        clock = FakeClock()
+        client = RiotClient(app_limits=[(1, 100.0)], clock=clock, sleep=clock.sleep)
+        session = FakeSession([FakeResponse(200, ["14.1.1"]), FakeResponse(200, ["14.1.1"]), FakeResponse(404)], clock)
+        url = "https://ddragon.leagueoflegends.com/api/versions.json"
+
+        assert await client.get_json(session, url) == ["14.1.1"]
+        assert await client.get_json(session, url) == ["14.1.1"]
+        assert await client.get_json(session, url) is None
+        assert clock.sleeps == []
+
+    @pytest.mark.asyncio
+    async def test_connection_errors_return_none(self):
+        """Transport errors are logged and return None like the old fetch_data"""
+        clock = FakeClock()
+        client = RiotClient(clock=clock, sleep=clock.sleep)
+        session = MagicMock()
+        session.get.side_effect = RuntimeError("boom")
+
+        assert await client.get_json(session, SUMMONER_URL, {}) is None
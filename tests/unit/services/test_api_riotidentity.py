@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta, timezone
+
+import mongomock
+import pytest
+
+from services.api.riotidentity import (
+    ACCOUNT_BY_PUUID_URL,
+    ACCOUNT_BY_RIOT_ID_URL,
+    TTL_INDEX_NAME,
+    RiotIdentityCache,
+    riot_id_key,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class AccountFetch:
+    """account-v1 stand-in answering both lookups from a small roster"""
+
+    def __init__(self, *accounts):
+        self.accounts = list(accounts)
+        self.urls = []
+
+    async def __call__(self, url):
+        self.urls.append(url)
+        for account in self.accounts:
+            if url in (ACCOUNT_BY_RIOT_ID_URL.format(game_name=account["gameName"], tag_line=account["tagLine"]),
+                       ACCOUNT_BY_PUUID_URL.format(puuid=account["puuid"])):
+                return dict(account)
+        return None
+
+
+FAKER = {"puuid": "p-faker", "gameName": "Faker", "tagLine": "KR1"}
+CAPS = {"puuid": "p-caps", "gameName": "Caps", "tagLine": "EUW"}
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock):
+    return RiotIdentityCache(max_entries=2, ttl_seconds=60, clock=clock)
+
+
+class TestRiotIdentityCache:
+    """Test the shared Riot ID <-> PUUID cache"""
+
+    def test_riot_id_key_ignores_case_and_padding(self):
+        assert riot_id_key(" Faker ", "kr1") == riot_id_key("faker", "KR1")
+
+    @pytest.mark.asyncio
+    async def test_riot_id_lookup_is_cached_both_ways(self, cache):
+        fetch = AccountFetch(FAKER)
+
+        assert await cache.by_riot_id("lol", "Faker", "KR1", fetch) == FAKER
+        assert await cache.by_riot_id("lol", "FAKER", "kr1", fetch) == FAKER
+        assert await cache.by_puuid("lol", "p-faker", fetch) == FAKER
+
+        assert len(fetch.urls) == 1
+        assert cache.get_metrics()["hits"] == 2
+
+    @pytest.mark.asyncio
+    async def test_unknown_accounts_are_not_cached(self, cache):
+        fetch = AccountFetch()
+
+        assert await cache.by_riot_id("lol", "Nobody", "000", fetch) is None
+        assert await cache.by_riot_id("lol", "Nobody", "000", fetch) is None
+        assert len(fetch.urls) == 2
+
+    @pytest.mark.asyncio
+    async def test_namespaces_are_kept_apart(self, cache):
+        fetch = AccountFetch(FAKER)
+
+        await cache.by_riot_id("lol", "Faker", "KR1", fetch)
+        await cache.by_riot_id("tft", "Faker", "KR1", fetch)
+
+        assert len(fetch.urls) == 2
+
+    @pytest.mark.asyncio
+    async def test_entries_expire_after_ttl(self, cache, clock):
+        fetch = AccountFetch(FAKER)
+
+        await cache.by_puuid("lol", "p-faker", fetch)
+        clock.now += 61
+        await cache.by_puuid("lol", "p-faker", fetch)
+
+        assert len(fetch.urls) == 2
+
+    @pytest.mark.asyncio
+    async def test_renamed_account_drops_old_riot_id(self, cache):
+        await cache.by_puuid("lol", "p-faker", AccountFetch(FAKER))
+        cache.remember("lol", dict(FAKER, gameName="Hide on bush"))
+
+        fetch = AccountFetch(FAKER)
+        await cache.by_riot_id("lol", "Faker", "KR1", fetch)
+        assert len(fetch.urls) == 1
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_accounts_are_evicted(self, cache):
+        third = {"puuid": "p-chovy", "gameName": "Chovy", "tagLine": "KR1"}
+        fetch = AccountFetch(FAKER, CAPS, third)
+
+        await cache.by_riot_id("lol", "Faker", "KR1", fetch)
+        await cache.by_riot_id("lol", "Caps", "EUW", fetch)
+        await cache.by_riot_id("lol", "Faker", "KR1", fetch)
+        await cache.by_riot_id("lol", "Chovy", "KR1", fetch)
+        await cache.by_riot_id("lol", "Caps", "EUW", fetch)
+
+        assert len(fetch.urls) == 4
+        assert cache.get_metrics()["entries"] == 2
+
+    @pytest.mark.asyncio
+    async def test_resolutions_are_written_through_and_survive_restart(self, clock):
+        collection = mongomock.MongoClient().db.riot_identities
+        first = RiotIdentityCache(collection=collection, clock=clock)
+        await first.by_riot_id("lol", "Faker", "KR1", AccountFetch(FAKER))
+
+        stored = collection.find_one({"_id": "lol:p-faker"})
+        assert stored["riotIdKey"] == "faker#kr1"
+        assert TTL_INDEX_NAME in collection.index_information()
+
+        fetch = AccountFetch()
+        restarted = RiotIdentityCache(collection=collection, clock=clock)
+        assert await restarted.by_riot_id("lol", "faker", "kr1", fetch) == FAKER
+        assert await restarted.by_puuid("lol", "p-faker", fetch) == FAKER
+        assert await restarted.by_puuid("tft", "p-faker", fetch) is None
+        assert restarted.get_metrics()["db_hits"] == 1
+        assert len(fetch.urls) == 1
+
+    @pytest.mark.asyncio
+    async def test_stored_identities_past_db_ttl_are_ignored(self, clock):
+        collection = mongomock.MongoClient().db.riot_identities
+        collection.insert_one(dict(FAKER, _id="lol:p-faker", namespace="lol", riotIdKey="faker#kr1",
+                                   updatedAt=datetime.now(timezone.utc) - timedelta(days=2)))
+        cache = RiotIdentityCache(collection=collection, db_ttl_seconds=86400, clock=clock)
+        fetch = AccountFetch(FAKER)
+
+        await cache.by_riot_id("lol", "Faker", "KR1", fetch)
+
+        assert len(fetch.urls) == 1
+        refreshed = collection.find_one({"_id": "lol:p-faker"})["updatedAt"].replace(tzinfo=timezone.utc)
+        assert datetime.now(timezone.utc) - refreshed < timedelta(minutes=1)
@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+
+from core.errors import APIError, ResourceNotFoundError
+from core.singleflight import get_singleflight_metrics
+from services.api.statscache import StatsCache, get_stats_cache, stats_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingFetch:
+    """Upstream stand-in returning queued results, optionally held until released"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        result = self.results.pop(0) if self.results else {"calls": self.calls}
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock):
+    return StatsCache(ttls={"apex": 60}, negative_ttl_seconds=10, stale_seconds=100, max_entries=3, clock=clock)
+
+
+class TestStatsCache:
+    """Test the shared player stats cache"""
+
+    def test_key_normalises_names(self):
+        assert stats_key("apex", "Xbox", "  Some   Player ") == stats_key("apex", "xbox", "some player")
+
+    @pytest.mark.asyncio
+    async def test_fresh_entries_skip_upstream(self, cache, clock):
+        fetch = CountingFetch({"v": 1})
+
+        assert await cache.get("apex", "Xbox", "Player", fetch) == {"v": 1}
+        clock.now += 59
+        assert await cache.get("apex", "xbox", "PLAYER", fetch) == {"v": 1}
+
+        assert fetch.calls == 1
+        assert cache.get_metrics()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_is_served_while_refreshing(self, cache, clock):
+        fetch = CountingFetch({"v": 1}, {"v": 2})
+        await cache.get("apex", "Xbox", "Player", fetch)
+        clock.now += 61
+        fetch.release.clear()
+
+        assert await cache.get("apex", "Xbox", "Player", fetch) == {"v": 1}
+        assert await cache.get("apex", "Xbox", "Player", fetch) == {"v": 1}
+        fetch.release.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        assert fetch.calls == 2
+        assert await cache.get("apex", "Xbox", "Player", fetch) == {"v": 2}
+        assert cache.get_metrics()["stale_hits"] == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_stale_value(self, cache, clock):
+        fetch = CountingFetch({"v": 1}, APIError("down"))
+        await cache.get("apex", "Xbox", "Player", fetch)
+        clock.now += 61
+
+        assert await cache.get("apex", "Xbox", "Player", fetch) == {"v": 1}
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        assert cache.get_metrics()["refresh_errors"] == 1
+        assert await cache.get("apex", "Xbox", "Player", fetch) == {"v": 1}
+
+    @pytest.mark.asyncio
+    async def test_expired_past_stale_window_waits_for_upstream(self, cache, clock):
+        fetch = CountingFetch({"v": 1}, {"v": 2})
+        await cache.get("apex", "Xbox", "Player", fetch)
+        clock.now += 161
+
+        assert await cache.get("apex", "Xbox", "Player", fetch) == {"v": 2}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_fetch(self, cache):
+        fetch = CountingFetch({"v": 1})
+        fetch.release.clear()
+
+        waiters = [asyncio.ensure_future(cache.get("apex", "Xbox", "Player", fetch)) for _ in range(5)]
+        await asyncio.sleep(0)
+        fetch.release.set()
+
+        assert await asyncio.gather(*waiters) == [{"v": 1}] * 5
+        assert fetch.calls == 1
+        assert cache.get_metrics()["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_process_wide_cache_reports_coalescing(self):
+        fetch = CountingFetch({"v": 1})
+        fetch.release.clear()
+        before = get_singleflight_metrics("stats_cache")["deduplicated"]
+
+        waiters = [asyncio.ensure_future(get_stats_cache().get("apex", "Xbox", "Shared", fetch)) for _ in range(3)]
+        await asyncio.sleep(0)
+        fetch.release.set()
+        await asyncio.gather(*waiters)
+
+        assert get_singleflight_metrics("stats_cache")["deduplicated"] - before == 2
+
+    @pytest.mark.asyncio
+    async def test_not_found_is_cached_briefly(self, cache, clock):
+        fetch = CountingFetch(ResourceNotFoundError("nope"), {"v": 1})
+
+        for _ in range(2):
+            with pytest.raises(ResourceNotFoundError):
+                await cache.get("apex", "Xbox", "Ghost", fetch)
+        assert fetch.calls == 1
+
+        clock.now += 11
+        assert await cache.get("apex", "Xbox", "Ghost", fetch) == {"v": 1}
+
+    @pytest.mark.asyncio
+    async def test_errors_and_empty_results_are_not_cached(self, cache):
+        fetch = CountingFetch(APIError("down"), None, {"v": 1})
+
+        with pytest.raises(APIError):
+            await cache.get("apex", "Xbox", "Player", fetch)
+        assert await cache.get("apex", "Xbox", "Player", fetch) is None
+        assert await cache.get("apex", "Xbox", "Player", fetch) == {"v": 1}
+        assert fetch.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_entries_are_evicted(self, cache):
+        for name in ("a", "b", "c"):
+            await cache.get("apex", "Xbox", name, CountingFetch({"name": name}))
+        await cache.get("apex", "Xbox", "a", CountingFetch())
+        await cache.get("apex", "Xbox", "d", CountingFetch({"name": "d"}))
+
+        fetch = CountingFetch({"name": "b2"})
+        assert await cache.get("apex", "Xbox", "b", fetch) == {"name": "b2"}
+        assert await cache.get("apex", "Xbox", "a", CountingFetch()) == {"name": "a"}
+        assert cache.get_metrics()["entries"] == 3
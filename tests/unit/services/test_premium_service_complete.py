@@ -101,19 +101,18 @@ class TestPremiumServiceComplete:
         # If not initialized, test the initialization process
         mock_client, mock_db, mock_collection = mock_mongo_client
         
-        with patch('services.premium.MongoClient', return_value=mock_client):
-            with patch('services.premium.MONGODB_URI', 'mongodb://test'):
-                with patch('services.premium.USERS_DB_NAME', 'test_db'):
-                    with patch('services.premium.USERS_COLLECTION_NAME', 'users'):
-                        _init_db_if_needed()
-                        
-                        # Verify MongoDB client was created correctly
-                        mock_client.admin.command.assert_called_once_with("ping")
+        with patch('services.premium.get_client', return_value=mock_client):
+            with patch('services.premium.USERS_DB_NAME', 'test_db'):
+                with patch('services.premium.USERS_COLLECTION_NAME', 'users'):
+                    _init_db_if_needed()
+                    
+                    # Verify MongoDB client was created correctly
+                    mock_client.admin.command.assert_called_once_with("ping")
 
     def test_db_initialization_failure(self):
         """Test database initialization failure handling"""
         # Test that the module handles initialization errors gracefully
-        with patch('services.premium.MongoClient', side_effect=Exception("Connection failed")):
+        with patch('services.database.connection.get_client', side_effect=Exception("Connection failed")):
             with patch('services.premium.logger') as mock_logger:
                 # Import will trigger module initialization
                 import importlib
@@ -539,6 +538,9 @@ class TestPremiumServiceComplete:
             "is_premium_active", 
             "get_entitlements",
             "get_user_entitlements",
+            "get_many_entitlements",
+            "get_user_entitlements_async",
+            "get_many_entitlements_async",
             "invalidate_user_entitlements",
         ]
         
@@ -560,7 +562,7 @@ class TestPremiumServiceComplete:
         mock_client, mock_db, mock_collection = mock_mongo_client
         
         # Test when main DB and fallback DB are different
-        with patch('services.premium.MongoClient', return_value=mock_client):
+        with patch('services.premium.get_client', return_value=mock_client):
             with patch('services.premium.USERS_DB_NAME', 'main_db'):
                 with patch('services.premium.FALLBACK_USERS_DB_NAME', 'fallback_db'):
                     _init_db_if_needed()
@@ -676,3 +678,154 @@ class TestPremiumServiceComplete:
                     
                     # Should still get same result
                     assert result1 == result3
+
+    def test_get_many_entitlements_batches_lookups(self, mock_mongo_client, sample_user_docs):
+        """Test batched entitlements use one $in query per collection and fill the cache"""
+        from services.premium import get_many_entitlements, _ENTITLEMENTS_CACHE
+        
+        mock_client, mock_db, mock_collection = mock_mongo_client
+        mock_fallback_collection = MagicMock()
+        
+        mock_collection.find.return_value = [sample_user_docs['active_supporter']]
+        mock_fallback_collection.find.return_value = [sample_user_docs['active_vip']]
+        ids = ['123456789', '345678901', 'unknown']
+        for discord_id in ids:
+            _ENTITLEMENTS_CACHE.pop(discord_id, None)
+        
+        with patch('services.premium._mongo_client', mock_client):
+            with patch('services.premium._users_collection', mock_collection):
+                with patch('services.premium._fallback_users_collection', mock_fallback_collection):
+                    result = get_many_entitlements(ids)
+                    
+                    assert result['123456789']['tier'] == 'supporter'
+                    assert result['345678901']['tier'] == 'vip'
+                    assert result['unknown']['tier'] == 'free'
+                    mock_collection.find.assert_called_once()
+                    fallback_query = mock_fallback_collection.find.call_args[0][0]
+                    assert sorted(fallback_query['discordId']['$in']) == ['345678901', 'unknown']
+                    
+                    # Cached entries are served without another query
+                    get_many_entitlements(ids)
+                    mock_collection.find.assert_called_once()
+        
+        for discord_id in ids:
+            _ENTITLEMENTS_CACHE.pop(discord_id, None)
+
+    def test_entitlements_cache_is_bounded(self):
+        """Test the cache evicts least recently used entries once full"""
+        from services.premium import _EntitlementsCache
+        
+        cache = _EntitlementsCache(max_entries=2)
+        expires = time.time() + 300
+        cache['a'] = (expires, {'tier': 'free'})
+        cache['b'] = (expires, {'tier': 'vip'})
+        cache.lookup('a', time.time())
+        cache['c'] = (expires, {'tier': 'sponsor'})
+        
+        assert 'b' not in cache
+        assert 'a' in cache and 'c' in cache
+        
+        # Expired entries are dropped when read
+        cache['d'] = (time.time() - 1, {'tier': 'free'})
+        assert cache.lookup('d', time.time()) is None
+        assert 'd' not in cache
+
+    def test_users_without_account_are_negatively_cached(self, mock_mongo_client):
+        """Test unknown users are cached so later calls skip both collections"""
+        from services.premium import get_user_entitlements, _ENTITLEMENTS_CACHE, _NEGATIVE_CACHE_TTL_SECONDS
+        
+        mock_client, mock_db, mock_collection = mock_mongo_client
+        mock_fallback_collection = MagicMock()
+        mock_collection.find_one.return_value = None
+        mock_fallback_collection.find_one.return_value = None
+        _ENTITLEMENTS_CACHE.pop('no_account', None)
+        
+        with patch('services.premium._mongo_client', mock_client):
+            with patch('services.premium._users_collection', mock_collection):
+                with patch('services.premium._fallback_users_collection', mock_fallback_collection):
+                    with patch('time.time', return_value=1000.0):
+                        assert get_user_entitlements('no_account')['tier'] == 'free'
+                        assert get_user_entitlements('no_account')['tier'] == 'free'
+        
+        assert mock_collection.find_one.call_count == 1
+        assert mock_fallback_collection.find_one.call_count == 1
+        assert _ENTITLEMENTS_CACHE['no_account'][0] == 1000.0 + _NEGATIVE_CACHE_TTL_SECONDS
+        _ENTITLEMENTS_CACHE.pop('no_account', None)
+
+    def test_lookup_errors_are_cached_briefly(self):
+        """Test a failed lookup is only cached for the short error TTL"""
+        from services.premium import get_user_entitlements, _ENTITLEMENTS_CACHE, _ERROR_CACHE_TTL_SECONDS
+        
+        _ENTITLEMENTS_CACHE.pop('123456789', None)
+        with patch('services.premium.get_user_by_discord_id', side_effect=Exception("DB Error")):
+            with patch('time.time', return_value=1000.0):
+                get_user_entitlements('123456789')
+        
+        assert _ENTITLEMENTS_CACHE['123456789'][0] == 1000.0 + _ERROR_CACHE_TTL_SECONDS
+        _ENTITLEMENTS_CACHE.pop('123456789', None)
+
+    def test_database_outage_is_not_cached_as_no_account(self, mock_mongo_client):
+        """Test a failing find_one gets the error TTL instead of the no-account TTL"""
+        from pymongo.errors import ServerSelectionTimeoutError
+        from services.premium import get_user_entitlements, _ENTITLEMENTS_CACHE, _ERROR_CACHE_TTL_SECONDS
+        
+        mock_client, mock_db, mock_collection = mock_mongo_client
+        mock_collection.find_one.side_effect = ServerSelectionTimeoutError("no servers")
+        _ENTITLEMENTS_CACHE.pop('outage_user', None)
+        
+        with patch('services.premium._mongo_client', mock_client):
+            with patch('services.premium._users_collection', mock_collection):
+                with patch('time.time', return_value=1000.0):
+                    assert get_user_entitlements('outage_user')['tier'] == 'free'
+        
+        assert _ENTITLEMENTS_CACHE['outage_user'][0] == 1000.0 + _ERROR_CACHE_TTL_SECONDS
+        _ENTITLEMENTS_CACHE.pop('outage_user', None)
+
+    @pytest.mark.asyncio
+    async def test_async_lookups_are_single_flight(self, mock_mongo_client, sample_user_docs):
+        """Test concurrent async misses for one user share a single query"""
+        import asyncio
+        from services.premium import get_user_entitlements_async, _ENTITLEMENTS_CACHE, _INFLIGHT_LOOKUPS
+        
+        mock_client, mock_db, mock_collection = mock_mongo_client
+        mock_collection.find.return_value = [sample_user_docs['active_sponsor']]
+        _ENTITLEMENTS_CACHE.pop('234567890', None)
+        
+        with patch('services.premium._mongo_client', mock_client):
+            with patch('services.premium._users_collection', mock_collection):
+                results = await asyncio.gather(*[get_user_entitlements_async('234567890') for _ in range(10)])
+                
+                assert all(r['tier'] == 'sponsor' for r in results)
+                mock_collection.find.assert_called_once()
+                assert not _INFLIGHT_LOOKUPS
+                
+                # Cached now, so no further queries
+                await get_user_entitlements_async('234567890')
+                mock_collection.find.assert_called_once()
+        
+        _ENTITLEMENTS_CACHE.pop('234567890', None)
+
+    @pytest.mark.asyncio
+    async def test_async_batch_lookup(self, mock_mongo_client, sample_user_docs):
+        """Test the async batch resolves misses with one $in query across both collections"""
+        from services.premium import get_many_entitlements_async, _ENTITLEMENTS_CACHE
+        
+        mock_client, mock_db, mock_collection = mock_mongo_client
+        mock_fallback_collection = MagicMock()
+        mock_collection.find.return_value = [sample_user_docs['active_supporter']]
+        mock_fallback_collection.find.return_value = []
+        ids = ['123456789', 'unknown']
+        for discord_id in ids:
+            _ENTITLEMENTS_CACHE.pop(discord_id, None)
+        
+        with patch('services.premium._mongo_client', mock_client):
+            with patch('services.premium._users_collection', mock_collection):
+                with patch('services.premium._fallback_users_collection', mock_fallback_collection):
+                    result = await get_many_entitlements_async(ids)
+        
+        assert result['123456789']['tier'] == 'supporter'
+        assert result['unknown']['tier'] == 'free'
+        assert sorted(mock_collection.find.call_args[0][0]['discordId']['$in']) == ids
+        mock_fallback_collection.find.assert_called_once_with({'discordId': {'$in': ['unknown']}})
+        for discord_id in ids:
+            _ENTITLEMENTS_CACHE.pop(discord_id, None)
@@ -0,0 +1,134 @@
+import threading
+import time
+
+import mongomock
+import pytest
+from unittest.mock import patch, MagicMock
+from pymongo.errors import OperationFailure
+
+import services.premium as premium
+from services.premium.watcher import EntitlementsWatcher
+
+
+class FakeChangeStream:
+    """Yields queued change events, then None like an idle try_next()"""
+
+    def __init__(self, changes):
+        self.changes = list(changes)
+        self.resume_token = None
+        self.drained = threading.Event()
+
+    def try_next(self):
+        if self.changes:
+            self.resume_token = {"_data": str(len(self.changes))}
+            return self.changes.pop(0)
+        self.drained.set()
+        time.sleep(0.01)
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _sponsor_doc(discord_id):
+    return {"discordId": discord_id, "premium": True, "status": "active", "role": "sponsor"}
+
+
+class TestEntitlementsWatcher:
+    """Test change-stream driven entitlement invalidation"""
+
+    @pytest.fixture(autouse=True)
+    def reset_cache(self):
+        premium._ENTITLEMENTS_CACHE.clear()
+        yield
+        premium._ENTITLEMENTS_CACHE.clear()
+        premium.set_entitlements_ttl(None)
+
+    def test_primary_update_refreshes_only_that_user(self):
+        """An upgrade on the primary collection replaces just that user's entry"""
+        expires = time.time() + 300
+        premium._ENTITLEMENTS_CACHE["111"] = (expires, premium._tier_entitlements(None))
+        premium._ENTITLEMENTS_CACHE["222"] = (expires, premium._tier_entitlements(None))
+        watcher = EntitlementsWatcher([MagicMock(), MagicMock()])
+
+        watcher.apply_change(0, {"operationType": "update", "fullDocument": _sponsor_doc("111")})
+
+        assert premium.get_user_entitlements("111")["tier"] == "sponsor"
+        assert premium._ENTITLEMENTS_CACHE["222"][0] == expires
+        assert watcher.events_applied == 1
+
+    def test_cached_premium_expires_at_period_end(self):
+        """A subscription lapsing on time sends no event, so the cache can't outlive the paid period"""
+        premium.set_entitlements_ttl(6 * 3600)
+        period_end = int(time.time()) + 60
+        doc = dict(_sponsor_doc("111"), currentPeriodEnd=period_end)
+
+        premium.refresh_user_entitlements(doc)
+        assert premium._ENTITLEMENTS_CACHE["111"][0] == period_end
+
+        premium._ENTITLEMENTS_CACHE.clear()
+        with patch('services.premium.get_user_by_discord_id', return_value=doc):
+            assert premium.get_user_entitlements("111")["tier"] == "sponsor"
+        assert premium._ENTITLEMENTS_CACHE["111"][0] == period_end
+
+        with patch('time.time', return_value=period_end + 1), \
+             patch('services.premium.get_user_by_discord_id', return_value=doc):
+            assert premium.get_user_entitlements("111")["tier"] == "free"
+
+    def test_fallback_update_invalidates(self):
+        """Changes in the fallback collection invalidate, since the primary takes precedence"""
+        premium._ENTITLEMENTS_CACHE["111"] = (time.time() + 300, premium._tier_entitlements(None))
+        watcher = EntitlementsWatcher([MagicMock(), MagicMock()])
+
+        watcher.apply_change(1, {"operationType": "replace", "fullDocument": _sponsor_doc("111")})
+
+        assert "111" not in premium._ENTITLEMENTS_CACHE
+
+    def test_stream_raises_ttl_while_connected(self):
+        """The long TTL applies only while every stream is open"""
+        stream = FakeChangeStream([{"operationType": "insert", "fullDocument": _sponsor_doc("333")}])
+        collection = MagicMock()
+        collection.watch.return_value = stream
+        watcher = EntitlementsWatcher([collection], watched_ttl_seconds=3600)
+
+        watcher.start()
+        try:
+            assert stream.drained.wait(2)
+            assert watcher.active
+            assert premium._positive_ttl_seconds == 3600
+            assert premium._ENTITLEMENTS_CACHE["333"][1]["tier"] == "sponsor"
+        finally:
+            watcher.stop()
+
+        assert not watcher.active
+        assert premium._positive_ttl_seconds == premium._CACHE_TTL_SECONDS
+
+    def test_standalone_server_falls_back_to_ttl(self):
+        """Deployments without change streams keep the normal TTL"""
+        collection = MagicMock()
+        collection.watch.side_effect = OperationFailure(
+            "The $changeStream stage is only supported on replica sets", code=40573,
+        )
+        watcher = EntitlementsWatcher([collection, mongomock.MongoClient()["astrostats"]["users"]])
+
+        watcher.start()
+        for thread in watcher._threads:
+            thread.join(2)
+
+        assert not any(thread.is_alive() for thread in watcher._threads)
+        assert not watcher.active
+        assert premium._positive_ttl_seconds == premium._CACHE_TTL_SECONDS
+
+    def test_lookup_racing_an_invalidation_is_not_cached(self):
+        """A read that overlaps a change event doesn't cache what it read"""
+        def slow_lookup(discord_id, **kwargs):
+            premium.invalidate_user_entitlements(discord_id)
+            return None
+
+        with patch('services.premium.get_user_by_discord_id', side_effect=slow_lookup):
+            premium.get_user_entitlements("444")
+
+        assert "444" not in premium._ENTITLEMENTS_CACHE
@@ -1,6 +1,6 @@
 import pytest
 import discord
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
 
 class TestEmbedUtils:
@@ -100,6 +100,22 @@ class TestEmbedUtils:
         assert "Premium" in upgrade["label"]
         assert upgrade["style"] == discord.ButtonStyle.primary
 
+    @pytest.mark.asyncio
+    async def test_premium_promotion_uses_async_entitlements(self):
+        """Test the promotion helpers await the async lookup instead of blocking the loop"""
+        from ui.embeds import get_premium_promotion_embed, get_premium_promotion_view
+        
+        with patch('services.premium.get_user_entitlements_async',
+                   AsyncMock(return_value={"tier": "sponsor"})) as mock_async, \
+             patch('services.premium.get_user_entitlements') as mock_sync:
+            view = await get_premium_promotion_view("123")
+            embed = await get_premium_promotion_embed("123")
+        
+        assert view.children[0].label == "Manage Account"
+        assert "Sponsor" in embed.description
+        assert mock_async.await_count == 2
+        mock_sync.assert_not_called()
+
     def test_embed_field_limits(self):
         """Test Discord embed field limits"""
         embed_limits = {
@@ -32,13 +32,13 @@ def add_fields_from_dict(embed: discord.Embed, fields_dict: Dict[str, str], inli
         embed.add_field(name=name, value=value, inline=inline)
     return embed
 
-def get_premium_promotion_embed(user_id: str) -> Optional[discord.Embed]:
+async def get_premium_promotion_embed(user_id: str) -> Optional[discord.Embed]:
     """Get premium promotion embed. Always show a small promo; tailor message by tier."""
     try:
         # Import here to avoid circular imports
-        from services.premium import get_user_entitlements
+        from services.premium import get_user_entitlements_async
 
-        entitlements = get_user_entitlements(user_id)
+        entitlements = await get_user_entitlements_async(user_id)
         tier = (entitlements or {}).get("tier", "free")
 
         if tier == "free":
@@ -63,13 +63,13 @@ def get_premium_promotion_embed(user_id: str) -> Optional[discord.Embed]:
         return None  # Never break caller on promo failure
 
 
-def get_premium_promotion_view(user_id: str) -> Optional[View]:
+async def get_premium_promotion_view(user_id: str) -> Optional[View]:
     """Get premium promotion view with link button. Returns a View with premium button."""
     try:
         # Import here to avoid circular imports
-        from services.premium import get_user_entitlements
+        from services.premium import get_user_entitlements_async
         
-        entitlements = get_user_entitlements(user_id)
+        entitlements = await get_user_entitlements_async(user_id)
         tier = (entitlements or {}).get("tier", "free")
         
         view = View(timeout=None)